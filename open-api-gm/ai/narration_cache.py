@@ -0,0 +1,229 @@
+"""
+Narration Cache
+---------------
+Content-addressed cache in front of VeinbreakerNarrator.
+
+Resolutions repeat constantly ("Bleed Strike hits for 4, enemy 12 -> 8, no
+statuses"). Payloads are normalized -- volatile numbers such as exact HP or
+roll totals are bucketed into bands -- and hashed; the hash keys a small set of
+prose variants in an on-disk SQLite table.
+
+- Up to `max_variants` texts are kept per key. While a key has fewer, a lookup
+  misses with probability (1 - have/max_variants) so variety keeps growing;
+  once full, a random stored variant is returned.
+- Total stored text is capped at `max_bytes`; least recently used rows are
+  evicted first.
+
+`CachedNarrator` wraps a narrator and exposes the same narrate* methods. Keys
+include the narrator's signature (model, client type, prompt version), so text
+from another model, the offline stub, or older prompts is never served.
+"""
+
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[1] / ".cache" / "narration.sqlite"
+# The offline stub (VB_NARRATOR_STUB=1) keeps its canned prose out of the real cache.
+STUB_CACHE_PATH = DEFAULT_CACHE_PATH.with_name("narration-stub.sqlite")
+
+# field name -> band width. Anything not listed is kept verbatim.
+_BANDS = {
+    "enemy_hp_before": 5,
+    "enemy_hp_after": 5,
+    "hp": 5,
+    "to_hit": 5,
+    "defense": 5,
+    "resolve": 5,
+    "momentum": 3,
+    "heat": 3,
+    "balance": 3,
+    "veinscore_total": 10,
+}
+
+
+def _band(value: Any, width: int) -> Any:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    if value <= 0:
+        # Dead / empty is narratively distinct from "low".
+        return "0"
+    lo = int((value - 1) // width) * width + 1
+    return f"{lo}-{lo + width - 1}"
+
+
+def normalize_payload(value: Any, key: Optional[str] = None) -> Any:
+    """Canonical form of a narration payload: sorted keys, banded volatile numbers."""
+    if isinstance(value, dict):
+        return {str(k): normalize_payload(v, str(k)) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [normalize_payload(v) for v in value]
+    if key in _BANDS:
+        return _band(value, _BANDS[key])
+    return value
+
+
+def narrator_signature(narrator) -> str:
+    """Who would write the text: model, client type and prompt version."""
+    from ai.narrator import PROMPT_VERSION
+
+    client = getattr(narrator, "client", None)
+    return "|".join(
+        (
+            str(getattr(narrator, "model", None)),
+            f"{type(client).__module__}.{type(client).__qualname__}",
+            PROMPT_VERSION,
+        )
+    )
+
+
+def cache_key(kind: str, payload: Any, scene_tag: Optional[str] = None, narrator_sig: Optional[str] = None) -> str:
+    canon = json.dumps(
+        {"kind": kind, "scene": scene_tag, "narrator": narrator_sig, "payload": normalize_payload(payload)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+class NarrationCache:
+    def __init__(
+        self,
+        path: Path = DEFAULT_CACHE_PATH,
+        *,
+        max_variants: int = 3,
+        max_bytes: int = 8 * 1024 * 1024,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.max_variants = max(1, int(max_variants))
+        self.max_bytes = int(max_bytes)
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS narration ("
+            " key TEXT NOT NULL, variant INTEGER NOT NULL, text TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (key, variant))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS narration_lru ON narration (last_used)")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            rows = self._db.execute("SELECT variant, text FROM narration WHERE key = ?", (key,)).fetchall()
+            if not rows or (len(rows) < self.max_variants and self.rng.random() >= len(rows) / self.max_variants):
+                self.stats["misses"] += 1
+                return None
+            variant, text = self.rng.choice(rows)
+            self._db.execute(
+                "UPDATE narration SET last_used = ? WHERE key = ? AND variant = ?",
+                (self.clock(), key, variant),
+            )
+            self._db.commit()
+            self.stats["hits"] += 1
+            return text
+
+    def put(self, key: str, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT variant, text FROM narration WHERE key = ? ORDER BY last_used", (key,)
+            ).fetchall()
+            if any(t == text for _, t in rows):
+                return
+            used = {v for v, _ in rows}
+            if len(rows) >= self.max_variants:
+                variant = rows[0][0]  # replace the stalest variant
+            else:
+                variant = next(i for i in range(self.max_variants) if i not in used)
+            size = len(text.encode("utf-8"))
+            self._db.execute(
+                "INSERT OR REPLACE INTO narration (key, variant, text, bytes, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, variant, text, size, self.clock()),
+            )
+            self.stats["stores"] += 1
+            self._evict()
+            self._db.commit()
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM narration").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _evict(self) -> None:
+        total = int(self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM narration").fetchone()[0])
+        if total <= self.max_bytes:
+            return
+        for key, variant, size in self._db.execute(
+            "SELECT key, variant, bytes FROM narration ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM narration WHERE key = ? AND variant = ?", (key, variant))
+            total -= size
+            self.stats["evictions"] += 1
+
+
+class CachedNarrator:
+    """
+    Drop-in wrapper: same narrate* API as VeinbreakerNarrator, consulting the
+    cache before calling the model. Anything else is forwarded to the narrator.
+    """
+
+    def __init__(self, narrator, cache: NarrationCache):
+        self.narrator = narrator
+        self.cache = cache
+        self.signature = narrator_signature(narrator)
+
+    def __getattr__(self, name):
+        return getattr(self.narrator, name)
+
+    def _cached(self, kind: str, payload: Dict[str, Any], scene_tag: Optional[str], produce: Callable[[], str]) -> str:
+        key = cache_key(kind, payload, scene_tag, self.signature)
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+        text = produce()
+        self.cache.put(key, text)
+        return text
+
+    def narrate(self, resolution: Dict[str, Any], *, scene_tag: Optional[str] = None) -> str:
+        return self._cached("narrate", resolution, scene_tag, lambda: self.narrator.narrate(resolution, scene_tag=scene_tag))
+
+    def narrate_scene(self, payload: Dict[str, Any]) -> str:
+        return self._cached("scene", payload, None, lambda: self.narrator.narrate_scene(payload))
+
+    def narrate_aftermath(self, payload: Dict[str, Any]) -> str:
+        return self._cached("aftermath", payload, None, lambda: self.narrator.narrate_aftermath(payload))
+
+    def narrate_loot(self, payload: Dict[str, Any]) -> str:
+        return self._cached("loot", payload, None, lambda: self.narrator.narrate_loot(payload))
+
+    def narrate_batch(self, resolutions: List[Dict[str, Any]], *, scene_tag: Optional[str] = None) -> List[str]:
+        """Serve cached links directly; only the misses go to the model, still as one batch."""
+        keys = [cache_key("narrate", r, scene_tag, self.signature) for r in resolutions]
+        texts: List[Optional[str]] = [self.cache.get(k) for k in keys]
+        missing = [i for i, t in enumerate(texts) if t is None]
+        if missing:
+            fresh = self.narrator.narrate_batch([resolutions[i] for i in missing], scene_tag=scene_tag)
+            for i, text in zip(missing, fresh):
+                texts[i] = text
+                self.cache.put(keys[i], text)
+        return [t or "" for t in texts]
@@ -5,11 +5,12 @@ Procedural narration layer.
 Consumes structured resolution data and returns restrained prose.
 """
 
+import hashlib
 import json
 import os
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 try:
     from openai import OpenAI  # type: ignore
@@ -102,6 +103,10 @@ Loot rules:
 - Do not invent origins beyond what is implied by the name.
 """
 
+# Canon, rules and the per-method prompt templates all live in this file, so its
+# digest versions the prompts (cached narration keys include it).
+PROMPT_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
 
 def narrator_stub(text: str) -> None:
     """
@@ -174,6 +179,59 @@ Narrate the resolution.
 
         return self._extract_text(response)
 
+    def narrate_batch(
+        self,
+        resolutions: List[Dict[str, Any]],
+        *,
+        scene_tag: Optional[str] = None
+    ) -> List[str]:
+        """
+        Narrate several links of one chain with a single request.
+        Returns one narration per resolution (empty string where the model came up short).
+        """
+        if not resolutions:
+            return []
+        if len(resolutions) == 1:
+            return [self.narrate(resolutions[0], scene_tag=scene_tag)]
+
+        links = json.dumps(resolutions, indent=2)
+        system_prompt = VOICE_CANON.strip()
+        user_prompt = f"""
+{NARRATION_RULES.strip()}
+
+Scene: {scene_tag or "unspecified"}
+
+The resolution data below is a list of {len(resolutions)} chain links, in order.
+Link count: {len(resolutions)}
+
+Resolution data:
+{links}
+
+Narrate each link separately, following the output rules for each one.
+Return ONLY a JSON array of {len(resolutions)} strings, one per link, in order.
+""".strip()
+
+        response = self.client.responses.create(
+            model=self.model,
+            input=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_output_tokens=120 * len(resolutions),
+        )
+
+        raw = " ".join(self._extract_parts(response)).strip()
+        texts: List[str] = []
+        try:
+            parsed = json.loads(raw[raw.index("["): raw.rindex("]") + 1])
+            if isinstance(parsed, list):
+                texts = [str(t) for t in parsed]
+        except Exception:
+            texts = [line.strip() for line in raw.splitlines() if line.strip()]
+        texts = [self._postprocess(t) for t in texts[: len(resolutions)]]
+        texts.extend([""] * (len(resolutions) - len(texts)))
+        return texts
+
     def narrate_scene(self, payload: Dict[str, Any]) -> str:
         """Scene/setup narration."""
         return self.narrate(payload, scene_tag="scene")
@@ -210,10 +268,7 @@ Limit: 40 words.
     # INTERNALS
     # =========================
 
-    def _extract_text(self, response) -> str:
-        """
-        Safely extract text from OpenAI Responses API output.
-        """
+    def _extract_parts(self, response) -> List[str]:
         parts = []
         for item in response.output:
             # message content
@@ -221,8 +276,13 @@ Limit: 40 words.
                 for c in item.content:
                     if getattr(c, "type", None) == "output_text":
                         parts.append(c.text)
+        return parts
 
-        text = " ".join(parts).strip()
+    def _extract_text(self, response) -> str:
+        """
+        Safely extract text from OpenAI Responses API output.
+        """
+        text = " ".join(self._extract_parts(response)).strip()
         return self._postprocess(text)
 
     def _postprocess(self, text: str) -> str:
@@ -0,0 +1,62 @@
+"""
+Offline stand-in for the OpenAI client.
+----------------------------------------
+Implements just enough of `client.responses.create(...)` for VeinbreakerNarrator:
+returns canned, deterministic prose (a JSON array for batched chain prompts) and
+records every call. Used by tests and by `VB_NARRATOR_STUB=1` for local play
+without an API key.
+"""
+
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+_LINK_COUNT_RE = re.compile(r"Link count:\s*(\d+)")
+
+
+def _response(text: str) -> SimpleNamespace:
+    content = [SimpleNamespace(type="output_text", text=text)]
+    return SimpleNamespace(output=[SimpleNamespace(type="message", content=content)])
+
+
+class _StubResponses:
+    def __init__(self, owner: "StubOpenAIClient"):
+        self._owner = owner
+
+    def create(self, *, model: str, input: List[Dict[str, Any]], **kwargs) -> SimpleNamespace:
+        return self._owner._create(model=model, input=input, **kwargs)
+
+
+class StubOpenAIClient:
+    """
+    delay:   seconds to sleep per call (simulates model latency; use it to test timeouts)
+    text_fn: optional callable(prompt) -> str overriding the canned reply
+    """
+
+    def __init__(self, *, delay: float = 0.0, text_fn: Optional[Callable[[str], str]] = None):
+        self.delay = float(delay)
+        self.text_fn = text_fn
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.responses = _StubResponses(self)
+
+    def _create(self, *, model: str, input: List[Dict[str, Any]], **kwargs) -> SimpleNamespace:
+        prompt = ""
+        for msg in input or []:
+            if isinstance(msg, dict) and msg.get("role") == "user":
+                prompt = str(msg.get("content") or "")
+        with self._lock:
+            self.calls.append({"model": model, "prompt": prompt, **kwargs})
+            n = len(self.calls)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.text_fn:
+            return _response(self.text_fn(prompt))
+        match = _LINK_COUNT_RE.search(prompt)
+        if match:
+            count = int(match.group(1))
+            return _response(json.dumps([f"Link {i + 1} lands. Stone answers." for i in range(count)]))
+        return _response(f"The strike lands. Stone answers. ({n})")
@@ -0,0 +1,441 @@
+"""
+benchmarks.py
+-------------
+Seeded performance benchmarks for the engine, the loaders and the step path.
+
+Each case times one operation (setup excluded) until it has run for
+`min_time` seconds, then re-runs a few operations under tracemalloc:
+
+- `ops_per_sec`, `mean_us`, `p50_us`, `p95_us` from the timed runs;
+- `alloc_peak_bytes`: peak extra memory while one operation runs;
+- `alloc_retained_bytes`: memory still held after it (leaks, caches).
+
+Cases use fixed seeds and the `tests/smalldata` fixtures (abilities and the
+Brumklin Skitter encounter), except the loader and scene/step cases, which
+exercise the real `game-data`.
+
+Library use:
+    from benchmarks import compare, run_benchmarks
+    report = run_benchmarks(["resolve_chain"], min_time=0.2)
+    regressions = compare(report, json.load(open("bench_baseline.json")))
+
+CLI: see tools/bench.py.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import play
+from engine.action_resolution import apply_action_effects, resolve_action_step, roll
+from engine.chain_odds import matchup as chain_matchup
+from engine.chain_optimizer import clear_cache as clear_optimizer_cache, suggest_chains
+from engine.chain_resolution_engine import ChainResolutionEngine
+from engine.combat_state import register_participant
+from engine.enemy_planner import clear_cache as clear_planner_cache, plan_chain
+from engine.game_data import GameData
+from engine.interrupt_controller import apply_interrupt
+from engine.interrupt_policy import EnemyWindowPolicy, InterruptDecision
+from engine.interrupt_windows import InterruptContext
+from engine.rng import bind as bind_rng, start_encounter_rng
+from simulator import HeadlessUI
+
+REPORT_VERSION = 1
+SMALLDATA = Path(__file__).parent / "tests" / "smalldata"
+CHAIN_LENGTHS = range(1, 9)
+
+# A case factory takes the seed and returns (setup, run): setup() builds the
+# input of one operation (untimed), run(arg) is the timed operation.
+Case = Tuple[Callable[[], Any], Callable[[Any], Any]]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops: int
+    seconds: float
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p95_us: float
+    alloc_peak_bytes: int
+    alloc_retained_bytes: int
+
+
+# ─────────────────────────────────────────
+# Fixtures
+# ─────────────────────────────────────────
+
+def _read_json(path: Path) -> Any:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def smalldata() -> Tuple[dict, dict]:
+    """(abilities, encounter) from tests/smalldata."""
+    return _read_json(SMALLDATA / "abilities.json"), _read_json(SMALLDATA / "encounter_example_01.json")
+
+
+def _attack_names(abilities: dict) -> List[str]:
+    return [a["name"] for a in abilities.get("abilities", []) if a.get("type") == "attack" and a.get("name")]
+
+
+class _NoInterrupts:
+    """Keeps every link of a benchmarked chain on the clock."""
+
+    def decide(self, when, ctx, state=None, ui=None):
+        return InterruptDecision("no_interrupt")
+
+
+def _combat_state(seed: int, abilities: dict, encounter: dict) -> Tuple[dict, dict, dict]:
+    random.seed(seed)
+    state = play.initial_state()
+    state["seed"] = seed
+    state["flags"] = {"narration_enabled": False}
+    state["phase"]["round"] = 1
+    player = state["party"]["members"][0]
+    player.update(json.loads(json.dumps(encounter["player"])))
+    player["abilities"] = [a["name"] for a in abilities["abilities"]]
+    play.hydrate_character_abilities(player, {"abilities": abilities})
+    enemy = json.loads(json.dumps(encounter["enemy"]["instance"]))
+    # Enough HP that no benchmarked chain ends early on a kill.
+    enemy["hp"] = 10_000
+    state["enemies"] = [enemy]
+    register_participant(state, key="player", entity=player, side="player")
+    register_participant(state, key="enemy0", entity=enemy, side="enemy")
+    play.reset_encounter_meters(state, player=player, enemy=enemy, reset_rp=True)
+    return state, player, enemy
+
+
+# ─────────────────────────────────────────
+# Cases
+# ─────────────────────────────────────────
+
+def case_load_game_data_json(seed: int) -> Case:
+    """Full parse + index of game-data JSON (the cold path without a content pack)."""
+    return (lambda: None), (lambda _: GameData.build(play._read_game_data(), None))
+
+
+def case_load_game_data_cached(seed: int) -> Case:
+    """Per-session view of the process-wide game data."""
+    play.shared_game_data()
+    return (lambda: None), (lambda _: play.load_game_data())
+
+
+def case_hydrate_character_abilities(seed: int) -> Case:
+    abilities, encounter = smalldata()
+    game_data = {"abilities": abilities}
+    names = [a["name"] for a in abilities["abilities"]]
+
+    def setup():
+        ch = json.loads(json.dumps(encounter["player"]))
+        ch["abilities"] = list(names)
+        return ch
+
+    return setup, (lambda ch: play.hydrate_character_abilities(ch, game_data))
+
+
+def _case_resolve_chain(length: int) -> Callable[[int], Case]:
+    def factory(seed: int) -> Case:
+        abilities, encounter = smalldata()
+        attacks = _attack_names(abilities)
+        chain = [attacks[i % len(attacks)] for i in range(length)]
+        ui = HeadlessUI(random.Random(seed))
+
+        def setup():
+            state, player, enemy = _combat_state(seed, abilities, encounter)
+            enc_rng = start_encounter_rng(state)
+            cre = ChainResolutionEngine(
+                roll_fn=roll,
+                resolve_action_step_fn=resolve_action_step,
+                apply_action_effects_fn=apply_action_effects,
+                emit_log_fn=None,
+                interrupt_apply_fn=apply_interrupt,
+                interrupt_policy=_NoInterrupts(),
+                rng=enc_rng,
+            )
+            return cre, state, player, enemy
+
+        def run(arg):
+            cre, state, player, enemy = arg
+            with bind_rng(state):
+                return cre.resolve_chain(
+                    state=state,
+                    ui=ui,
+                    aggressor=player,
+                    defender=enemy,
+                    chain_ability_names=chain,
+                    defender_group=[enemy],
+                )
+
+        return setup, run
+
+    factory.__doc__ = f"ChainResolutionEngine.resolve_chain over {length} smalldata attack link(s)."
+    return factory
+
+
+def case_enemy_window_decide(seed: int) -> Case:
+    """EnemyWindowPolicy.decide for the Skitter's legacy window after a missed link."""
+    abilities, encounter = smalldata()
+    state, player, enemy = _combat_state(seed, abilities, encounter)
+    state["log"] = [{"action_effects": {"hit": False}}]
+    policy = EnemyWindowPolicy(random.Random(seed))
+    link = {"name": _attack_names(abilities)[0], "type": "attack"}
+    rounds = iter(range(1, 1 << 62))
+
+    def setup():
+        # New round each call, so the per-round interrupt budget never runs out.
+        state["phase"]["round"] = next(rounds)
+        return InterruptContext(
+            aggressor=player, defender=enemy, chain_index=2, chain_length=4,
+            link=link, attack_d20=11, defender_d20=9, state=state,
+        )
+
+    return setup, (lambda ctx: policy.decide("after_link", ctx, state))
+
+
+def case_enemy_planner(seed: int) -> Case:
+    """Uncached enemy_planner.plan_chain: the Skitter plus two variant moves, 4 RP, against the player."""
+    abilities, encounter = smalldata()
+    state, player, enemy = _combat_state(seed, abilities, encounter)
+    base = enemy["moves"][0]
+    moves = [
+        base,
+        {**base, "id": "move.bench.spike", "dice": "2d4", "cost": {"rp": 2}},
+        {**base, "id": "move.bench.bleed", "on_hit": {"effects": ["bleed"]}},
+    ]
+    m = chain_matchup(state, enemy, player, interrupt_chance=0.5)
+
+    def setup():
+        clear_planner_cache()
+
+    return setup, (lambda _: plan_chain(enemy, moves, 4, m, max_evals=1000))
+
+
+def case_chain_suggest(seed: int) -> Case:
+    """Uncached chain_optimizer.suggest_chains: the smalldata player's abilities against the Skitter."""
+    abilities, encounter = smalldata()
+    state, _player, _enemy = _combat_state(seed, abilities, encounter)
+
+    def setup():
+        clear_optimizer_cache()
+
+    return setup, (lambda _: suggest_chains(state, budget_ms=1000))
+
+
+def case_enter_scene(seed: int) -> Case:
+    """play.enter_scene_into_state for the first scene of the campaign script."""
+    scene_id = play.script_scene_ids(play.load_script())[0]
+
+    def setup():
+        random.seed(seed)
+        ctx = play.create_game_context(HeadlessUI(random.Random(seed)), skip_character_creation=True)
+        ctx["state"].setdefault("flags", {})["narration_enabled"] = False
+        return ctx
+
+    return setup, (lambda ctx: play.enter_scene_into_state(ctx, scene_id))
+
+
+def play_encounter(session, rng: random.Random, max_steps: int = 400) -> int:
+    """
+    Drive a web session from `start` through its first encounter (until the
+    combat is over or `max_steps`), answering prompts like a client. Returns
+    the number of steps taken.
+    """
+    session.step({"action": "start"})
+    state = session.game.context["state"]
+    steps = 1
+    in_combat = False
+    while steps < max_steps:
+        awaiting = state.get("awaiting") or {}
+        kind = awaiting.get("type")
+        if state.get("combat_over") and in_combat:
+            break
+        if kind == "chain_builder":
+            in_combat = True
+            opts = [o.get("id") or o.get("name") for o in awaiting.get("options", []) if isinstance(o, dict)]
+            opts = [o for o in opts if o]
+            body = {"action": "declare_chain", "chain": rng.sample(opts, min(len(opts), rng.randint(1, 3)))}
+        elif kind == "chain_interrupt":
+            body = {"action": "interrupt_skip"}
+        elif kind == "execute_prompt":
+            body = {"action": "execute_no"}
+        elif kind:
+            body = {"action": "choice", "choice": 0}
+        else:
+            body = {"action": "tick"}
+        session.step(body)
+        steps += 1
+    return steps
+
+
+def case_session_encounter(seed: int) -> Case:
+    """GameSession.step loop through one complete encounter of a fresh web session."""
+    from game_runner import Game
+    from game_session import GameSession
+    from ui.web_provider import WebProvider
+
+    def setup():
+        random.seed(seed)
+        session = GameSession(None)
+        session.game = Game(WebProvider(session))
+        return session
+
+    return setup, (lambda session: play_encounter(session, random.Random(seed)))
+
+
+BENCHMARKS: Dict[str, Callable[[int], Case]] = {
+    "load_game_data.json": case_load_game_data_json,
+    "load_game_data.cached": case_load_game_data_cached,
+    "hydrate_character_abilities": case_hydrate_character_abilities,
+    **{f"resolve_chain.len{n}": _case_resolve_chain(n) for n in CHAIN_LENGTHS},
+    "enemy_window_policy.decide": case_enemy_window_decide,
+    "enemy_planner.plan": case_enemy_planner,
+    "chain_optimizer.suggest": case_chain_suggest,
+    "enter_scene_into_state": case_enter_scene,
+    "session.encounter": case_session_encounter,
+}
+
+
+# ─────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def measure(name: str, case: Case, *, min_time: float = 1.0, min_ops: int = 5, max_ops: int = 1_000_000, alloc_ops: int = 3) -> BenchResult:
+    setup, run = case
+    run(setup())  # warm caches and lazy imports
+
+    samples: List[float] = []
+    total = 0.0
+    # As timeit does: a collection triggered by setup garbage would land in a random sample.
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        while (total < min_time or len(samples) < min_ops) and len(samples) < max_ops:
+            arg = setup()
+            t0 = time.perf_counter()
+            run(arg)
+            dt = time.perf_counter() - t0
+            samples.append(dt)
+            total += dt
+            if len(samples) % 256 == 0:
+                gc.collect()
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(max(1, alloc_ops)):
+            arg = setup()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            out = run(arg)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+            del out, arg
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return BenchResult(
+        name=name,
+        ops=len(samples),
+        seconds=total,
+        ops_per_sec=len(samples) / total if total else 0.0,
+        mean_us=statistics.fmean(samples) * 1e6,
+        p50_us=_percentile(samples, 50) * 1e6,
+        p95_us=_percentile(samples, 95) * 1e6,
+        alloc_peak_bytes=int(statistics.median(peaks)),
+        alloc_retained_bytes=int(statistics.median(retained)),
+    )
+
+
+def select(patterns: Optional[Iterable[str]] = None) -> List[str]:
+    """Benchmark names matching any of `patterns` (prefix match; default: all)."""
+    patterns = list(patterns or [])
+    if not patterns:
+        return list(BENCHMARKS)
+    return [n for n in BENCHMARKS if any(n == p or n.startswith(p) for p in patterns)]
+
+
+def run_benchmarks(
+    names: Optional[Iterable[str]] = None,
+    *,
+    seed: int = 0,
+    min_time: float = 1.0,
+    min_ops: int = 5,
+    alloc_ops: int = 3,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in select(names):
+        result = measure(name, BENCHMARKS[name](seed), min_time=min_time, min_ops=min_ops, alloc_ops=alloc_ops)
+        results[name] = asdict(result)
+        if progress:
+            progress(result)
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            "seed": seed,
+            "min_time": min_time,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+# ─────────────────────────────────────────
+# Baseline comparison
+# ─────────────────────────────────────────
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], *, threshold: float = 0.10, alloc_threshold: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    One row per benchmark present in both reports: speed (baseline p50 / current
+    p50) and peak-allocation (current / baseline) ratios, and whether either
+    crossed its threshold (speed down by more than `threshold`, peak
+    allocations up by more than `alloc_threshold`).
+    """
+    rows: List[Dict[str, Any]] = []
+    base = baseline.get("results", {}) if isinstance(baseline, dict) else {}
+    for name, cur in (report.get("results") or {}).items():
+        old = base.get(name)
+        if not isinstance(old, dict):
+            continue
+        # Medians: a few slow outliers (GC, scheduler) should not read as a regression.
+        speed = old["p50_us"] / cur["p50_us"] if cur.get("p50_us") else 1.0
+        alloc = cur["alloc_peak_bytes"] / old["alloc_peak_bytes"] if old.get("alloc_peak_bytes") else 1.0
+        slower = speed < 1.0 - threshold
+        heavier = alloc > 1.0 + alloc_threshold
+        rows.append({
+            "name": name,
+            "ops_per_sec": cur["ops_per_sec"],
+            "baseline_ops_per_sec": old["ops_per_sec"],
+            "speed_ratio": speed,
+            "alloc_ratio": alloc,
+            "regression": slower or heavier,
+            "reason": ", ".join(r for r, hit in (("slower", slower), ("more allocations", heavier)) if hit),
+        })
+    return rows
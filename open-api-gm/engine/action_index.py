@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# entity id -> (entity, index). Kept off the entity so character/enemy dicts stay
+# plain JSON data (saves, snapshots, deep copies never see the index).
+_INDEXES: Dict[int, Tuple[Dict[str, Any], "ActionIndex"]] = {}
+_INDEXES_LOCK = threading.Lock()
+_INDEXES_MAX = 4096
+
+
+class ActionIndex:
+    """
+    name/id -> action dict for one entity's `abilities` + `moves`.
+
+    Lookup order matches the old linear scan: abilities before moves, and within
+    a list the first entry whose name OR id matches wins.
+    """
+
+    __slots__ = ("token", "items", "by_key")
+
+    def __init__(self, token: Tuple[int, int, int, int], items: Tuple[Any, ...], by_key: Dict[str, Dict[str, Any]]):
+        self.token = token
+        self.items = items
+        self.by_key = by_key
+
+    def current(self, abilities, moves) -> bool:
+        """Same lists, same length, and the same action objects in every slot."""
+        if self.token != _token(abilities, moves):
+            return False
+        items = self.items
+        n = len(abilities)
+        return all(a is b for a, b in zip(items, abilities)) and all(a is b for a, b in zip(items[n:], moves))
+
+    def get(self, name_or_id: Any) -> Optional[Dict[str, Any]]:
+        return self.by_key.get(name_or_id)
+
+
+_EMPTY: tuple = ()
+
+
+def _lists(entity: Dict[str, Any]):
+    abilities = entity.get("abilities")
+    moves = entity.get("moves")
+    return (
+        abilities if isinstance(abilities, list) else _EMPTY,
+        moves if isinstance(moves, list) else _EMPTY,
+    )
+
+
+def _token(abilities, moves) -> Tuple[int, int, int, int]:
+    return (id(abilities), len(abilities), id(moves), len(moves))
+
+
+def build_action_index(entity: Dict[str, Any]) -> Optional[ActionIndex]:
+    """(Re)build the entity's action index and remember it for `action_index`."""
+    if not isinstance(entity, dict):
+        return None
+    abilities, moves = _lists(entity)
+    by_key: Dict[str, Dict[str, Any]] = {}
+    for action in list(abilities) + list(moves):
+        if not isinstance(action, dict):
+            continue
+        for key in (action.get("name"), action.get("id")):
+            if key is not None and key not in by_key:
+                by_key[key] = action
+    index = ActionIndex(_token(abilities, moves), tuple(abilities) + tuple(moves), by_key)
+    with _INDEXES_LOCK:
+        if len(_INDEXES) >= _INDEXES_MAX:
+            _INDEXES.clear()
+        _INDEXES[id(entity)] = (entity, index)
+    return index
+
+
+def invalidate_action_index(entity: Dict[str, Any]) -> None:
+    with _INDEXES_LOCK:
+        hit = _INDEXES.get(id(entity))
+        if hit is not None and hit[0] is entity:
+            del _INDEXES[id(entity)]
+
+
+def action_index(entity: Dict[str, Any]) -> Optional[ActionIndex]:
+    """
+    Return the entity's action index, rebuilding it if the abilities/moves lists
+    were replaced, resized or had an entry swapped (`abilities[i] = new`) since
+    it was built. Renaming an action dict in place is not detected; call
+    `invalidate_action_index` after doing that.
+    """
+    if not isinstance(entity, dict):
+        return None
+    hit = _INDEXES.get(id(entity))
+    if hit is not None and hit[0] is entity:
+        abilities, moves = _lists(entity)
+        if hit[1].current(abilities, moves):
+            return hit[1]
+    return build_action_index(entity)
+
+
+def lookup_action(entity: Dict[str, Any], name_or_id: Any) -> Optional[Dict[str, Any]]:
+    index = action_index(entity)
+    return index.get(name_or_id) if index else None
@@ -2,24 +2,28 @@ import random
 from engine.stats import stat_mod
 from engine.status import apply_status_effects
 from engine.utilities import compare
-from engine.combat_state import combat_add, combat_get, combat_set, consume_shield, shield_value
+from engine.combat_state import combat_add, combat_get, combat_set, consume_shield, participant, shield_value
+from engine.dice import parse as parse_dice
+from engine.rng import current as current_rng, stream as rng_stream
 
 try:
     from game_context import NARRATOR
 except Exception:
     NARRATOR = None
 
-def roll(dice: str) -> int:
+def roll(dice, stream: str = "damage") -> int:
     """
-    Roll a dice expression like '1d6' or '2d4'.
+    Roll a dice expression like '1d6', '2d4' or '1d6+2' (or an engine.dice.DiceExpr).
+    Uses the bound encounter RNG substream (engine.rng) when there is one.
     """
+    rng = current_rng()
+    if rng is not None:
+        return rng.roll(dice, stream)
     try:
-        count_str, die_str = dice.lower().split("d")
-        count = int(count_str)
-        die = int(die_str)
-    except Exception:
+        expr = parse_dice(dice)
+    except ValueError:
         return 0
-    return sum(random.randint(1, die) for _ in range(count))
+    return expr.roll(random)
 
 
 def ability_attack_roll(character, ability, base_d20=None):
@@ -28,7 +32,7 @@ def ability_attack_roll(character, ability, base_d20=None):
     If base_d20 is provided, it is used instead of rolling a new d20.
     Returns (total, d20_roll).
     """
-    die_total = base_d20 if base_d20 is not None else roll("1d20")
+    die_total = base_d20 if base_d20 is not None else roll("1d20", stream="attack")
     add_stat = ability.get("addStatToAttackRoll", True)
     stat_key = ability.get("stat")
     stats = character.get("stats") or character.get("attributes", {})
@@ -173,7 +177,7 @@ def apply_momentum_feeds(enemy, trigger: str):
             continue
         chance = feed.get("chance", 1)
         try:
-            if random.random() > float(chance):
+            if rng_stream("ai").random() > float(chance):
                 continue
         except Exception:
             continue
@@ -182,6 +186,13 @@ def apply_momentum_feeds(enemy, trigger: str):
     return gained
 
 
+def _is_player_side(state, character):
+    p = participant(state, character) if isinstance(character, dict) else None
+    if p is not None:
+        return p.side != "enemy"
+    return isinstance(character, dict) and not character.get("moves")
+
+
 def apply_action_effects(state, character, enemies, defense_d20=None):
     pending = state.get("pending_action")
     if not pending or pending.get("cancelled"):
@@ -196,6 +207,9 @@ def apply_action_effects(state, character, enemies, defense_d20=None):
     tags = pending.get("tags", [])
     log = pending.get("log", {})
     log["ability_name"] = pending.get("ability")
+    if _is_player_side(state, character):
+        # Read back by the combat journal for `player_moved` behavior conditions.
+        log["movement"] = ability.get("type") == "movement" or ability.get("resolution") == "movement"
     effects = ability.get("effects") or {}
 
     def _get_res(e, k, default=0):
@@ -395,7 +409,11 @@ def apply_action_effects(state, character, enemies, defense_d20=None):
 
     log_entry = {"type": "action_resolution", "action_effects": log}
 
-    if state.get("flags", {}).get("narration_enabled") and NARRATOR:
+    flags = state.get("flags", {})
+    if flags.get("narration_enabled") and flags.get("narration_async"):
+        # Queued per chain by the caller (NarrationService); text arrives later as an event.
+        log_entry["narration_pending"] = True
+    elif flags.get("narration_enabled") and NARRATOR:
         try:
             narration_input = build_narration_payload(state=state, effects=log)
             narration = NARRATOR.narrate(narration_input, scene_tag="combat")
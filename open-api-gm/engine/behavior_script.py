@@ -0,0 +1,208 @@
+"""
+Behavior scripts
+----------------
+Enemy move selection, compiled once per archetype.
+
+An archetype's `ai.behavior_script.default_loop` is an ordered list of steps:
+
+  {"type": "move", "ref": "move.pressure_strike"}
+  {"type": "conditional", "if": {"player_missed_last_action": true},
+   "then": [{"type": "move", "ref": "move.punish_miss"}]}
+
+The first step that applies picks the move; with none, the enemy uses its
+first move. `play.select_enemy_move` used to rebuild the move lookup and
+re-interpret the loop on every enemy turn. `compile_behavior` turns the loop
+into a flat table of rules -- (conditions, move) with the move refs already
+resolved against the enemy's moves -- cached per (script, moves) object pair,
+which spawns share with their bestiary template.
+
+Conditions read the combat journal, not the log:
+
+  player_missed_last_action: bool   last resolved hit/miss was a miss
+  player_moved: bool                the player's latest action was a movement ability
+  blood_mark_gte: int               blood marks on the lead party member
+
+Steps that can never fire (unknown conditions, malformed values, refs to
+moves the enemy does not have) are dropped at compile time and listed in
+`errors`; `precompile_behaviors` reports them at load. Rules after one without
+conditions are unreachable and dropped too.
+
+`CompiledBehavior.choose(state, trace=[])` records every rule it evaluated
+(step, move, each condition's result) for debugging; see
+`play.select_enemy_move` and VB_AI_TRACE. `match` is the same without the
+fallback: the enemy planner opens with the scripted move when a rule
+applies and plans freely otherwise.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from engine.combat_journal import last_action_missed, player_moved
+from engine.game_data import FrozenDict, FrozenList
+from engine.interrupt_windows import PredicateError
+
+Check = Callable[[Dict[str, Any]], bool]
+
+
+def _int_value(key: str, val: Any) -> int:
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        raise PredicateError(f"{key}: expected an integer, got {val!r}") from None
+
+
+def _lead_blood(state: Dict[str, Any]) -> int:
+    try:
+        members = state.get("party", {}).get("members") or [{}]
+        return int((members[0].get("marks") or {}).get("blood", 0))
+    except Exception:
+        return 0
+
+
+def compile_condition(key: str, val: Any) -> Check:
+    """One `if` entry as a test(state); raises PredicateError for unknown keys or bad values."""
+    if key == "player_missed_last_action":
+        want = bool(val)
+        return lambda state: last_action_missed(state) == want
+    if key == "player_moved":
+        want = bool(val)
+        return lambda state: player_moved(state) == want
+    if key == "blood_mark_gte":
+        n = _int_value(key, val)
+        return lambda state: _lead_blood(state) >= n
+    raise PredicateError(f"Unknown condition: {key}")
+
+
+class BehaviorRule:
+    __slots__ = ("step", "conditions", "move")
+
+    def __init__(self, step: int, conditions: Tuple[Tuple[str, Any, Check], ...], move: Dict[str, Any]):
+        self.step = step
+        self.conditions = conditions
+        self.move = move
+
+
+class CompiledBehavior:
+    """
+    A behavior script compiled against one move list: `rules` in evaluation
+    order, `fallback` (the first move, or None), `errors` for dropped steps.
+    """
+
+    __slots__ = ("rules", "fallback", "errors")
+
+    def __init__(self, rules: List[BehaviorRule], fallback: Optional[Dict[str, Any]], errors: List[str]):
+        self.rules = tuple(rules)
+        self.fallback = fallback
+        self.errors = list(errors)
+
+    def choose(self, state: Dict[str, Any], trace: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        move = self.match(state, trace)
+        if move is not None:
+            return move
+        if trace is not None and self.fallback is not None:
+            trace.append({"step": None, "move": self.fallback.get("id"), "fallback": True, "matched": True})
+        return self.fallback
+
+    def match(self, state: Dict[str, Any], trace: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """The move of the first rule that applies, or None (no fallback)."""
+        if trace is not None:
+            return self._match_traced(state, trace)
+        for rule in self.rules:
+            for _key, _val, check in rule.conditions:
+                if not check(state):
+                    break
+            else:
+                return rule.move
+        return None
+
+    def _match_traced(self, state: Dict[str, Any], trace: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        for rule in self.rules:
+            results = {key: check(state) for key, _val, check in rule.conditions}
+            matched = all(results.values())
+            trace.append({"step": rule.step, "move": rule.move.get("id"), "if": results, "matched": matched})
+            if matched:
+                return rule.move
+        return None
+
+
+def compile_behavior_script(script: Any, moves: Any) -> CompiledBehavior:
+    moves = [m for m in (moves or []) if isinstance(m, dict)]
+    lookup = {m.get("id"): m for m in moves if m.get("id")}
+    rules: List[BehaviorRule] = []
+    errors: List[str] = []
+    loop = script.get("default_loop", []) if isinstance(script, dict) else []
+    for i, step in enumerate(loop or []):
+        if not isinstance(step, dict):
+            errors.append(f"step {i}: not an object")
+            continue
+        stype = step.get("type")
+        if stype == "move":
+            conditions: Tuple[Tuple[str, Any, Check], ...] = ()
+            candidates = [step]
+        elif stype == "conditional":
+            cond = step.get("if", {}) or {}
+            try:
+                if not isinstance(cond, dict):
+                    raise PredicateError("if must be an object")
+                conditions = tuple((k, v, compile_condition(k, v)) for k, v in cond.items())
+            except PredicateError as exc:
+                errors.append(f"step {i}: {exc}")
+                continue
+            candidates = [s for s in (step.get("then") or []) if isinstance(s, dict) and s.get("type") == "move"]
+        else:
+            errors.append(f"step {i}: unknown step type {stype!r}")
+            continue
+        move = next((lookup[s["ref"]] for s in candidates if s.get("ref") in lookup), None)
+        if move is None:
+            errors.append(f"step {i}: no known move in {[s.get('ref') for s in candidates]}")
+            continue
+        rules.append(BehaviorRule(i, conditions, move))
+        if not conditions:
+            break
+    return CompiledBehavior(rules, moves[0] if moves else None, errors)
+
+
+_CACHE: Dict[Tuple[int, int], Tuple[Any, Any, Tuple[Any, ...], CompiledBehavior]] = {}
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 4096
+
+# Shared stand-ins for a missing script / move list, so such enemies hit the cache too.
+_NO_SCRIPT = FrozenDict()
+_NO_MOVES = FrozenList()
+
+
+def behavior_script(enemy: Dict[str, Any]) -> Any:
+    return ((enemy.get("resolved_archetype") or {}).get("ai") or {}).get("behavior_script") or _NO_SCRIPT
+
+
+def compile_behavior(enemy: Dict[str, Any]) -> CompiledBehavior:
+    """
+    The enemy's compiled behavior, memoized per (script, moves) object pair.
+    A moves list whose items were replaced is recompiled; edit scripts by
+    replacing them, not in place.
+    """
+    script = behavior_script(enemy)
+    moves = enemy.get("moves") or _NO_MOVES
+    key = (id(script), id(moves))
+    hit = _CACHE.get(key)
+    if hit is not None and hit[0] is script and hit[1] is moves and len(hit[2]) == len(moves) and all(a is b for a, b in zip(hit[2], moves)):
+        return hit[3]
+    compiled = compile_behavior_script(script, moves)
+    with _CACHE_LOCK:
+        if len(_CACHE) >= _CACHE_MAX:
+            _CACHE.clear()
+        _CACHE[key] = (script, moves, tuple(moves), compiled)
+    return compiled
+
+
+def precompile_behaviors(enemies: Any) -> Dict[str, List[str]]:
+    """Load-time pass over bestiary templates; returns the dropped steps per enemy id."""
+    errors: Dict[str, List[str]] = {}
+    for eid, enemy in (enemies.items() if isinstance(enemies, dict) else enumerate(enemies or [])):
+        if not isinstance(enemy, dict):
+            continue
+        found = compile_behavior(enemy).errors
+        if found:
+            errors[str(enemy.get("id") or eid)] = found
+    return errors
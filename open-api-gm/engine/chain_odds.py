@@ -0,0 +1,253 @@
+"""
+Chain odds
+----------
+Exact outcome model of one chain under `ChainResolutionEngine`'s rules.
+
+The engine rolls ONE aggressor d20 per chain: attack_total = d20 + heat +
+attack bonus (balance resets at chain start), and each non-movement link hits
+when attack_total >= dv + defender momentum + defense bonus. Hits and misses
+move the defender's momentum and the aggressor's balance deterministically,
+so for each of the 20 faces the whole hit pattern is fixed; `chain_odds`
+walks all 20 and weighs them exactly. Per hit pattern, damage is the exact
+distribution of the links' dice (engine.dice pmfs) plus the heat bonus minus
+shields, capped at the defender's HP, so expected damage and kill chance
+are exact too.
+
+Interrupts: the defender is modeled as attempting one interrupt after each
+resolved link with probability `interrupt_chance` (or per link, from
+`attempts`); only a perfect interrupt (d20 + interrupt bonus >=
+attack_total + idf - balance + 5) breaks the chain. Not modeled: the meter penalties of an interrupt that succeeds
+without being perfect, execution strikes, press/cash-out prompts, status
+effects beyond counting them, and defender reactions.
+
+`matchup(state, aggressor, defender)` reads the meters the model needs;
+`link_model(aggressor, action)` reads a move or ability the way
+resolve_action_step / apply_action_effects do.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from engine.chain_resolution_engine import get_dv_base, get_hp, get_idf, get_resource
+from engine.combat_state import combat_get, shield_value
+from engine.dice import DiceExpr, parse as parse_dice
+from engine.stats import stat_mod
+
+D20 = 20
+
+
+class LinkModel(NamedTuple):
+    movement: bool
+    damage: DiceExpr
+    statuses: int
+    heat_gain: int
+    balance_delta: int
+
+
+@dataclass(frozen=True)
+class Matchup:
+    heat: int = 0
+    attack_bonus: int = 0
+    idf: int = 0
+    dv: int = 10
+    defender_momentum: int = 0
+    defense_bonus: int = 0
+    interrupt_bonus: int = 0
+    shield: int = 0
+    hp: int = 0  # 0 = unknown, damage is not capped
+    momentum_cap: int = 8
+    interrupt_chance: float = 1.0
+
+
+@dataclass
+class ChainOdds:
+    expected_damage: float = 0.0
+    kill_prob: float = 0.0
+    break_prob: float = 0.0
+    expected_statuses: float = 0.0
+    hit_probs: List[float] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "expected_damage": round(self.expected_damage, 4),
+            "kill_prob": round(self.kill_prob, 4),
+            "break_prob": round(self.break_prob, 4),
+            "expected_statuses": round(self.expected_statuses, 4),
+            "hit_probs": [round(p, 4) for p in self.hit_probs],
+        }
+
+
+def _is_movement(action: Dict[str, Any]) -> bool:
+    return (action.get("type") or "").lower() == "movement" or (action.get("resolution") or "").lower() == "movement"
+
+
+def link_model(aggressor: Dict[str, Any], action: Dict[str, Any]) -> LinkModel:
+    """One move/ability as the engine resolves it (damage dice, stat mod, on-hit statuses, tags)."""
+    if _is_movement(action):
+        return LinkModel(True, DiceExpr(0, 0), 0, 0, 0)
+    effects = action.get("effects") if isinstance(action.get("effects"), dict) else {}
+    on_hit = effects.get("on_hit") if isinstance(effects.get("on_hit"), list) else []
+    entry = next((e for e in on_hit if isinstance(e, dict) and e.get("type") == "damage"), None)
+    dice = action.get("dice", "1d4")
+    flat = 0
+    stat_key = action.get("stat")
+    if entry:
+        dice = entry.get("dice", dice)
+        flat = int(entry.get("flat", 0) or 0)
+        stat_key = stat_key or entry.get("stat")
+    try:
+        expr = parse_dice(dice)
+    except ValueError:
+        expr = DiceExpr(0, 0)
+    stats = aggressor.get("stats") or aggressor.get("attributes", {}) or {}
+    if action.get("addStatToDamage", True) and stat_key and stat_key in stats:
+        try:
+            flat += stat_mod(stats[stat_key])
+        except Exception:
+            pass
+
+    statuses = len([e for e in on_hit if not (isinstance(e, dict) and e.get("type") == "damage")])
+    monster_on_hit = action.get("on_hit") if isinstance(action.get("on_hit"), dict) else {}
+    if not statuses and isinstance(monster_on_hit.get("effects"), list):
+        statuses = len(monster_on_hit["effects"])
+
+    tags = action.get("tags") or []
+    balance_delta = (-1 if "balance_minus_1" in tags else 0) + (2 if "balance_plus_2" in tags else 0)
+    return LinkModel(False, DiceExpr(expr.count, expr.sides, expr.flat + flat), statuses, 1 + (1 if "heat" in tags else 0), balance_delta)
+
+
+def matchup(state: Dict[str, Any], aggressor: Dict[str, Any], defender: Dict[str, Any], *, interrupt_chance: float = 1.0) -> Matchup:
+    """The aggressor/defender meters `chain_odds` reads, as the engine would see them now."""
+    state = state if isinstance(state, dict) else {}
+    return Matchup(
+        heat=int(combat_get(state, aggressor, "heat", get_resource(aggressor, "heat", 0))),
+        attack_bonus=int(((aggressor.get("temp_bonuses") or {}).get("attack", 0)) or 0),
+        idf=get_idf(aggressor),
+        dv=get_dv_base(defender),
+        defender_momentum=int(combat_get(state, defender, "momentum", get_resource(defender, "momentum", 0))),
+        defense_bonus=int(((defender.get("temp_bonuses") or {}).get("defense", 0)) or 0),
+        interrupt_bonus=int(((defender.get("temp_bonuses") or {}).get("interrupt", 0)) or 0),
+        shield=int(shield_value(state, defender)),
+        hp=max(0, get_hp(defender)),
+        momentum_cap=int((state.get("rules") or {}).get("momentum_cap", 8) or 8),
+        interrupt_chance=float(interrupt_chance),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _step_pmf(expr: DiceExpr, shift: int) -> Tuple[Tuple[int, float], ...]:
+    step: Dict[int, float] = {}
+    for total, p in expr.pmf().items():
+        dmg = max(0, total + shift)
+        step[dmg] = step.get(dmg, 0.0) + p
+    return tuple(step.items())
+
+
+@lru_cache(maxsize=8192)
+def _damage_state(hits: Tuple[Optional[Tuple[DiceExpr, int]], ...], heat: int, shield: int, hp: int) -> Tuple[Tuple[Tuple[int, float], ...], int, int, Tuple[Tuple[float, float], ...]]:
+    """
+    (damage distribution, heat, shield, progress) after one hit pattern
+    (`hits`: (damage, heat gain) per hit link, None otherwise), where progress
+    is (E[min(damage so far, hp)], P(damage so far >= hp)) after each link.
+    Built from the pattern's prefix, so chains sharing a prefix share the work.
+    """
+    if not hits:
+        return ((0, 1.0),), heat, shield, ()
+    dist_items, heat, shield, progress = _damage_state(hits[:-1], heat, shield, hp)
+    cap = hp if hp > 0 else None
+    hit = hits[-1]
+    if hit is not None:
+        damage, heat_gain = hit
+        shift = max(0, min(4, heat))
+        if shield > 0:
+            shift -= 1
+            shield -= 1
+        step = _step_pmf(damage, shift)
+        nxt: Dict[int, float] = {}
+        for have, p in dist_items:
+            if cap is not None and have >= cap:
+                nxt[have] = nxt.get(have, 0.0) + p
+                continue
+            for dmg, q in step:
+                t = have + dmg
+                if cap is not None and t > cap:
+                    t = cap
+                nxt[t] = nxt.get(t, 0.0) + p * q
+        dist_items = tuple(nxt.items())
+        heat += heat_gain
+    mean = sum(t * p for t, p in dist_items)
+    killed = sum(p for t, p in dist_items if t >= cap) if cap is not None else 0.0
+    return dist_items, heat, shield, progress + ((mean, killed),)
+
+
+def _damage_progress(hits: Tuple[Optional[Tuple[DiceExpr, int]], ...], heat: int, shield: int, hp: int) -> Tuple[Tuple[float, float], ...]:
+    return _damage_state(hits, heat, shield, hp)[3]
+
+
+def chain_odds(links: Sequence[LinkModel], m: Matchup, attempts: Optional[Sequence[float]] = None) -> ChainOdds:
+    """`attempts`: per-link interrupt attempt chance, overriding `m.interrupt_chance`."""
+    n = len(links)
+    odds = ChainOdds(hit_probs=[0.0] * n)
+    if all(link.movement for link in links):
+        return odds
+    dv = m.dv + m.defense_bonus
+    cap = m.momentum_cap
+    chances = [(attempts[k] if attempts is not None and k < len(attempts) else m.interrupt_chance) / D20 for k in range(n)]
+    base = m.heat + m.attack_bonus
+    # Faces that play out identically (same hits, same break odds) are weighed together.
+    outcomes: Dict[Tuple[Tuple[Optional[bool], ...], Tuple[float, ...]], int] = {}
+    for d20 in range(1, D20 + 1):
+        attack_total = d20 + base
+        def_mom = m.defender_momentum
+        balance = 0
+        hits: List[Optional[bool]] = []
+        breaks: List[float] = []
+        for idx, link in enumerate(links):
+            if link.movement:
+                hits.append(None)
+                breaks.append(0.0)
+                continue
+            hit = attack_total >= dv + def_mom
+            if hit:
+                def_mom += 1 if idx < 2 else 2
+                if def_mom > cap:
+                    def_mom = cap
+                balance += 2 + link.balance_delta
+            else:
+                def_mom = def_mom - 1 if def_mom > 0 else 0
+                balance += 1
+            faces = D20 + 1 - (attack_total + m.idf - balance + 5 - m.interrupt_bonus)
+            breaks.append(chances[idx] * (0 if faces < 0 else D20 if faces > D20 else faces))
+            hits.append(hit)
+        key = (tuple(hits), tuple(breaks))
+        outcomes[key] = outcomes.get(key, 0) + 1
+
+    for (hits, breaks), count in outcomes.items():
+        weight = count / D20
+        prog = _damage_progress(
+            tuple((link.damage, link.heat_gain) if hit else None for link, hit in zip(links, hits)),
+            m.heat, m.shield, m.hp,
+        )
+        alive = 1.0
+        killed_before = 0.0
+        for k, hit in enumerate(hits):
+            if hit is None:
+                continue
+            if hit:
+                reach = weight * alive * (1.0 - killed_before)
+                odds.hit_probs[k] += reach
+                odds.expected_statuses += reach * links[k].statuses
+            mean, killed = prog[k]
+            stop = alive * breaks[k]
+            if stop:
+                odds.expected_damage += weight * stop * mean
+                odds.kill_prob += weight * stop * killed
+                odds.break_prob += weight * stop * (1.0 - killed)
+                alive -= stop
+            killed_before = killed
+        mean, killed = prog[-1]
+        odds.expected_damage += weight * alive * mean
+        odds.kill_prob += weight * alive * killed
+    return odds
@@ -0,0 +1,304 @@
+"""
+Chain optimizer
+---------------
+Suggests the player's best chains for the current turn (`POST /chain/suggest`).
+
+Candidates are the lead member's usable abilities (off cooldown, as
+`list_usable_abilities` reports them) in any order, each at most once, up to
+the phase's `chain_max` links. A chain is legal when it passes
+`validate_chain_costs` against the encounter RP and the member's pools, the
+same check `declare_chain` runs. Chains are grown link by link, strongest
+abilities first, and pruned:
+
+  - cost only grows with length, so a prefix that fails is not extended;
+  - abilities with the same damage, heat and balance effects and the same
+    effective cost score identically and are interchangeable; only the
+    first (the one landing the most statuses) is tried;
+  - movement abilities are left out: they never change the modeled odds;
+  - branch and bound: the chain's hit chance per position does not depend
+    on which abilities fill it, so a chain is neither scored nor extended
+    when even its best case (those hit chances x the strongest remaining
+    links at the highest heat bonus they could reach) cannot beat the
+    current k-th best expected damage. Ties keep the chain found first.
+
+Each candidate is scored with the exact single-d20 model in
+engine.chain_odds against the first living enemy. The enemy's interrupt
+attempts are estimated per link from its windows, evaluated the way
+EnemyWindowPolicy would at that link (legacy weights, new-schema chances,
+or the default window from the third link on) and capped by what is left of
+its per-round budget. Misses inside the chain opening further windows are
+not modeled.
+
+Results are ranked by expected damage, then lower break chance, then more
+statuses landed, and cached per (abilities, meters, enemy state) signature,
+so repeated queries within a turn are free. Enumeration stops at
+VB_SUGGEST_BUDGET_MS (default 50 ms); `complete` says whether every legal
+chain was scored. Incomplete results are not cached.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from engine.chain_odds import ChainOdds, LinkModel, Matchup, chain_odds, link_model, matchup
+from engine.chain_rules import validate_chain_cooldowns, validate_chain_costs
+from engine.combat_journal import last_action_missed
+from engine.combat_state import combat_get
+from engine.dice import DiceExpr
+from engine.interrupt_policy import compile_enemy_windows, enemy_windows, is_new_schema
+from engine.interrupt_windows import InterruptContext, window_allows_interrupt
+from engine.phases import list_usable_abilities
+
+DEFAULT_BUDGET_MS = float(os.environ.get("VB_SUGGEST_BUDGET_MS", "50") or 0)
+DEFAULT_TOP_K = 5
+
+
+@dataclass
+class ChainSuggestion:
+    abilities: List[str]
+    odds: ChainOdds
+    rp: int
+    pools: Dict[str, int]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"abilities": list(self.abilities), "rp": self.rp, "pools": dict(self.pools), **self.odds.as_dict()}
+
+
+_CACHE: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 4096
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def usable_abilities(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    member = (state.get("party", {}).get("members") or [None])[0]
+    if not member:
+        return []
+    names = set(list_usable_abilities(state))
+    return [ab for ab in member.get("abilities", []) if isinstance(ab, dict) and ab.get("name") in names]
+
+
+def current_enemy(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    enemies = [e for e in (state.get("enemies") or []) if isinstance(e, dict)]
+    for enemy in enemies:
+        hp = enemy.get("hp")
+        hp = hp.get("current") if isinstance(hp, dict) else hp
+        try:
+            if int(hp) > 0:
+                return enemy
+        except (TypeError, ValueError):
+            return enemy
+    return None
+
+
+def _remaining_interrupts(state: Dict[str, Any], enemy: Dict[str, Any]) -> Optional[int]:
+    """What is left of the enemy's per-round interrupt budget; None when unlimited."""
+    rules = ((enemy.get("resolved_archetype") or {}).get("rhythm_profile") or {}).get("interrupt") or {}
+    try:
+        budget = int(rules.get("budget_per_round", 0) or 0)
+    except Exception:
+        budget = 0
+    if budget <= 0:
+        return None
+    used = 0
+    try:
+        bucket = state.get("_interrupt_budget") or {}
+        round_no = int((state.get("phase", {}) or {}).get("round") or 0)
+        if int(bucket.get("round", -1)) == round_no:
+            used = int((bucket.get("by_id") or {}).get(enemy.get("id") or enemy.get("name") or "defender", 0) or 0)
+    except Exception:
+        used = 0
+    return max(0, budget - used)
+
+
+def attempt_table(
+    state: Dict[str, Any],
+    player: Dict[str, Any],
+    enemy: Dict[str, Any],
+    abilities: Sequence[Dict[str, Any]],
+    max_len: int,
+) -> Tuple[Tuple[Tuple[float, ...], ...], ...]:
+    """
+    table[length - 1][index][i]: chance the enemy attempts an interrupt after
+    link `index` of a `length`-link chain when that link is abilities[i].
+    """
+    windows = enemy_windows(enemy)
+    new_schema = bool(windows) and is_new_schema(windows)
+    legacy = compile_enemy_windows(enemy).entries if windows and not new_schema else ()
+    missed = last_action_missed(state)
+    table = []
+    for length in range(1, max_len + 1):
+        rows = []
+        for idx in range(length):
+            row = []
+            for ab in abilities:
+                p = 0.0
+                if windows:
+                    ctx = InterruptContext(
+                        aggressor=player, defender=enemy, chain_index=idx, chain_length=length,
+                        link=ab, attack_d20=None, defender_d20=None, state=state,
+                    )
+                    try:
+                        if new_schema:
+                            w = window_allows_interrupt(windows, "after_link", ctx)
+                            p = float(w.get("chance", 0.0)) if w else 0.0
+                        else:
+                            p = max([float(w.get("weight", 1.0)) for w, test in legacy if test("after_link", ctx, state)] or [0.0])
+                    except Exception:
+                        p = 0.0
+                elif missed or idx >= 2:
+                    p = 1.0
+                row.append(max(0.0, min(1.0, p)))
+            rows.append(tuple(row))
+        table.append(tuple(rows))
+    return tuple(table)
+
+
+def _attempts(table, combo: Sequence[int], budget: Optional[int]) -> List[float]:
+    rows = table[len(combo) - 1]
+    out = []
+    left = float(budget) if budget is not None else None
+    for idx, i in enumerate(combo):
+        p = rows[idx][i]
+        if left is not None:
+            p = min(p, max(0.0, left))
+            left -= p
+        out.append(p)
+    return out
+
+
+def suggest_chains(
+    state: Dict[str, Any],
+    *,
+    top_k: int = DEFAULT_TOP_K,
+    max_len: Optional[int] = None,
+    budget_ms: Optional[float] = None,
+) -> Dict[str, Any]:
+    """The top-k legal chains for the lead member against the current enemy."""
+    started = time.perf_counter()
+    player = (state.get("party", {}).get("members") or [None])[0]
+    if not player:
+        return {"ok": False, "error": "no party member"}
+    enemy = current_enemy(state)
+    if enemy is None:
+        return {"ok": False, "error": "no enemy"}
+
+    res = player.get("resources") or {}
+    rp = int(combat_get(state, player, "rp", int(res.get("resolve", 0) or 0)) or 0)
+    pools = {k: int(v or 0) for k, v in (player.get("pools") or {}).items()}
+    view = {"resources": {"resolve": rp}, "pools": pools}
+    limit = int(max_len or (state.get("phase", {}) or {}).get("chain_max", 6) or 6)
+    limit = max(1, min(limit, rp))
+    top_k = max(1, int(top_k))
+
+    abilities = [ab for ab in usable_abilities(state) if validate_chain_cooldowns(player, [ab.get("name")])[0]]
+    models: List[LinkModel] = [link_model(player, ab) for ab in abilities]
+    # Strongest first; reach[i][shift]: what abilities[i] adds on a hit at that heat bonus.
+    reach = [[sum(max(0, t + shift) * p for t, p in model.damage.pmf().items()) for shift in range(5)] for model in models]
+    order = sorted((i for i, model in enumerate(models) if not model.movement), key=lambda i: (-reach[i][4], -models[i].statuses))
+    abilities = [abilities[i] for i in order]
+    models = [models[i] for i in order]
+    reach = [reach[i] for i in order]
+    limit = min(limit, len(abilities))
+    # (model, pool paid from, cost paid there or on top of the 1 RP per link), as validate_chain_costs charges it.
+    classes = []
+    for model, ab in zip(models, abilities):
+        pool = ab.get("pool") if ab.get("pool") in pools else None
+        extra = (ab.get("cost", 0) or 0) if pool or ab.get("resource", "resolve") != "resolve" else 0
+        classes.append((model, pool, extra))
+    kind_ids: Dict[Any, int] = {}
+    kinds = [kind_ids.setdefault((model._replace(statuses=0), pool, extra), len(kind_ids)) for model, pool, extra in classes]
+
+    m: Matchup = matchup(state, player, enemy, interrupt_chance=0.0)
+    table = attempt_table(state, player, enemy, abilities, limit)
+    budget = _remaining_interrupts(state, enemy)
+
+    key = (tuple(ab.get("name") for ab in abilities), tuple(classes), rp, tuple(sorted(pools.items())), m, table, budget, limit, top_k)
+    hit = _CACHE.get(key)
+    if hit is not None:
+        return dict(hit, cached=True, elapsed_ms=round((time.perf_counter() - started) * 1000.0, 3))
+
+    # Hit chance per position is the same whichever abilities fill the chain.
+    filler = LinkModel(False, DiceExpr(0, 0), 0, 0, 0)
+    hit_at = chain_odds([filler] * limit, m, [0.0] * limit).hit_probs if limit else []
+
+    deadline = started + (DEFAULT_BUDGET_MS if budget_ms is None else float(budget_ms)) / 1000.0
+    scored: List[Tuple[Tuple[float, float, float, int], Tuple[int, ...], ChainOdds]] = []
+    best: List[float] = []  # expected damage of the current top-k, descending
+    evaluated = 0
+    complete = True
+    stack: List[Tuple[Tuple[int, ...], float]] = [((), 0.0)]
+    while stack:
+        prefix, prefix_damage = stack.pop()
+        pos = len(prefix)
+        left = limit - pos
+        bounded = len(best) >= top_k
+        if bounded:
+            # Best case for the rest of the chain: every remaining link at the
+            # highest heat bonus it could reach, strongest links on the likeliest positions.
+            shift = max(0, min(4, m.heat + sum(models[j].heat_gain for j in prefix) + 2 * (left - 1)))
+            later = sorted(hit_at[pos + 1:], reverse=True)
+            room = sorted(((reach[i][shift], i) for i in range(len(abilities)) if i not in prefix), reverse=True)[:left]
+        children = []
+        tried = set()
+        for i in range(len(abilities)):
+            # Interchangeable abilities are only taken in list order.
+            if i in prefix or kinds[i] in tried:
+                continue
+            tried.add(kinds[i])
+            if bounded:
+                rest = [r for r, j in room if j != i][: left - 1]
+                bound = prefix_damage + hit_at[pos] * reach[i][shift] + sum(h * r for h, r in zip(later, rest))
+                if bound <= best[-1] + 1e-9:
+                    continue
+            combo = prefix + (i,)
+            if not validate_chain_costs(view, [abilities[j] for j in combo])[0]:
+                continue
+            if time.perf_counter() > deadline:
+                complete = False
+                break
+            odds = chain_odds([models[j] for j in combo], m, _attempts(table, combo, budget))
+            evaluated += 1
+            scored.append(((-odds.expected_damage, odds.break_prob, -odds.expected_statuses, len(combo)), combo, odds))
+            best = sorted(best + [odds.expected_damage], reverse=True)[:top_k]
+            if len(combo) < limit:
+                children.append((combo, odds.expected_damage))
+        if not complete:
+            break
+        stack.extend(reversed(children))
+
+    scored.sort(key=lambda s: s[0])
+    suggestions = []
+    for _rank, combo, odds in scored[:top_k]:
+        spend: Dict[str, int] = {}
+        total = len(combo)
+        for j in combo:
+            _model, pool, extra = classes[j]
+            if pool:
+                spend[pool] = spend.get(pool, 0) + extra
+            else:
+                total += extra
+        suggestions.append(ChainSuggestion([abilities[j].get("name") for j in combo], odds, total, spend).as_dict())
+
+    result = {
+        "ok": True,
+        "enemy": enemy.get("id") or enemy.get("name"),
+        "rp": rp,
+        "max_len": limit,
+        "suggestions": suggestions,
+        "evaluated": evaluated,
+        "complete": complete,
+    }
+    if complete:
+        with _CACHE_LOCK:
+            if len(_CACHE) >= _CACHE_MAX:
+                _CACHE.clear()
+            _CACHE[key] = result
+    return dict(result, cached=False, elapsed_ms=round((time.perf_counter() - started) * 1000.0, 3))
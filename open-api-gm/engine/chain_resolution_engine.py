@@ -3,8 +3,10 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional
 
+from engine.action_index import lookup_action
 from engine.interrupt_policy import InterruptPolicy
 from engine.interrupt_windows import InterruptContext
+from engine.metrics import laps as metrics_laps
 from engine.stats import stat_mod
 from engine.combat_state import combat_add, combat_get, combat_set, status_add, status_get
 from ui.events import emit_event, emit_resource_update
@@ -21,7 +23,7 @@ class ChainResult:
         return self.reason
 
 
-def _get_hp(entity: Dict[str, Any]) -> int:
+def get_hp(entity: Dict[str, Any]) -> int:
     hp_val = entity.get("hp")
     if hp_val is None and isinstance(entity.get("resources"), dict):
         hp_val = entity["resources"].get("hp")
@@ -94,7 +96,7 @@ def _is_primed_by_hp(entity: Dict[str, Any]) -> bool:
     hp_max = _get_hp_max(entity)
     if not hp_max:
         return False
-    hp_cur = _get_hp(entity)
+    hp_cur = get_hp(entity)
     pct = _get_execution_threshold_pct(entity)
     try:
         pct = float(pct)
@@ -190,7 +192,7 @@ def _apply_prime_status_effects_on_hit(
         status_add(state, dest, status=status_name, stacks=stacks, duration_rounds=1)
 
 
-def _get_resource(entity: Dict[str, Any], key: str, default: int = 0) -> int:
+def get_resource(entity: Dict[str, Any], key: str, default: int = 0) -> int:
     if isinstance(entity.get("resources"), dict) and key in entity["resources"]:
         return int(entity["resources"].get(key, default) or 0)
     return int(entity.get(key, default) or 0)
@@ -208,7 +210,7 @@ def _clamp(v: int, lo: int, hi: int) -> int:
     return max(lo, min(hi, v))
 
 
-def _get_dv_base(entity: Dict[str, Any]) -> int:
+def get_dv_base(entity: Dict[str, Any]) -> int:
     """
     Newrules DV: treat as a static target number for the chain.
     - Enemies: dv_base is present.
@@ -226,7 +228,7 @@ def _get_dv_base(entity: Dict[str, Any]) -> int:
     return 10 + stat_mod(int(agi or 10)) + int(tb.get("defense", 0) or 0)
 
 
-def _get_idf(entity: Dict[str, Any]) -> int:
+def get_idf(entity: Dict[str, Any]) -> int:
     if "idf" in entity:
         return int(entity.get("idf") or 0)
     if isinstance(entity.get("resources"), dict):
@@ -250,15 +252,34 @@ class ChainResolutionEngine:
         interrupt_policy: InterruptPolicy,
         emit_log_fn: Optional[Callable[[Any, str, str], None]] = None,
         interrupt_apply_fn: Optional[Callable[..., Any]] = None,
+        rng: Any = None,
     ):
+        """
+        rng: optional engine.rng.EncounterRNG; when given, chain rolls draw from its
+        named substreams (attack / damage / interrupt) instead of `roll_fn`.
+        """
         self.roll = roll_fn
+        self.rng = rng
         self.resolve_action_step = resolve_action_step_fn
         self.apply_action_effects = apply_action_effects_fn
         self.interrupt_policy = interrupt_policy
         self.emit_log = emit_log_fn
         self.apply_interrupt = interrupt_apply_fn
 
-    def resolve_chain(
+    def _roll(self, dice: str, stream: str) -> int:
+        if self.rng is not None:
+            return int(self.rng.roll(dice, stream))
+        return int(self.roll(dice))
+
+    def resolve_chain(self, *args: Any, **kwargs: Any) -> ChainResult:
+        # Per-link latency (vb_phase_seconds{phase="chain_link"}); the last link closes in finally.
+        links = metrics_laps("chain_link")
+        try:
+            return self._resolve_chain(*args, links=links, **kwargs)
+        finally:
+            links.close()
+
+    def _resolve_chain(
         self,
         state: Dict[str, Any],
         ui: Any,
@@ -268,6 +289,8 @@ class ChainResolutionEngine:
         defender_group: List[Dict[str, Any]],
         dv_mode: str = "per_chain",
         start_index: int = 0,
+        *,
+        links: Any = None,
     ) -> ChainResult:
         if state.get("combat_over"):
             return ChainResult("completed", "combat_over", 0)
@@ -280,18 +303,10 @@ class ChainResolutionEngine:
         if isinstance(aggressor, dict) and aggressor.get("_combat_key"):
             combat_set(state, aggressor, "balance", 0)
 
+        # O(1) name/id lookups via the aggressor's compiled action index (rebuilt only when
+        # its abilities/moves lists change).
         def _lookup_action(name_or_id: str) -> Optional[Dict[str, Any]]:
-            a = next(
-                (x for x in aggressor.get("abilities", []) if x.get("name") == name_or_id or x.get("id") == name_or_id),
-                None,
-            )
-            if a:
-                return a
-            m = next(
-                (x for x in aggressor.get("moves", []) if x.get("name") == name_or_id or x.get("id") == name_or_id),
-                None,
-            )
-            return m
+            return lookup_action(aggressor, name_or_id)
 
         # Only roll if we have at least one non-movement link in this chain.
         needs_roll = False
@@ -303,8 +318,8 @@ class ChainResolutionEngine:
                 needs_roll = True
                 break
 
-        balance = combat_get(state, aggressor, "balance", _get_resource(aggressor, "balance", 0))
-        heat = combat_get(state, aggressor, "heat", _get_resource(aggressor, "heat", 0))
+        balance = combat_get(state, aggressor, "balance", get_resource(aggressor, "balance", 0))
+        heat = combat_get(state, aggressor, "heat", get_resource(aggressor, "heat", 0))
         atk_tb = int(((aggressor.get("temp_bonuses") or {}).get("attack", 0)) or 0)
 
         # Execution intent (Phase 1): only HP-threshold priming is supported.
@@ -342,10 +357,10 @@ class ChainResolutionEngine:
                 attack_total = int(state.get("_chain_attack_total") or 0)
                 needs_roll = bool(state.get("_chain_needs_roll", needs_roll))
             except Exception:
-                attack_d20 = int(self.roll("1d20")) if needs_roll else 0
+                attack_d20 = self._roll("1d20", "attack") if needs_roll else 0
                 attack_total = int(attack_d20 + balance + heat + atk_tb) if needs_roll else 0
         else:
-            attack_d20 = int(self.roll("1d20")) if needs_roll else 0
+            attack_d20 = self._roll("1d20", "attack") if needs_roll else 0
             attack_total = int(attack_d20 + balance + heat + atk_tb) if needs_roll else 0
             if isinstance(state, dict):
                 state["_chain_attack_d20"] = int(attack_d20)
@@ -362,6 +377,8 @@ class ChainResolutionEngine:
 
         idx = max(0, start_index)
         while idx < len(chain_ability_names):
+            if links is not None:
+                links.lap()
             name_or_id = chain_ability_names[idx]
             ability = _lookup_action(name_or_id)
             if not ability:
@@ -405,24 +422,24 @@ class ChainResolutionEngine:
                 try:
                     emit_resource_update(
                         ui,
-                        momentum=combat_get(state, aggressor, "momentum", _get_resource(aggressor, "momentum", 0)),
-                        balance=combat_get(state, aggressor, "balance", _get_resource(aggressor, "balance", 0)),
-                        heat=combat_get(state, aggressor, "heat", _get_resource(aggressor, "heat", 0)),
+                        momentum=combat_get(state, aggressor, "momentum", get_resource(aggressor, "momentum", 0)),
+                        balance=combat_get(state, aggressor, "balance", get_resource(aggressor, "balance", 0)),
+                        heat=combat_get(state, aggressor, "heat", get_resource(aggressor, "heat", 0)),
                     )
                 except Exception:
                     pass
                 idx += 1
                 continue
 
-            dv_base = _get_dv_base(defender)
-            def_mom = combat_get(state, defender, "momentum", _get_resource(defender, "momentum", 0))
+            dv_base = get_dv_base(defender)
+            def_mom = combat_get(state, defender, "momentum", get_resource(defender, "momentum", 0))
             def_tb = int(((defender.get("temp_bonuses") or {}).get("defense", 0)) or 0)
             defense_target = int(dv_base + def_mom + def_tb)
 
             # Execution Strike replaces the selected attack link.
             if execute_link_idx is not None and idx == execute_link_idx:
                 # Must have 1 RP available.
-                rp_cur = combat_get(state, aggressor, "rp", _get_resource(aggressor, "resolve", 0))
+                rp_cur = combat_get(state, aggressor, "rp", get_resource(aggressor, "resolve", 0))
                 if rp_cur < 1:
                     if self.emit_log:
                         self.emit_log(ui, "Execution failed: not enough RP (needs 1).", "system")
@@ -436,8 +453,8 @@ class ChainResolutionEngine:
                     try:
                         emit_resource_update(
                             ui,
-                            momentum=combat_get(state, aggressor, "momentum", _get_resource(aggressor, "momentum", 0)),
-                            balance=combat_get(state, aggressor, "balance", _get_resource(aggressor, "balance", 0)),
+                            momentum=combat_get(state, aggressor, "momentum", get_resource(aggressor, "momentum", 0)),
+                            balance=combat_get(state, aggressor, "balance", get_resource(aggressor, "balance", 0)),
                             heat=0,
                         )
                     except Exception:
@@ -536,11 +553,11 @@ class ChainResolutionEngine:
                         tier = max(1, tier)
                         try:
                             # Tier-scaled backlash: (1d6 × tier)
-                            crit = max(0, int(self.roll("1d6")) * tier)
+                            crit = max(0, self._roll("1d6", "damage") * tier)
                         except Exception:
                             crit = 0
                         if crit > 0:
-                            before_hp = _get_hp(aggressor)
+                            before_hp = get_hp(aggressor)
                             _set_hp(aggressor, max(0, before_hp - crit))
                             state["_last_damage"] = {
                                 "amount": crit,
@@ -549,7 +566,7 @@ class ChainResolutionEngine:
                                 "tier": tier,
                             }
                             ui.system(f"Catastrophic execution backlash: {crit} damage (1d6×T{tier}).")
-                            if _get_hp(aggressor) <= 0:
+                            if get_hp(aggressor) <= 0:
                                 ui.system(f"{aggressor.get('name', 'Target')} is defeated!")
                                 state["combat_over"] = True
 
@@ -615,15 +632,15 @@ class ChainResolutionEngine:
             try:
                 emit_resource_update(
                     ui,
-                    momentum=combat_get(state, aggressor, "momentum", _get_resource(aggressor, "momentum", 0)),
-                    balance=combat_get(state, aggressor, "balance", _get_resource(aggressor, "balance", 0)),
-                    heat=combat_get(state, aggressor, "heat", _get_resource(aggressor, "heat", 0)),
+                    momentum=combat_get(state, aggressor, "momentum", get_resource(aggressor, "momentum", 0)),
+                    balance=combat_get(state, aggressor, "balance", get_resource(aggressor, "balance", 0)),
+                    heat=combat_get(state, aggressor, "heat", get_resource(aggressor, "heat", 0)),
                 )
             except Exception:
                 pass
 
             # Resolve + apply effects but force hit/miss so legacy code doesn't overwrite outcomes.
-            before_hp = _get_hp(defender)
+            before_hp = get_hp(defender)
 
             self.resolve_action_step(state, aggressor, ability, attack_roll=attack_d20, balance_bonus=0)
 
@@ -637,7 +654,7 @@ class ChainResolutionEngine:
 
             self.apply_action_effects(state, aggressor, defender_group, defense_d20=None)
 
-            after_hp = _get_hp(defender)
+            after_hp = get_hp(defender)
             if after_hp < 0:
                 _set_hp(defender, 0)
                 after_hp = 0
@@ -692,13 +709,13 @@ class ChainResolutionEngine:
                             "tier": defender.get("tier"),
                             "role": defender.get("role"),
                             "dv_base": dv_base,
-                             "idf": _get_idf(defender),
+                             "idf": get_idf(defender),
                              "hp": {"current": int(after_hp), "max": int(_get_hp_max(defender) or after_hp)},
                              "execution_threshold_pct": _get_execution_threshold_pct(defender),
                              "primed": _is_primed(state, defender),
-                             "heat": combat_get(state, defender, "heat", _get_resource(defender, "heat", 0)),
-                             "momentum": combat_get(state, defender, "momentum", _get_resource(defender, "momentum", 0)),
-                             "balance": combat_get(state, defender, "balance", _get_resource(defender, "balance", 0)),
+                             "heat": combat_get(state, defender, "heat", get_resource(defender, "heat", 0)),
+                             "momentum": combat_get(state, defender, "momentum", get_resource(defender, "momentum", 0)),
+                             "balance": combat_get(state, defender, "balance", get_resource(defender, "balance", 0)),
                          }
                      })
             except Exception:
@@ -762,14 +779,14 @@ class ChainResolutionEngine:
           succeeds if interrupt_total >= attack_total + aggressor_idf - aggressor_balance
         Minimal interrupt damage placeholder is applied to the aggressor.
         """
-        interrupt_d20 = int(self.roll("1d20"))
+        interrupt_d20 = self._roll("1d20", "interrupt")
         def_tb = int(((defender.get("temp_bonuses") or {}).get("interrupt", 0)) or 0)
         interrupt_total = int(interrupt_d20 + def_tb)
 
         threshold = int(
             attack_total
-            + _get_idf(aggressor)
-            - combat_get(state, aggressor, "balance", _get_resource(aggressor, "balance", 0))
+            + get_idf(aggressor)
+            - combat_get(state, aggressor, "balance", get_resource(aggressor, "balance", 0))
         )
         perfect_threshold = threshold + 5
 
@@ -792,9 +809,9 @@ class ChainResolutionEngine:
             bal_pen = -1
             mom_pen = -2 if perfect else -1
 
-            new_heat = _clamp(combat_get(state, aggressor, "heat", _get_resource(aggressor, "heat", 0)) + heat_pen, 0, 99)
-            new_mom = _clamp(combat_get(state, aggressor, "momentum", _get_resource(aggressor, "momentum", 0)) + mom_pen, 0, 99)
-            new_bal = _clamp(combat_get(state, aggressor, "balance", _get_resource(aggressor, "balance", 0)) + bal_pen, -10, 10)
+            new_heat = _clamp(combat_get(state, aggressor, "heat", get_resource(aggressor, "heat", 0)) + heat_pen, 0, 99)
+            new_mom = _clamp(combat_get(state, aggressor, "momentum", get_resource(aggressor, "momentum", 0)) + mom_pen, 0, 99)
+            new_bal = _clamp(combat_get(state, aggressor, "balance", get_resource(aggressor, "balance", 0)) + bal_pen, -10, 10)
             combat_set(state, aggressor, "heat", new_heat)
             combat_set(state, aggressor, "momentum", new_mom)
             combat_set(state, aggressor, "balance", new_bal)
@@ -842,9 +859,9 @@ class ChainResolutionEngine:
             pass
 
         # Perfect parry: counter damage.
-        dmg = max(0, int(self.roll("1d4")))
+        dmg = max(0, self._roll("1d4", "damage"))
         if dmg > 0:
-            before_hp = _get_hp(aggressor)
+            before_hp = get_hp(aggressor)
             _set_hp(aggressor, max(0, before_hp - dmg))
             state["_last_damage"] = {"amount": dmg, "source": "counter", "by": defender.get("name")}
             ui.system(f"PERFECT PARRY hits for {dmg}.")
@@ -856,13 +873,13 @@ class ChainResolutionEngine:
             except Exception:
                 pass
             if self.emit_log:
-                hp_now = _get_hp(aggressor)
+                hp_now = get_hp(aggressor)
                 max_hp = _get_hp_max(aggressor)
                 if max_hp:
                     self.emit_log(ui, f"{aggressor.get('name', 'Target')} HP {hp_now}/{max_hp}", "system")
                 else:
                     self.emit_log(ui, f"{aggressor.get('name', 'Target')} HP {hp_now}", "system")
-            if _get_hp(aggressor) <= 0:
+            if get_hp(aggressor) <= 0:
                 ui.system(f"{aggressor.get('name', 'Target')} is defeated!")
                 state["combat_over"] = True
 
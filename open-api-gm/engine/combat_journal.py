@@ -0,0 +1,214 @@
+"""
+Combat journal
+--------------
+`state["log"]` as an indexed, bounded journal.
+
+The interrupt policy, the interrupt controller and enemy move selection each
+walked `reversed(state["log"])` to find the latest hit/miss, and the log grew
+for the whole session. `CombatJournal` is still a list (engine code keeps
+appending to and slicing `state["log"]` as before), but it indexes entries as
+they are appended:
+
+- last outcome (`last_hit`), whether the player's latest action was a
+  movement ability (`last_moved`), rolling counters and a window of recent outcomes
+  are O(1) to read;
+- per-round summaries (entries, actions, hits, misses, damage, defense
+  reactions), keyed by the round set in `begin_round`;
+- retention: past `max_entries` the oldest entries are moved to an
+  append-only JSONL file under `spill_dir` (or just dropped when there is
+  none). `total`/`spilled` keep absolute positions, so `mark()`/`since()`
+  stay valid across trims.
+
+Plain lists (tests, restored snapshots) are upgraded in place by `journal()`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("VB_JOURNAL_MAX_ENTRIES", "1000") or 0)
+# Trim in batches so appends past the limit do not each shift the whole list.
+TRIM_SLACK = 64
+ROUNDS_KEPT = 100
+RECENT_WINDOW = 20
+
+_ROUND_FIELDS = ("entries", "actions", "hits", "misses", "damage", "defense_reactions")
+
+
+class CombatJournal(list):
+    def __init__(
+        self,
+        entries: Iterable[Any] = (),
+        *,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        spill_dir: Optional[Path] = None,
+        window: int = RECENT_WINDOW,
+    ):
+        list.__init__(self)
+        self.max_entries = int(max_entries) if max_entries else None
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_path: Optional[Path] = None
+        self.total = 0
+        self.spilled = 0
+        self.spill_errors = 0
+        self.round: Optional[int] = None
+        self.last_hit: Optional[bool] = None
+        self.last_moved: Optional[bool] = None
+        self.counters: Dict[str, int] = {k: 0 for k in _ROUND_FIELDS}
+        self.rounds: Dict[Any, Dict[str, int]] = {}
+        self.recent: deque = deque(maxlen=max(1, int(window)))
+        self.extend(entries)
+
+    # -- list interface ----------------------------------------------------------
+
+    def append(self, entry: Any) -> None:
+        list.append(self, entry)
+        self._observe(entry)
+        if self.max_entries and len(self) > self.max_entries + TRIM_SLACK:
+            self._trim(len(self) - self.max_entries)
+
+    def extend(self, entries: Iterable[Any]) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def __iadd__(self, entries: Iterable[Any]) -> "CombatJournal":
+        self.extend(entries)
+        return self
+
+    def __reduce__(self):
+        return (_restore, (list(self), dict(self.__dict__)))
+
+    # -- accessors ---------------------------------------------------------------
+
+    def last_missed(self) -> bool:
+        return self.last_hit is False
+
+    def moved_last(self) -> bool:
+        return getattr(self, "last_moved", None) is True
+
+    def recent_hit_rate(self) -> Optional[float]:
+        return (sum(self.recent) / len(self.recent)) if self.recent else None
+
+    def begin_round(self, round_no: Any) -> None:
+        self.round = round_no
+        self._round_summary()
+
+    def round_summary(self, round_no: Any = None) -> Dict[str, int]:
+        key = self.round if round_no is None else round_no
+        return dict(self.rounds.get(key) or {k: 0 for k in _ROUND_FIELDS})
+
+    def mark(self) -> int:
+        """Absolute position of the next entry (for `since`)."""
+        return self.total
+
+    def since(self, mark: int) -> List[Any]:
+        """Entries appended after `mark` that are still in memory."""
+        return list(self[max(0, int(mark) - self.spilled):])
+
+    def with_entries(self, entries: Iterable[Any]) -> "CombatJournal":
+        """A new journal with this one's retention settings."""
+        return CombatJournal(entries, max_entries=self.max_entries, spill_dir=self.spill_dir, window=self.recent.maxlen)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "total": self.total,
+            "spilled": self.spilled,
+            "spill_errors": self.spill_errors,
+            "spill_path": str(self.spill_path) if self.spill_path else None,
+            **self.counters,
+        }
+
+    # -- indexing / retention ----------------------------------------------------
+
+    def _round_summary(self) -> Dict[str, int]:
+        summary = self.rounds.get(self.round)
+        if summary is None:
+            summary = self.rounds[self.round] = {k: 0 for k in _ROUND_FIELDS}
+            while len(self.rounds) > ROUNDS_KEPT:
+                self.rounds.pop(next(iter(self.rounds)))
+        return summary
+
+    def _observe(self, entry: Any) -> None:
+        self.total += 1
+        if not isinstance(entry, dict):
+            return
+        summary = self._round_summary()
+        bump = [self.counters, summary]
+        for c in bump:
+            c["entries"] += 1
+        effects = entry.get("action_effects")
+        if isinstance(effects, dict):
+            for c in bump:
+                c["actions"] += 1
+            hit = effects.get("hit")
+            if hit is True or hit is False:
+                self.last_hit = hit
+                self.recent.append(hit)
+                for c in bump:
+                    c["hits" if hit else "misses"] += 1
+            moved = effects.get("movement")
+            if moved is True or moved is False:
+                self.last_moved = moved
+            try:
+                damage = int(effects.get("damage_applied") or 0)
+            except Exception:
+                damage = 0
+            for c in bump:
+                c["damage"] += damage
+        if isinstance(entry.get("defense_reaction"), dict):
+            for c in bump:
+                c["defense_reactions"] += 1
+
+    def _trim(self, count: int) -> None:
+        old = self[:count]
+        list.__delitem__(self, slice(0, count))
+        self.spilled += count
+        if self.spill_dir is None:
+            return
+        try:
+            if self.spill_path is None:
+                self.spill_dir.mkdir(parents=True, exist_ok=True)
+                self.spill_path = self.spill_dir / f"journal-{int(time.time())}-{uuid.uuid4().hex[:8]}.jsonl"
+            with self.spill_path.open("a", encoding="utf-8") as fh:
+                for entry in old:
+                    fh.write(json.dumps(entry, default=str) + "\n")
+        except Exception:
+            # Retention must never break combat; the entries are counted as spilled either way.
+            self.spill_errors += 1
+
+
+def _restore(entries: List[Any], attrs: Dict[str, Any]) -> CombatJournal:
+    out = CombatJournal.__new__(CombatJournal)
+    list.extend(out, entries)
+    out.__dict__.update(attrs)
+    return out
+
+
+def journal(state: Dict[str, Any]) -> Optional[CombatJournal]:
+    """The state's journal; a plain `state["log"]` list is upgraded in place."""
+    if not isinstance(state, dict):
+        return None
+    log = state.get("log")
+    if isinstance(log, CombatJournal):
+        return log
+    upgraded = CombatJournal(log if isinstance(log, list) else [])
+    state["log"] = upgraded
+    return upgraded
+
+
+def last_action_missed(state: Dict[str, Any]) -> bool:
+    """True if the most recent resolved action (hit True/False) was a miss."""
+    j = journal(state)
+    return bool(j and j.last_missed())
+
+
+def player_moved(state: Dict[str, Any]) -> bool:
+    """True if the player's most recent action was a movement ability."""
+    j = journal(state)
+    return bool(j and j.moved_last())
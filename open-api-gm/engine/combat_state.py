@@ -1,17 +1,90 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
 
-COMBAT_METERS = {"heat", "balance", "momentum", "rp", "rp_cap"}
+# Fixed meter layout: Participant.meters[METER_SLOT[name]].
+METER_NAMES = ("heat", "balance", "momentum", "rp", "rp_cap")
+METER_SLOT = {name: i for i, name in enumerate(METER_NAMES)}
+COMBAT_METERS = frozenset(METER_NAMES)
 
 
+@lru_cache(maxsize=1024)
 def _status_id(name: str) -> str:
     s = "".join(ch.lower() if ch.isalnum() else "_" for ch in (name or "").strip())
     s = "_".join([p for p in s.split("_") if p])
     return f"status.{s}" if s else "status.unknown"
 
 
+class StatusTable:
+    """Interns status ids ("status.bleed") to small ints for participant status maps."""
+
+    __slots__ = ("_ids", "_names")
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def intern(self, sid: str) -> int:
+        code = self._ids.get(sid)
+        if code is None:
+            code = len(self._names)
+            self._ids[sid] = code
+            self._names.append(sid)
+        return code
+
+    def lookup(self, sid: str) -> Optional[int]:
+        return self._ids.get(sid)
+
+    def name(self, code: int) -> str:
+        return self._names[code]
+
+
+STATUS_TABLE = StatusTable()
+
+
+class Participant:
+    """
+    One combatant's encounter-scoped state: meters in a fixed-layout list and
+    statuses keyed by interned status id. `to_dict`/`from_dict` keep the old
+    nested-dict shape for snapshots and the UI.
+    """
+
+    __slots__ = ("key", "side", "id", "meters", "statuses")
+
+    def __init__(self, key: str, side: str, pid: Any, meters: List[int], statuses: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.key = key
+        self.side = side
+        self.id = pid
+        self.meters = meters
+        self.statuses = statuses if statuses is not None else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "side": self.side,
+            "id": self.id,
+            "combat": dict(zip(METER_NAMES, self.meters)),
+            "statuses": {STATUS_TABLE.name(code): dict(st) for code, st in self.statuses.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Participant":
+        combat = data.get("combat") if isinstance(data.get("combat"), dict) else {}
+        statuses = data.get("statuses") if isinstance(data.get("statuses"), dict) else {}
+        return cls(
+            data.get("key"),
+            data.get("side"),
+            data.get("id"),
+            [int(combat.get(m, 0) or 0) for m in METER_NAMES],
+            {STATUS_TABLE.intern(sid): dict(st) for sid, st in statuses.items() if isinstance(st, dict)},
+        )
+
+    def __repr__(self) -> str:
+        return f"Participant({self.key!r}, side={self.side!r}, meters={self.meters!r})"
+
+
 def ensure_encounter(state: Dict[str, Any]) -> Dict[str, Any]:
     enc = state.setdefault("encounter", {})
     enc.setdefault("participants", {})
@@ -26,66 +99,69 @@ def register_participant(state: Dict[str, Any], *, key: str, entity: Dict[str, A
     if rp is None:
         rp = entity.get("rp")
     rp_cap = res.get("resolve_cap") or entity.get("rp_cap") or entity.get("resolve_cap")
-    participants[key] = {
-        "key": key,
-        "side": side,
-        "id": entity.get("id") or entity.get("name") or key,
-        "combat": {
-            "heat": 0,
-            "balance": 0,
-            "momentum": 0,
-            "rp": int(rp or 0),
-            "rp_cap": int(rp_cap or rp or 0),
-        },
-        "statuses": {},
-    }
+    participants[key] = Participant(
+        key,
+        side,
+        entity.get("id") or entity.get("name") or key,
+        [0, 0, 0, int(rp or 0), int(rp_cap or rp or 0)],
+    )
     entity["_combat_key"] = key
 
 
-def participant(state: Dict[str, Any], entity: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    key = entity.get("_combat_key") if isinstance(entity, dict) else None
-    if not key:
-        return None
-    enc = state.get("encounter") if isinstance(state, dict) else None
-    participants = enc.get("participants") if isinstance(enc, dict) else None
-    if not isinstance(participants, dict):
+def participant(state: Dict[str, Any], entity: Dict[str, Any]) -> Optional[Participant]:
+    try:
+        key = entity["_combat_key"]
+        participants = state["encounter"]["participants"]
+        p = participants[key]
+    except (KeyError, TypeError, IndexError):
         return None
-    p = participants.get(key)
-    return p if isinstance(p, dict) else None
+    if p.__class__ is Participant:
+        return p
+    if isinstance(p, dict):
+        # Restored snapshot (or hand-built state): upgrade in place.
+        p = Participant.from_dict(p)
+        participants[key] = p
+        return p
+    return None
 
 
 def combat_get(state: Dict[str, Any], entity: Dict[str, Any], meter: str, default: int = 0) -> int:
-    if meter not in COMBAT_METERS:
+    slot = METER_SLOT.get(meter)
+    if slot is None:
         raise KeyError(f"Unknown combat meter: {meter}")
     p = participant(state, entity)
-    if not p:
+    if p is None:
         return int(default)
-    combat = p.get("combat")
-    if not isinstance(combat, dict):
-        return int(default)
-    return int(combat.get(meter, default) or 0)
+    return p.meters[slot]
 
 
 def combat_set(state: Dict[str, Any], entity: Dict[str, Any], meter: str, value: int) -> None:
-    if meter not in COMBAT_METERS:
+    slot = METER_SLOT.get(meter)
+    if slot is None:
         raise KeyError(f"Unknown combat meter: {meter}")
     p = participant(state, entity)
-    if not p:
+    if p is None:
         return
-    combat = p.setdefault("combat", {})
-    combat[meter] = int(value)
+    p.meters[slot] = int(value)
 
 
 def combat_add(state: Dict[str, Any], entity: Dict[str, Any], meter: str, delta: int) -> int:
-    cur = combat_get(state, entity, meter, 0)
-    nxt = int(cur + int(delta))
-    combat_set(state, entity, meter, nxt)
+    slot = METER_SLOT.get(meter)
+    if slot is None:
+        raise KeyError(f"Unknown combat meter: {meter}")
+    p = participant(state, entity)
+    if p is None:
+        # Matches the old get/set pair: reads default 0, the write is dropped.
+        return int(delta)
+    nxt = p.meters[slot] + int(delta)
+    p.meters[slot] = nxt
     return nxt
 
 
 def combat_reset(state: Dict[str, Any], entity: Dict[str, Any]) -> None:
-    for m in COMBAT_METERS:
-        combat_set(state, entity, m, 0)
+    p = participant(state, entity)
+    if p is not None:
+        p.meters[:] = [0] * len(METER_NAMES)
 
 
 def status_add(
@@ -98,17 +174,14 @@ def status_add(
     shield: int = 0,
 ) -> None:
     p = participant(state, entity)
-    if not p:
+    if p is None:
         return
-    statuses = p.setdefault("statuses", {})
-    if not isinstance(statuses, dict):
-        statuses = {}
-        p["statuses"] = statuses
 
     sid = status if status.startswith("status.") else _status_id(status)
-    cur = statuses.get(sid) if isinstance(statuses.get(sid), dict) else {}
+    code = STATUS_TABLE.intern(sid)
+    cur = p.statuses.get(code) or {}
     cur_stacks = int(cur.get("stacks", 0) or 0)
-    statuses[sid] = {
+    p.statuses[code] = {
         "id": sid,
         "name": cur.get("name") or status,
         "stacks": cur_stacks + int(stacks or 0),
@@ -119,26 +192,18 @@ def status_add(
 
 def status_get(state: Dict[str, Any], entity: Dict[str, Any], status_id: str) -> Optional[Dict[str, Any]]:
     p = participant(state, entity)
-    if not p:
-        return None
-    statuses = p.get("statuses")
-    if not isinstance(statuses, dict):
+    if p is None or not p.statuses:
         return None
-    st = statuses.get(status_id)
-    return st if isinstance(st, dict) else None
+    code = STATUS_TABLE.lookup(status_id)
+    return p.statuses.get(code) if code is not None else None
 
 
 def shield_value(state: Dict[str, Any], entity: Dict[str, Any]) -> int:
     p = participant(state, entity)
-    if not p:
-        return 0
-    statuses = p.get("statuses")
-    if not isinstance(statuses, dict):
+    if p is None:
         return 0
     total = 0
-    for st in statuses.values():
-        if not isinstance(st, dict):
-            continue
+    for st in p.statuses.values():
         stacks = int(st.get("stacks", 0) or 0)
         shield = int(st.get("shield", 0) or 0)
         if stacks > 0 and shield > 0:
@@ -154,14 +219,10 @@ def consume_shield(state: Dict[str, Any], entity: Dict[str, Any], amount: int =
     if amount <= 0:
         return 0
     p = participant(state, entity)
-    if not p:
-        return 0
-    statuses = p.get("statuses")
-    if not isinstance(statuses, dict):
+    if p is None:
         return 0
-    for sid, st in list(statuses.items()):
-        if not isinstance(st, dict):
-            continue
+    statuses = p.statuses
+    for code, st in list(statuses.items()):
         stacks = int(st.get("stacks", 0) or 0)
         shield = int(st.get("shield", 0) or 0)
         if stacks <= 0 or shield <= 0:
@@ -169,6 +230,6 @@ def consume_shield(state: Dict[str, Any], entity: Dict[str, Any], amount: int =
         # Consume one stack worth of shield.
         st["stacks"] = stacks - 1
         if st["stacks"] <= 0:
-            statuses.pop(sid, None)
+            statuses.pop(code, None)
         return min(amount, shield)
     return 0
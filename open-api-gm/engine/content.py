@@ -0,0 +1,205 @@
+"""
+Content repository
+------------------
+Indexed, in-memory access to the per-record content under `game-data/`.
+
+Scene entry and completion used to open and parse one JSON file per lookup
+(scene, environment, each trap/hazard, each loot item), and every narration
+template lookup re-parsed all of `narrations.json`. `ContentRepository`
+scans the content directories once, parses each file once and serves
+records from id -> record indexes.
+
+- Records are stored frozen (engine.game_data.freeze) and handed out as
+  plain copies, so callers can keep mutating what they get back.
+- Refresh is per file: a lookup re-stats only the file that holds the id
+  and re-parses it when its (mtime, size) changed. Unknown ids trigger a
+  directory rescan at most once per `rescan_interval` seconds, which picks
+  up new and deleted files.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from engine.game_data import freeze, thaw
+
+# kind -> content location. Directories hold one record per file (id = file stem,
+# plus the record's own "id"); a single file may hold one record, a list, or {"items": [...]}.
+CONTENT_KINDS: Dict[str, str] = {
+    "scenes": "scenes",
+    "traps": "traps",
+    "hazards": "hazards",
+    "environments": "environments",
+    "loot": "loot",
+    "scripts": "scripts",
+    "narrations": "narrations.json",
+}
+
+
+def _records(data: Any) -> List[Dict[str, Any]]:
+    if isinstance(data, list):
+        return [r for r in data if isinstance(r, dict)]
+    if isinstance(data, dict):
+        if isinstance(data.get("items"), list):
+            return [r for r in data["items"] if isinstance(r, dict)]
+        return [data]
+    return []
+
+
+class _FileEntry:
+    __slots__ = ("kind", "sig", "ids")
+
+    def __init__(self, kind: str, sig: Tuple[int, int], ids: Tuple[str, ...]):
+        self.kind = kind
+        self.sig = sig
+        self.ids = ids
+
+
+class ContentRepository:
+    def __init__(
+        self,
+        root: Path,
+        *,
+        kinds: Optional[Dict[str, str]] = None,
+        rescan_interval: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.root = Path(root)
+        self.kinds = dict(kinds or CONTENT_KINDS)
+        self.rescan_interval = float(rescan_interval)
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._files: Dict[Path, _FileEntry] = {}
+        # kind -> id -> (path, frozen record)
+        self._index: Dict[str, Dict[str, Tuple[Path, Any]]] = {k: {} for k in self.kinds}
+        self._last_scan: Dict[str, float] = {}
+        self._counters = {"scans": 0, "parses": 0, "hits": 0, "misses": 0, "refreshes": 0}
+
+    # -- lookups -----------------------------------------------------------------
+
+    def get(self, kind: str, record_id: str, default: Any = None) -> Any:
+        """Plain (mutable) copy of the record, or `default`."""
+        rec = self.get_frozen(kind, record_id)
+        return thaw(rec) if rec is not None else default
+
+    def get_frozen(self, kind: str, record_id: str) -> Any:
+        """The shared read-only record (no copy), or None."""
+        if kind not in self.kinds:
+            raise KeyError(f"Unknown content kind: {kind}")
+        record_id = str(record_id)
+        with self._lock:
+            index = self._index[kind]
+            if kind not in self._last_scan:
+                self._scan(kind)
+            hit = index.get(record_id)
+            if hit is not None:
+                # Re-stat only the file holding this id; it may have changed or gone.
+                hit = index.get(record_id) if self._fresh(hit[0]) else None
+            if hit is None and self.clock() - self._last_scan.get(kind, 0.0) >= self.rescan_interval:
+                self._scan(kind)
+                hit = index.get(record_id)
+            if hit is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            return hit[1]
+
+    def ids(self, kind: str) -> List[str]:
+        with self._lock:
+            if kind not in self._last_scan:
+                self._scan(kind)
+            return sorted(self._index[kind])
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self._counters)
+            out["files"] = len(self._files)
+            out["records"] = {k: len(v) for k, v in self._index.items()}
+            return out
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._files.clear()
+            self._index = {k: {} for k in self.kinds}
+            self._last_scan.clear()
+
+    # -- indexing ----------------------------------------------------------------
+
+    def _paths(self, kind: str) -> Iterable[Path]:
+        target = self.root / self.kinds[kind]
+        if target.suffix == ".json":
+            return [target] if target.exists() else []
+        return sorted(target.glob("*.json")) if target.is_dir() else []
+
+    def _scan(self, kind: str) -> None:
+        """(Re)index one kind: parse new/changed files, drop deleted ones."""
+        self._counters["scans"] += 1
+        self._last_scan[kind] = self.clock()
+        seen = set()
+        for path in self._paths(kind):
+            seen.add(path)
+            entry = self._files.get(path)
+            sig = self._signature(path)
+            if entry is None or entry.sig != sig:
+                self._load(kind, path, sig)
+        for path, entry in list(self._files.items()):
+            if entry.kind == kind and path not in seen:
+                self._forget(path)
+
+    def _fresh(self, path: Path) -> bool:
+        """Re-stat one file; re-parse it if it changed. False if it disappeared."""
+        entry = self._files.get(path)
+        sig = self._signature(path)
+        if entry is None:
+            return False
+        if sig is None:
+            self._forget(path)
+            return False
+        if sig != entry.sig:
+            self._counters["refreshes"] += 1
+            self._load(entry.kind, path, sig)
+        return True
+
+    def _load(self, kind: str, path: Path, sig: Optional[Tuple[int, int]]) -> None:
+        self._forget(path)
+        if sig is None:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            data = None
+        self._counters["parses"] += 1
+        records = _records(data)
+        # One-record-per-file directories are also addressable by file stem (the old lookup path).
+        by_stem = len(records) == 1 and path != self.root / self.kinds[kind]
+        ids = []
+        for rec in records:
+            frozen = freeze(rec)
+            keys = {str(rec["id"])} if rec.get("id") else set()
+            if by_stem:
+                keys.add(path.stem)
+            for key in keys:
+                self._index[kind][key] = (path, frozen)
+                ids.append(key)
+        self._files[path] = _FileEntry(kind, sig, tuple(ids))
+
+    def _forget(self, path: Path) -> None:
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        index = self._index[entry.kind]
+        for rid in entry.ids:
+            hit = index.get(rid)
+            if hit is not None and hit[0] == path:
+                del index[rid]
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
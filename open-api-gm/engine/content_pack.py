@@ -0,0 +1,146 @@
+"""
+Content pack
+------------
+A compiled, versioned snapshot of the shared game data.
+
+`load_game_data()` used to read every content JSON file and resolve enemy
+archetypes in each process that started. `tools/build_content_pack.py` does
+that work once, at build time, and writes the resolved data as a single
+document to `game-data/content.pack`. At startup the runtime reads the pack
+in one read instead.
+
+File layout:
+    header  struct "<4sHH32s32sQ": magic b"VBPK", format version, codec,
+            sha256 of the source signature, builder digest, payload length
+    payload UTF-8 JSON of the resolved game data
+
+The payload is plain data, never code: reading a pack is `json.loads` plus
+the usual `GameData.build` (freeze + id indexes, which share their rows with
+`data`). Repeated short strings are interned on load, so each distinct id or
+tag is held once.
+
+Freshness: the header records a digest of the JSON sources (relative path,
+size, mtime). If a source changed since the build (development), the pack is
+ignored and the runtime falls back to the raw JSON. With `check=False`
+(VB_CONTENT_PACK_CHECK=0) the pack is trusted as-is, e.g. for deployments
+that do not ship the JSON.
+
+The builder digest hashes the code that defines the packed shape
+(`engine/game_data.py` and this module). Packs written by other versions of
+that code are always rejected, whatever `check` says.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from engine.game_data import FrozenDict, FrozenList, GameData
+
+PACK_MAGIC = b"VBPK"
+PACK_VERSION = 2
+CODEC_JSON = 2
+_HEADER = struct.Struct("<4sHH32s32sQ")
+
+# Strings up to this length (ids, keys, tags, dice) are interned before packing.
+_INTERN_MAX = 96
+
+
+def _builder_digest() -> bytes:
+    h = hashlib.sha256()
+    engine = Path(__file__).resolve().parent
+    for name in ("game_data.py", "content_pack.py"):
+        h.update(name.encode("utf-8") + b"\0" + (engine / name).read_bytes())
+    return h.digest()
+
+
+BUILDER_DIGEST = _builder_digest()
+
+
+def source_digest(paths: Iterable[Path], root: Path) -> bytes:
+    """sha256 over (path relative to root, size, mtime_ns) of every existing source."""
+    h = hashlib.sha256()
+    root = Path(root)
+    for p in sorted(set(Path(p) for p in paths)):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        try:
+            rel = p.resolve().relative_to(root.resolve()).as_posix()
+        except ValueError:
+            rel = p.as_posix()
+        h.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.digest()
+
+
+def _intern(value: Any, memo: dict) -> Any:
+    """Freeze a decoded payload, interning short strings (shared sub-objects stay shared)."""
+    key = id(value)
+    if key in memo:
+        return memo[key]
+    if isinstance(value, str):
+        return sys.intern(value) if len(value) <= _INTERN_MAX else value
+    if isinstance(value, dict):
+        out = FrozenDict((_intern(k, memo), _intern(v, memo)) for k, v in value.items())
+    elif isinstance(value, list):
+        out = FrozenList(_intern(v, memo) for v in value)
+    else:
+        return value
+    memo[key] = out
+    return out
+
+
+def encode_pack(game_data: GameData, digest: bytes) -> bytes:
+    payload = json.dumps(game_data.data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(PACK_MAGIC, PACK_VERSION, CODEC_JSON, digest, BUILDER_DIGEST, len(payload)) + payload
+
+
+def write_pack(path: Path, game_data: GameData, sources: Iterable[Path], root: Path) -> int:
+    """Write the pack atomically; returns its size in bytes."""
+    blob = encode_pack(game_data, source_digest(sources, root))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def read_pack(
+    path: Path,
+    *,
+    sources: Optional[Iterable[Path]] = None,
+    root: Optional[Path] = None,
+    check: bool = True,
+) -> Optional[GameData]:
+    """
+    The packed GameData, or None when the pack is missing, malformed, from
+    another format version or builder, or (with `check`) stale relative to
+    `sources`.
+    """
+    try:
+        blob = Path(path).read_bytes()
+    except OSError:
+        return None
+    if len(blob) < _HEADER.size:
+        return None
+    magic, version, codec, digest, builder, length = _HEADER.unpack_from(blob)
+    if magic != PACK_MAGIC or version != PACK_VERSION or codec != CODEC_JSON or builder != BUILDER_DIGEST:
+        return None
+    if len(blob) != _HEADER.size + length:
+        return None
+    if check and sources is not None:
+        if digest != source_digest(sources, root or Path(path).parent):
+            return None
+    try:
+        raw = json.loads(blob[_HEADER.size:])
+    except ValueError:
+        return None
+    if not isinstance(raw, dict):
+        return None
+    return GameData.build(_intern(raw, {}))
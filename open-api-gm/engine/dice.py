@@ -0,0 +1,165 @@
+"""
+Dice
+----
+Parsed, cached dice expressions.
+
+`parse("2d6+1")` -> DiceExpr(count=2, sides=6, flat=1), cached per string, so
+hot paths stop re-splitting "NdM" on every roll. A DiceExpr can
+
+- roll once against any `random.Random`-like source (`roll`),
+- roll a whole column at once through NumPy (`roll_many`), for balance
+  simulations and AI lookahead,
+- report its exact outcome distribution (`pmf`, `mean`, `prob_at_least`),
+  for expected-damage previews.
+
+`from_profile({"dice": "1d6", "flat": 2})` reads the damage_profile / effect
+shape used throughout the content files.
+"""
+from __future__ import annotations
+
+import random
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional; roll_many needs it, everything else does not.
+    np = None
+
+_EXPR_RE = re.compile(r"^\s*(?:(\d*)\s*d\s*(\d+))?\s*(?:([+-])\s*(\d+))?\s*$", re.IGNORECASE)
+_FLAT_RE = re.compile(r"^\s*([+-]?\d+)\s*$")
+
+
+class DiceExpr:
+    __slots__ = ("count", "sides", "flat", "_pmf")
+
+    def __init__(self, count: int, sides: int, flat: int = 0):
+        self.count = max(0, int(count))
+        self.sides = max(0, int(sides)) if self.count else 0
+        self.flat = int(flat)
+        self._pmf: Optional[Dict[int, float]] = None
+
+    # -- shape ---------------------------------------------------------------
+
+    @property
+    def min(self) -> int:
+        return self.count + self.flat if self.sides else self.flat
+
+    @property
+    def max(self) -> int:
+        return self.count * self.sides + self.flat
+
+    @property
+    def mean(self) -> float:
+        return self.count * (self.sides + 1) / 2 + self.flat if self.sides else float(self.flat)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, DiceExpr) and (self.count, self.sides, self.flat) == (other.count, other.sides, other.flat)
+
+    def __hash__(self) -> int:
+        return hash((self.count, self.sides, self.flat))
+
+    def __str__(self) -> str:
+        base = f"{self.count}d{self.sides}" if self.sides else ""
+        if not self.flat:
+            return base or "0"
+        return f"{base}{self.flat:+d}" if base else str(self.flat)
+
+    def __repr__(self) -> str:
+        return f"DiceExpr({str(self)!r})"
+
+    # -- rolling ---------------------------------------------------------------
+
+    def roll(self, rng: Any = random) -> int:
+        """One roll using `rng.randint` (a random.Random, or the random module)."""
+        sides = self.sides
+        total = self.flat
+        for _ in range(self.count if sides else 0):
+            total += rng.randint(1, sides)
+        return total
+
+    def roll_many(self, n: int, rng: Any = None):
+        """
+        `n` independent rolls as a NumPy int64 array.
+        rng: numpy Generator, an int seed, or None (fresh entropy).
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for roll_many")
+        gen = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+        if not self.sides or not self.count:
+            return np.full(int(n), self.flat, dtype=np.int64)
+        rolls = gen.integers(1, self.sides + 1, size=(int(n), self.count), dtype=np.int64)
+        return rolls.sum(axis=1) + self.flat
+
+    # -- distribution ------------------------------------------------------------
+
+    def pmf(self) -> Dict[int, float]:
+        """Exact probability of each total."""
+        if self._pmf is None:
+            dist = [1.0]
+            if self.sides:
+                face = [1.0 / self.sides] * self.sides
+                for _ in range(self.count):
+                    dist = _convolve(dist, face)
+            offset = self.min
+            self._pmf = {offset + i: p for i, p in enumerate(dist) if p > 0}
+        return dict(self._pmf)
+
+    def prob_at_least(self, value: int) -> float:
+        return sum(p for total, p in self.pmf().items() if total >= value)
+
+
+def _convolve(a, b):
+    if np is not None:
+        return np.convolve(a, b).tolist()
+    out = [0.0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        for j, y in enumerate(b):
+            out[i + j] += x * y
+    return out
+
+
+@lru_cache(maxsize=512)
+def _parse_str(expr: str) -> DiceExpr:
+    flat_only = _FLAT_RE.match(expr)
+    if flat_only:
+        return DiceExpr(0, 0, int(flat_only.group(1)))
+    m = _EXPR_RE.match(expr)
+    if not m or m.group(2) is None:
+        raise ValueError(f"Bad dice expression: {expr!r}")
+    count = int(m.group(1)) if m.group(1) else 1
+    flat = int(m.group(4) or 0) * (-1 if m.group(3) == "-" else 1)
+    return DiceExpr(count, int(m.group(2)), flat)
+
+
+def parse(expr: Any) -> DiceExpr:
+    """'2d6', 'd8', '1d6+2', '3' (flat) or an existing DiceExpr. Raises ValueError otherwise."""
+    if isinstance(expr, DiceExpr):
+        return expr
+    if isinstance(expr, bool) or not isinstance(expr, (str, int)):
+        raise ValueError(f"Bad dice expression: {expr!r}")
+    return _parse_str(str(expr))
+
+
+def from_profile(obj: Any, default: Optional[str] = "1d6") -> DiceExpr:
+    """A {"dice": ..., "flat": ...} damage entry as one expression (flat folded in)."""
+    obj = obj if isinstance(obj, dict) else {}
+    dice = obj.get("dice", default)
+    flat = obj.get("flat", 0)
+    try:
+        base = parse(dice) if dice else DiceExpr(0, 0)
+    except ValueError:
+        base = DiceExpr(0, 0)
+    extra = int(flat) if isinstance(flat, (int, float)) and not isinstance(flat, bool) else 0
+    if not extra:
+        return base
+    return DiceExpr(base.count, base.sides, base.flat + extra)
+
+
+def expected(expr: Any) -> float:
+    return parse(expr).mean
+
+
+def pmf(expr: Any) -> Dict[int, float]:
+    return parse(expr).pmf()
@@ -0,0 +1,117 @@
+"""
+Enemy instances
+---------------
+Copy-on-write spawns of bestiary templates.
+
+Spawning used to `deepcopy(template)` once per monster, duplicating the whole
+bestiary entry (stat block, moves, resolved archetype, lore) although combat
+only ever rebinds a handful of top-level runtime fields (`hp`, `chain`,
+`_combat_key`, dv/idf, the action index). An `EnemyInstance` starts as a
+shallow view of the frozen template: its top-level slots point at the shared,
+read-only sub-objects, and whatever the engine assigns replaces the slot in
+this instance only.
+
+- It is a real dict, so isinstance() checks, `.get`, iteration, json.dumps()
+  and the session snapshot encoder see the same mapping as before.
+- Nested template data stays frozen. `setdefault` and `mutable(key)` hand
+  back a private plain copy of a shared sub-object the first time a caller
+  needs to edit it in place; editing a shared one directly raises TypeError
+  instead of leaking into other spawns.
+- `overlay()` is what this spawn actually owns (the keys that no longer point
+  at the template's values).
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, Mapping, Optional
+
+from engine.game_data import FrozenDict, FrozenList, freeze, thaw
+
+# Small per-spawn state that may appear in authored templates; copied at spawn
+# so the engine can edit it in place.
+RUNTIME_KEYS = frozenset({"hp", "chain", "statuses", "resources", "flags", "cooldowns"})
+
+_MISSING = object()
+
+
+class EnemyInstance(dict):
+    __slots__ = ("template",)
+
+    def __init__(self, template: Mapping[str, Any], overlay: Optional[Mapping[str, Any]] = None):
+        if not isinstance(template, FrozenDict):
+            # Plain (caller-owned) templates are frozen once so spawns can never edit them.
+            template = freeze(dict(template or {}))
+        dict.__init__(self, template)
+        self.template = template
+        for key in RUNTIME_KEYS:
+            if key in template:
+                dict.__setitem__(self, key, thaw(template[key]))
+        if overlay:
+            dict.update(self, overlay)
+
+    # -- copy-on-write ---------------------------------------------------------
+
+    def shared(self, key: str) -> bool:
+        """True while `key` still points at the template's (read-only) value."""
+        value = dict.get(self, key, _MISSING)
+        return value is not _MISSING and value is self.template.get(key, _MISSING)
+
+    def mutable(self, key: str) -> Any:
+        """This spawn's own editable copy of `key` (copied from the template on first use)."""
+        value = dict.__getitem__(self, key)
+        if isinstance(value, (FrozenDict, FrozenList)):
+            value = thaw(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key in self:
+            return self.mutable(key)
+        dict.__setitem__(self, key, default)
+        return default
+
+    def overlay(self) -> Dict[str, Any]:
+        """Keys this spawn owns: runtime fields and anything rebound since spawning."""
+        return {k: v for k, v in self.items() if self.template.get(k, _MISSING) is not v}
+
+    # -- copying / pickling ----------------------------------------------------
+
+    def copy(self) -> "EnemyInstance":
+        out = EnemyInstance.__new__(EnemyInstance)
+        dict.update(out, self)
+        out.template = self.template
+        return out
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo: dict) -> "EnemyInstance":
+        # The template is immutable; only the overlay needs copying.
+        out = self.copy()
+        memo[id(self)] = out
+        dict.update(out, copy.deepcopy(self.overlay(), memo))
+        return out
+
+    def __reduce__(self):
+        return (_rebuild, (dict(self.template), dict(self)))
+
+    def __repr__(self) -> str:
+        return f"EnemyInstance({dict.__repr__(self)})"
+
+
+def _rebuild(template: Dict[str, Any], items: Dict[str, Any]) -> EnemyInstance:
+    inst = EnemyInstance.__new__(EnemyInstance)
+    inst.template = freeze(template)
+    for key, value in items.items():
+        # Re-share values that still equal the template's after the round trip.
+        shared = inst.template.get(key, _MISSING)
+        if key not in RUNTIME_KEYS and shared is not _MISSING and shared == value:
+            value = shared
+        dict.__setitem__(inst, key, value)
+    return inst
+
+
+def spawn_enemy(template: Optional[Mapping[str, Any]], enemy_id: Optional[str] = None) -> EnemyInstance:
+    """New instance of a bestiary template (a bare id/name stub when the template is missing)."""
+    if not isinstance(template, dict):
+        template = FrozenDict({"id": enemy_id, "name": enemy_id})
+    return EnemyInstance(template)
@@ -0,0 +1,185 @@
+"""
+Enemy planner
+-------------
+Chooses an enemy's chain by lookahead instead of file order.
+
+Candidate chains (each move at most once, within the enemy's RP) are scored
+with the exact chain model in engine.chain_odds against the defender's DV,
+momentum, shields and HP:
+
+  score = expected damage + STATUS_VALUE * expected statuses landed
+          + KILL_VALUE * P(kill) - COUNTER_COST * P(chain broken)
+
+Search is a beam search over chain prefixes (`beam` best per length),
+bounded by `max_links` and a number of chain evaluations per decision
+(VB_PLANNER_MAX_EVALS, default 64, roughly 5 ms). The greedy file-order chain
+is scored first; when the budget runs out the best chain scored so far is
+used, and with no budget at all, the greedy chain itself. The cutoff counts
+evaluations, not time, so a seeded encounter replays the same plans.
+
+`lead` pins the first move: the enemy's behavior script decides what it opens
+with when one of its rules matches, and the search only fills in the rest.
+
+Finished plans are memoized in a transposition cache keyed by the candidate
+moves, the pinned lead, the budget and a compact signature of the matchup
+(`Matchup` is frozen and hashable), so repeated decisions from the same
+combat state are free.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from engine.chain_odds import ChainOdds, LinkModel, Matchup, chain_odds, link_model
+
+DEFAULT_MAX_EVALS = int(os.environ.get("VB_PLANNER_MAX_EVALS", "64") or 0)
+DEFAULT_BEAM = 8
+
+STATUS_VALUE = 1.5
+KILL_VALUE = 10.0
+# Expected perfect-parry counter damage (1d4) plus the tempo lost.
+COUNTER_COST = 4.0
+
+
+def move_cost(move: Dict[str, Any]) -> int:
+    cost = move.get("cost", {})
+    try:
+        return int((cost.get("rp", 0) if isinstance(cost, dict) else 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def greedy_chain(moves: Sequence[Dict[str, Any]], rp_available: int, max_links: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Moves in file order while they fit the RP budget; the first move alone when none fits."""
+    chain = []
+    for mv in moves:
+        if max_links is not None and len(chain) >= max_links:
+            break
+        cost = move_cost(mv)
+        if cost <= rp_available:
+            chain.append(mv)
+            rp_available -= cost
+    if not chain and moves:
+        chain.append(moves[0])
+    return chain
+
+
+def score_odds(odds: ChainOdds) -> float:
+    return odds.expected_damage + STATUS_VALUE * odds.expected_statuses + KILL_VALUE * odds.kill_prob - COUNTER_COST * odds.break_prob
+
+
+@dataclass
+class EnemyPlan:
+    moves: List[Dict[str, Any]]
+    score: float = 0.0
+    odds: Optional[ChainOdds] = None
+    source: str = "greedy"  # "greedy" | "search" | "cache"
+    evaluated: int = 0
+    truncated: bool = False
+    elapsed_ms: float = 0.0
+    alternatives: List[Tuple[List[Any], float]] = field(default_factory=list)
+
+
+_CACHE: Dict[Tuple[Any, ...], Tuple[Tuple[Any, ...], EnemyPlan]] = {}
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 4096
+
+
+def clear_cache() -> None:
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def plan_chain(
+    aggressor: Dict[str, Any],
+    moves: Sequence[Dict[str, Any]],
+    rp_available: int,
+    m: Matchup,
+    *,
+    max_links: Optional[int] = None,
+    beam: int = DEFAULT_BEAM,
+    max_evals: Optional[int] = None,
+    lead: Optional[Dict[str, Any]] = None,
+) -> EnemyPlan:
+    moves = [mv for mv in moves if isinstance(mv, dict)]
+    if not moves:
+        return EnemyPlan([])
+    started = time.perf_counter()
+    budget = DEFAULT_MAX_EVALS if max_evals is None else int(max_evals)
+    limit = len(moves) if max_links is None else max(1, min(int(max_links), len(moves)))
+    index = {id(mv): i for i, mv in enumerate(moves)}
+    pinned = index.get(id(lead)) if lead is not None else None
+
+    key = (tuple(id(mv) for mv in moves), int(rp_available), limit, int(beam), budget, pinned, m)
+    hit = _CACHE.get(key)
+    if hit is not None and all(a is b for a, b in zip(hit[0], moves)):
+        plan = hit[1]
+        return EnemyPlan(list(plan.moves), plan.score, plan.odds, "cache", 0, plan.truncated, (time.perf_counter() - started) * 1000.0, list(plan.alternatives))
+
+    models: List[LinkModel] = [link_model(aggressor, mv) for mv in moves]
+    costs = [move_cost(mv) for mv in moves]
+
+    if pinned is None:
+        root: Tuple[int, ...] = ()
+        greedy = greedy_chain(moves, rp_available, limit)
+    else:
+        root = (pinned,)
+        left = rp_available - costs[pinned]
+        rest = [mv for i, mv in enumerate(moves) if i != pinned]
+        # greedy_chain falls back to an unaffordable first move; a pinned lead needs no filler.
+        tail = greedy_chain(rest, left, limit - 1) if limit > 1 else []
+        greedy = [moves[pinned]] + [mv for mv in tail if move_cost(mv) <= left]
+    plan = EnemyPlan(greedy)
+    evaluated: Dict[Tuple[int, ...], Tuple[float, ChainOdds]] = {}
+
+    def evaluate(combo: Tuple[int, ...]) -> Tuple[float, ChainOdds]:
+        odds = chain_odds([models[i] for i in combo], m)
+        evaluated[combo] = (score_odds(odds), odds)
+        return evaluated[combo]
+
+    truncated = budget <= 0
+    if not truncated:
+        score, odds = evaluate(tuple(index[id(mv)] for mv in greedy))
+        plan.score, plan.odds = score, odds
+        best = tuple(index[id(mv)] for mv in greedy)
+        frontier: List[Tuple[int, ...]] = [root]
+        for _depth in range(limit - len(root)):
+            scored: List[Tuple[float, Tuple[int, ...]]] = []
+            for prefix in frontier:
+                spent = sum(costs[i] for i in prefix)
+                for i in range(len(moves)):
+                    if i in prefix or spent + costs[i] > rp_available:
+                        continue
+                    combo = prefix + (i,)
+                    if combo not in evaluated and len(evaluated) >= budget:
+                        truncated = True
+                        break
+                    score_i = evaluated[combo][0] if combo in evaluated else evaluate(combo)[0]
+                    scored.append((score_i, combo))
+                if truncated:
+                    break
+            # Ties keep the earlier (shorter, file-order) chain.
+            for score_i, combo in scored:
+                if score_i > plan.score + 1e-9:
+                    best = combo
+                    plan.score, plan.odds = evaluated[combo]
+            if truncated or not scored:
+                break
+            scored.sort(key=lambda sc: -sc[0])
+            frontier = [combo for _s, combo in scored[: max(1, int(beam))]]
+        plan.moves = [moves[i] for i in best]
+        plan.source = "search"
+        ranked = sorted(evaluated.items(), key=lambda kv: -kv[1][0])[:5]
+        plan.alternatives = [([moves[i].get("id") for i in combo], round(s, 4)) for combo, (s, _o) in ranked]
+    plan.evaluated = len(evaluated)
+    plan.truncated = truncated
+    plan.elapsed_ms = (time.perf_counter() - started) * 1000.0
+    # A truncated search is still a pure function of the key, so it is cached too.
+    with _CACHE_LOCK:
+        if len(_CACHE) >= _CACHE_MAX:
+            _CACHE.clear()
+        _CACHE[key] = (tuple(moves), plan)
+    return plan
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+# ---------------------------------------------------------------------------
+# Read-only containers
+# ---------------------------------------------------------------------------
+# Game data is shared by every session in the process, so the containers must
+# refuse in-place edits. They subclass dict/list so the rest of the engine's
+# isinstance() checks and json.dumps() keep working unchanged. deepcopy() hands
+# back plain mutable containers, which is what spawning code relies on.
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only (shared game data); copy it before editing")
+
+
+class FrozenDict(dict):
+    __slots__ = ()
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __copy__(self):
+        return dict(self)
+
+    def copy(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self, memo)
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    __slots__ = ()
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __iadd__ = _readonly
+    __imul__ = _readonly
+    append = _readonly
+    clear = _readonly
+    extend = _readonly
+    insert = _readonly
+    pop = _readonly
+    remove = _readonly
+    reverse = _readonly
+    sort = _readonly
+
+    def __copy__(self):
+        return list(self)
+
+    def copy(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self, memo)
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into FrozenDict/FrozenList."""
+    if isinstance(value, FrozenDict) or isinstance(value, FrozenList):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any, memo: Optional[dict] = None) -> Any:
+    """Recursively copy frozen (or plain) containers into plain mutable ones."""
+    if memo is None:
+        memo = {}
+    key = id(value)
+    if key in memo:
+        return memo[key]
+    if isinstance(value, dict):
+        out: Dict[Any, Any] = {}
+        memo[key] = out
+        for k, v in value.items():
+            out[k] = thaw(v, memo)
+        return out
+    if isinstance(value, list):
+        out_list: list = []
+        memo[key] = out_list
+        out_list.extend(thaw(v, memo) for v in value)
+        return out_list
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    import copy
+
+    return copy.deepcopy(value, memo)
+
+
+# ---------------------------------------------------------------------------
+# Shared snapshot
+# ---------------------------------------------------------------------------
+
+
+def _index_by_id(items: Iterable[Any]) -> FrozenDict:
+    out: Dict[str, Any] = {}
+    for item in items or []:
+        if isinstance(item, dict) and item.get("id"):
+            out[str(item["id"])] = item
+    return FrozenDict(out)
+
+
+def _ability_rows(data: Dict[str, Any]) -> list:
+    rows: list = []
+    for key in ("abilities", "resolve_abilities"):
+        block = data.get(key)
+        if isinstance(block, dict) and isinstance(block.get("abilities"), list):
+            rows.extend(block["abilities"])
+    return rows
+
+
+@dataclass(frozen=True)
+class GameData:
+    """Immutable, process-wide snapshot of parsed game data."""
+
+    data: FrozenDict
+    abilities_by_id: FrozenDict
+    enemies_by_id: FrozenDict
+    loot_by_id: FrozenDict
+    statuses_by_id: FrozenDict
+    signature: Tuple[Tuple[str, int, int], ...] = field(default=())
+
+    @classmethod
+    def build(cls, raw: Dict[str, Any], signature: Tuple[Tuple[str, int, int], ...] = ()) -> "GameData":
+        data = freeze(raw)
+        enemies = data.get("enemy_by_id")
+        if not isinstance(enemies, dict):
+            enemies = _index_by_id(data.get("bestiary", []))
+        return cls(
+            data=data,
+            abilities_by_id=_index_by_id(_ability_rows(data)),
+            enemies_by_id=enemies,
+            loot_by_id=_index_by_id(list(data.get("loot", []) or []) + list(data.get("veinscore_loot", []) or [])),
+            statuses_by_id=_index_by_id(data.get("statuses", [])),
+            signature=signature,
+        )
+
+    def view(self) -> Dict[str, Any]:
+        """
+        Per-session game_data dict. The top level is a plain dict so callers can
+        attach session scratch keys (e.g. "__scene"); every value is shared and
+        read-only.
+        """
+        return dict(self.data)
+
+
+def file_signature(paths: Iterable[Path]) -> Tuple[Tuple[str, int, int], ...]:
+    sig = []
+    for p in sorted(set(Path(p) for p in paths)):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        sig.append((str(p), st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class SharedCache:
+    """
+    Build-once cache invalidated by source file mtimes.
+
+    `sources()` lists the files the value depends on; when their (path, mtime,
+    size) signature changes the next get() rebuilds via `builder()`. Concurrent
+    callers share one build.
+    """
+
+    def __init__(self, sources: Callable[[], Iterable[Path]], builder: Callable[[Tuple], Any]):
+        self._sources = sources
+        self._builder = builder
+        self._lock = threading.Lock()
+        self._entry: Optional[Tuple[Tuple, Any]] = None
+        self.builds = 0
+
+    def get(self) -> Any:
+        sig = file_signature(self._sources())
+        entry = self._entry
+        if entry is not None and entry[0] == sig:
+            return entry[1]
+        with self._lock:
+            entry = self._entry
+            if entry is not None and entry[0] == sig:
+                return entry[1]
+            value = self._builder(sig)
+            self._entry = (sig, value)
+            self.builds += 1
+            return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entry = None
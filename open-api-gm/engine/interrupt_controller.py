@@ -1,5 +1,7 @@
-import random
 from engine.action_resolution import roll as roll_dice, resolve_defense_reaction
+from engine.combat_journal import last_action_missed
+from engine.dice import from_profile as dice_from_profile
+from engine.rng import stream as rng_stream
 from engine.status import apply_status_effects
 
 
@@ -9,10 +11,7 @@ def enemy_damage_roll(enemy):
     Fallback to 1d6.
     """
     profile = enemy.get("stat_block", {}).get("damage_profile", {}) if enemy else {}
-    dmg = profile.get("baseline") or {}
-    dice = dmg.get("dice", "1d6")
-    flat = dmg.get("flat", 0)
-    return roll_dice(dice) + flat
+    return roll_dice(dice_from_profile(profile.get("baseline") or {}, default="1d6"))
 
 
 class InterruptController:
@@ -42,14 +41,7 @@ class InterruptController:
         character = state.get("party", {}).get("members", [{}])[0]
 
         def last_player_missed():
-            for entry in reversed(state.get("log", [])):
-                if isinstance(entry, dict) and "action_effects" in entry:
-                    hit = entry["action_effects"].get("hit")
-                    if hit is False:
-                        return True
-                    if hit is True:
-                        return False
-            return False
+            return last_action_missed(state)
 
         def check_trigger(trigger_if):
             if not trigger_if:
@@ -89,7 +81,7 @@ class InterruptController:
             if not check_trigger(w.get("trigger_if", {})):
                 continue
             weight = w.get("weight", 1.0)
-            if random.random() <= weight:
+            if rng_stream("interrupt").random() <= weight:
                 # consume budget immediately
                 self.enemy["interrupts_used"] = used + 1
                 return True
@@ -101,8 +93,9 @@ class InterruptController:
         defender: player dict with resources: idf, momentum, hp
         Returns (hit, dmg, rolls)
         """
-        atk_d20 = random.randint(1, 20)
-        def_d20 = random.randint(1, 20)
+        rng = rng_stream("interrupt")
+        atk_d20 = rng.randint(1, 20)
+        def_d20 = rng.randint(1, 20)
 
         atk_total = atk_d20 + attacker.get("attack_mod", 0)
         def_total = def_d20 + defender.get("resources", {}).get("idf", 0) + defender.get("resources", {}).get("momentum", 0)
@@ -148,8 +141,8 @@ def apply_interrupt(state, interruptor, target):
     # ──────────────────────────────────────────────
     # Contested roll
     # ──────────────────────────────────────────────
-    atk_d20 = roll_dice("1d20")
-    def_d20 = roll_dice("1d20")
+    atk_d20 = roll_dice("1d20", stream="interrupt")
+    def_d20 = roll_dice("1d20", stream="interrupt")
 
     atk_total = atk_d20 + atk_stat + atk_bonus
     def_total = def_d20 + def_stat + def_bonus
@@ -1,9 +1,16 @@
 ﻿from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Protocol
-
-from engine.interrupt_windows import InterruptContext, window_allows_interrupt
+from typing import Any, Callable, Dict, List, Optional, Protocol
+
+from engine.interrupt_windows import (
+    CompiledWindows,
+    InterruptContext,
+    PredicateError,
+    cached_compile,
+    window_allows_interrupt,
+)
 from engine.combat_state import combat_get
+from engine.combat_journal import last_action_missed as _last_action_missed, player_moved as _player_moved
 
 
 class UIProtocol(Protocol):
@@ -28,17 +35,6 @@ class InterruptPolicy(Protocol):
     ) -> InterruptDecision: ...
 
 
-def _last_action_missed(state: Dict[str, Any]) -> bool:
-    for entry in reversed(state.get("log", [])):
-        if isinstance(entry, dict) and "action_effects" in entry and isinstance(entry["action_effects"], dict):
-            hit = entry["action_effects"].get("hit")
-            if hit is False:
-                return True
-            if hit is True:
-                return False
-    return False
-
-
 def _default_window_open(when: str, ctx: InterruptContext, state: Dict[str, Any]) -> bool:
     """
     Default rule when no data-driven policy exists:
@@ -59,40 +55,123 @@ def _legacy_window_allows_interrupt(w: Dict[str, Any], when: str, ctx: Interrupt
         "weight": 0.7
       }
     This is treated as an AFTER_LINK window keyed by action number (1-based).
+    Windows with unknown triggers never match (see `compile_legacy_window`).
     """
-    if when != "after_link":
+    try:
+        test = compile_legacy_window(w)
+    except PredicateError:
         return False
+    return test(when, ctx, state)
 
-    after_idxs = w.get("after_action_index") or []
-    action_number = ctx.chain_index + 1
-    if after_idxs and action_number not in after_idxs:
-        return False
 
+LegacyTest = Callable[[str, InterruptContext, Dict[str, Any]], bool]
+
+
+def _trigger_int(key: str, val: Any) -> int:
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        raise PredicateError(f"{key}: expected an integer, got {val!r}") from None
+
+
+def compile_legacy_window(w: Dict[str, Any]) -> LegacyTest:
+    """Compile a legacy window's `after_action_index` / `trigger_if` into one test; raises PredicateError."""
+    if not isinstance(w, dict):
+        raise PredicateError("window must be an object")
+    after_idxs = w.get("after_action_index") or []
+    try:
+        after = frozenset(after_idxs)
+    except TypeError:
+        raise PredicateError(f"after_action_index: expected a list of action numbers, got {after_idxs!r}") from None
     trigger = w.get("trigger_if", {}) or {}
     if not isinstance(trigger, dict):
-        return False
+        raise PredicateError("trigger_if must be an object")
 
-    # Evaluate supported triggers against current state/ctx
+    checks: List[Callable[[InterruptContext, Dict[str, Any]], bool]] = []
     for key, val in trigger.items():
         if key == "player_missed_last_action":
-            if _last_action_missed(state) != bool(val):
-                return False
+            want = bool(val)
+            checks.append(lambda ctx, state, want=want: _last_action_missed(state) == want)
+        elif key == "player_moved":
+            # Same journal flag the behavior scripts read.
+            want = bool(val)
+            checks.append(lambda ctx, state, want=want: _player_moved(state) == want)
         elif key == "chain_length_gte":
-            if ctx.chain_length < int(val):
-                return False
+            n = _trigger_int(key, val)
+            checks.append(lambda ctx, state, n=n: ctx.chain_length >= n)
         elif key == "player_heat_gte":
-            heat = int(combat_get(state, ctx.aggressor, "heat", int((ctx.aggressor.get("resources") or {}).get("heat", 0))))
-            if heat < int(val):
-                return False
+            n = _trigger_int(key, val)
+            checks.append(
+                lambda ctx, state, n=n: int(combat_get(state, ctx.aggressor, "heat", int((ctx.aggressor.get("resources") or {}).get("heat", 0)))) >= n
+            )
         elif key == "blood_mark_gte":
-            blood = int(((ctx.aggressor.get("marks") or {}).get("blood", 0)))
-            if blood < int(val):
-                return False
+            n = _trigger_int(key, val)
+            checks.append(lambda ctx, state, n=n: int(((ctx.aggressor.get("marks") or {}).get("blood", 0))) >= n)
         else:
-            # Unknown trigger -> treat as unmet (fail closed)
+            raise PredicateError(f"Unknown trigger: {key}")
+    checks_t = tuple(checks)
+
+    def test(when: str, ctx: InterruptContext, state: Dict[str, Any]) -> bool:
+        if when != "after_link":
             return False
+        if after and ctx.chain_index + 1 not in after:
+            return False
+        for check in checks_t:
+            if not check(ctx, state):
+                return False
+        return True
+
+    return test
+
+
+def compile_legacy_windows(windows: Any) -> CompiledWindows:
+    entries = []
+    errors: List[str] = []
+    for i, w in enumerate(windows or []):
+        if not isinstance(w, dict):
+            errors.append(f"window {i}: not an object")
+            continue
+        try:
+            entries.append((w, compile_legacy_window(w)))
+        except PredicateError as exc:
+            errors.append(f"window {i}: {exc}")
+    return CompiledWindows(entries, errors)
+
 
-    return True
+def is_new_schema(windows: Any) -> bool:
+    return any(isinstance(x, dict) and "when" in x for x in windows)
+
+
+def enemy_windows(defender: Dict[str, Any]) -> Any:
+    """The defender's interrupt window list (archetype rhythm profile first, then legacy locations)."""
+    resolved = defender.get("resolved_archetype", {}) or {}
+    rules = (resolved.get("rhythm_profile", {}) or {}).get("interrupt", {}) or {}
+    return rules.get("windows") or defender.get("interrupt_windows") or defender.get("ai", {}).get("interrupt_windows") or []
+
+
+def compile_enemy_windows(defender: Dict[str, Any]) -> CompiledWindows:
+    """Compile (and cache) a defender's window list the way EnemyWindowPolicy reads it."""
+    windows = enemy_windows(defender)
+    if windows and is_new_schema(windows):
+        return cached_compile(windows)
+    return cached_compile(windows, compile_legacy_windows)
+
+
+def precompile_enemy_windows(enemies: Any) -> Dict[str, List[str]]:
+    """
+    Load-time pass over bestiary templates: compiles every window list into the
+    cache (spawns share their template's lists, so runtime lookups hit it) and
+    returns the rejected windows per enemy id -- unknown predicate types or
+    triggers and malformed values, which will never fire.
+    """
+    errors: Dict[str, List[str]] = {}
+    for eid, enemy in (enemies.items() if isinstance(enemies, dict) else enumerate(enemies or [])):
+        if not isinstance(enemy, dict):
+            continue
+        found = compile_enemy_windows(enemy).errors
+        if found:
+            errors[str(enemy.get("id") or eid)] = found
+    return errors
 
 
 class EnemyWindowPolicy:
@@ -144,7 +223,7 @@ class EnemyWindowPolicy:
         w = None
         if windows:
             # New schema: {"when":"before_link|after_link","if":{...},"chance":...}
-            if any(isinstance(x, dict) and "when" in x for x in windows):
+            if is_new_schema(windows):
                 w = window_allows_interrupt(windows, when, ctx)
                 if w:
                     chance = float(w.get("chance", 0.0))
@@ -162,10 +241,9 @@ class EnemyWindowPolicy:
             else:
                 # Legacy schema: {"after_action_index":[...],"trigger_if":{...},"weight":...}
                 if state:
-                    for cand in windows:
-                        if not isinstance(cand, dict):
-                            continue
-                        if _legacy_window_allows_interrupt(cand, when, ctx, state):
+                    # Compiled once per window list (i.e. per archetype).
+                    for cand, test in cached_compile(windows, compile_legacy_windows).entries:
+                        if test(when, ctx, state):
                             weight = float(cand.get("weight", 1.0))
                             roll = self.rng.random()
                             if roll < weight:
@@ -1,6 +1,7 @@
 from __future__ import annotations
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 @dataclass
@@ -104,6 +105,176 @@ def eval_predicate(pred: Dict[str, Any], ctx: InterruptContext) -> bool:
     raise ValueError(f"Unknown predicate type: {t}")
 
 
+class PredicateError(ValueError):
+    """A window predicate the DSL cannot evaluate (unknown type, bad value or operator)."""
+
+
+Test = Callable[[InterruptContext], bool]
+
+_OPS: Dict[str, Callable[[float, float], bool]] = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def _int(pred: Dict[str, Any], key: str = "value") -> int:
+    try:
+        return int(pred.get(key, 0))
+    except (TypeError, ValueError):
+        raise PredicateError(f"{pred.get('type')}: {key} must be an integer, got {pred.get(key)!r}") from None
+
+
+def _path_getter(parts: Tuple[str, ...], default: Any = 0) -> Callable[[Any], Any]:
+    """`_get(d, "a.b.c", default)` with the path split once."""
+
+    def get(d: Any) -> Any:
+        cur = d
+        for part in parts:
+            if not isinstance(cur, dict) or part not in cur:
+                return default
+            cur = cur[part]
+        return cur
+
+    return get
+
+
+def compile_predicate(pred: Dict[str, Any]) -> Test:
+    """
+    Compile a predicate (see `eval_predicate`) into a closure over `InterruptContext`.
+    Values, paths and operators are parsed here, once; raises PredicateError
+    for anything `eval_predicate` could not evaluate.
+    """
+    if not isinstance(pred, dict):
+        raise PredicateError(f"predicate must be an object, got {type(pred).__name__}")
+    t = pred.get("type", "always")
+
+    if t == "always":
+        return lambda ctx: True
+
+    if t == "chain_index_at_least":
+        v = _int(pred)
+        return lambda ctx: ctx.chain_index >= v
+
+    if t == "chain_index_is":
+        v = _int(pred)
+        return lambda ctx: ctx.chain_index == v
+
+    if t == "chain_length_at_least":
+        v = _int(pred)
+        return lambda ctx: ctx.chain_length >= v
+
+    if t == "link_type_is":
+        want = str(pred.get("value", "")).lower()
+        return lambda ctx: (ctx.link.get("type") or "").lower() == want
+
+    if t == "defender_resource_at_least":
+        v = _int(pred)
+        get = _path_getter(("resources", str(pred.get("resource", ""))))
+        return lambda ctx: int(get(ctx.defender)) >= v
+
+    if t == "attacker_momentum_at_least":
+        v = _int(pred)
+        get = _path_getter(("resources", "momentum"))
+        return lambda ctx: int(get(ctx.aggressor)) >= v
+
+    if t == "compare":
+        left, op, right = pred.get("left"), pred.get("op"), pred.get("right")
+        if not isinstance(left, str) or op not in _OPS:
+            raise PredicateError(f"compare: needs a string 'left' and one of {sorted(_OPS)} as 'op'")
+        try:
+            rv = float(right)
+        except (TypeError, ValueError):
+            raise PredicateError(f"compare: right must be a number, got {right!r}") from None
+        root, _, rest = left.partition(".")
+        get = _path_getter(tuple(rest.split("."))) if rest else (lambda d: d)
+        pick = {
+            "attacker": lambda ctx: ctx.aggressor,
+            "defender": lambda ctx: ctx.defender,
+            "state": lambda ctx: ctx.state,
+        }.get(root)
+        if pick is None:
+            return lambda ctx: _OPS[op](0.0, rv)
+        cmp = _OPS[op]
+        return lambda ctx: cmp(float(get(pick(ctx))), rv)
+
+    if t == "not":
+        inner = compile_predicate(pred.get("pred", {"type": "always"}))
+        return lambda ctx: not inner(ctx)
+
+    if t in ("and", "or"):
+        parts = tuple(compile_predicate(p) for p in pred.get("preds", []))
+        if t == "and":
+            return lambda ctx: all(p(ctx) for p in parts)
+        return lambda ctx: any(p(ctx) for p in parts)
+
+    raise PredicateError(f"Unknown predicate type: {t}")
+
+
+class CompiledWindows:
+    """
+    A window list compiled once: `entries` are (window, test) pairs, valid
+    windows only, in evaluation order; `errors` lists the rejected ones.
+    """
+
+    __slots__ = ("entries", "errors", "by_when")
+
+    def __init__(self, entries: List[Tuple[Dict[str, Any], Any]], errors: List[str]):
+        self.entries = tuple(entries)
+        self.errors = list(errors)
+        self.by_when: Dict[Any, Tuple[Tuple[Dict[str, Any], Any], ...]] = {}
+
+
+def compile_windows(windows: Any) -> CompiledWindows:
+    """New-schema windows, pre-sorted by priority (stable, so ties keep file order)."""
+    entries: List[Tuple[Dict[str, Any], Test]] = []
+    errors: List[str] = []
+    for i, w in enumerate(windows or []):
+        if not isinstance(w, dict):
+            errors.append(f"window {i}: not an object")
+            continue
+        try:
+            test = compile_predicate(w.get("if", {"type": "always"}))
+            priority = int(w.get("priority", 0))
+        except (PredicateError, TypeError, ValueError) as exc:
+            errors.append(f"window {i}: {exc}")
+            continue
+        entries.append((w, test, priority))
+    entries.sort(key=lambda e: e[2], reverse=True)
+    compiled = CompiledWindows([(w, test) for w, test, _ in entries], errors)
+    for w, test in compiled.entries:
+        compiled.by_when.setdefault(w.get("when"), ())
+        compiled.by_when[w.get("when")] += ((w, test),)
+    return compiled
+
+
+# Compiled window lists, keyed by the identity of the (shared, read-only) list they
+# came from: one compile per enemy archetype or player rule set.
+_CACHE: Dict[Tuple[int, Any], Tuple[Any, Tuple[Any, ...], CompiledWindows]] = {}
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAX = 4096
+
+
+def cached_compile(windows: Any, compile_fn: Callable[[Any], CompiledWindows] = compile_windows) -> CompiledWindows:
+    """
+    `compile_fn(windows)`, memoized per list object. A list whose items were
+    replaced is recompiled; edit window dicts by replacing them, not in place.
+    """
+    key = (id(windows), compile_fn)
+    hit = _CACHE.get(key)
+    if hit is not None and hit[0] is windows and len(hit[1]) == len(windows) and all(a is b for a, b in zip(hit[1], windows)):
+        return hit[2]
+    compiled = compile_fn(windows)
+    with _CACHE_LOCK:
+        if len(_CACHE) >= _CACHE_MAX:
+            _CACHE.clear()
+        _CACHE[key] = (windows, tuple(windows), compiled)
+    return compiled
+
+
 def window_allows_interrupt(windows: List[Dict[str, Any]], when: str, ctx: InterruptContext) -> Optional[Dict[str, Any]]:
     """
     Returns the first matching window config if any.
@@ -114,18 +285,12 @@ def window_allows_interrupt(windows: List[Dict[str, Any]], when: str, ctx: Inter
         "chance": 0.35,           # optional; AI policy can use
         "priority": 10            # optional
       }
+    Highest priority wins. Windows are compiled once per list (`cached_compile`);
+    windows with invalid predicates never match.
     """
-    candidates = []
-    for w in windows or []:
-        if w.get("when") != when:
-            continue
-        pred = w.get("if", {"type": "always"})
-        if eval_predicate(pred, ctx):
-            candidates.append(w)
-
-    if not candidates:
+    if not windows:
         return None
-
-    # highest priority wins
-    candidates.sort(key=lambda x: int(x.get("priority", 0)), reverse=True)
-    return candidates[0]
+    for w, test in cached_compile(windows).by_when.get(when, ()):
+        if test(ctx):
+            return w
+    return None
@@ -0,0 +1,235 @@
+"""
+Log writer
+----------
+Buffered, background writes for the text logs (`narration.log`).
+
+`play.append_log` and `ui.events._debug_log` used to open the log, append one
+line and close it, on the caller's thread, for every logged event -- several
+times per chain link, and concurrently from every session's step. Now lines
+go to an in-memory queue and one writer thread per file appends them in
+batches (whatever arrived within `interval` seconds, or `batch_size` lines).
+
+- Ordering: lines are written in the order `write()` accepted them.
+- Rotation: before a batch would push the file past `max_bytes`, it is
+  rotated to `<name>.1` ... `<name>.<backups>`.
+- Tags: lines written inside `log_tag(tag)` (per request/session) are
+  prefixed with `[tag]`, so interleaved sessions stay separable.
+- `flush()` writes everything queued so far on the caller's thread (tests,
+  shutdown). `close()` flushes and switches the writer to synchronous
+  writes. All writers are closed at exit.
+- Never raises: I/O errors are counted, a full queue drops lines (counted).
+
+VB_LOG_ASYNC=0 writes synchronously (still with rotation).
+"""
+from __future__ import annotations
+
+import atexit
+import contextvars
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_MAX_BYTES = int(os.environ.get("VB_LOG_MAX_BYTES", str(10 * 1024 * 1024)) or 0)
+DEFAULT_BACKUPS = int(os.environ.get("VB_LOG_BACKUPS", "3") or 0)
+DEFAULT_BACKGROUND = os.environ.get("VB_LOG_ASYNC", "1").strip().lower() not in {"0", "false", "off", "no"}
+
+_TAG: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("vb_log_tag", default=None)
+
+
+@contextmanager
+def log_tag(tag: Optional[str]) -> Iterator[None]:
+    """Prefix lines logged in this block (and this context) with `[tag]`."""
+    token = _TAG.set(str(tag) if tag else None)
+    try:
+        yield
+    finally:
+        _TAG.reset(token)
+
+
+class LogWriter:
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backups: int = DEFAULT_BACKUPS,
+        batch_size: int = 512,
+        interval: float = 0.25,
+        queue_size: int = 20000,
+        background: bool = DEFAULT_BACKGROUND,
+    ):
+        self.path = Path(path)
+        self.max_bytes = int(max_bytes or 0)
+        self.backups = max(0, int(backups))
+        self.batch_size = max(1, int(batch_size))
+        self.interval = float(interval)
+        self.queue_size = int(queue_size)
+        self.background = bool(background)
+        # Lock order: _io_lock, then _cond. write() only takes _cond.
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._queue: deque = deque()
+        self._size: Optional[int] = None
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+        self._counters = {"lines": 0, "batches": 0, "bytes_written": 0, "rotations": 0, "dropped": 0, "errors": 0}
+
+    def write(self, line: str, tag: Optional[str] = None) -> None:
+        tag = tag if tag is not None else _TAG.get()
+        text = f"[{tag}] {line}" if tag else str(line)
+        if not self.background or self._closed:
+            with self._io_lock:
+                self._write_batch([text])
+            return
+        with self._cond:
+            if len(self._queue) >= self.queue_size:
+                self._counters["dropped"] += 1
+                return
+            self._queue.append(text)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"log-writer:{self.path.name}", daemon=True)
+                self._worker.start()
+            elif len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                # Wake an idle worker (it waits without a timeout on an empty queue),
+                # or cut a waiting batch short once it is full.
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Write every line queued so far (on the caller's thread)."""
+        self._drain()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._drain()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._counters)
+            out["queued"] = len(self._queue)
+        out["path"] = str(self.path)
+        return out
+
+    # -- internals ---------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    continue
+                if len(self._queue) < self.batch_size and not self._closed:
+                    # Let a batch accumulate.
+                    self._cond.wait(self.interval)
+            self._drain()
+
+    def _drain(self) -> None:
+        with self._io_lock:
+            with self._cond:
+                batch = list(self._queue)
+                self._queue.clear()
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, lines: List[str]) -> None:
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            if self._size is None:
+                self._size = self.path.stat().st_size if self.path.exists() else 0
+            if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as fh:
+                fh.write(data)
+            self._size += len(data)
+            with self._cond:
+                self._counters["lines"] += len(lines)
+                self._counters["batches"] += 1
+                self._counters["bytes_written"] += len(data)
+        except Exception:
+            # Logging never breaks the game loop.
+            self._size = None
+            with self._cond:
+                self._counters["errors"] += 1
+
+    def _rotate(self) -> None:
+        if self.backups:
+            for i in range(self.backups - 1, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.write_bytes(b"")
+        self._size = 0
+        with self._cond:
+            self._counters["rotations"] += 1
+
+
+# ---------------------------------------------------------------------------
+# Process-wide writers (one per file, shared by every module logging to it)
+# ---------------------------------------------------------------------------
+
+_WRITERS: Dict[Path, LogWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+_ALIASES: Dict[Any, LogWriter] = {}
+
+
+def log_writer(path: Path) -> LogWriter:
+    """The shared writer for `path` (one per resolved file)."""
+    writer = _ALIASES.get(path)
+    if writer is not None:
+        return writer
+    key = Path(path).resolve()
+    with _WRITERS_LOCK:
+        writer = _WRITERS.get(key)
+        if writer is None:
+            writer = _WRITERS[key] = LogWriter(key)
+        _ALIASES[path] = writer
+        return writer
+
+
+def flush_logs() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.flush()
+
+
+def close_logs() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    for writer in writers:
+        writer.close()
+
+
+def log_metrics() -> Dict[str, Any]:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values())
+    return {w.path.name: w.metrics() for w in writers}
+
+
+def _reset_after_fork() -> None:
+    # A forked child (simulator workers) gets fresh locks and no writer thread;
+    # lines queued by the parent stay the parent's to write.
+    global _WRITERS_LOCK
+    _WRITERS_LOCK = threading.Lock()
+    for writer in _WRITERS.values():
+        writer._cond = threading.Condition()
+        writer._io_lock = threading.Lock()
+        writer._queue.clear()
+        writer._worker = None
+        writer._size = None
+
+
+atexit.register(close_logs)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,239 @@
+"""
+Metrics
+-------
+Latency histograms for the game loop and the HTTP endpoints, rendered in the
+Prometheus text exposition format (served at GET /metrics).
+
+    with timer("scene_entry"):
+        ...
+
+    @timed("enemy_turn")
+    def handle_enemy_turn(ctx, ...): ...
+
+Phases land in `vb_phase_seconds{phase=...}` and requests (recorded by the
+server middleware) in `vb_http_request_seconds{method,route,status}`. Each
+histogram has fixed cumulative buckets, a sum and a count. Quantiles are
+computed by the scraper.
+
+VB_METRICS=0 disables collection: `timer()` returns a shared no-op context
+manager and `timed` wrappers call straight through. `METRICS.enabled` can also
+be toggled at runtime.
+"""
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds. Steps are usually single-digit ms; narration calls run to seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PHASE_METRIC = "vb_phase_seconds"
+HTTP_METRIC = "vb_http_request_seconds"
+
+_HELP = {
+    PHASE_METRIC: "Time spent in game loop phases.",
+    HTTP_METRIC: "HTTP request latency by route.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        out, total = [], 0
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.registry._observe(self.name, self.labels, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Laps:
+    """Times consecutive intervals (e.g. chain links): each lap() closes the previous one."""
+
+    __slots__ = ("registry", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", labels: Labels):
+        self.registry = registry
+        self.labels = labels
+        self.start: Optional[float] = None
+
+    def lap(self) -> None:
+        now = time.perf_counter()
+        if self.start is not None:
+            self.registry._observe(PHASE_METRIC, self.labels, now - self.start)
+        self.start = now
+
+    def close(self) -> None:
+        if self.start is not None:
+            self.registry._observe(PHASE_METRIC, self.labels, time.perf_counter() - self.start)
+            self.start = None
+
+
+class _NullLaps:
+    __slots__ = ()
+
+    def lap(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+_NULL_LAPS = _NullLaps()
+
+
+class MetricsRegistry:
+    def __init__(self, *, enabled: bool = True, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.enabled = bool(enabled)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._hists: Dict[str, Dict[Labels, Histogram]] = {}
+
+    # -- recording ---------------------------------------------------------------
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        if self.enabled:
+            self._observe(name, _labels(labels), seconds)
+
+    def timer(self, phase: str, **labels: Any):
+        """Context manager timing one `vb_phase_seconds{phase=...}` observation."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, PHASE_METRIC, _labels(dict(labels, phase=phase)))
+
+    def laps(self, phase: str, **labels: Any):
+        """Interval timer; call `lap()` at the start of each item and `close()` after the last."""
+        if not self.enabled:
+            return _NULL_LAPS
+        return _Laps(self, _labels(dict(labels, phase=phase)))
+
+    def timed(self, phase: str, **labels: Any) -> Callable:
+        """Decorator form of `timer`."""
+        key = _labels(dict(labels, phase=phase))
+
+        def deco(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._observe(PHASE_METRIC, key, time.perf_counter() - start)
+
+            return wrapper
+
+        return deco
+
+    def _observe(self, name: str, labels: Labels, seconds: float) -> None:
+        with self._lock:
+            family = self._hists.setdefault(name, {})
+            hist = family.get(labels)
+            if hist is None:
+                hist = family[labels] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    # -- reading -----------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Dict[Labels, Dict[str, Any]]]:
+        with self._lock:
+            return {
+                name: {labels: {"count": h.count, "sum": h.sum, "buckets": list(zip(h.buckets, h.cumulative()))} for labels, h in family.items()}
+                for name, family in self._hists.items()
+            }
+
+    def get(self, name: str, **labels: Any) -> Optional[Histogram]:
+        with self._lock:
+            return (self._hists.get(name) or {}).get(_labels(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._hists):
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, h in sorted(self._hists[name].items()):
+                    cumulative = h.cumulative()
+                    for bound, total in zip(h.buckets, cumulative):
+                        lines.append(f"{name}_bucket{_fmt(labels, le=_num(bound))} {total}")
+                    lines.append(f'{name}_bucket{_fmt(labels, le="+Inf")} {cumulative[-1]}')
+                    lines.append(f"{name}_sum{_fmt(labels)} {h.sum:.9g}")
+                    lines.append(f"{name}_count{_fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _num(value: float) -> str:
+    return f"{value:g}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(labels: Labels, **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+METRICS = MetricsRegistry(enabled=os.environ.get("VB_METRICS", "1").strip().lower() not in {"0", "false", "off", "no"})
+timer = METRICS.timer
+timed = METRICS.timed
+laps = METRICS.laps
@@ -4,19 +4,30 @@ Narration Manager
 Coordinates scene, combat, and aftermath narration.
 Consumes engine state + logs.
 Never alters game state.
+
+With a NarrationService attached, the submit_* variants queue the request and
+return a placeholder id immediately; the text arrives later via `deliver`.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Optional
+
+from engine.metrics import timer
 
 
 class NarrationManager:
-    def __init__(self, narrator):
+    def __init__(self, narrator, service=None):
         """
         narrator: VeinbreakerNarrator instance
+        service:  optional NarrationService for non-blocking narration
         """
         self.narrator = narrator
+        self.service = service
         self.enabled = True
 
+    @property
+    def is_async(self) -> bool:
+        return self.service is not None
+
     # =========================
     # SCENE INTRO
     # =========================
@@ -33,7 +44,25 @@ class NarrationManager:
         if not self.enabled:
             return None
 
-        payload = {
+        payload = self._scene_payload(
+            location=location,
+            environment_tags=environment_tags,
+            enemy_presence=enemy_presence,
+            player_state=player_state,
+            threat_level=threat_level,
+        )
+
+        with timer("narration", kind="scene"):
+            return self.narrator.narrate_scene(payload)
+
+    def submit_scene_intro(self, *, deliver: Callable[[Dict[str, Any]], None], **kwargs) -> Optional[str]:
+        if not self.enabled or not self.service:
+            return None
+        return self.service.submit("scene", self._scene_payload(**kwargs), deliver=deliver, scene_tag="scene")
+
+    @staticmethod
+    def _scene_payload(*, location, environment_tags, enemy_presence, player_state, threat_level) -> Dict[str, Any]:
+        return {
             "location": location,
             "environment_tags": environment_tags,
             "enemy_presence": enemy_presence,
@@ -41,8 +70,6 @@ class NarrationManager:
             "threat_level": threat_level
         }
 
-        return self.narrator.narrate_scene(payload)
-
     # =========================
     # COMBAT STEP
     # =========================
@@ -56,7 +83,30 @@ class NarrationManager:
         if not self.enabled:
             return None
 
-        payload = {
+        payload = self._combat_payload(action_effects, chain_index)
+        with timer("narration", kind="combat"):
+            return self.narrator.narrate(payload, scene_tag="combat")
+
+    def submit_combat_step(
+        self,
+        *,
+        action_effects: Dict[str, Any],
+        chain_index: int,
+        deliver: Callable[[Dict[str, Any]], None],
+        chain_key: Any = None
+    ) -> Optional[str]:
+        """
+        Queue one chain link. Links sharing `chain_key` are coalesced into a
+        single batched prompt by the service.
+        """
+        if not self.enabled or not self.service:
+            return None
+        payload = self._combat_payload(action_effects, chain_index)
+        return self.service.submit("combat", payload, deliver=deliver, scene_tag="combat", group=chain_key)
+
+    @staticmethod
+    def _combat_payload(action_effects: Dict[str, Any], chain_index: int) -> Dict[str, Any]:
+        return {
             "action": action_effects.get("ability_name"),
             "hit": action_effects.get("hit"),
             "to_hit": action_effects.get("to_hit"),
@@ -75,8 +125,6 @@ class NarrationManager:
             "chain_broken": action_effects.get("chain_broken", False),
         }
 
-        return self.narrator.narrate(payload, scene_tag="combat")
-
     # =========================
     # AFTERMATH
     # =========================
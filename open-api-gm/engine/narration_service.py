@@ -0,0 +1,240 @@
+"""
+Narration Service
+-----------------
+Non-blocking front end for the narrator.
+
+The game loop calls `submit(...)` and gets a placeholder id back immediately;
+the model call runs on a background asyncio loop and the finished text is
+handed to the `deliver` callback (for the web: GameSession.deliver, which the
+/events endpoint drains).
+
+- Combat links submitted with the same `group` within `coalesce_window`
+  seconds are narrated with ONE batched prompt (narrator.narrate_batch).
+- At most `max_concurrency` model calls are in flight. A call that timed out
+  still holds its slot until the (blocking) client call returns.
+- Each call is bounded by `timeout` once it has a slot; a timed-out or failed
+  request delivers a `narration_failed` event for its placeholder ids instead
+  of text.
+
+Never alters game state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from engine.metrics import timer
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[Dict[str, Any]], None]
+
+# kind -> narrator method for single (non-batched) requests
+_SINGLE_METHODS = {
+    "scene": "narrate_scene",
+    "aftermath": "narrate_aftermath",
+    "loot": "narrate_loot",
+}
+
+
+class _Request:
+    __slots__ = ("id", "kind", "payload", "deliver", "scene_tag")
+
+    def __init__(self, rid: str, kind: str, payload: Dict[str, Any], deliver: Deliver, scene_tag: Optional[str]):
+        self.id = rid
+        self.kind = kind
+        self.payload = payload
+        self.deliver = deliver
+        self.scene_tag = scene_tag
+
+
+class NarrationService:
+    def __init__(
+        self,
+        narrator,
+        *,
+        max_concurrency: int = 4,
+        timeout: float = 20.0,
+        coalesce_window: float = 0.05,
+    ):
+        """
+        narrator: VeinbreakerNarrator (or anything with the same narrate* methods)
+        """
+        self.narrator = narrator
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = float(timeout)
+        self.coalesce_window = max(0.0, float(coalesce_window))
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._groups: Dict[Any, List[_Request]] = {}
+        self.stats = {
+            "submitted": 0,
+            "batches": 0,
+            "max_batch": 0,
+            "delivered": 0,
+            "timeouts": 0,
+            "errors": 0,
+        }
+
+    # =========================
+    # PUBLIC
+    # =========================
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        *,
+        deliver: Deliver,
+        scene_tag: Optional[str] = None,
+        group: Any = None,
+    ) -> str:
+        """
+        Queue a narration request and return its placeholder id.
+        `group` (combat only) coalesces links of one chain into a single prompt.
+        """
+        req = _Request(f"narr-{next(self._ids)}", kind, payload, deliver, scene_tag)
+        loop = self._ensure_loop()
+        with self._lock:
+            self._outstanding += 1
+            self.stats["submitted"] += 1
+        loop.call_soon_threadsafe(self._enqueue, req, group)
+        return req.id
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted request has been delivered. Returns False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout=timeout)
+
+    def close(self) -> None:
+        loop, thread = self._loop, self._thread
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._loop = self._thread = self._executor = self._semaphore = None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.stats)
+            out["outstanding"] = self._outstanding
+        return out
+
+    # =========================
+    # LOOP
+    # =========================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                ready.set()
+                loop.run_forever()
+                loop.close()
+
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="narration")
+            self._thread = threading.Thread(target=run, name="narration-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            return loop
+
+    def _enqueue(self, req: _Request, group: Any) -> None:
+        if req.kind != "combat" or group is None:
+            self._spawn([req])
+            return
+        pending = self._groups.get(group)
+        if pending is not None:
+            pending.append(req)
+            return
+        self._groups[group] = [req]
+        self._loop.call_later(self.coalesce_window, self._flush_group, group)
+
+    def _flush_group(self, group: Any) -> None:
+        batch = self._groups.pop(group, None)
+        if batch:
+            self._spawn(batch)
+
+    def _spawn(self, batch: List[_Request]) -> None:
+        self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[_Request]) -> None:
+        with self._lock:
+            self.stats["batches"] += 1
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        reason = None
+        texts: List[str] = []
+        await self._semaphore.acquire()
+        # The slot follows the executor call, not this coroutine: a timed-out call
+        # keeps running on its worker thread, so the slot is released only when it
+        # actually returns. Otherwise later batches are admitted with no free worker
+        # and burn their own timeout queued behind it.
+        call = self._loop.run_in_executor(self._executor, self._call, batch)
+        call.add_done_callback(self._release_slot)
+        try:
+            texts = await asyncio.wait_for(asyncio.shield(call), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            reason = "timeout"
+        except Exception as e:
+            logger.warning("narration failed: %s", e)
+            reason = str(e) or e.__class__.__name__
+
+        for i, req in enumerate(batch):
+            text = texts[i] if i < len(texts) else None
+            if reason is None and text:
+                event = {"type": "narration", "id": req.id, "text": text, "data": {"kind": req.kind}}
+            else:
+                event = {"type": "narration_failed", "id": req.id, "reason": reason or "empty"}
+            try:
+                req.deliver(event)
+            except Exception:
+                # A dead session must not take the service down.
+                pass
+
+        with self._idle:
+            key = "delivered" if reason is None else ("timeouts" if reason == "timeout" else "errors")
+            self.stats[key] += len(batch)
+            self._outstanding -= len(batch)
+            self._idle.notify_all()
+
+    def _release_slot(self, call: "asyncio.Future") -> None:
+        self._semaphore.release()
+        if not call.cancelled():
+            call.exception()  # retrieved here: a late failure was already reported as a timeout
+
+    def _call(self, batch: List[_Request]) -> List[str]:
+        """Runs on the executor: one (possibly batched) synchronous narrator call."""
+        first = batch[0]
+        with timer("narration", kind=first.kind):
+            return self._narrate(first, batch)
+
+    def _narrate(self, first: _Request, batch: List[_Request]) -> List[str]:
+        if first.kind == "combat":
+            if len(batch) > 1 and hasattr(self.narrator, "narrate_batch"):
+                return self.narrator.narrate_batch([r.payload for r in batch], scene_tag=first.scene_tag or "combat")
+            return [self.narrator.narrate(r.payload, scene_tag=r.scene_tag or "combat") for r in batch]
+        method = getattr(self.narrator, _SINGLE_METHODS.get(first.kind, ""), None)
+        if method is None:
+            return [self.narrator.narrate(first.payload, scene_tag=first.scene_tag or first.kind)]
+        return [method(first.payload)]
@@ -0,0 +1,501 @@
+"""
+Player store
+------------
+Per-player persistence for character profiles and mutable run state.
+
+The game used to keep one global `player_state.json` (plus `character.json`
+and `characters/<id>.json`) and rewrite it wholesale on every save, so every
+server session shared -- and clobbered -- the same state. A `PlayerStore`
+keys run state by player id instead:
+
+- `SqlitePlayerStore` (default): one SQLite database in WAL mode. Resources,
+  pools, marks and cooldowns are stored one row per key, so `update_state`
+  touches only the rows that changed and `save_state` only rewrites what
+  differs. `transaction()` groups several writes atomically.
+- `JsonPlayerStore`: the legacy file layout (`VB_PLAYER_STORE=json`). The
+  default player maps to `player_state.json`; other players get their own
+  file under `players/`.
+
+State dicts keep the `player_state.json` shape:
+    {"character_id", "resources", "pools", "marks", "cooldowns",
+     "veinscore", "veins_spent_total"}
+
+`SqlitePlayerStore.import_json_files()` migrates the existing JSON files; it
+runs automatically the first time an empty database is opened through
+`open_player_store`.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_PLAYER_ID = "default"
+
+# Keyed sections stored one row per key.
+STATE_SECTIONS = ("resources", "pools", "marks", "cooldowns")
+# Scalar state fields (stored as rows of the "state" section).
+STATE_FIELDS = ("veinscore", "veins_spent_total")
+
+_BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_DB_PATH = _BASE_DIR / ".data" / "players.sqlite"
+
+
+def _load_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else None
+    except Exception:
+        return None
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Write via a temp file + os.replace so a crash never leaves a truncated file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _player_file_name(player_id: str) -> str:
+    return hashlib.sha1(str(player_id).encode("utf-8")).hexdigest() + ".json"
+
+
+# ─────────────────────────────────────────
+# Interface
+# ─────────────────────────────────────────
+
+class PlayerStore:
+    """
+    Storage backend for profiles (static, shared) and run state (per player).
+    Loads return None when nothing is stored.
+    """
+
+    def load_state(self, player_id: str = DEFAULT_PLAYER_ID) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save_state(self, player_id: str, state: Dict[str, Any]) -> None:
+        """Replace the player's state (the character_id is kept when `state` has none)."""
+        raise NotImplementedError
+
+    def update_state(self, player_id: str, section: str, values: Dict[str, Any]) -> None:
+        """Merge `values` into one section (None deletes a key)."""
+        raise NotImplementedError
+
+    def set_character(self, player_id: str, character_id: Optional[str]) -> None:
+        raise NotImplementedError
+
+    def load_profile(self, character_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save_profile(self, profile: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def has_profile(self, character_id: str) -> bool:
+        return self.load_profile(character_id) is not None
+
+    @contextmanager
+    def transaction(self) -> Iterator["PlayerStore"]:
+        yield self
+
+    def close(self) -> None:
+        pass
+
+
+# ─────────────────────────────────────────
+# Legacy JSON files
+# ─────────────────────────────────────────
+
+class JsonPlayerStore(PlayerStore):
+    """
+    The original file layout. Writes are whole-file rewrites; `transaction()`
+    only serializes writers within this process.
+    """
+
+    def __init__(
+        self,
+        *,
+        state_path: Path,
+        profiles_dir: Path,
+        profile_path: Optional[Path] = None,
+        players_dir: Optional[Path] = None,
+    ):
+        self.state_path = Path(state_path)
+        self.profiles_dir = Path(profiles_dir)
+        self.profile_path = Path(profile_path) if profile_path else None
+        self.players_dir = Path(players_dir) if players_dir else self.state_path.parent / "players"
+        self._lock = threading.RLock()
+
+    def _state_path(self, player_id: str) -> Path:
+        if not player_id or player_id == DEFAULT_PLAYER_ID:
+            return self.state_path
+        return self.players_dir / _player_file_name(player_id)
+
+    def _write_state(self, player_id: str, state: Dict[str, Any]) -> None:
+        path = self._state_path(player_id)
+        if path != self.state_path:
+            # Per-player files are named by hash; keep the id inside for migration.
+            state = {**state, "player_id": player_id}
+        _write_json(path, state)
+
+    def load_state(self, player_id: str = DEFAULT_PLAYER_ID) -> Optional[Dict[str, Any]]:
+        return _load_json(self._state_path(player_id))
+
+    def save_state(self, player_id: str, state: Dict[str, Any]) -> None:
+        with self._lock:
+            path = self._state_path(player_id)
+            out = dict(state)
+            if not out.get("character_id"):
+                prev = _load_json(path) or {}
+                if prev.get("character_id"):
+                    out["character_id"] = prev["character_id"]
+            self._write_state(player_id, out)
+
+    def update_state(self, player_id: str, section: str, values: Dict[str, Any]) -> None:
+        with self._lock:
+            path = self._state_path(player_id)
+            state = _load_json(path) or {}
+            cur = state.get(section) if isinstance(state.get(section), dict) else {}
+            for k, v in values.items():
+                if v is None:
+                    cur.pop(k, None)
+                else:
+                    cur[k] = v
+            state[section] = cur
+            self._write_state(player_id, state)
+
+    def set_character(self, player_id: str, character_id: Optional[str]) -> None:
+        with self._lock:
+            path = self._state_path(player_id)
+            state = _load_json(path) or {}
+            state["character_id"] = character_id
+            self._write_state(player_id, state)
+
+    def load_profile(self, character_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not character_id:
+            return _load_json(self.profile_path) if self.profile_path else None
+        return _load_json(self.profiles_dir / f"{character_id}.json")
+
+    def save_profile(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            _write_json(self.profiles_dir / f"{profile.get('id') or 'character.unknown'}.json", profile)
+            # Keep the legacy `character.json` updated as a fallback.
+            if self.profile_path:
+                _write_json(self.profile_path, profile)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        out = []
+        if self.profiles_dir.exists():
+            for p in sorted(self.profiles_dir.glob("*.json")):
+                data = _load_json(p)
+                if data is not None:
+                    data.setdefault("id", p.stem)
+                    out.append(data)
+        return out
+
+    @contextmanager
+    def transaction(self) -> Iterator["JsonPlayerStore"]:
+        with self._lock:
+            yield self
+
+
+# ─────────────────────────────────────────
+# SQLite
+# ─────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    character_id TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_values (
+    player_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (player_id, section, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS profiles (
+    character_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SqlitePlayerStore(PlayerStore):
+    """
+    SQLite-backed store (WAL journal). One connection shared under a lock;
+    `transaction()` is re-entrant and commits once at the outermost level.
+
+    `profiles_dir`, when given, is a read-only fallback for profiles that are
+    not in the database (e.g. characters shipped with the content).
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_DB_PATH, *, profiles_dir: Optional[Path] = None, clock=time.time):
+        self.path = Path(path) if str(path) != ":memory:" else None
+        self.profiles_dir = Path(profiles_dir) if profiles_dir else None
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._depth = 0
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path) if self.path is not None else ":memory:",
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=5.0,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # -- transactions ----------------------------------------------------------
+
+    @contextmanager
+    def transaction(self) -> Iterator["SqlitePlayerStore"]:
+        with self._lock:
+            outer = self._depth == 0
+            if outer:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if outer:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._depth -= 1
+            if outer:
+                self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    # -- state -----------------------------------------------------------------
+
+    def load_state(self, player_id: str = DEFAULT_PLAYER_ID) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT character_id FROM players WHERE player_id = ?", (player_id,)).fetchone()
+            if row is None:
+                return None
+            state: Dict[str, Any] = {"character_id": row[0]}
+            for section in STATE_SECTIONS:
+                state[section] = {}
+            for section, key, value in self._conn.execute(
+                "SELECT section, key, value FROM player_values WHERE player_id = ?", (player_id,)
+            ):
+                if section == "state":
+                    state[key] = json.loads(value)
+                else:
+                    state.setdefault(section, {})[key] = json.loads(value)
+            return state
+
+    def save_state(self, player_id: str, state: Dict[str, Any]) -> None:
+        with self.transaction():
+            self._touch(player_id, state.get("character_id") or None)
+            for section in STATE_SECTIONS:
+                values = state.get(section) if isinstance(state.get(section), dict) else {}
+                self._write_section(player_id, section, values, replace=True)
+            scalars = {k: state.get(k) for k in STATE_FIELDS if k in state}
+            self._write_section(player_id, "state", scalars, replace=False)
+
+    def update_state(self, player_id: str, section: str, values: Dict[str, Any]) -> None:
+        if section not in STATE_SECTIONS and section != "state":
+            raise KeyError(f"Unknown state section: {section}")
+        with self.transaction():
+            self._touch(player_id, None)
+            self._write_section(player_id, section, values, replace=False)
+
+    def set_character(self, player_id: str, character_id: Optional[str]) -> None:
+        with self.transaction():
+            self._touch(player_id, None)
+            self._conn.execute("UPDATE players SET character_id = ? WHERE player_id = ?", (character_id, player_id))
+
+    def _touch(self, player_id: str, character_id: Optional[str]) -> None:
+        """Ensure the player row exists; a non-empty character_id replaces the stored one."""
+        self._conn.execute(
+            "INSERT INTO players (player_id, character_id, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(player_id) DO UPDATE SET "
+            "character_id = COALESCE(excluded.character_id, players.character_id), updated_at = excluded.updated_at",
+            (player_id, character_id, self.clock()),
+        )
+
+    def _write_section(self, player_id: str, section: str, values: Dict[str, Any], *, replace: bool) -> None:
+        existing = {
+            key: value
+            for key, value in self._conn.execute(
+                "SELECT key, value FROM player_values WHERE player_id = ? AND section = ?", (player_id, section)
+            )
+        }
+        upserts = []
+        deletes = []
+        for key, value in values.items():
+            key = str(key)
+            if value is None and section != "state":
+                if key in existing:
+                    deletes.append((player_id, section, key))
+                continue
+            blob = json.dumps(value, sort_keys=True)
+            if existing.get(key) != blob:
+                upserts.append((player_id, section, key, blob))
+        if replace:
+            keep = {str(k) for k in values}
+            deletes.extend((player_id, section, key) for key in existing if key not in keep)
+        if upserts:
+            self._conn.executemany(
+                "INSERT INTO player_values (player_id, section, key, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(player_id, section, key) DO UPDATE SET value = excluded.value",
+                upserts,
+            )
+        if deletes:
+            self._conn.executemany(
+                "DELETE FROM player_values WHERE player_id = ? AND section = ? AND key = ?", deletes
+            )
+
+    # -- profiles ----------------------------------------------------------------
+
+    def load_profile(self, character_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not character_id:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM profiles WHERE character_id = ?", (character_id,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        if self.profiles_dir is not None:
+            return _load_json(self.profiles_dir / f"{character_id}.json")
+        return None
+
+    def save_profile(self, profile: Dict[str, Any]) -> None:
+        cid = profile.get("id") or "character.unknown"
+        with self.transaction():
+            self._conn.execute(
+                "INSERT INTO profiles (character_id, data, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(character_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (cid, json.dumps(profile), self.clock()),
+            )
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        if self.profiles_dir is not None and self.profiles_dir.exists():
+            for p in sorted(self.profiles_dir.glob("*.json")):
+                data = _load_json(p)
+                if data is not None:
+                    data.setdefault("id", p.stem)
+                    out[str(data["id"])] = data
+        with self._lock:
+            rows = self._conn.execute("SELECT character_id, data FROM profiles").fetchall()
+        for cid, blob in rows:
+            try:
+                data = json.loads(blob)
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                data.setdefault("id", cid)
+                out[cid] = data
+        return [out[k] for k in sorted(out)]
+
+    # -- migration ---------------------------------------------------------------
+
+    def import_json_files(
+        self,
+        *,
+        state_path: Optional[Path] = None,
+        profiles_dir: Optional[Path] = None,
+        player_id: str = DEFAULT_PLAYER_ID,
+        players_dir: Optional[Path] = None,
+    ) -> Dict[str, int]:
+        """
+        Import the legacy JSON layout: `player_state.json` as `player_id`,
+        `players/*.json` (JsonPlayerStore files, keyed by their "player_id"
+        field) and every `characters/*.json` profile. One transaction.
+        """
+        counts = {"players": 0, "profiles": 0}
+        with self.transaction():
+            if profiles_dir is not None and Path(profiles_dir).exists():
+                for p in sorted(Path(profiles_dir).glob("*.json")):
+                    data = _load_json(p)
+                    if data is None:
+                        continue
+                    data.setdefault("id", p.stem)
+                    self.save_profile(data)
+                    counts["profiles"] += 1
+            state = _load_json(state_path) if state_path is not None else None
+            if state is not None:
+                self.save_state(player_id, state)
+                counts["players"] += 1
+            if players_dir is not None and Path(players_dir).exists():
+                for p in sorted(Path(players_dir).glob("*.json")):
+                    data = _load_json(p)
+                    if data is None or not data.get("player_id"):
+                        continue
+                    self.save_state(str(data["player_id"]), data)
+                    counts["players"] += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported_at', ?)", (str(self.clock()),)
+            )
+        return counts
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            has_players = self._conn.execute("SELECT 1 FROM players LIMIT 1").fetchone()
+            imported = self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported_at'").fetchone()
+        return has_players is None and imported is None
+
+
+# ─────────────────────────────────────────
+# Factory
+# ─────────────────────────────────────────
+
+def open_player_store(
+    backend: Optional[str] = None,
+    *,
+    state_path: Path,
+    profiles_dir: Path,
+    profile_path: Optional[Path] = None,
+    db_path: Optional[Path | str] = None,
+) -> PlayerStore:
+    """
+    Build the configured store (`VB_PLAYER_STORE`: "sqlite" (default) or
+    "json"; `VB_PLAYER_DB` overrides the database path). A fresh SQLite
+    database imports the legacy JSON files once.
+    """
+    backend = (backend or os.getenv("VB_PLAYER_STORE") or "sqlite").lower()
+    if backend == "json":
+        return JsonPlayerStore(state_path=state_path, profiles_dir=profiles_dir, profile_path=profile_path)
+    store = SqlitePlayerStore(db_path or os.getenv("VB_PLAYER_DB") or DEFAULT_DB_PATH, profiles_dir=profiles_dir)
+    if store.is_empty():
+        try:
+            store.import_json_files(
+                state_path=state_path,
+                profiles_dir=profiles_dir,
+                players_dir=Path(state_path).parent / "players",
+            )
+        except Exception:
+            # A failed import leaves an empty store; profiles still resolve from `profiles_dir`.
+            pass
+    return store
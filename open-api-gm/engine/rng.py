@@ -0,0 +1,174 @@
+"""
+Encounter RNG
+-------------
+Deterministic, seedable randomness for combat.
+
+Each encounter owns an `EncounterRNG` (stored at state["rng"]) derived from
+the session seed and an encounter counter. It hands out independent named
+substreams -- attack, damage, interrupt, loot, ai -- so that, e.g., an extra
+interrupt check never shifts the damage dice. Same seed + same inputs ->
+same fight, which is what bug reports, replay and batch simulation need.
+
+`bind(state)` makes the state's RNG the ambient one for the current context
+(game_step does this per request); `stream(name)` returns that substream, or
+the global `random` module when nothing is bound (tests and legacy callers,
+which patch `random.*`, keep working).
+
+For simulations, `EncounterRNG(seed, block_size=N)` pre-generates dice in
+vectorized NumPy blocks instead of one `randint` per die.
+"""
+from __future__ import annotations
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from engine.dice import DiceExpr, parse as parse_dice
+
+try:
+    import numpy as np
+except Exception:  # numpy is optional; block rolling falls back to per-die randint.
+    np = None
+
+STREAMS = ("attack", "damage", "interrupt", "loot", "ai")
+STATE_KEY = "rng"
+
+_BOUND_STATE: ContextVar[Optional[Dict[str, Any]]] = ContextVar("encounter_rng_state", default=None)
+
+
+def derive_seed(*parts: Any) -> int:
+    """Stable 63-bit seed from arbitrary parts (independent of PYTHONHASHSEED)."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+class _DiceBlock:
+    """A pre-rolled buffer of single-die results for one (stream, sides)."""
+
+    __slots__ = ("values", "pos")
+
+    def __init__(self, values):
+        self.values = values
+        self.pos = 0
+
+
+class EncounterRNG:
+    def __init__(self, seed: Any, *, block_size: int = 0):
+        self.seed = seed
+        self.block_size = int(block_size) if np is not None else 0
+        self._streams: Dict[str, random.Random] = {}
+        self._blocks: Dict[Tuple[str, int], _DiceBlock] = {}
+        self._block_counter = 0
+
+    # -- substreams ----------------------------------------------------------
+
+    def stream(self, name: str) -> random.Random:
+        r = self._streams.get(name)
+        if r is None:
+            r = random.Random(derive_seed(self.seed, name))
+            self._streams[name] = r
+        return r
+
+    def randint(self, name: str, a: int, b: int) -> int:
+        return self.stream(name).randint(a, b)
+
+    def roll(self, dice: Any, stream: str = "damage") -> int:
+        """Roll a dice expression (engine.dice) on a substream. Malformed expressions roll 0."""
+        try:
+            expr = parse_dice(dice)
+        except ValueError:
+            return 0
+        if self.block_size and expr.count and expr.sides:
+            return self._roll_block(stream, expr.count, expr.sides) + expr.flat
+        return expr.roll(self.stream(stream))
+
+    # -- vectorized blocks -----------------------------------------------------
+
+    def dice_block(self, sides: int, n: int, stream: str = "damage"):
+        """n independent rolls of one die as a NumPy int array (requires numpy)."""
+        if np is None:
+            raise RuntimeError("numpy is required for dice_block")
+        self._block_counter += 1
+        return DiceExpr(1, sides).roll_many(n, derive_seed(self.seed, stream, "block", sides, self._block_counter))
+
+    def _roll_block(self, stream: str, count: int, sides: int) -> int:
+        block = self._blocks.get((stream, sides))
+        if block is None or block.pos + count > len(block.values):
+            values = self.dice_block(sides, max(self.block_size, count), stream)
+            block = _DiceBlock(values.tolist())
+            self._blocks[(stream, sides)] = block
+        start = block.pos
+        block.pos = start + count
+        return sum(block.values[start:block.pos])
+
+    # -- persistence -----------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Session snapshots: seed + each used substream's state (pre-rolled blocks are dropped)."""
+        streams = {}
+        for name, r in self._streams.items():
+            version, internal, gauss = r.getstate()
+            streams[name] = [version, list(internal), gauss]
+        return {"__encounter_rng__": True, "seed": self.seed, "block_size": self.block_size, "streams": streams}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EncounterRNG":
+        rng = cls(data.get("seed"), block_size=int(data.get("block_size", 0) or 0))
+        for name, st in (data.get("streams") or {}).items():
+            try:
+                version, internal, gauss = st
+                r = random.Random()
+                r.setstate((version, tuple(internal), gauss))
+                rng._streams[name] = r
+            except Exception:
+                continue
+        return rng
+
+
+# ─────────────────────────────────────────
+# State helpers
+# ─────────────────────────────────────────
+
+def encounter_rng(state: Dict[str, Any]) -> EncounterRNG:
+    """The state's current EncounterRNG, created from state["seed"] on first use."""
+    rng = state.get(STATE_KEY)
+    if isinstance(rng, EncounterRNG):
+        return rng
+    if isinstance(rng, dict) and rng.get("__encounter_rng__"):
+        rng = EncounterRNG.from_dict(rng)
+    else:
+        rng = EncounterRNG(derive_seed(state.get("seed"), "encounter", state.get("encounter_count", 0)))
+    state[STATE_KEY] = rng
+    return rng
+
+
+def start_encounter_rng(state: Dict[str, Any], *, block_size: int = 0) -> EncounterRNG:
+    """New encounter boundary: fresh substreams derived from the session seed + encounter counter."""
+    count = int(state.get("encounter_count", 0) or 0) + 1
+    state["encounter_count"] = count
+    rng = EncounterRNG(derive_seed(state.get("seed"), "encounter", count), block_size=block_size)
+    state[STATE_KEY] = rng
+    return rng
+
+
+@contextmanager
+def bind(state: Optional[Dict[str, Any]]) -> Iterator[None]:
+    """Make `state`'s EncounterRNG the ambient RNG for rolls in this context."""
+    token = _BOUND_STATE.set(state if isinstance(state, dict) else None)
+    try:
+        yield
+    finally:
+        _BOUND_STATE.reset(token)
+
+
+def current() -> Optional[EncounterRNG]:
+    state = _BOUND_STATE.get()
+    return encounter_rng(state) if state is not None else None
+
+
+def stream(name: str):
+    """Bound substream, or the global `random` module when no state is bound."""
+    rng = current()
+    return rng.stream(name) if rng is not None else random
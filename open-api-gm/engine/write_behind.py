@@ -0,0 +1,307 @@
+"""
+Write-behind saving
+-------------------
+`WriteBehindStore` wraps a `PlayerStore` and buffers saves.
+
+One /step can save a character several times: progression, safe-room
+purchases and character creation each call `save_profile_and_state`. The
+wrapper keeps only the latest profile/state per key, so all of them
+coalesce into a single flush.
+
+- Reads see buffered writes (read-your-writes within the process).
+- `hold(player_id)` defers flushing that player until the block exits.
+  `game_step` holds for the whole step.
+- Dirty entries are flushed by a background thread `window` seconds after
+  they first became dirty. `window <= 0` flushes synchronously instead.
+- A failed background flush keeps the data and retries that player after a
+  backoff (the window, doubling per consecutive failure, capped at
+  `MAX_RETRY_DELAY`), not on every pass of the worker.
+- `flush(player_id)` flushes one player now (session eviction);
+  `close()` flushes everything and makes later writes synchronous
+  (shutdown, atexit).
+
+`metrics()` reports logical saves against physical writes.
+`write_amplification` is physical / logical; below 1.0 means saves were
+coalesced.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from copy import deepcopy
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from engine.metrics import timed
+from engine.player_store import DEFAULT_PLAYER_ID, PlayerStore
+
+# Longest wait before the worker retries a player whose flush failed (seconds).
+MAX_RETRY_DELAY = 60.0
+
+
+class WriteBehindStore(PlayerStore):
+    def __init__(self, backend: PlayerStore, *, window: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.window = float(window)
+        self.clock = clock
+        # Lock order: _flush_lock, then _cond. Backend writes never run under _cond.
+        self._cond = threading.Condition(threading.RLock())
+        self._flush_lock = threading.Lock()
+        # player_id -> (state, dirty_since); character_id -> (profile, dirty_since, owner player_id)
+        self._states: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._profiles: Dict[str, Tuple[Dict[str, Any], float, str]] = {}
+        self._holds: Dict[str, int] = {}
+        # player_id -> (earliest retry time, consecutive failures) after a failed flush
+        self._retry: Dict[str, Tuple[float, int]] = {}
+        self._local = threading.local()
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+        self._counters = {
+            "logical_writes": 0,
+            "physical_writes": 0,
+            "flushes": 0,
+            "bytes_written": 0,
+            "flush_errors": 0,
+            "flush_seconds_total": 0.0,
+        }
+
+    # -- writes (buffered) -------------------------------------------------------
+
+    def save_state(self, player_id: str, state: Dict[str, Any]) -> None:
+        player_id = player_id or DEFAULT_PLAYER_ID
+        state = deepcopy(state)
+        with self._cond:
+            prev = self._states.get(player_id)
+            if not state.get("character_id") and prev and prev[0].get("character_id"):
+                state["character_id"] = prev[0]["character_id"]
+            self._states[player_id] = (state, prev[1] if prev else self.clock())
+            self._counters["logical_writes"] += 1
+            sync = self._dirty(player_id)
+        if sync:
+            self.flush(player_id)
+
+    def save_profile(self, profile: Dict[str, Any]) -> None:
+        cid = profile.get("id") or "character.unknown"
+        profile = deepcopy(profile)
+        # Profiles flush with the player whose step saved them.
+        owner = getattr(self._local, "player_id", None) or DEFAULT_PLAYER_ID
+        with self._cond:
+            prev = self._profiles.get(cid)
+            self._profiles[cid] = (profile, prev[1] if prev else self.clock(), owner)
+            self._counters["logical_writes"] += 1
+            sync = self._dirty(owner)
+        if sync:
+            self.flush(owner)
+
+    def update_state(self, player_id: str, section: str, values: Dict[str, Any]) -> None:
+        player_id = player_id or DEFAULT_PLAYER_ID
+        with self._cond:
+            self._counters["logical_writes"] += 1
+            pending = self._states.get(player_id)
+            if pending is not None:
+                target = pending[0] if section == "state" else pending[0].setdefault(section, {})
+                for k, v in values.items():
+                    if v is None and section != "state":
+                        target.pop(k, None)
+                    else:
+                        target[k] = v
+                sync = self._dirty(player_id)
+        if pending is None:
+            # Nothing buffered: the row-level backend update is already cheap.
+            self._write_through(lambda: self.backend.update_state(player_id, section, values))
+        elif sync:
+            self.flush(player_id)
+
+    def set_character(self, player_id: str, character_id: Optional[str]) -> None:
+        player_id = player_id or DEFAULT_PLAYER_ID
+        with self._cond:
+            self._counters["logical_writes"] += 1
+            pending = self._states.get(player_id)
+            if pending is not None:
+                pending[0]["character_id"] = character_id
+                sync = self._dirty(player_id)
+        if pending is None:
+            self._write_through(lambda: self.backend.set_character(player_id, character_id))
+        elif sync:
+            self.flush(player_id)
+
+    def _write_through(self, fn: Callable[[], None]) -> None:
+        with self._flush_lock:
+            fn()
+            with self._cond:
+                self._counters["physical_writes"] += 1
+
+    # -- reads (see buffered writes) --------------------------------------------
+
+    def load_state(self, player_id: str = DEFAULT_PLAYER_ID) -> Optional[Dict[str, Any]]:
+        player_id = player_id or DEFAULT_PLAYER_ID
+        with self._cond:
+            pending = self._states.get(player_id)
+            state = deepcopy(pending[0]) if pending is not None else None
+        if state is None:
+            return self.backend.load_state(player_id)
+        if not state.get("character_id"):
+            stored = self.backend.load_state(player_id) or {}
+            state["character_id"] = stored.get("character_id")
+        return state
+
+    def load_profile(self, character_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            pending = self._profiles.get(character_id) if character_id else None
+            if pending is not None:
+                return deepcopy(pending[0])
+        return self.backend.load_profile(character_id)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        out = {str(p.get("id")): p for p in self.backend.list_profiles()}
+        with self._cond:
+            for cid, (profile, _, _) in self._profiles.items():
+                out[cid] = deepcopy(profile)
+        return [out[k] for k in sorted(out)]
+
+    # -- flushing ----------------------------------------------------------------
+
+    @contextmanager
+    def hold(self, player_id: Optional[str] = None) -> Iterator[None]:
+        """Defer flushing `player_id` until the block exits (one flush per step)."""
+        player_id = player_id or DEFAULT_PLAYER_ID
+        with self._cond:
+            self._holds[player_id] = self._holds.get(player_id, 0) + 1
+        outer = getattr(self._local, "player_id", None)
+        self._local.player_id = player_id
+        try:
+            yield
+        finally:
+            self._local.player_id = outer
+            sync = False
+            with self._cond:
+                left = self._holds.get(player_id, 1) - 1
+                if left > 0:
+                    self._holds[player_id] = left
+                else:
+                    self._holds.pop(player_id, None)
+                    sync = self._dirty(player_id)
+            if sync:
+                self.flush(player_id)
+
+    @contextmanager
+    def transaction(self) -> Iterator["WriteBehindStore"]:
+        # Buffered writes already reach the backend together, one transaction per flush.
+        yield self
+
+    def flush(self, player_id: Optional[str] = None) -> int:
+        """
+        Write pending entries now: one player (its state plus the profiles it
+        saved) or, with no id, everything. Returns the number of records written.
+        """
+        with self._flush_lock:
+            with self._cond:
+                if player_id is None:
+                    states, self._states = self._states, {}
+                    profiles, self._profiles = self._profiles, {}
+                else:
+                    states = {player_id: self._states.pop(player_id)} if player_id in self._states else {}
+                    profiles = {cid: p for cid, p in self._profiles.items() if p[2] == player_id}
+                    for cid in profiles:
+                        self._profiles.pop(cid, None)
+            if not states and not profiles:
+                return 0
+            return self._write(states, profiles)
+
+    @timed("persistence.flush")
+    def _write(self, states, profiles) -> int:
+        started = time.perf_counter()
+        owners = set(states) | {owner for _, _, owner in profiles.values()}
+        try:
+            with self.backend.transaction():
+                for profile, _, _ in profiles.values():
+                    self.backend.save_profile(profile)
+                for pid, (state, _) in states.items():
+                    self.backend.save_state(pid, state)
+        except Exception:
+            # Keep the data for the next attempt (newer buffered writes win).
+            with self._cond:
+                self._counters["flush_errors"] += 1
+                for pid, entry in states.items():
+                    self._states.setdefault(pid, entry)
+                for cid, entry in profiles.items():
+                    self._profiles.setdefault(cid, entry)
+                now = self.clock()
+                base = self.window if self.window > 0 else 1.0
+                for pid in owners:
+                    failures = self._retry.get(pid, (0.0, 0))[1] + 1
+                    self._retry[pid] = (now + min(base * 2 ** (failures - 1), MAX_RETRY_DELAY), failures)
+            return 0
+        written = len(states) + len(profiles)
+        size = sum(len(json.dumps(s)) for s, _ in states.values()) + sum(len(json.dumps(p)) for p, _, _ in profiles.values())
+        with self._cond:
+            for pid in owners:
+                self._retry.pop(pid, None)
+            self._counters["flushes"] += 1
+            self._counters["physical_writes"] += written
+            self._counters["bytes_written"] += size
+            self._counters["flush_seconds_total"] += time.perf_counter() - started
+        return written
+
+    def _dirty(self, player_id: str) -> bool:
+        """
+        Called with _cond held after a buffered write (or when a hold ends).
+        Returns True when the caller should flush `player_id` synchronously.
+        """
+        if self._holds.get(player_id):
+            return False
+        if self.window <= 0 or self._closed:
+            return True
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._worker.start()
+        self._cond.notify_all()
+        return False
+
+    def _due(self, now: float) -> Tuple[List[str], Optional[float]]:
+        """Players whose oldest pending write is past the window (and any retry backoff), and the next deadline."""
+        due, nxt = [], None
+        owners: Dict[str, float] = {pid: since for pid, (_, since) in self._states.items()}
+        for _, since, owner in self._profiles.values():
+            owners[owner] = min(since, owners.get(owner, since))
+        for pid, since in owners.items():
+            if self._holds.get(pid):
+                continue
+            deadline = max(since + self.window, self._retry.get(pid, (0.0, 0))[0])
+            if deadline <= now:
+                due.append(pid)
+            elif nxt is None or deadline < nxt:
+                nxt = deadline
+        return due, nxt
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                due, nxt = self._due(self.clock())
+                if not due:
+                    self._cond.wait(None if nxt is None else max(0.0, nxt - self.clock()))
+                    continue
+            for pid in due:
+                self.flush(pid)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._states) + len(self._profiles)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            out = dict(self._counters)
+            out["pending"] = len(self._states) + len(self._profiles)
+            out["window_seconds"] = self.window
+        logical = out["logical_writes"]
+        out["write_amplification"] = round(out["physical_writes"] / logical, 3) if logical else 0.0
+        return out
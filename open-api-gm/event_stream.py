@@ -0,0 +1,76 @@
+"""
+event_stream.py
+---------------
+Per-session bounded event log for streaming transports.
+
+Every event a GameSession emits is appended to an `EventRing` with a
+monotonically increasing sequence number. Streaming endpoints (SSE and
+WebSocket in server.py) read from a cursor and park on `wait()` until the next
+append, so events reach the client while `play.game_step` is still running.
+
+The ring is bounded: a client that reconnects with a cursor older than the
+oldest retained event is told it missed events (`gap`) and replays what is
+left. Producers may be any thread; waiters are asyncio tasks.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 512
+
+
+class EventRing:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = max(1, int(capacity))
+        self._buf: "deque[Tuple[int, Dict[str, Any]]]" = deque(maxlen=self.capacity)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def append(self, event: Dict[str, Any]) -> int:
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._buf.append((seq, event))
+            waiters, self._waiters = self._waiters, []
+        for loop, flag in waiters:
+            try:
+                loop.call_soon_threadsafe(flag.set)
+            except RuntimeError:
+                # Loop already closed (client went away).
+                pass
+        return seq
+
+    def since(self, cursor: int) -> Tuple[List[Tuple[int, Dict[str, Any]]], bool]:
+        """
+        Events with seq > cursor, plus whether some were lost (evicted from the
+        ring, or the cursor belongs to an older incarnation of the session).
+        """
+        with self._lock:
+            if cursor > self._seq:
+                return list(self._buf), True
+            oldest = self._buf[0][0] if self._buf else self._seq + 1
+            gap = cursor + 1 < oldest and cursor < self._seq
+            return [(s, e) for s, e in self._buf if s > cursor], gap
+
+    async def wait(self, cursor: int, timeout: Optional[float] = None) -> bool:
+        """Wait until an event newer than `cursor` exists. Returns False on timeout."""
+        flag = asyncio.Event()
+        with self._lock:
+            if self._seq > cursor:
+                return True
+            self._waiters.append((asyncio.get_running_loop(), flag))
+        try:
+            await asyncio.wait_for(flag.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._waiters = [w for w in self._waiters if w[1] is not flag]
+            return False
@@ -2,26 +2,59 @@
 Central place to host long-lived game-wide singletons (e.g., narrator, narration manager).
 """
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 try:
-    from openai import OpenAI  # type: ignore
     from ai.narrator import VeinbreakerNarrator, load_api_key
     from engine.narration_manager import NarrationManager
+    from engine.narration_service import NarrationService
 
     _api_key = load_api_key()
-    if _api_key:
+    if os.getenv("VB_NARRATOR_STUB") == "1":
+        # Offline narration (no network): canned prose from the local stub client.
+        from ai.stub_client import StubOpenAIClient
+
+        _client = StubOpenAIClient(delay=float(os.getenv("VB_NARRATOR_STUB_DELAY", "0")))
+    elif _api_key:
+        from openai import OpenAI  # type: ignore
+
         _client = OpenAI(api_key=_api_key)
+    else:
+        _client = None
+
+    if _client is not None:
         _narrator = VeinbreakerNarrator(_client, model="gpt-4o-mini")
+        if os.getenv("VB_NARRATION_CACHE", "1") != "0":
+            # Repeated resolutions are served from disk instead of re-asking the model.
+            from ai.narration_cache import DEFAULT_CACHE_PATH, STUB_CACHE_PATH, CachedNarrator, NarrationCache
+
+            _default_cache = STUB_CACHE_PATH if os.getenv("VB_NARRATOR_STUB") == "1" else DEFAULT_CACHE_PATH
+            _narrator = CachedNarrator(
+                _narrator,
+                NarrationCache(
+                    os.getenv("VB_NARRATION_CACHE_PATH") or _default_cache,
+                    max_variants=int(os.getenv("VB_NARRATION_CACHE_VARIANTS", "3")),
+                    max_bytes=int(os.getenv("VB_NARRATION_CACHE_BYTES", str(8 * 1024 * 1024))),
+                ),
+            )
         NARRATOR = _narrator
-        NARRATION = NarrationManager(_narrator)
+        # Web sessions narrate through the service (non-blocking); the CLI keeps calling NARRATION directly.
+        NARRATION_SERVICE = NarrationService(
+            _narrator,
+            max_concurrency=int(os.getenv("VB_NARRATION_CONCURRENCY", "4")),
+            timeout=float(os.getenv("VB_NARRATION_TIMEOUT", "20")),
+        )
+        NARRATION = NarrationManager(_narrator, service=NARRATION_SERVICE)
     else:
         logger.warning("No API key found in env or apiKey file; narration disabled.")
         NARRATOR = None
         NARRATION = None
+        NARRATION_SERVICE = None
 except Exception as e:
     logger.error("Failed to initialize narrator: %s", e)
     # In test/offline contexts, narration stays disabled.
     NARRATOR = None
     NARRATION = None
+    NARRATION_SERVICE = None
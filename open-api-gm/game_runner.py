@@ -6,7 +6,7 @@ Does NOT break CLI.
 """
 
 class Game:
-    def __init__(self, ui):
+    def __init__(self, ui, player_id=None):
         # Import lazily to avoid circular imports
         import play
 
@@ -16,7 +16,8 @@ class Game:
         # Call into play.py setup logic
         self.context = play.create_game_context(
             ui,
-            skip_character_creation=self.is_web
+            skip_character_creation=self.is_web,
+            player_id=player_id,
         )
 
         self.started = False
@@ -1,15 +1,37 @@
-
+import threading
 from typing import Dict, Any, List
 
+from event_stream import EventRing
+from state_diff import StateDiffer
+
 class GameSession:
     def __init__(self, game):
         self.game = game
         self.events: List[Dict[str, Any]] = []
+        # Events produced off the request thread (e.g. async narration); drained by /events and /step.
+        self._delivered: List[Dict[str, Any]] = []
+        self._delivered_lock = threading.Lock()
+        # Sequenced copy of every event for the streaming endpoints (/events/stream, /events/ws).
+        self.stream = EventRing()
+        # Last HUD snapshots sent, for delta-encoded character/enemy updates.
+        self.deltas = StateDiffer()
 
     def emit(self, event: Dict[str, Any]):
         self.events.append(event)
+        self.stream.append(event)
+
+    def deliver(self, event: Dict[str, Any]):
+        """Thread-safe emit for background producers."""
+        with self._delivered_lock:
+            self._delivered.append(event)
+        self.stream.append(event)
+
+    def drain_delivered(self) -> List[Dict[str, Any]]:
+        with self._delivered_lock:
+            out, self._delivered = self._delivered, []
+        return out
 
     def step(self, player_input: Dict[str, Any]):
         self.events = []
         self.game.handle_input(player_input, self)
-        return self.events
+        return self.events + self.drain_delivered()
@@ -1,22 +1,35 @@
+import atexit
 import json
+import logging
 import os
 import argparse
 from pathlib import Path
 import pdb
 import random
+import threading
 
 
 from engine.chain_resolution_engine import ChainResolutionEngine, ChainResult
-from engine.interrupt_policy import EnemyWindowPolicy, PlayerPromptPolicy
+from engine.interrupt_policy import EnemyWindowPolicy, PlayerPromptPolicy, precompile_enemy_windows
+from engine.behavior_script import compile_behavior, precompile_behaviors
+from engine.chain_odds import matchup as chain_matchup
+from engine.enemy_planner import greedy_chain, plan_chain
+from engine.game_data import FrozenDict, GameData, SharedCache, freeze, thaw
+from engine.content import ContentRepository
+from engine.content_pack import read_pack as read_content_pack
+from engine.action_index import build_action_index
+from engine.enemy_instance import EnemyInstance
 
 
 from copy import deepcopy
+from dataclasses import replace as dc_replace
 from ai.narrator import narrate
 from game_context import NARRATOR, NARRATION
 from ui.ui import UI
 from ui.cli_provider import CLIProvider
 from ui.events import (
     emit_event,
+    deliver_event,
     emit_combat_state,
     emit_combat_log,
     emit_interrupt,
@@ -28,7 +41,10 @@ from combat import Combat
 from engine.phases import allowed_actions, tick_cooldowns, list_usable_abilities
 from engine.apply import apply_action
 from flow.character_creation import run_character_creation
-from engine.save_load import save_character, load_character, load_profile
+from engine.player_store import DEFAULT_PLAYER_ID, open_player_store
+from engine.write_behind import WriteBehindStore
+from engine.log_writer import log_writer
+from engine.metrics import timed
 from flow.chain_declaration import prompt_chain_declaration
 from engine.chain_rules import declare_chain
 from engine.action_resolution import (
@@ -42,16 +58,61 @@ from engine.action_resolution import (
 from engine.interrupt_controller import InterruptController, apply_interrupt
 from engine.status import apply_status_effects, tick_statuses
 from engine.combat_state import register_participant, combat_get, combat_set, status_get
+from engine.combat_journal import CombatJournal, journal
+from engine.dice import from_profile as dice_from_profile
+from engine.rng import bind as bind_rng, encounter_rng, start_encounter_rng, stream as rng_stream
 
 import debugpy
 
+logger = logging.getLogger(__name__)
 
 
-LOG_FILE = Path(__file__).parent / "narration.log"
+# VB_NARRATION_LOG moves the text log (the test suite points it at a scratch file).
+LOG_FILE = Path(os.getenv("VB_NARRATION_LOG") or Path(__file__).parent / "narration.log")
 DEFAULT_CHARACTER_PATH = Path(__file__).parent / "default_character.json"
 PROFILE_PATH = Path(__file__).parent / "character.json"
 PLAYER_STATE_PATH = Path(__file__).parent / "player_state.json"
 CHARACTERS_DIR = Path(__file__).parent / "characters"
+# Profiles + per-player run state (SQLite by default; VB_PLAYER_STORE=json keeps the files above).
+# Saves are buffered and coalesced (one flush per step / VB_SAVE_WINDOW seconds; 0 = synchronous).
+# Opened on first use by player_store(), so importing this module touches no files.
+SAVE_WINDOW = float(os.getenv("VB_SAVE_WINDOW", "1.0"))
+_PLAYER_STORE = None
+_PLAYER_STORE_LOCK = threading.Lock()
+# Combat log entries past VB_JOURNAL_MAX_ENTRIES move to append-only files here (empty = drop them).
+JOURNAL_DIR = os.getenv("VB_JOURNAL_DIR", str(Path(__file__).parent / ".data" / "journal")) or None
+# Log every enemy move decision with the behavior rules it evaluated.
+AI_TRACE = os.getenv("VB_AI_TRACE", "0") not in ("", "0")
+# Links per enemy chain in the web/CLI enemy turn (the planner picks which moves).
+ENEMY_CHAIN_LINKS = max(1, int(os.getenv("VB_ENEMY_CHAIN_LINKS", "1") or 1))
+
+
+def player_store() -> WriteBehindStore:
+    """The shared profile/run-state store, opened on first use."""
+    global _PLAYER_STORE
+    store = _PLAYER_STORE
+    if store is None:
+        with _PLAYER_STORE_LOCK:
+            store = _PLAYER_STORE
+            if store is None:
+                store = WriteBehindStore(
+                    open_player_store(state_path=PLAYER_STATE_PATH, profiles_dir=CHARACTERS_DIR, profile_path=PROFILE_PATH),
+                    window=SAVE_WINDOW,
+                )
+                atexit.register(store.close)
+                _PLAYER_STORE = store
+    return store
+
+
+def close_player_store() -> None:
+    """Flush and close the store if it was ever opened (server shutdown)."""
+    global _PLAYER_STORE
+    with _PLAYER_STORE_LOCK:
+        store, _PLAYER_STORE = _PLAYER_STORE, None
+    if store is not None:
+        store.close()
+
+
 BUFF_TYPES = {
     "radiance",
     "quickened",
@@ -75,13 +136,13 @@ DEBUFF_TYPES = {
     "exhausted",
 }
 
-def create_default_character():
+def create_default_character(player_id: str | None = None):
     """
     Load the default character.
 
     New model:
-      - `character.json` is a profile (static, abilities are ids)
-      - `player_state.json` is mutable runtime state (resources/pools/cooldowns)
+      - `character.json` / stored profiles are static (abilities are ids)
+      - the player's state in player_store() is mutable runtime state (resources/pools/cooldowns)
 
     Back-compat:
       - if a legacy `character.json` includes full ability dicts/resources, we accept it.
@@ -107,14 +168,16 @@ def create_default_character():
         except Exception:
             return None
 
-    # If player state specifies a character_id, load that profile from `characters/<id>.json`.
+    # If the player's state specifies a character_id, load that profile from the store.
+    try:
+        state = player_store().load_state(player_id or DEFAULT_PLAYER_ID) or {}
+    except Exception:
+        state = {}
     selected_profile = None
     try:
-        state_blob = _load_json(PLAYER_STATE_PATH) or {}
-        if isinstance(state_blob, dict):
-            cid = state_blob.get("character_id")
-            if cid:
-                selected_profile = _load_json(CHARACTERS_DIR / f"{cid}.json")
+        cid = state.get("character_id")
+        if cid:
+            selected_profile = player_store().load_profile(cid)
     except Exception:
         selected_profile = None
 
@@ -126,11 +189,10 @@ def create_default_character():
             return profile
 
         merged = dict(profile)
-        state = _load_json(PLAYER_STATE_PATH) or {}
         cooldowns = state.get("cooldowns") if isinstance(state.get("cooldowns"), dict) else {}
         merged["_cooldowns"] = cooldowns
-        merged["_veins_spent_total"] = int(state.get("veins_spent_total", 0) or 0) if isinstance(state, dict) else 0
-        # Merge mutable pieces from player_state.json if present
+        merged["_veins_spent_total"] = int(state.get("veins_spent_total", 0) or 0)
+        # Merge mutable pieces from the player's saved state if present
         if isinstance(state.get("resources"), dict):
             merged["resources"] = dict(state["resources"])
         if isinstance(state.get("pools"), dict):
@@ -180,9 +242,10 @@ def hydrate_character_abilities(character: dict, game_data: dict) -> None:
             if not src:
                 continue
             ab = {"id": src.get("id") or entry, "name": src.get("name") or entry}
+            # Thawed: runtime abilities are edited in place (cooldowns, tags, effects).
             for key in ["effect", "cost", "dice", "stat", "tags", "path", "tier", "type", "effects", "to_hit", "resourceDelta", "resolution"]:
                 if key in src:
-                    ab[key] = src[key]
+                    ab[key] = thaw(src[key])
             # base cooldown lives in game data `cooldown`
             ab["base_cooldown"] = int(src.get("cooldown", 0) or 0)
             ab["cooldown"] = 0
@@ -211,13 +274,14 @@ def hydrate_character_abilities(character: dict, game_data: dict) -> None:
             if src:
                 for key in ["effect", "cost", "dice", "stat", "tags", "path", "tier", "type", "effects", "to_hit", "resourceDelta", "resolution"]:
                     if key not in entry and key in src:
-                        entry[key] = src[key]
+                        entry[key] = thaw(src[key])
                 if "base_cooldown" not in entry:
                     entry["base_cooldown"] = int(src.get("cooldown", entry.get("cooldown", 0) or 0) or 0)
             runtime.append(entry)
             continue
 
     character["abilities"] = runtime
+    build_action_index(character)
 
 
 def _character_id_from_name(name: str) -> str:
@@ -300,18 +364,20 @@ def split_profile_and_state(character: dict) -> tuple[dict, dict]:
     return profile, state
 
 
-def save_profile_and_state(character: dict) -> None:
+def player_id_of(state: dict | None) -> str:
+    """Store key for a game state's player (web sessions set state["player_id"])."""
+    pid = state.get("player_id") if isinstance(state, dict) else None
+    return str(pid) if pid else DEFAULT_PLAYER_ID
+
+
+@timed("persistence.save")
+def save_profile_and_state(character: dict, player_id: str | None = None) -> None:
     profile, state = split_profile_and_state(character)
-    if profile:
-        CHARACTERS_DIR.mkdir(parents=True, exist_ok=True)
-        (CHARACTERS_DIR / f"{profile.get('id') or 'character.unknown'}.json").write_text(
-            json.dumps(profile, indent=2),
-            encoding="utf-8",
-        )
-        # Keep the legacy `character.json` updated as a fallback.
-        PROFILE_PATH.write_text(json.dumps(profile, indent=2), encoding="utf-8")
-    if state:
-        PLAYER_STATE_PATH.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    with player_store().transaction():
+        if profile:
+            player_store().save_profile(profile)
+        if state:
+            player_store().save_state(player_id or DEFAULT_PLAYER_ID, state)
 
 
 def is_safe_room(state: dict) -> bool:
@@ -676,7 +742,7 @@ def _refill_pools_to_cap(ch: dict) -> None:
         for k, cap in pool_caps.items():
             pools[k] = int(cap)
 
-def create_game_context(ui, skip_character_creation=False):
+def create_game_context(ui, skip_character_creation=False, player_id=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--auto", action="store_true", help="Run in automated mode (no prompts).")
     parser.add_argument("--narrate", dest="narrate", action="store_true", help="Enable narration (off by default).")
@@ -693,66 +759,16 @@ def create_game_context(ui, skip_character_creation=False):
     phase_machine = canon["phase_machine.json"]
     game_data = load_game_data()
 
+    player_id = player_id or DEFAULT_PLAYER_ID
     if skip_character_creation:
-        character = create_default_character()
+        character = create_default_character(player_id)
     elif args.auto or args.interactive_defaults:
         # Saved run: merge profile + mutable state.
-        try:
-            # Prefer selecting profile by `player_state.json.character_id`.
-            state_blob = load_character(PLAYER_STATE_PATH.name)
-            cid = state_blob.get("character_id") if isinstance(state_blob, dict) else None
-            if cid:
-                profile = load_profile(CHARACTERS_DIR / f"{cid}.json")
-            else:
-                profile = load_profile(PROFILE_PATH.name)
-        except Exception:
-            profile = {}
-        try:
-            state_blob = load_character(PLAYER_STATE_PATH.name)
-        except Exception:
-            state_blob = {}
-        character = dict(profile) if isinstance(profile, dict) else {}
-        if isinstance(state_blob, dict):
-            cooldowns = state_blob.get("cooldowns") if isinstance(state_blob.get("cooldowns"), dict) else {}
-            character["_cooldowns"] = cooldowns
-            if isinstance(state_blob.get("resources"), dict):
-                character["resources"] = dict(state_blob["resources"])
-            if isinstance(state_blob.get("pools"), dict):
-                character["pools"] = dict(state_blob["pools"])
-            if isinstance(state_blob.get("marks"), dict):
-                character["marks"] = dict(state_blob["marks"])
-            if state_blob.get("veinscore") is not None:
-                character["veinscore"] = state_blob.get("veinscore")
-        character.setdefault("chain", {"declared": False, "abilities": [], "resolve_spent": 0, "stable": False, "invalidated": False})
+        character = create_default_character(player_id)
     else:
         use_saved = ui.choice("Use saved character?", ["Yes", "No"]) == 0
         if use_saved:
-            try:
-                state_blob = load_character(PLAYER_STATE_PATH.name)
-                cid = state_blob.get("character_id") if isinstance(state_blob, dict) else None
-                if cid:
-                    profile = load_profile(CHARACTERS_DIR / f"{cid}.json")
-                else:
-                    profile = load_profile(PROFILE_PATH.name)
-            except Exception:
-                profile = {}
-            try:
-                state_blob = load_character(PLAYER_STATE_PATH.name)
-            except Exception:
-                state_blob = {}
-            character = dict(profile) if isinstance(profile, dict) else {}
-            if isinstance(state_blob, dict):
-                cooldowns = state_blob.get("cooldowns") if isinstance(state_blob.get("cooldowns"), dict) else {}
-                character["_cooldowns"] = cooldowns
-                if isinstance(state_blob.get("resources"), dict):
-                    character["resources"] = dict(state_blob["resources"])
-                if isinstance(state_blob.get("pools"), dict):
-                    character["pools"] = dict(state_blob["pools"])
-                if isinstance(state_blob.get("marks"), dict):
-                    character["marks"] = dict(state_blob["marks"])
-                if state_blob.get("veinscore") is not None:
-                    character["veinscore"] = state_blob.get("veinscore")
-            character.setdefault("chain", {"declared": False, "abilities": [], "resolve_spent": 0, "stable": False, "invalidated": False})
+            character = create_default_character(player_id)
         else:
             character = run_character_creation(
                 canon,
@@ -760,7 +776,7 @@ def create_game_context(ui, skip_character_creation=False):
                 ui=ui,
             )
             # Persist new character as profile + state (web-first model).
-            save_profile_and_state(character)
+            save_profile_and_state(character, player_id)
 
     # Normalize player resources so hp_max is always available and hp is numeric.
     res = character.setdefault("resources", {})
@@ -772,7 +788,12 @@ def create_game_context(ui, skip_character_creation=False):
         res["hp_max"] = res["hp"]
 
     state = initial_state()
-    state["flags"] = {"narration_enabled": bool(args.narrate)}
+    state["player_id"] = player_id
+    state["flags"] = {
+        "narration_enabled": bool(args.narrate),
+        # Step-driven (web) UIs must not block on the model: queue narration and deliver it via /events.
+        "narration_async": bool(NARRATION and NARRATION.is_async and not getattr(ui, "is_blocking", True)),
+    }
     append_log(f"SESSION_START flags={state.get('flags')}")
     state["party"]["members"][0].update(character)
     state["game_data"] = game_data
@@ -849,11 +870,8 @@ def usable_ability_objects(state):
     return [ab for ab in member.get("abilities", []) if ab.get("cooldown", 0) == 0]
 
 def append_log(entry: str) -> None:
-    try:
-        with LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(entry + "\n")
-    except Exception:
-        pass
+    # Queued; a background thread appends in batches (engine/log_writer.py).
+    log_writer(LOG_FILE).write(entry)
 
 def log_flags(prefix: str, state: dict) -> None:
     flags = state.get("flags", {})
@@ -861,6 +879,7 @@ def log_flags(prefix: str, state: dict) -> None:
 
 def round_upkeep(state: dict) -> None:
     """Per-round refresh: cooldowns, resolve regen, balance/momentum/heat resets, enemy budgets."""
+    journal(state).begin_round(state.get("phase", {}).get("round"))
     tick_cooldowns(state)
     ch = state["party"]["members"][0]
     res = ch.get("resources", {})
@@ -927,6 +946,21 @@ def emit_authoritative_player_update(ui, state: dict, ch: dict) -> None:
     })
 
 
+def emit_hud_snapshot(ctx: dict) -> None:
+    """Re-send the player sheet and the current enemy card (client resync)."""
+    try:
+        state = ctx.get("state") or {}
+        ui = ctx.get("ui")
+        members = (state.get("party") or {}).get("members") or []
+        if members and isinstance(members[0], dict):
+            emit_authoritative_player_update(ui, state, members[0])
+        enemies = state.get("enemies") or []
+        if enemies and state.get("mode") != "safe_room":
+            emit_enemy_update(ui, state, enemies[0])
+    except Exception:
+        pass
+
+
 def reset_encounter_meters(state: dict, *, player: dict | None = None, enemy: dict | None = None, reset_rp: bool = True) -> None:
     """
     Enforce encounter-boundary resets.
@@ -1006,6 +1040,45 @@ def emit_action_narration(state: dict, ui, idx: int) -> None:
             ui.error(f"[NARRATOR ERROR] {last.get('narration_error')}", data=last)
             append_log(f"NARRATION_ERROR: {last.get('narration_error')}")
 
+def emit_narration_pending(ui, narration_id: str, **data) -> None:
+    """Placeholder for queued narration; the text follows as a `narration` event with the same id."""
+    emit_event(ui, {"type": "narration_pending", "id": narration_id, "data": data})
+
+
+def queue_chain_narration(state: dict, ui, entries: list, chain_key) -> list:
+    """
+    Non-blocking narration for the links a chain just resolved: each link is
+    queued on the narration service (coalesced into one prompt per chain_key)
+    and a `narration_pending` placeholder is emitted right away. The finished
+    text is delivered later as a `narration` event with the same id.
+    """
+    flags = state.get("flags", {})
+    if not (flags.get("narration_enabled") and flags.get("narration_async") and NARRATION):
+        return []
+    ids = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.pop("narration_pending", False):
+            continue
+        effects = entry.get("action_effects")
+        if not isinstance(effects, dict):
+            continue
+        try:
+            nid = NARRATION.submit_combat_step(
+                action_effects=effects,
+                chain_index=effects.get("chain_index", len(ids) + 1),
+                deliver=lambda ev: deliver_event(ui, ev),
+                chain_key=chain_key,
+            )
+        except Exception as e:
+            append_log(f"NARRATION_ERROR: {e}")
+            continue
+        if nid:
+            entry["narration_id"] = nid
+            ids.append(nid)
+            emit_narration_pending(ui, nid, kind="combat", ability=effects.get("ability_name"))
+    return ids
+
+@timed("chain_declaration")
 def handle_chain_declaration(ctx: dict, player_input: dict) -> bool | None:
     state = ctx["state"]
     ui = ctx["ui"]
@@ -1061,6 +1134,7 @@ def handle_chain_declaration(ctx: dict, player_input: dict) -> bool | None:
     append_log("DEBUG: skipping emit_declare_chain because awaiting declare_chain action")
     return None
 
+@timed("chain_resolution")
 def handle_chain_resolution(ctx: dict) -> bool | None:
     """
     Resolves a declared chain using the unified Chain Resolution Engine.
@@ -1115,12 +1189,12 @@ def handle_chain_resolution(ctx: dict) -> bool | None:
     # ─────────────────────────────────────────
     # Interrupt policy selection (DEFENDER-based)
     # ─────────────────────────────────────────
-    seed = state.get("seed", None)
-    rng = random.Random(seed)
+    # Encounter-scoped RNG: the interrupt substream advances across chains (and survives snapshots).
+    rng = encounter_rng(state)
 
     # Player chain (player -> enemy): enemy decides (enemy policy)
     # Enemy chain (enemy -> player): player decides (player policy)
-    interrupt_policy = PlayerPromptPolicy() if defender is player else EnemyWindowPolicy(rng)
+    interrupt_policy = PlayerPromptPolicy() if defender is player else EnemyWindowPolicy(rng.stream("interrupt"))
 
     # ─────────────────────────────────────────
     # Chain Resolution Engine
@@ -1137,6 +1211,7 @@ def handle_chain_resolution(ctx: dict) -> bool | None:
             interrupt_policy=interrupt_policy,
             emit_log_fn=emit_combat_log,
             interrupt_apply_fn=apply_interrupt,
+            rng=rng,
         )
 
         ui.system(f"{aggressor.get('name','Combatant')} resolves a chain...")
@@ -1170,6 +1245,7 @@ def handle_chain_resolution(ctx: dict) -> bool | None:
             player["chain"].pop("execute", None)
 
     start_idx = int(state.get("phase", {}).get("chain_resume_idx", 0) or 0)
+    log_start = journal(state).mark()
     if cre is not None:
         result = cre.resolve_chain(
             state=state,
@@ -1182,6 +1258,13 @@ def handle_chain_resolution(ctx: dict) -> bool | None:
             start_index=start_idx,
         )
 
+    queue_chain_narration(
+        state,
+        ui,
+        journal(state).since(log_start),
+        chain_key=(id(state), state.get("phase", {}).get("round"), active),
+    )
+
     if getattr(result, "status", None) == "awaiting":
         # Pause and wait for next /step to resolve the player's interrupt decision.
         state["phase"]["current"] = "chain_resolution"
@@ -1260,10 +1343,11 @@ def handle_chain_resolution(ctx: dict) -> bool | None:
     return True
 
 
+@timed("enemy_turn")
 def handle_enemy_turn(ctx: dict, player_input: dict | None = None) -> bool | None:
     """
     Minimal enemy phase:
-    - Enemy declares a simple one-move chain (first attack move)
+    - Enemy declares a planned chain of its attack moves (one link by default)
     - Player gets a single interrupt prompt before the enemy chain resolves
     """
     state = ctx["state"]
@@ -1386,11 +1470,11 @@ def handle_enemy_turn(ctx: dict, player_input: dict | None = None) -> bool | Non
 
             emit_combat_log(ui, f"Interrupt ability: {chosen.get('name')} (bonus {ab_bonus})", "system")
 
-        p_d20 = roll("1d20")
+        p_d20 = roll("1d20", stream="interrupt")
         p_roll = p_d20 + int(idf) + int(momentum) + int(ab_bonus)
         defense = (enemy.get("stat_block", {}) or {}).get("defense", {})
         dv = enemy.get("dv_base", defense.get("dv_base", 10))
-        e_d20 = roll("1d20")
+        e_d20 = roll("1d20", stream="interrupt")
         e_roll = e_d20 + (dv or 0)
         emit_combat_log(ui, f"Interrupt contest: player {p_roll} (d20 {p_d20}) vs enemy {e_roll} (d20 {e_d20})", "roll")
         if p_roll >= e_roll:
@@ -1408,12 +1492,8 @@ def handle_enemy_turn(ctx: dict, player_input: dict | None = None) -> bool | Non
             return True
         emit_combat_log(ui, "Interrupt failed. Enemy acts.", "system")
 
-    # Enemy declares a simple one-move chain (first attack move)
-    enemy_chain = []
-    for mv in enemy.get("moves", []):
-        if mv.get("type") == "attack":
-            enemy_chain.append(mv.get("name") or mv.get("id"))
-            break
+    # Enemy declares its chain: the planner's pick among its attack moves (VB_ENEMY_CHAIN_LINKS long).
+    enemy_chain = [mv.get("name") or mv.get("id") for mv in plan_enemy_turn(enemy, state)]
     if not enemy_chain:
         state["active_combatant"] = "player"
         state["phase"]["current"] = "chain_declaration"
@@ -1433,7 +1513,23 @@ def handle_enemy_turn(ctx: dict, player_input: dict | None = None) -> bool | Non
     return True
 
 
+def _canon_sources():
+    base = Path(__file__).parent
+    paths = list((base / "canon").glob("*.json"))
+    paths.append(base / "engine" / "abilities.json")
+    paths.append(base / "engine" / "resolve_abilities.json")
+    return paths
+
+
+_CANON_CACHE = SharedCache(_canon_sources, lambda _sig: freeze(_read_canon()))
+
+
 def load_canon():
+    """Shared, read-only canon; re-read only when a canon file changes on disk."""
+    return dict(_CANON_CACHE.get())
+
+
+def _read_canon():
     canon = {}
     canon_dir = Path(__file__).parent / "canon"
     for fname in os.listdir(canon_dir):
@@ -1478,7 +1574,11 @@ def format_enemy_preview(enemy):
         dice = dmg.get("dice", "?")
         flat = dmg.get("flat")
         flat_str = f"{flat:+}" if isinstance(flat, (int, float)) else ""
-        return f"{dice}{flat_str}"
+        try:
+            avg = f" (avg {dice_from_profile(dmg, default=None).mean:.1f})" if dmg.get("dice") else ""
+        except Exception:
+            avg = ""
+        return f"{dice}{flat_str}{avg}"
 
     baseline = fmt_dmg(dmg_profile.get("baseline", {}))
     spike = fmt_dmg(dmg_profile.get("spike", {})) if dmg_profile.get("spike") else None
@@ -1557,7 +1657,7 @@ def emit_enemy_update(ui, state, enemy) -> None:
     Web UI helper: emit an enemy HUD payload (name/meta + hp + meters).
     """
     try:
-        from ui.events import emit_event
+        from ui.events import emit_state_update
         from engine.combat_state import combat_get
 
         if not isinstance(enemy, dict):
@@ -1605,7 +1705,7 @@ def emit_enemy_update(ui, state, enemy) -> None:
             "momentum": combat_get(state, enemy, "momentum", 0),
             "balance": combat_get(state, enemy, "balance", 0),
         }
-        emit_event(ui, {"type": "enemy_update", "enemy": payload})
+        emit_state_update(ui, {"type": "enemy_update", "enemy": payload}, "enemy")
     except Exception:
         pass
 
@@ -1738,8 +1838,7 @@ def apply_dun_mark_and_restore(state: dict) -> None:
 
 
 def resolve_loot_item(loot_id: str) -> dict:
-    path = Path(__file__).parent / "game-data" / "loot" / f"{loot_id}.json"
-    data = _read_json(path)
+    data = CONTENT.get("loot", loot_id)
     if isinstance(data, dict) and data:
         data.setdefault("id", loot_id)
         return data
@@ -1748,21 +1847,11 @@ def resolve_loot_item(loot_id: str) -> dict:
 
 def resolve_narration_template(prompt_id: str) -> str | None:
     """
-    Reads game-data/narrations.json which may be a single object or a list of objects.
+    Looks up a template from game-data/narrations.json (a single object, a list,
+    or {"items": [...]}) through the content index.
     """
-    path = Path(__file__).parent / "game-data" / "narrations.json"
-    data = _read_json(path)
-    if isinstance(data, dict) and data.get("id") == prompt_id:
-        return data.get("template")
-    if isinstance(data, dict) and isinstance(data.get("items"), list):
-        for it in data["items"]:
-            if isinstance(it, dict) and it.get("id") == prompt_id:
-                return it.get("template")
-    if isinstance(data, list):
-        for it in data:
-            if isinstance(it, dict) and it.get("id") == prompt_id:
-                return it.get("template")
-    return None
+    rec = CONTENT.get_frozen("narrations", prompt_id)
+    return rec.get("template") if isinstance(rec, dict) else None
 
 
 def scene_conditions_pass(conditions: list, state: dict) -> bool:
@@ -1880,7 +1969,67 @@ def format_enemy_state(enemy):
         status_str = "none"
     return f"[Enemy] HP {hp}/{hp_max or '?'} | RP {rp} | Momentum {momentum} | Status {status_str}"
 
+def _game_data_sources():
+    base = Path(__file__).parent
+    root = base / "game-data"
+    paths = list(root.glob("*.json"))
+    paths.extend((root / "beasts").glob("*.json"))
+    paths.append(base / "canon" / "enemy_archetypes.json")
+    return paths
+
+
+# Compiled content (tools/build_content_pack.py). Used when present and not older than the JSON sources.
+CONTENT_PACK_PATH = Path(os.getenv("VB_CONTENT_PACK_PATH") or Path(__file__).parent / "game-data" / "content.pack")
+
+
+def _build_game_data(sig) -> GameData:
+    gd = None
+    if os.getenv("VB_CONTENT_PACK") != "off":
+        sources = _game_data_sources()
+        packed = read_content_pack(
+            CONTENT_PACK_PATH,
+            sources=sources,
+            root=Path(__file__).parent,
+            # Deployments without the JSON sources trust the pack as-is.
+            check=os.getenv("VB_CONTENT_PACK_CHECK", "1") != "0" and any(p.exists() for p in sources),
+        )
+        if packed is not None:
+            gd = dc_replace(packed, signature=sig)
+    if gd is None:
+        gd = GameData.build(_read_game_data(), sig)
+    # Interrupt windows and behavior scripts are compiled once per template here, not per decide() call.
+    # Content problems are reported through logging, not the player-facing narration log.
+    for eid, errors in precompile_enemy_windows(gd.enemies_by_id).items():
+        for err in errors:
+            logger.warning("CONTENT_INVALID %s interrupt %s (window disabled)", eid, err)
+    for eid, errors in precompile_behaviors(gd.enemies_by_id).items():
+        for err in errors:
+            logger.warning("CONTENT_INVALID %s behavior %s (step disabled)", eid, err)
+    return gd
+
+
+_GAME_DATA_CACHE = SharedCache(lambda: [*_game_data_sources(), CONTENT_PACK_PATH], _build_game_data)
+
+
+# Per-record content (scenes, traps, hazards, environments, loot, narrations), indexed once
+# and refreshed per file on mtime change.
+CONTENT = ContentRepository(Path(__file__).parent / "game-data")
+
+
+def shared_game_data() -> GameData:
+    """Process-wide GameData snapshot (rebuilt when a source file's mtime changes)."""
+    return _GAME_DATA_CACHE.get()
+
+
 def load_game_data():
+    """
+    Session view of the shared game data: a fresh top-level dict whose values are
+    the shared, read-only structures. Copy (deepcopy) before mutating nested data.
+    """
+    return shared_game_data().view()
+
+
+def _read_game_data():
     root = Path(__file__).parent / "game-data"
     data = {}
     archetypes = {}
@@ -1986,7 +2135,8 @@ DEFAULT_SCRIPT_PATH = Path(__file__).parent / "game-data" / "scripts" / "script.
 
 
 def load_script(path: Path | None = None) -> dict:
-    path = path or DEFAULT_SCRIPT_PATH
+    if path is None:
+        return CONTENT.get("scripts", DEFAULT_SCRIPT_PATH.stem, {})
     try:
         return json.loads(path.read_text(encoding="utf-8"))
     except Exception:
@@ -2037,34 +2187,20 @@ def ensure_campaign(state: dict, game_data: dict) -> None:
     }
 
 
-def _read_json(path: Path) -> dict:
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-
 def load_scene(scene_id: str) -> dict:
-    path = Path(__file__).parent / "game-data" / "scenes" / f"{scene_id}.json"
-    return _read_json(path)
+    return CONTENT.get("scenes", scene_id, {})
 
 
 def resolve_trap(trap_id: str) -> dict:
-    path = Path(__file__).parent / "game-data" / "traps" / f"{trap_id}.json"
-    data = _read_json(path)
-    return data or {"id": trap_id}
+    return CONTENT.get("traps", trap_id) or {"id": trap_id}
 
 
 def resolve_hazard(hazard_id: str) -> dict:
-    path = Path(__file__).parent / "game-data" / "hazards" / f"{hazard_id}.json"
-    data = _read_json(path)
-    return data or {"id": hazard_id}
+    return CONTENT.get("hazards", hazard_id) or {"id": hazard_id}
 
 
 def resolve_environment(env_id: str) -> dict:
-    path = Path(__file__).parent / "game-data" / "environments" / f"{env_id}.json"
-    data = _read_json(path)
-    return data or {"id": env_id}
+    return CONTENT.get("environments", env_id) or {"id": env_id}
 
 
 def _prime_enemy_for_combat(enemy: dict) -> dict:
@@ -2151,9 +2287,11 @@ def _prime_enemy_for_combat(enemy: dict) -> dict:
     if enemy.get("idf") is None:
         enemy["idf"] = defense.get("idf", 0)
 
+    build_action_index(enemy)
     return enemy
 
 
+@timed("scene_entry")
 def enter_scene_into_state(ctx: dict, scene_id: str) -> bool:
     """
     Loads a scene and populates state with encounter content (enemies/traps/hazards/env).
@@ -2232,8 +2370,11 @@ def enter_scene_into_state(ctx: dict, scene_id: str) -> bool:
         template = enemy_by_id.get(mid) if isinstance(enemy_by_id, dict) else None
         if not isinstance(template, dict):
             template = {"id": mid, "name": mid}
+        if not isinstance(template, FrozenDict):
+            template = freeze(template)
         for _ in range(max(1, count)):
-            inst = deepcopy(template)
+            # Shares the template; only the runtime fields set below are per-spawn.
+            inst = EnemyInstance(template)
             # Per-spawn deterministic RNG (uses Random's stable string seeding for str inputs).
             seed = state.get("seed")
             r = random.Random()
@@ -2286,7 +2427,7 @@ def select_loot(game_data, enemy):
     if not tier_matches:
         tier_matches = [l for l in loot_table if l.get("tier", 0) <= tier]
     candidates = tier_matches or loot_table
-    return random.choice(candidates) if candidates else None
+    return rng_stream("loot").choice(candidates) if candidates else None
   
 def veinscore_value(name, game_data):
     table = game_data.get("veinscore_loot", [])
@@ -2311,78 +2452,64 @@ def enemy_move_damage(enemy, move):
         dmg_obj = dmg_profile.get(dmg_ref, {})
     elif isinstance(dmg_ref, dict):
         dmg_obj = dmg_ref
-    dice = dmg_obj.get("dice", "1d6")
-    flat = dmg_obj.get("flat", 0)
-    dmg_roll = roll(dice)
-    return dmg_roll + (flat if isinstance(flat, (int, float)) else 0)
+    return roll(dice_from_profile(dmg_obj, default="1d6"))
 
-def select_enemy_move(enemy, state):
-    """Select an enemy move; fall back to first move."""
+def select_enemy_move(enemy, state, trace=None):
+    """
+    Select an enemy move from its compiled behavior script; fall back to first move.
+    Pass a list as `trace` to get the rules evaluated (VB_AI_TRACE=1 logs them).
+    """
     moves = enemy.get("moves", []) if enemy else []
     if not moves:
         return None
-    move_lookup = {m.get("id"): m for m in moves if m.get("id")}
-    behavior = (enemy.get("resolved_archetype") or {}).get("ai", {}).get("behavior_script", {})
-
-    def last_player_missed():
-        for entry in reversed(state.get("log", [])):
-            if isinstance(entry, dict) and "action_effects" in entry:
-                hit = entry["action_effects"].get("hit")
-                if hit is False:
-                    return True
-                if hit is True:
-                    return False
-        return False
-
-    def check_cond(cond):
-        if not cond:
-            return True
-        for k, v in cond.items():
-            if k == "player_missed_last_action":
-                if last_player_missed() != bool(v):
-                    return False
-            elif k == "player_moved":
-                return False  # movement not tracked yet
-            elif k == "blood_mark_gte":
-                blood = state.get("party", {}).get("members", [{}])[0].get("marks", {}).get("blood", 0)
-                if blood < v:
-                    return False
-            else:
-                return False
-        return True
+    behavior = compile_behavior(enemy)
+    if trace is None and AI_TRACE:
+        trace = []
+        move = behavior.choose(state, trace)
+        append_log(f"AI_TRACE {enemy.get('id') or enemy.get('name')} -> {(move or {}).get('id')} {json.dumps(trace)}")
+        return move
+    return behavior.choose(state, trace)
+
+def plan_enemy_turn(enemy, state):
+    """The chain an enemy declares on its turn (live combat and the simulator share this)."""
+    attack_moves = [mv for mv in (enemy or {}).get("moves", []) if mv.get("type") == "attack"]
+    if not attack_moves:
+        return []
+    return build_enemy_chain(enemy, state, moves=attack_moves, max_links=ENEMY_CHAIN_LINKS)
 
-    for step in behavior.get("default_loop", []):
-        stype = step.get("type")
-        if stype == "move":
-            ref = step.get("ref")
-            if ref and ref in move_lookup:
-                return move_lookup[ref]
-        elif stype == "conditional":
-            if check_cond(step.get("if", {})):
-                for inner in step.get("then", []):
-                    if inner.get("type") == "move":
-                        ref = inner.get("ref")
-                        if ref and ref in move_lookup:
-                            return move_lookup[ref]
-    return moves[0]
-
-def build_enemy_chain(enemy):
-    """Build a simple move chain based on available RP."""
-    moves = enemy.get("moves", []) if enemy else []
+def build_enemy_chain(enemy, state=None, *, moves=None, max_links=None):
+    """
+    Build the enemy's chain within its RP. Without a combat state this is the
+    greedy file-order chain; with one, the lookahead planner picks it
+    (engine/enemy_planner.py) against the lead party member. When a rule of
+    the enemy's behavior script applies, the chain opens with its move.
+    """
+    moves = list(enemy.get("moves", []) if enemy else []) if moves is None else list(moves)
     if not moves:
         return []
     rp_available = enemy.get("rp", enemy.get("rp_pool", 2))
-    chain = []
-    # naive: iterate moves in order and take those we can afford until rp spent
-    for mv in moves:
-        cost = mv.get("cost", {}).get("rp", 0)
-        if cost <= rp_available:
-            chain.append(mv)
-            rp_available -= cost
-    # if nothing fit, take the first move once
-    if not chain:
-        chain.append(moves[0])
-    return chain
+    members = state.get("party", {}).get("members") if isinstance(state, dict) else None
+    if not members:
+        return greedy_chain(moves, rp_available, max_links)
+    # The web flow suppresses per-link player interrupts during enemy chains.
+    chance = 0.0 if state.get("suppress_chain_interrupt") else 1.0
+    trace = [] if AI_TRACE else None
+    scripted = compile_behavior(enemy).match(state, trace)
+    plan = plan_chain(
+        enemy,
+        moves,
+        rp_available,
+        chain_matchup(state, enemy, members[0], interrupt_chance=chance),
+        max_links=max_links,
+        lead=scripted,
+    )
+    if AI_TRACE:
+        append_log(
+            f"AI_PLAN {enemy.get('id') or enemy.get('name')} -> {[mv.get('id') for mv in plan.moves]} "
+            f"score={plan.score:.2f} source={plan.source} evaluated={plan.evaluated} truncated={plan.truncated} "
+            f"{plan.elapsed_ms:.2f}ms alternatives={plan.alternatives} script={json.dumps(trace)}"
+        )
+    return plan.moves
 
 def compute_damage_reduction(target):
     """Consume and roll any stored damage_reduction effects on the target."""
@@ -2391,12 +2518,7 @@ def compute_damage_reduction(target):
     for eff in dr_list:
         if not isinstance(eff, dict):
             continue
-        dice = eff.get("dice")
-        flat = eff.get("flat", 0)
-        if dice:
-            total += roll(dice)
-        if isinstance(flat, (int, float)):
-            total += flat
+        total += roll(dice_from_profile(eff, default=None))
     return total
 
 def initial_state():
@@ -2435,7 +2557,7 @@ def initial_state():
             ]
         },
         'enemies': [],
-        'log': []
+        'log': CombatJournal(spill_dir=JOURNAL_DIR)
     }
 
 def get_player_choice(options, ui, state):
@@ -2500,6 +2622,7 @@ def reopen_chain_builder(state, ui, prompt="Build your next chain?", max_len=Non
     state["awaiting"] = {"type": "chain_builder", "options": usable_objs}
     return usable_objs
 
+@timed("awaiting")
 def resolve_awaiting(state, ui, player_input):
     """
     Handle any pending awaiting payloads.
@@ -2779,7 +2902,15 @@ def choose_action(ctx, actions, resolved_choice, requested_action, auto_mode, in
 
 
 
+@timed("step")
 def game_step(ctx, player_input):
+    # All rolls made while handling this input draw from the session's encounter RNG,
+    # and every save made by this step reaches the player store as one flush.
+    with bind_rng(ctx.get("state")), player_store().hold(player_id_of(ctx.get("state"))):
+        return _game_step(ctx, player_input)
+
+
+def _game_step(ctx, player_input):
     state = ctx["state"]
     ui = ctx["ui"]
     phase_machine = ctx["phase_machine"]
@@ -2882,15 +3013,11 @@ def game_step(ctx, player_input):
             except Exception:
                 pass
             try:
-                save_profile_and_state(ch)
+                save_profile_and_state(ch, player_id_of(state))
             except Exception:
                 pass
             try:
-                ps = json.loads(PLAYER_STATE_PATH.read_text(encoding="utf-8")) if PLAYER_STATE_PATH.exists() else {}
-                if not isinstance(ps, dict):
-                    ps = {}
-                ps["character_id"] = ch.get("id")
-                PLAYER_STATE_PATH.write_text(json.dumps(ps, indent=2), encoding="utf-8")
+                player_store().set_character(player_id_of(state), ch.get("id"))
             except Exception:
                 pass
 
@@ -2969,7 +3096,7 @@ def game_step(ctx, player_input):
                 pass
             ui.system("You rest. Blood steadies. Pools refilled.")
             try:
-                save_profile_and_state(ch)
+                save_profile_and_state(ch, player_id_of(state))
             except Exception:
                 pass
             if not getattr(ui, "is_blocking", True):
@@ -3016,12 +3143,9 @@ def game_step(ctx, player_input):
             ch["_veins_spent_total"] = int(ch.get("_veins_spent_total", 0) or 0) + int(cost)
             leveled = apply_vein_tier_progression(ch)
 
-            # Add to profile on disk (ids only), then hydrate into runtime.
+            # Add to the stored profile (ids only), then hydrate into runtime.
             try:
-                profile_path = CHARACTERS_DIR / f"{ch.get('id') or 'character.unknown'}.json"
-                profile = json.loads(profile_path.read_text(encoding="utf-8")) if profile_path.exists() else {}
-                if not isinstance(profile, dict):
-                    profile = {}
+                profile = player_store().load_profile(ch.get("id") or "character.unknown") or {}
                 ab_list = profile.get("abilities") if isinstance(profile.get("abilities"), list) else []
                 if ability_id not in ab_list:
                     ab_list.append(ability_id)
@@ -3031,10 +3155,7 @@ def game_step(ctx, player_input):
                 profile.setdefault("path", ch.get("path"))
                 profile["tier"] = ch.get("tier")
                 profile.setdefault("attributes", ch.get("attributes") or {})
-                CHARACTERS_DIR.mkdir(parents=True, exist_ok=True)
-                profile_path.write_text(json.dumps(profile, indent=2), encoding="utf-8")
-                # Also update legacy file.
-                PROFILE_PATH.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+                player_store().save_profile(profile)
             except Exception as e:
                 ui.error(f"Failed to save profile: {e}")
 
@@ -3049,7 +3170,7 @@ def game_step(ctx, player_input):
             if leveled:
                 ui.system(f"Tier up: {ch.get('tier')}")
             try:
-                save_profile_and_state(ch)
+                save_profile_and_state(ch, player_id_of(state))
             except Exception:
                 pass
             if not getattr(ui, "is_blocking", True):
@@ -3199,6 +3320,7 @@ def game_step(ctx, player_input):
                     register_participant(state, key="player", entity=player, side="player")
                     register_participant(state, key="enemy0", entity=enemy, side="enemy")
                     reset_encounter_meters(state, player=player, enemy=enemy, reset_rp=True)
+                    start_encounter_rng(state)
             except Exception:
                 pass
 
@@ -3356,6 +3478,7 @@ def game_step(ctx, player_input):
                     register_participant(state, key="enemy0", entity=enemy, side="enemy")
                     # Encounter boundary: reset combat meters and refill resolve to cap.
                     reset_encounter_meters(state, player=player, enemy=enemy, reset_rp=True)
+                    start_encounter_rng(state)
                 except Exception:
                     pass
 
@@ -3374,7 +3497,7 @@ def game_step(ctx, player_input):
             if state.get("flags", {}).get("narration_enabled") and NARRATION:
                 log_flags("SCENE_INTRO", state)
                 try:
-                    scene_text = NARRATION.scene_intro(
+                    scene_kwargs = dict(
                         location=enemy.get("location", "encounter"),
                         environment_tags=enemy.get("tags", []),
                         enemy_presence={
@@ -3389,6 +3512,13 @@ def game_step(ctx, player_input):
                         },
                         threat_level="immediate",
                     )
+                    if state.get("flags", {}).get("narration_async"):
+                        narration_id = NARRATION.submit_scene_intro(deliver=lambda ev: deliver_event(ui, ev), **scene_kwargs)
+                        if narration_id:
+                            emit_narration_pending(ui, narration_id, kind="scene")
+                        scene_text = None
+                    else:
+                        scene_text = NARRATION.scene_intro(**scene_kwargs)
                     if scene_text:
                         ui.narration(scene_text)
                         append_log(f"NARRATION_SCENE: {scene_text}")
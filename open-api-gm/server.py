@@ -1,13 +1,21 @@
 
+import asyncio
 import json
-from fastapi import FastAPI
+import os
+import time
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Any, Dict, Optional
 from pathlib import Path
 from copy import deepcopy
 from game_runner import Game
 from game_session import GameSession
+from session_store import LRUSessionStore, SqliteSessionStore
+from engine.chain_optimizer import suggest_chains
+from engine.log_writer import close_logs, log_metrics, log_tag
+from engine.metrics import HTTP_METRIC, METRICS
 from ui.web_provider import WebProvider
 
 app = FastAPI()
@@ -26,10 +34,80 @@ app.add_middleware(
 )
 
 
-sessions = {}
+@app.middleware("http")
+async def _record_latency(request: Request, call_next):
+    if not METRICS.enabled:
+        return await call_next(request)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template (/sessions/{session_id}/...), not the raw path, keeps label cardinality bounded.
+        route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+        METRICS.observe(HTTP_METRIC, time.perf_counter() - started, method=request.method, route=route, status=status)
+
+
+def _new_session(player_id: str | None = None) -> GameSession:
+    session = GameSession(None)
+    ui = WebProvider(session)
+    session.game = Game(ui, player_id=player_id)
+    return session
+
+
+# Live sessions are LRU/TTL bounded; evicted sessions are snapshotted to disk and
+# rehydrated on their next request.
+def _flush_session_saves(session_id: str, session: GameSession) -> None:
+    """Evicted sessions write their buffered character saves before leaving memory."""
+    import play
+
+    ctx = getattr(getattr(session, "game", None), "context", None) or {}
+    play.player_store().flush(play.player_id_of(ctx.get("state")))
+
+
+# VB_SESSION_STORE=sqlite shares sessions between workers through VB_SESSION_DB
+# (run several behind session_routing's consistent-hash router; see tools/serve_workers.py).
+# Stored snapshots of abandoned sessions are pruned after VB_SESSION_RETENTION seconds
+# (default 48 x VB_SESSION_TTL; 0 keeps them).
+_RETENTION = float(os.environ["VB_SESSION_RETENTION"]) if os.getenv("VB_SESSION_RETENTION") else None
+if os.getenv("VB_SESSION_STORE", "memory").lower() == "sqlite":
+    sessions = SqliteSessionStore(
+        _new_session,
+        os.getenv("VB_SESSION_DB") or Path(__file__).resolve().parent / ".data" / "sessions.sqlite",
+        worker=os.getenv("VB_WORKER_ID") or None,
+        max_sessions=int(os.getenv("VB_SESSION_MAX", "500")),
+        idle_ttl=float(os.getenv("VB_SESSION_TTL", "1800")),
+        on_evict=_flush_session_saves,
+        retention=_RETENTION,
+    )
+else:
+    sessions = LRUSessionStore(
+        _new_session,
+        max_sessions=int(os.getenv("VB_SESSION_MAX", "500")),
+        idle_ttl=float(os.getenv("VB_SESSION_TTL", "1800")),
+        on_evict=_flush_session_saves,
+        retention=_RETENTION,
+    )
+
+
+def _flush_player_store():
+    import play
+
+    play.close_player_store()
+    close_logs()
+    close = getattr(sessions, "close", None)
+    if close:
+        close()
+
+
+app.router.add_event_handler("shutdown", _flush_player_store)
 
 class StepRequest(BaseModel):
     session_id: str
+    # Which player's saved character/state this session plays (default: the shared legacy player).
+    player_id: str | None = None
     action: str | None = None
     choice: int | None = None
     chain: list[str] | None = None
@@ -38,6 +116,9 @@ class StepRequest(BaseModel):
     name: str | None = None
     path: str | None = None
     rp_ability: str | None = None
+    # Delta-encoded HUD updates: last version applied per channel ({} to opt in); resync forces full snapshots.
+    ack: Dict[str, int] | None = None
+    resync: bool | None = None
 
 
 class EmitRequest(BaseModel):
@@ -49,10 +130,19 @@ class EmitRequest(BaseModel):
 
 class EventsRequest(BaseModel):
     session_id: str
+    ack: Dict[str, int] | None = None
+    resync: bool | None = None
+
+
+class ChainSuggestRequest(BaseModel):
+    session_id: str
+    top_k: int = 5
+    max_len: int | None = None
 
 
 class CharacterSelectRequest(BaseModel):
     character_id: str
+    player_id: str | None = None
 
 
 class CharacterCreateRequest(BaseModel):
@@ -61,12 +151,13 @@ class CharacterCreateRequest(BaseModel):
     rp_ability: str | None = None
     tier1_abilities: list[str] | None = None
     select: bool = True
+    player_id: str | None = None
 
 
 @app.get("/character")
-def get_character():
+def get_character(player_id: str | None = None):
     """
-    Return the default character payload (from disk if present).
+    Return the player's selected character payload (from the player store if present).
     """
     import play
 
@@ -111,7 +202,7 @@ def get_character():
 
     # Load the current profile + mutable state, then hydrate ability IDs into full objects.
     try:
-        payload = play.create_default_character()
+        payload = play.create_default_character(player_id)
     except Exception:
         payload = {}
     try:
@@ -126,48 +217,36 @@ def get_character():
 @app.get("/characters")
 def list_characters():
     """
-    List available character profiles (static) from `open-api-gm/characters/`.
+    List available character profiles (static) from the player store.
     """
-    root = Path(__file__).resolve().parent
-    chars_dir = root / "characters"
+    import play
+
     out = []
-    if chars_dir.exists():
-        for p in sorted(chars_dir.glob("*.json")):
-            try:
-                data = json.loads(p.read_text(encoding="utf-8"))
-                if not isinstance(data, dict):
-                    continue
-                out.append({
-                    "id": data.get("id") or p.stem,
-                    "name": data.get("name") or p.stem,
-                    "path": data.get("path"),
-                    "tier": data.get("tier"),
-                })
-            except Exception:
-                continue
+    try:
+        profiles = play.player_store().list_profiles()
+    except Exception:
+        profiles = []
+    for data in profiles:
+        out.append({
+            "id": data.get("id"),
+            "name": data.get("name") or data.get("id"),
+            "path": data.get("path"),
+            "tier": data.get("tier"),
+        })
     return out
 
 
 @app.post("/character/select")
 def select_character(req: CharacterSelectRequest):
     """
-    Select which profile `player_state.json` points at.
+    Select which profile the player's saved state points at.
     """
     import play
 
-    root = Path(__file__).resolve().parent
-    chars_dir = root / "characters"
-    target = chars_dir / f"{req.character_id}.json"
-    if not target.exists():
-        return {"ok": False, "error": f"Unknown character_id: {req.character_id}"}
-
     try:
-        state_path = play.PLAYER_STATE_PATH
-        state = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
-        if not isinstance(state, dict):
-            state = {}
-        state["character_id"] = req.character_id
-        state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        if not play.player_store().has_profile(req.character_id):
+            return {"ok": False, "error": f"Unknown character_id: {req.character_id}"}
+        play.player_store().set_character(req.player_id or play.DEFAULT_PLAYER_ID, req.character_id)
         return {"ok": True, "character_id": req.character_id}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -176,7 +255,7 @@ def select_character(req: CharacterSelectRequest):
 @app.post("/character/create")
 def create_character(req: CharacterCreateRequest):
     """
-    Create a new character profile on disk and optionally select it in `player_state.json`.
+    Create a new character profile in the player store and optionally select it for the player.
     This avoids needing to go through the in-game /step character creation loop.
     """
     import play
@@ -202,12 +281,9 @@ def create_character(req: CharacterCreateRequest):
 
     # Ensure unique character id.
     base_id = play._character_id_from_name(name)
-    root = Path(__file__).resolve().parent
-    chars_dir = root / "characters"
-    chars_dir.mkdir(parents=True, exist_ok=True)
     cid = base_id
     n = 2
-    while (chars_dir / f"{cid}.json").exists():
+    while play.player_store().has_profile(cid):
         cid = f"{base_id}_{n}"
         n += 1
     ch["id"] = cid
@@ -251,40 +327,57 @@ def create_character(req: CharacterCreateRequest):
     except Exception:
         pass
 
+    player_id = req.player_id or play.DEFAULT_PLAYER_ID
     try:
-        play.save_profile_and_state(ch)
+        if req.select:
+            play.save_profile_and_state(ch, player_id)
+        else:
+            # Keep the player's current run; only the new profile is stored.
+            play.player_store().save_profile(play.split_profile_and_state(ch)[0])
     except Exception as e:
         return {"ok": False, "error": f"Failed to save: {e}"}
 
     if req.select:
         try:
-            state_path = play.PLAYER_STATE_PATH
-            state = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
-            if not isinstance(state, dict):
-                state = {}
-            state["character_id"] = cid
-            state_path.write_text(json.dumps(state, indent=2), encoding="utf-8")
+            play.player_store().set_character(player_id, cid)
         except Exception as e:
             return {"ok": False, "error": f"Created but failed to select: {e}", "character_id": cid}
 
     return {"ok": True, "character_id": cid, "selected": bool(req.select)}
 
 
+def _sync_client_versions(session: GameSession, ack: Dict[str, int] | None, resync: bool | None) -> None:
+    differ = getattr(session, "deltas", None)
+    if differ is None:
+        return
+    if resync:
+        differ.reset()
+    elif ack is not None:
+        differ.ack(ack)
+
+
+def _emit_hud_snapshot(session: GameSession) -> list:
+    """Emit the current player sheet and enemy card into the session; returns the new events."""
+    import play
+
+    start = len(session.events)
+    ctx = getattr(getattr(session, "game", None), "context", None)
+    if isinstance(ctx, dict):
+        play.emit_hud_snapshot(ctx)
+    return session.events[start:]
+
+
 @app.post("/step")
 def step(req: StepRequest):
     # Starting a run should always rebuild the in-memory session so character selection
-    # (player_state.json.character_id) is reflected immediately without requiring a server restart.
-    if req.action in {"start"} and req.session_id in sessions:
-        sessions.pop(req.session_id, None)
-
-    if req.session_id not in sessions:
-        session = GameSession(None)
-        ui = WebProvider(session)
-        game = Game(ui)
-        session.game = game
-        sessions[req.session_id] = session
-
-    session = sessions[req.session_id]
+    # (the player's stored character_id) is reflected immediately without requiring a server restart.
+    if req.action in {"start"}:
+        sessions.discard(req.session_id)
+
+    session = sessions.get(req.session_id)
+    if session is None:
+        session = _new_session(req.player_id)
+        sessions.put(req.session_id, session)
     payload: Dict[str, Any] = {
         "action": req.action,
         "choice": req.choice,
@@ -296,30 +389,170 @@ def step(req: StepRequest):
         "rp_ability": req.rp_ability,
     }
     payload = {k: v for k, v in payload.items() if v is not None}
-    events = session.step(payload)
+    _sync_client_versions(session, req.ack, req.resync)
+    # Tag this step's narration.log lines with the session.
+    with log_tag(req.session_id[:12]):
+        events = session.step(payload)
+        if req.resync:
+            events = events + _emit_hud_snapshot(session)
+    sessions.save(req.session_id, session)
     return events
 
 
 @app.post("/emit")
 def emit(req: EmitRequest):
-    if req.session_id not in sessions:
-        session = GameSession(None)
-        ui = WebProvider(session)
-        game = Game(ui)
-        session.game = game
-        sessions[req.session_id] = session
-
-    session = sessions[req.session_id]
+    session = sessions.get(req.session_id)
+    if session is None:
+        session = _new_session()
+        sessions.put(req.session_id, session)
     payload = req.payload or {"type": req.type, "text": req.text}
     session.emit(payload)
+    sessions.save(req.session_id, session)
     return session.events
 
 
 @app.post("/events")
 def events(req: EventsRequest):
-    if req.session_id not in sessions:
+    session = sessions.get(req.session_id)
+    if session is None:
         return []
-    session = sessions[req.session_id]
+    _sync_client_versions(session, req.ack, req.resync)
+    if req.resync:
+        _emit_hud_snapshot(session)
     evs = session.events[:]
     session.events = []
+    drain = getattr(session, "drain_delivered", None)
+    if drain:
+        evs.extend(drain())
+    if evs:
+        sessions.save(req.session_id, session)
     return evs
+
+
+@app.post("/chain/suggest")
+def chain_suggest(req: ChainSuggestRequest):
+    """Top-k legal chains for this turn, by expected damage and break chance (engine/chain_optimizer.py)."""
+    session = sessions.get(req.session_id)
+    ctx = getattr(getattr(session, "game", None), "context", None)
+    state = ctx.get("state") if isinstance(ctx, dict) else None
+    if not isinstance(state, dict):
+        return {"ok": False, "error": "no session"}
+    return suggest_chains(state, top_k=req.top_k, max_len=req.max_len)
+
+
+# ─────────────────────────────────────────
+# Streaming events (SSE / WebSocket)
+# ─────────────────────────────────────────
+
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+def _session_or_new(session_id: str) -> GameSession:
+    session = sessions.get(session_id)
+    if session is None:
+        session = _new_session()
+        sessions.put(session_id, session)
+    return session
+
+
+async def _stream_session_events(session_id: str, cursor: int):
+    """
+    Yields ("event", seq, payload), ("gap", seq, info) or ("keepalive", cursor, None).
+    Follows the session across `start` (which replaces the session object) by
+    restarting from cursor 0 with a gap marker.
+    """
+    session = _session_or_new(session_id)
+    while True:
+        current = sessions.get(session_id)
+        if current is not None and current is not session:
+            session, cursor = current, 0
+            yield ("gap", 0, {"reason": "session_reset"})
+        ring = getattr(session, "stream", None)
+        if ring is None:
+            return
+        batch, gap = ring.since(cursor)
+        if gap:
+            yield ("gap", cursor, {"reason": "events_dropped", "oldest": batch[0][0] if batch else ring.last_seq})
+        for seq, event in batch:
+            cursor = seq
+            yield ("event", seq, event)
+        if not await ring.wait(cursor, timeout=STREAM_KEEPALIVE_SECONDS):
+            yield ("keepalive", cursor, None)
+
+
+@app.get("/events/stream")
+async def events_stream(session_id: str, request: Request, cursor: int | None = None):
+    """
+    Server-Sent Events. Each event carries `id: <seq>`; reconnecting browsers
+    resume from Last-Event-ID automatically (or pass ?cursor=).
+    """
+    if cursor is None:
+        try:
+            cursor = int(request.headers.get("last-event-id") or 0)
+        except ValueError:
+            cursor = 0
+
+    async def body():
+        async for kind, seq, payload in _stream_session_events(session_id, cursor):
+            if await request.is_disconnected():
+                break
+            if kind == "keepalive":
+                yield ": keepalive\n\n"
+            elif kind == "gap":
+                yield f"event: gap\ndata: {json.dumps(payload)}\n\n"
+            else:
+                yield f"id: {seq}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.websocket("/events/ws")
+async def events_ws(websocket: WebSocket, session_id: str, cursor: int = 0):
+    """WebSocket stream: messages are {"seq", "event"}, {"seq", "gap"} or {"seq", "keepalive"}; reconnect with ?cursor=<last seq>."""
+    await websocket.accept()
+    try:
+        async for kind, seq, payload in _stream_session_events(session_id, cursor):
+            if kind == "event":
+                await websocket.send_text(json.dumps({"seq": seq, "event": payload}, default=str))
+            elif kind == "gap":
+                await websocket.send_text(json.dumps({"seq": seq, "gap": payload}))
+            else:
+                await websocket.send_text(json.dumps({"seq": seq, "keepalive": True}))
+    except (WebSocketDisconnect, asyncio.CancelledError):
+        pass
+
+
+@app.get("/sessions/metrics")
+def session_metrics():
+    """Live session count, eviction/rehydration counters and approximate bytes per session."""
+    return sessions.metrics()
+
+
+@app.get("/players/metrics")
+def player_store_metrics():
+    """Write-behind saver counters: logical vs physical writes, flushes, bytes, write amplification."""
+    import play
+
+    return play.player_store().metrics()
+
+
+@app.get("/sessions/{session_id}/deltas")
+def session_delta_metrics(session_id: str):
+    """Delta encoder counters and current channel versions for one session."""
+    session = sessions.get(session_id)
+    differ = getattr(session, "deltas", None)
+    if differ is None:
+        return {}
+    return {"enabled": differ.enabled, "versions": differ.versions(), **differ.metrics()}
+
+
+@app.get("/logs/metrics")
+def log_writer_metrics():
+    """Background log writer counters per file: lines, batches, bytes, rotations, drops, queue depth."""
+    return log_metrics()
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Latency histograms (game loop phases, HTTP routes) in the Prometheus text format."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
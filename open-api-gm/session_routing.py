@@ -0,0 +1,184 @@
+"""
+session_routing.py
+------------------
+Consistent-hash routing of web sessions across several server workers.
+
+`server.py` workers share session state through `SqliteSessionStore`
+(VB_SESSION_STORE=sqlite), so any worker can serve any session; routing each
+`session_id` to the same worker keeps its session hot in that worker's
+memory. `HashRing` maps ids to workers with virtual nodes, so adding or
+removing a worker only moves the sessions on its arcs.
+
+`create_router(upstreams)` is a small ASGI front end for that: it reads the
+session id from the query string (`?session_id=`) or the JSON body, forwards
+the request to the worker owning it and streams the response back (SSE
+included). A worker that refuses connections is taken off the ring for
+`retry_after` seconds and its sessions fail over to the next worker, which
+loads them from the shared store.
+
+Not proxied: WebSocket upgrades (/events/ws). Clients behind the router use
+the SSE stream or /events.
+
+See tools/serve_workers.py for running a router plus N workers.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_VNODES = 160
+
+# Hop-by-hop headers (RFC 7230 6.1) plus the ones httpx recomputes.
+_SKIP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+    "transfer-encoding", "upgrade", "host", "content-length", "content-encoding",
+}
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str] = (), *, vnodes: int = DEFAULT_VNODES):
+        self.vnodes = max(1, int(vnodes))
+        self._lock = threading.Lock()
+        self._nodes: List[str] = []
+        self._keys: List[int] = []
+        self._owners: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def add(self, node: str) -> None:
+        with self._lock:
+            if node in self._nodes:
+                return
+            self._nodes.append(node)
+            self._rebuild()
+
+    def remove(self, node: str) -> None:
+        with self._lock:
+            if node not in self._nodes:
+                return
+            self._nodes.remove(node)
+            self._rebuild()
+
+    def node_for(self, key: str, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Owner of `key`: the first node clockwise of its hash (skipping `exclude`)."""
+        skip = set(exclude)
+        with self._lock:
+            if not self._keys:
+                return None
+            start = bisect.bisect(self._keys, _hash(str(key))) % len(self._keys)
+            for i in range(len(self._keys)):
+                owner = self._owners[(start + i) % len(self._keys)]
+                if owner not in skip:
+                    return owner
+            return None
+
+    def _rebuild(self) -> None:
+        points: List[Tuple[int, str]] = []
+        for node in self._nodes:
+            for i in range(self.vnodes):
+                points.append((_hash(f"{node}#{i}"), node))
+        points.sort()
+        self._keys = [p[0] for p in points]
+        self._owners = [p[1] for p in points]
+
+
+def session_id_of(query: Dict[str, str], body: bytes) -> Optional[str]:
+    """Routing key of a request: `?session_id=` or `session_id` in a JSON body."""
+    sid = query.get("session_id")
+    if sid:
+        return sid
+    if body[:1] == b"{":
+        try:
+            data = json.loads(body)
+        except Exception:
+            return None
+        if isinstance(data, dict) and data.get("session_id"):
+            return str(data["session_id"])
+    return None
+
+
+def create_router(
+    upstreams: List[str],
+    *,
+    vnodes: int = DEFAULT_VNODES,
+    retry_after: float = 5.0,
+    timeout: float = 60.0,
+    transport: Any = None,
+):
+    """ASGI app routing each session to one of `upstreams` (base URLs of server workers)."""
+    import httpx
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, Response, StreamingResponse
+    from starlette.routing import Route
+
+    ring = HashRing(upstreams, vnodes=vnodes)
+    down: Dict[str, float] = {}
+    counters = {"requests": 0, "failovers": 0, "unavailable": 0}
+    client = httpx.AsyncClient(timeout=httpx.Timeout(timeout, read=None), transport=transport)
+
+    def pick(key: str, tried: List[str]) -> Optional[str]:
+        now = time.monotonic()
+        skip = set(tried) | {u for u, until in down.items() if until > now}
+        return ring.node_for(key, exclude=skip) or ring.node_for(key, exclude=tried)
+
+    async def proxy(request: Request) -> Response:
+        if request.url.path == "/router/metrics":
+            now = time.monotonic()
+            return JSONResponse({**counters, "upstreams": ring.nodes, "down": [u for u, t in down.items() if t > now]})
+        body = await request.body()
+        key = session_id_of(dict(request.query_params), body) or request.url.path
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in _SKIP_HEADERS]
+        tried: List[str] = []
+        counters["requests"] += 1
+        while True:
+            upstream = pick(key, tried)
+            if upstream is None:
+                counters["unavailable"] += 1
+                return JSONResponse({"error": "no worker available"}, status_code=503)
+            url = upstream.rstrip("/") + request.url.path + (f"?{request.url.query}" if request.url.query else "")
+            try:
+                upstream_req = client.build_request(request.method, url, headers=headers, content=body)
+                resp = await client.send(upstream_req, stream=True)
+            except httpx.TransportError:
+                down[upstream] = time.monotonic() + retry_after
+                tried.append(upstream)
+                counters["failovers"] += 1
+                continue
+            down.pop(upstream, None)
+            out_headers = {k: v for k, v in resp.headers.items() if k.lower() not in _SKIP_HEADERS}
+            out_headers["x-vb-worker"] = upstream
+            return StreamingResponse(resp.aiter_raw(), status_code=resp.status_code, headers=out_headers, background=_Close(resp))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await client.aclose()
+
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"]
+    app = Starlette(routes=[Route("/{path:path}", proxy, methods=methods)], lifespan=lifespan)
+    app.state.ring = ring
+    return app
+
+
+class _Close:
+    """Starlette background task closing the upstream response after streaming."""
+
+    def __init__(self, resp: Any):
+        self.resp = resp
+
+    async def __call__(self) -> None:
+        await self.resp.aclose()
@@ -0,0 +1,602 @@
+"""
+session_store.py
+----------------
+Bounded storage for live web sessions.
+
+`server.py` used to keep every GameSession forever in a module-level dict.
+`SessionStore` caps the number of live sessions (LRU), drops sessions that
+have been idle longer than a TTL, and snapshots evicted sessions to disk so
+the next /step for that id rehydrates them transparently.
+
+Only the mutable game `state` (plus pending events) is persisted; shared
+game data, the UI provider and other runtime objects are rebuilt by the
+session factory on rehydrate.
+
+Snapshot contract (`snapshot_session` / `restore_session`): everything a
+worker needs to continue a session it has never seen --
+
+- `state`: the whole game state, including `awaiting` (the pending prompt),
+  `encounter.participants` (combat meters and statuses), `enemies` with their
+  `_spawn_rng` (random.Random state), the combat journal entries, flags and
+  `player_id`;
+- `started` / `combat`: whether the run started and a Combat driver is live;
+- `events`: events not yet drained by the client.
+
+Not carried over: the delta encoder (clients get full HUD snapshots again
+after their next ack), the streaming event ring (stream readers see a
+`session_reset` gap) and narration still in flight on the old worker.
+
+`SqliteSessionStore` keeps the snapshots in a database shared by several
+server workers (see session_routing.py), so a session can move between them.
+
+Retention: a stored snapshot whose session never comes back is pruned once
+it is older than `retention` seconds (default `RETENTION_TTLS` x idle TTL;
+0 keeps them forever). Both stores sweep on startup and then at most once per
+idle TTL, from the same pass that expires live sessions.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from engine.combat_journal import CombatJournal
+
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent / ".sessions"
+# Stored snapshots outlive their idle TTL by this factor before they are pruned.
+RETENTION_TTLS = 48
+_DEFAULT_RETENTION = 24 * 3600.0  # when sessions never expire from memory
+
+# State keys that are rebuilt from the live context instead of persisted.
+_RUNTIME_STATE_KEYS = {"game_data"}
+
+
+# ─────────────────────────────────────────
+# Snapshot encoding
+# ─────────────────────────────────────────
+
+def _encode(value: Any) -> Any:
+    """JSON-safe copy of state. Unknown runtime objects are dropped (returned as ...)."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            enc = _encode(v)
+            if enc is not Ellipsis:
+                out[str(k)] = enc
+        return out
+    if isinstance(value, (list, tuple)):
+        return [v for v in (_encode(x) for x in value) if v is not Ellipsis]
+    if isinstance(value, random.Random):
+        version, internal, gauss = value.getstate()
+        return {"__random__": [version, list(internal), gauss]}
+    to_dict = getattr(value, "to_dict", None)
+    if callable(to_dict):
+        # Compact runtime records (e.g. combat_state.Participant) persist in their dict form
+        # and are upgraded back on first access.
+        return _encode(to_dict())
+    return Ellipsis
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {"__random__"}:
+            version, internal, gauss = value["__random__"]
+            r = random.Random()
+            r.setstate((version, tuple(internal), gauss))
+            return r
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def snapshot_session(session: Any) -> Dict[str, Any]:
+    """Serializable snapshot of a GameSession (state + pending events)."""
+    game = getattr(session, "game", None)
+    ctx = getattr(game, "context", None) or {}
+    state = ctx.get("state", {}) if isinstance(ctx, dict) else {}
+    return {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "started": bool(getattr(game, "started", False)),
+        "combat": bool(ctx.get("combat")) if isinstance(ctx, dict) else False,
+        "state": _encode({k: v for k, v in state.items() if k not in _RUNTIME_STATE_KEYS}),
+        "events": _encode(list(getattr(session, "events", []) or [])),
+    }
+
+
+def restore_session(session: Any, snapshot: Dict[str, Any]) -> Any:
+    """Load a snapshot into a freshly built GameSession (from the session factory)."""
+    game = getattr(session, "game", None)
+    ctx = getattr(game, "context", None)
+    if not isinstance(ctx, dict) or not isinstance(snapshot, dict):
+        return session
+    state = _decode(snapshot.get("state") or {})
+    if not isinstance(state, dict):
+        return session
+    state["game_data"] = ctx.get("game_data")
+    fresh_log = (ctx.get("state") or {}).get("log")
+    if isinstance(fresh_log, CombatJournal):
+        # Re-index the retained entries under the session's retention settings.
+        state["log"] = fresh_log.with_entries(state.get("log") or [])
+    ctx["state"] = state
+    game.started = bool(snapshot.get("started", False))
+    if snapshot.get("combat"):
+        import play
+        from combat import Combat
+
+        ctx["combat"] = Combat(ctx, play.handle_chain_declaration, play.handle_chain_resolution, play.usable_ability_objects)
+    events = snapshot.get("events")
+    if isinstance(events, list):
+        session.events = events
+    return session
+
+
+# ─────────────────────────────────────────
+# Stores
+# ─────────────────────────────────────────
+
+def _retention(idle_ttl: float, retention: Optional[float]) -> float:
+    if retention is not None:
+        return max(0.0, float(retention))
+    return idle_ttl * RETENTION_TTLS if idle_ttl > 0 else _DEFAULT_RETENTION
+
+
+class SessionStore:
+    """
+    Interface for session storage. `get` may rehydrate an evicted session;
+    `discard` forgets a session everywhere (memory and disk).
+    """
+
+    def get(self, session_id: str) -> Any:
+        raise NotImplementedError
+
+    def put(self, session_id: str, session: Any) -> None:
+        raise NotImplementedError
+
+    def discard(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def save(self, session_id: str, session: Any) -> None:
+        """Persist a session after a request changed it (no-op for in-process stores)."""
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+
+class LRUSessionStore(SessionStore):
+    """
+    In-process store with an LRU cap and idle TTL. Evicted sessions are
+    written to `snapshot_dir` and rebuilt via `factory()` + `restore_session`
+    on the next access. `on_evict(session_id, session)` runs before each
+    eviction snapshot (e.g. to flush buffered saves). Snapshot files older
+    than `retention` seconds are deleted.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        *,
+        max_sessions: int = 500,
+        idle_ttl: float = 1800.0,
+        snapshot_dir: Optional[Path] = DEFAULT_SNAPSHOT_DIR,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str, Any], None]] = None,
+        retention: Optional[float] = None,
+    ):
+        self.factory = factory
+        self.on_evict = on_evict
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_ttl = float(idle_ttl) if idle_ttl else 0.0
+        self.retention = _retention(self.idle_ttl, retention)
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._live: "OrderedDict[str, tuple[Any, float]]" = OrderedDict()
+        self._counters = {
+            "evictions_lru": 0,
+            "evictions_ttl": 0,
+            "snapshots_written": 0,
+            "snapshot_errors": 0,
+            "snapshots_pruned": 0,
+            "rehydrations": 0,
+            "last_snapshot_bytes": 0,
+        }
+        self._next_sweep = 0.0
+        self.prune()
+
+    # -- public ------------------------------------------------------------
+
+    def get(self, session_id: str) -> Any:
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            entry = self._live.get(session_id)
+            if entry is not None:
+                self._live[session_id] = (entry[0], now)
+                self._live.move_to_end(session_id)
+                return entry[0]
+            session = self._rehydrate(session_id)
+            if session is not None:
+                self._insert(session_id, session, now)
+            return session
+
+    def put(self, session_id: str, session: Any) -> None:
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            self._insert(session_id, session, now)
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._live.pop(session_id, None)
+            path = self._path(session_id)
+            if path is not None:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def prune(self) -> int:
+        """Delete snapshot files older than `retention`; returns how many went."""
+        if self.snapshot_dir is None or self.retention <= 0:
+            return 0
+        now = time.time()
+        cutoff = now - self.retention
+        pruned = 0
+        with self._lock:
+            self._next_sweep = now + (self.idle_ttl or self.retention)
+            try:
+                paths = list(self.snapshot_dir.glob("*.json"))
+            except OSError:
+                return 0
+            for path in paths:
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        pruned += 1
+                except OSError:
+                    continue
+            self._counters["snapshots_pruned"] += pruned
+        return pruned
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = []
+            for session, _ in self._live.values():
+                try:
+                    sizes.append(len(json.dumps(snapshot_session(session))))
+                except Exception:
+                    continue
+            out = dict(self._counters)
+            out.update({
+                "live_sessions": len(self._live),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl,
+                "bytes_total": sum(sizes),
+                "bytes_per_session_avg": int(sum(sizes) / len(sizes)) if sizes else 0,
+                "bytes_per_session_max": max(sizes) if sizes else 0,
+            })
+            return out
+
+    # -- internals -----------------------------------------------------------
+
+    def _insert(self, session_id: str, session: Any, now: float) -> None:
+        self._live[session_id] = (session, now)
+        self._live.move_to_end(session_id)
+        while len(self._live) > self.max_sessions:
+            old_id, (old_session, _) = self._live.popitem(last=False)
+            self._counters["evictions_lru"] += 1
+            self._snapshot(old_id, old_session)
+
+    def _expire(self, now: float) -> None:
+        if self.retention > 0 and time.time() >= self._next_sweep:
+            self.prune()
+        if self.idle_ttl <= 0:
+            return
+        while self._live:
+            old_id, (old_session, last_seen) = next(iter(self._live.items()))
+            if now - last_seen < self.idle_ttl:
+                break
+            self._live.popitem(last=False)
+            self._counters["evictions_ttl"] += 1
+            self._snapshot(old_id, old_session)
+
+    def _path(self, session_id: str) -> Optional[Path]:
+        if self.snapshot_dir is None:
+            return None
+        digest = hashlib.sha1(str(session_id).encode("utf-8")).hexdigest()
+        return self.snapshot_dir / f"{digest}.json"
+
+    def _snapshot(self, session_id: str, session: Any) -> None:
+        if self.on_evict is not None:
+            try:
+                self.on_evict(session_id, session)
+            except Exception:
+                pass
+        path = self._path(session_id)
+        if path is None:
+            return
+        try:
+            blob = json.dumps({"session_id": session_id, **snapshot_session(session)})
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(blob, encoding="utf-8")
+            os.replace(tmp, path)
+            self._counters["snapshots_written"] += 1
+            self._counters["last_snapshot_bytes"] = len(blob)
+        except Exception:
+            # Never break a request because a snapshot could not be written.
+            self._counters["snapshot_errors"] += 1
+
+    def _rehydrate(self, session_id: str) -> Any:
+        path = self._path(session_id)
+        if path is None or not path.exists():
+            return None
+        try:
+            snap = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+        if not isinstance(snap, dict) or snap.get("session_id") != session_id:
+            return None
+        session = restore_session(self.factory(), snap)
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        self._counters["rehydrations"] += 1
+        return session
+
+
+_SESSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    worker TEXT,
+    updated_at REAL NOT NULL,
+    snapshot BLOB NOT NULL
+);
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Sessions shared by every worker pointed at the same database.
+
+    Each worker keeps the sessions it served recently in memory (LRU, idle
+    TTL), tagged with the row `version` they were loaded or saved at.
+    `save()` writes the snapshot after every request that changed the
+    session and bumps the version. `get()` compares the cached version with
+    the row: when another worker has moved the session on, the cached copy
+    is dropped and rebuilt from the newer snapshot.
+
+    Routing sessions sticky to one worker keeps that check a cache hit; it is
+    still correct (just slower) without sticky routing. Two workers stepping
+    the same session at the same instant is not serialized: the last save
+    wins and is counted as a conflict. Rows not saved for `retention`
+    seconds are deleted.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        path: Path | str,
+        *,
+        worker: Optional[str] = None,
+        max_sessions: int = 500,
+        idle_ttl: float = 1800.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[str, Any], None]] = None,
+        retention: Optional[float] = None,
+    ):
+        self.factory = factory
+        self.path = Path(path)
+        self.worker = worker or f"pid-{os.getpid()}"
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_ttl = float(idle_ttl) if idle_ttl else 0.0
+        self.retention = _retention(self.idle_ttl, retention)
+        self.clock = clock
+        self.on_evict = on_evict
+        self._lock = threading.RLock()
+        # session_id -> (session, row version, last seen)
+        self._live: "OrderedDict[str, tuple[Any, int, float]]" = OrderedDict()
+        self._counters = {
+            "saves": 0,
+            "save_errors": 0,
+            "conflicts": 0,
+            "loads": 0,
+            "moved_in": 0,
+            "evictions_lru": 0,
+            "evictions_ttl": 0,
+            "rows_pruned": 0,
+            "last_snapshot_bytes": 0,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SESSIONS_SCHEMA)
+        self._next_sweep = 0.0
+        self.prune()
+
+    # -- public ------------------------------------------------------------
+
+    def get(self, session_id: str) -> Any:
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            row = self._conn.execute(
+                "SELECT version, worker FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            entry = self._live.get(session_id)
+            # Version 0: never saved (e.g. a failed write); keep serving the live copy.
+            if entry is not None and ((row is None and entry[1] == 0) or (row is not None and row[0] == entry[1])):
+                self._live[session_id] = (entry[0], entry[1], now)
+                self._live.move_to_end(session_id)
+                return entry[0]
+            if row is None:
+                # Discarded by another worker.
+                self._live.pop(session_id, None)
+                return None
+            session = self._load(session_id)
+            if session is None:
+                return None
+            session, version = session
+            if row[1] != self.worker:
+                self._counters["moved_in"] += 1
+            self._insert(session_id, session, version, now)
+            return session
+
+    def put(self, session_id: str, session: Any) -> None:
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            entry = self._live.get(session_id)
+            self._insert(session_id, session, entry[1] if entry else 0, now)
+            self.save(session_id, session)
+
+    def save(self, session_id: str, session: Any) -> None:
+        with self._lock:
+            entry = self._live.get(session_id)
+            expected = entry[1] if entry is not None and entry[0] is session else 0
+            try:
+                blob = zlib.compress(json.dumps(snapshot_session(session)).encode("utf-8"), 1)
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+                    current = row[0] if row else 0
+                    if current != expected:
+                        # Someone else saved this session since we loaded it; ours wins.
+                        self._counters["conflicts"] += 1
+                    version = current + 1
+                    self._conn.execute(
+                        "INSERT INTO sessions (session_id, version, worker, updated_at, snapshot) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(session_id) DO UPDATE SET version = excluded.version, worker = excluded.worker, "
+                        "updated_at = excluded.updated_at, snapshot = excluded.snapshot",
+                        (session_id, version, self.worker, time.time(), blob),
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            except Exception:
+                # Never break a request because a snapshot could not be written.
+                self._counters["save_errors"] += 1
+                return
+            self._counters["saves"] += 1
+            self._counters["last_snapshot_bytes"] = len(blob)
+            if entry is not None and entry[0] is session:
+                self._live[session_id] = (session, version, entry[2])
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._live.pop(session_id, None)
+            try:
+                self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            except Exception:
+                pass
+
+    def prune(self) -> int:
+        """Delete rows not saved for `retention` seconds; returns how many went."""
+        if self.retention <= 0:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._next_sweep = now + (self.idle_ttl or self.retention)
+            try:
+                pruned = self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.retention,)).rowcount
+            except Exception:
+                return 0
+            self._counters["rows_pruned"] += max(0, pruned)
+            return max(0, pruned)
+
+    def version(self, session_id: str) -> int:
+        """Row version of a session's latest snapshot (0 when it has none)."""
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            return int(row[0]) if row else 0
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stored, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(snapshot)), 0) FROM sessions").fetchone()
+            out = dict(self._counters)
+            out.update({
+                "worker": self.worker,
+                "live_sessions": len(self._live),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl,
+                "stored_sessions": stored,
+                "stored_bytes": total,
+            })
+            return out
+
+    # -- internals -----------------------------------------------------------
+
+    def _load(self, session_id: str) -> Optional[tuple]:
+        row = self._conn.execute("SELECT version, snapshot FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        try:
+            snap = json.loads(zlib.decompress(row[1]).decode("utf-8"))
+        except Exception:
+            return None
+        self._counters["loads"] += 1
+        return restore_session(self.factory(), snap), int(row[0])
+
+    def _insert(self, session_id: str, session: Any, version: int, now: float) -> None:
+        self._live[session_id] = (session, version, now)
+        self._live.move_to_end(session_id)
+        while len(self._live) > self.max_sessions:
+            old_id, (old_session, _, _) = self._live.popitem(last=False)
+            self._counters["evictions_lru"] += 1
+            self._evicted(old_id, old_session)
+
+    def _expire(self, now: float) -> None:
+        if self.retention > 0 and time.time() >= self._next_sweep:
+            self.prune()
+        if self.idle_ttl <= 0:
+            return
+        while self._live:
+            old_id, (old_session, _, last_seen) = next(iter(self._live.items()))
+            if now - last_seen < self.idle_ttl:
+                break
+            self._live.popitem(last=False)
+            self._counters["evictions_ttl"] += 1
+            self._evicted(old_id, old_session)
+
+    def _evicted(self, session_id: str, session: Any) -> None:
+        # The database already has the latest snapshot; only the hook runs.
+        if self.on_evict is not None:
+            try:
+                self.on_evict(session_id, session)
+            except Exception:
+                pass
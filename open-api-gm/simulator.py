@@ -0,0 +1,403 @@
+"""
+simulator.py
+------------
+Headless Monte Carlo combat simulator.
+
+Runs seeded player-vs-enemy encounters straight through the combat engine
+(ChainResolutionEngine, apply_action_effects, plan_enemy_turn, round_upkeep)
+with no UI provider, web session or narration, and aggregates balance metrics
+per (character build, bestiary entry).
+
+Library use:
+    from simulator import run_batch
+    report = run_batch(n=2000, seed=7, workers=4)
+
+CLI: see tools/simulate.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import play
+from engine.action_resolution import apply_action_effects, resolve_action_step, roll
+from engine.chain_resolution_engine import ChainResolutionEngine, _is_primed
+from engine.chain_rules import declare_chain
+from engine.combat_state import combat_get, combat_set, register_participant
+from engine.enemy_instance import spawn_enemy
+from engine.interrupt_controller import apply_interrupt
+from engine.interrupt_policy import EnemyWindowPolicy, PlayerPromptPolicy
+from engine.rng import bind as bind_rng, start_encounter_rng
+from ui.events import set_debug_log_enabled
+
+
+@dataclass
+class SimConfig:
+    max_rounds: int = 30
+    chain_len: int = 3
+    # Chance the simulated player takes an offered interrupt window during enemy chains.
+    player_interrupt_rate: float = 0.0
+    # Declare EXECUTE whenever the enemy is Primed at chain declaration.
+    use_execute: bool = True
+    # Dice pre-rolled per vectorized block (engine.rng); 0 rolls one die at a time.
+    dice_block: int = 0
+
+
+class HeadlessUI:
+    """
+    Minimal stand-in for `ui.UI`: swallows output and answers prompts itself.
+    Blocking, so the engine never pauses for press/execute windows.
+    """
+
+    is_blocking = True
+
+    def __init__(self, rng: random.Random, interrupt_rate: float = 0.0):
+        self.rng = rng
+        self.interrupt_rate = float(interrupt_rate or 0.0)
+
+    def system(self, text: str, data: Any = None) -> None:
+        pass
+
+    scene = narration = loot = error = system
+
+    def clear(self, target: str = "narration") -> None:
+        pass
+
+    def text_input(self, prompt: str, data: Any = None) -> str:
+        return ""
+
+    def choice(self, prompt: str, options: List[str], data: Any = None) -> int:
+        if prompt.startswith("Interrupt") and len(options) > 1:
+            return 1 if self.rng.random() < self.interrupt_rate else 0
+        return 0
+
+
+class _CountingPolicy:
+    """Wraps an interrupt policy and counts attempted interrupts."""
+
+    def __init__(self, inner, counts: Dict[str, int], key: str):
+        self.inner = inner
+        self.counts = counts
+        self.key = key
+
+    def decide(self, when, ctx, state=None, ui=None):
+        decision = self.inner.decide(when, ctx, state, ui)
+        if getattr(decision, "kind", None) == "attempt":
+            self.counts[self.key] = self.counts.get(self.key, 0) + 1
+        return decision
+
+
+# ─────────────────────────────────────────
+# Inputs
+# ─────────────────────────────────────────
+
+def derive_seed(base_seed: int, *parts: Any) -> int:
+    """Stable per-encounter seed (independent of worker, process or PYTHONHASHSEED)."""
+    h = hashlib.sha256(repr((int(base_seed),) + tuple(str(p) for p in parts)).encode("utf-8"))
+    return int.from_bytes(h.digest()[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+
+def load_builds(paths: Optional[Iterable[Path]] = None) -> Dict[str, dict]:
+    """Character builds keyed by id (default: every profile in `characters/`)."""
+    if paths is None:
+        paths = sorted(play.CHARACTERS_DIR.glob("*.json"))
+    builds: Dict[str, dict] = {}
+    for p in paths:
+        try:
+            data = json.loads(Path(p).read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(data, dict):
+            builds[str(data.get("id") or Path(p).stem)] = data
+    return builds
+
+
+def bestiary_ids(game_data: dict) -> List[str]:
+    enemy_by_id = game_data.get("enemy_by_id", {}) if isinstance(game_data, dict) else {}
+    return sorted(enemy_by_id.keys()) if isinstance(enemy_by_id, dict) else []
+
+
+def _build_character(profile: dict, game_data: dict) -> dict:
+    ch = play._create_draft_character(path_id=profile.get("path"))
+    for key in ("id", "name", "path", "tier", "attributes", "marks"):
+        if key in profile:
+            ch[key] = deepcopy(profile[key])
+    ch["abilities"] = list(profile.get("abilities", []))
+    if isinstance(profile.get("resources"), dict):
+        ch["resources"].update(profile["resources"])
+    ch["resources"]["hp"] = ch["resources"].get("hp_max", ch["resources"].get("hp", 28))
+    ch["chain"] = {"declared": False, "abilities": [], "resolve_spent": 0, "stable": False, "invalidated": False}
+    play.hydrate_character_abilities(ch, game_data)
+    return ch
+
+
+def _spawn_enemy(enemy_id: str, game_data: dict, seed: int) -> dict:
+    template = game_data.get("enemy_by_id", {}).get(enemy_id)
+    inst = spawn_enemy(template, enemy_id)
+    r = random.Random()
+    r.seed(f"{seed}|sim|{enemy_id}")
+    inst["_spawn_rng"] = r
+    return play._prime_enemy_for_combat(inst)
+
+
+# ─────────────────────────────────────────
+# One encounter
+# ─────────────────────────────────────────
+
+def _hp(entity: dict) -> int:
+    res = entity.get("resources") if isinstance(entity.get("resources"), dict) else {}
+    hp = res.get("hp") if res.get("hp") is not None else entity.get("hp")
+    if isinstance(hp, dict):
+        hp = hp.get("current", 0)
+    try:
+        return int(hp or 0)
+    except Exception:
+        return 0
+
+
+def _choose_player_chain(state: dict, player: dict, enemy: dict, config: SimConfig) -> bool:
+    """Greedy build: usable attacks first, then anything else; shrink until the chain validates."""
+    usable = [a for a in player.get("abilities", []) if isinstance(a, dict) and int(a.get("cooldown", 0) or 0) == 0]
+    usable.sort(key=lambda a: 0 if str(a.get("type") or "").lower() == "attack" else 1)
+    names = [a.get("name") for a in usable if a.get("name")][: max(0, int(config.chain_len))]
+    execute = bool(config.use_execute and _is_primed(state, enemy))
+
+    res = player.setdefault("resources", {})
+    res["resolve"] = int(combat_get(state, player, "rp", int(res.get("resolve", 0) or 0)))
+    res["resolve_cap"] = int(combat_get(state, player, "rp_cap", int(res.get("resolve_cap", 0) or 0)))
+    while names:
+        ok, _resp = declare_chain(state, player, names, resolve_spent=0, stabilize=False, execute=execute)
+        if ok:
+            combat_set(state, player, "rp", int(res.get("resolve", 0) or 0))
+            for ability in player.get("abilities", []):
+                if ability.get("name") in names:
+                    cd = ability.get("base_cooldown", ability.get("cooldown", 0) or 0)
+                    ability["base_cooldown"] = cd
+                    ability["cooldown"] = cd
+            return True
+        names = names[:-1]
+    return False
+
+
+def _resolve(cre, state, ui, aggressor, defender, names, group):
+    state.pop("_chain_attack_d20", None)
+    state.pop("_chain_attack_total", None)
+    state.pop("_chain_needs_roll", None)
+    result = cre.resolve_chain(
+        state=state,
+        ui=ui,
+        aggressor=aggressor,
+        defender=defender,
+        chain_ability_names=names,
+        defender_group=group,
+        dv_mode="per_chain",
+        start_index=0,
+    )
+    combat_set(state, aggressor, "balance", 0)
+    aggressor["chain"] = {"abilities": [], "declared": False}
+    return result
+
+
+def simulate_encounter(
+    build: dict,
+    enemy_id: str,
+    seed: int,
+    *,
+    game_data: Optional[dict] = None,
+    config: Optional[SimConfig] = None,
+) -> Dict[str, Any]:
+    """Run one fight to completion (or `max_rounds`) and return its metrics."""
+    config = config or SimConfig()
+    game_data = game_data if game_data is not None else play.load_game_data()
+    # Every draw comes from the encounter RNG (bound below) or the seeded spawn RNG;
+    # the module-level `random` is left alone so in-process callers keep their stream.
+    state = play.initial_state()
+    state["seed"] = seed
+    state["flags"] = {"narration_enabled": False}
+    state["game_data"] = game_data
+    player = state["party"]["members"][0]
+    player.update(_build_character(build, game_data))
+    enemy = _spawn_enemy(enemy_id, game_data, seed)
+    state["enemies"] = [enemy]
+
+    register_participant(state, key="player", entity=player, side="player")
+    register_participant(state, key="enemy0", entity=enemy, side="enemy")
+    play.reset_encounter_meters(state, player=player, enemy=enemy, reset_rp=True)
+    enc_rng = start_encounter_rng(state, block_size=config.dice_block)
+    ui = HeadlessUI(enc_rng.stream("ai"), config.player_interrupt_rate)
+
+    counts: Dict[str, int] = {}
+    kw = dict(
+        roll_fn=roll,
+        resolve_action_step_fn=resolve_action_step,
+        apply_action_effects_fn=apply_action_effects,
+        emit_log_fn=None,
+        interrupt_apply_fn=apply_interrupt,
+        rng=enc_rng,
+    )
+    player_cre = ChainResolutionEngine(interrupt_policy=_CountingPolicy(EnemyWindowPolicy(enc_rng.stream("interrupt")), counts, "enemy_attempts"), **kw)
+    enemy_cre = ChainResolutionEngine(interrupt_policy=_CountingPolicy(PlayerPromptPolicy(), counts, "player_attempts"), **kw)
+
+    hp_player_start = _hp(player)
+    hp_enemy_start = _hp(enemy)
+    enemy_breaks = player_breaks = 0
+    rounds = 0
+    with bind_rng(state):
+        while rounds < config.max_rounds and not state.get("combat_over"):
+            rounds += 1
+            state["phase"]["round"] = rounds
+            state["phase"]["current"] = "chain_declaration"
+            play.round_upkeep(state)
+
+            state["active_combatant"] = "player"
+            if _choose_player_chain(state, player, enemy, config):
+                state["phase"]["current"] = "chain_resolution"
+                result = _resolve(player_cre, state, ui, player, enemy, list(player["chain"]["abilities"]), [enemy])
+                if str(result.break_reason).startswith("interrupt"):
+                    enemy_breaks += 1
+            if state.get("combat_over") or _hp(enemy) <= 0:
+                break
+
+            state["active_combatant"] = "enemy"
+            # Same selection as the live enemy turn: behavior script lead, planner for the rest.
+            chain = [mv.get("name") or mv.get("id") for mv in play.plan_enemy_turn(enemy, state)]
+            if chain:
+                result = _resolve(enemy_cre, state, ui, enemy, player, chain, [player])
+                if str(result.break_reason).startswith("interrupt"):
+                    player_breaks += 1
+            if state.get("combat_over") or _hp(player) <= 0:
+                break
+
+    hp_player_end = max(0, _hp(player))
+    hp_enemy_end = max(0, _hp(enemy))
+    won = hp_enemy_end <= 0 and hp_player_end > 0
+    return {
+        "build": str(build.get("id") or build.get("name")),
+        "enemy": enemy_id,
+        "seed": seed,
+        "outcome": "win" if won else ("loss" if hp_player_end <= 0 else "timeout"),
+        "rounds": rounds,
+        "damage_dealt": max(0, hp_enemy_start - hp_enemy_end),
+        "damage_taken": max(0, hp_player_start - hp_player_end),
+        "enemy_interrupt_attempts": counts.get("enemy_attempts", 0),
+        "enemy_interrupt_breaks": enemy_breaks,
+        "player_interrupt_attempts": counts.get("player_attempts", 0),
+        "player_interrupt_breaks": player_breaks,
+    }
+
+
+# ─────────────────────────────────────────
+# Batches
+# ─────────────────────────────────────────
+
+def _run_chunk(task: tuple) -> List[Dict[str, Any]]:
+    build, enemy_id, base_seed, start, count, config_dict = task
+    set_debug_log_enabled(False)
+    game_data = play.load_game_data()
+    config = SimConfig(**config_dict)
+    bid = str(build.get("id") or build.get("name"))
+    out = []
+    for i in range(start, start + count):
+        seed = derive_seed(base_seed, bid, enemy_id, i)
+        out.append(simulate_encounter(build, enemy_id, seed, game_data=game_data, config=config))
+    return out
+
+
+def _percentile(sorted_vals: List[float], pct: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * pct
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return float(sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo))
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    vals = sorted(values)
+    if not vals:
+        return {"mean": 0.0, "p10": 0.0, "p50": 0.0, "p90": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(vals) / len(vals), 3),
+        "p10": _percentile(vals, 0.10),
+        "p50": _percentile(vals, 0.50),
+        "p90": _percentile(vals, 0.90),
+        "max": float(vals[-1]),
+    }
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Aggregate encounter results per "build|enemy" pair."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for r in results:
+        groups.setdefault(f"{r['build']}|{r['enemy']}", []).append(r)
+    out: Dict[str, Dict[str, Any]] = {}
+    for key in sorted(groups):
+        rows = groups[key]
+        n = len(rows)
+        wins = [r for r in rows if r["outcome"] == "win"]
+        total_rounds = sum(r["rounds"] for r in rows) or 1
+        out[key] = {
+            "build": rows[0]["build"],
+            "enemy": rows[0]["enemy"],
+            "encounters": n,
+            "win_rate": round(len(wins) / n, 4),
+            "loss_rate": round(sum(1 for r in rows if r["outcome"] == "loss") / n, 4),
+            "timeout_rate": round(sum(1 for r in rows if r["outcome"] == "timeout") / n, 4),
+            "rounds_to_kill": _distribution([r["rounds"] for r in wins]),
+            "damage_dealt": _distribution([r["damage_dealt"] for r in rows]),
+            "damage_taken": _distribution([r["damage_taken"] for r in rows]),
+            "enemy_interrupts_per_round": round(sum(r["enemy_interrupt_attempts"] for r in rows) / total_rounds, 4),
+            "enemy_interrupt_break_rate": round(sum(r["enemy_interrupt_breaks"] for r in rows) / total_rounds, 4),
+            "player_interrupts_per_round": round(sum(r["player_interrupt_attempts"] for r in rows) / total_rounds, 4),
+        }
+    return out
+
+
+def run_batch(
+    builds: Optional[Dict[str, dict]] = None,
+    enemy_ids: Optional[List[str]] = None,
+    n: int = 1000,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    config: Optional[SimConfig] = None,
+    chunk_size: int = 250,
+) -> Dict[str, Any]:
+    """
+    Run `n` encounters for every (build, enemy) pair and return
+    {"config": ..., "summary": {...}}. Results are identical for any worker count.
+    """
+    config = config or SimConfig()
+    builds = builds if builds is not None else load_builds()
+    if enemy_ids is None:
+        enemy_ids = bestiary_ids(play.load_game_data())
+    chunk_size = max(1, int(chunk_size))
+    tasks = []
+    for build in builds.values():
+        for enemy_id in enemy_ids:
+            for start in range(0, n, chunk_size):
+                tasks.append((build, enemy_id, seed, start, min(chunk_size, n - start), asdict(config)))
+
+    results: List[Dict[str, Any]] = []
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1 or len(tasks) <= 1:
+        try:
+            for task in tasks:
+                results.extend(_run_chunk(task))
+        finally:
+            set_debug_log_enabled(True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_run_chunk, tasks):
+                results.extend(chunk)
+
+    return {
+        "config": {"n": n, "seed": seed, "builds": list(builds), "enemies": list(enemy_ids), **asdict(config)},
+        "summary": summarize(results),
+    }
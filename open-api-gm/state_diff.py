@@ -0,0 +1,153 @@
+"""
+state_diff.py
+-------------
+Per-session delta encoding for the HUD updates (`character_update`,
+`enemy_update`).
+
+The web UI used to receive the full player sheet and the full enemy card on
+every update, several times per /step, even when one meter changed. A
+`StateDiffer` (one per GameSession) remembers the last snapshot sent on each
+channel and its version:
+
+- first update on a channel (connect, rehydrated session, resync): full
+  snapshot, `{"type": ..., "<key>": {...}, "version": n}`;
+- later updates: `{"type": ..., "version": n, "base": n - 1, "patch": [...]}`
+  with JSON-patch (RFC 6902) `add` / `remove` / `replace` operations;
+- unchanged snapshots are not sent at all.
+
+Clients opt in by sending `ack` (channel -> last version they applied) with
+/step or /events; sessions that never do keep getting full legacy events.
+An ack that does not match what the server last sent (lost events, reload)
+drops that channel, so its next update is a full snapshot again; `resync`
+drops them all.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Tuple
+
+Patch = List[Dict[str, Any]]
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: Any, new: Any, path: str = "") -> Patch:
+    """JSON-patch operations turning `old` into `new` (lists of different length are replaced whole)."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: Patch = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            sub = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": sub, "value": value})
+            else:
+                ops.extend(diff(old[key], value, sub))
+        return ops
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            ops.extend(diff(a, b, f"{path}/{i}"))
+        return ops
+    if type(old) is not type(new) or old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(doc: Any, ops: Patch) -> Any:
+    """Apply `diff` output to a copy of `doc` (reference implementation for clients and tests)."""
+    doc = deepcopy(doc)
+    for op in ops:
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        if not tokens:
+            doc = deepcopy(op.get("value"))
+            continue
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            idx = len(parent) if last == "-" else int(last)
+            if op["op"] == "remove":
+                parent.pop(idx)
+            elif op["op"] == "add":
+                parent.insert(idx, deepcopy(op["value"]))
+            else:
+                parent[idx] = deepcopy(op["value"])
+        elif op["op"] == "remove":
+            parent.pop(last, None)
+        else:
+            parent[last] = deepcopy(op["value"])
+    return doc
+
+
+class StateDiffer:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # channel -> (version, last snapshot sent, normalized through JSON)
+        self._channels: Dict[str, Tuple[int, Any]] = {}
+        self._counters = {"full": 0, "deltas": 0, "skipped": 0, "full_bytes": 0, "delta_bytes": 0, "resyncs": 0}
+
+    def encode(self, channel: str, snapshot: Any) -> Optional[Dict[str, Any]]:
+        """
+        {"version", "full"} for a first/resynced channel, {"version", "base", "patch"}
+        for a change, or None when nothing changed.
+        """
+        blob = json.dumps(snapshot, default=str)
+        snap = json.loads(blob)
+        with self._lock:
+            prev = self._channels.get(channel)
+            if prev is None:
+                self._channels[channel] = (1, snap)
+                self._counters["full"] += 1
+                self._counters["full_bytes"] += len(blob)
+                return {"version": 1, "full": snap}
+            version, old = prev
+            ops = diff(old, snap)
+            if not ops:
+                self._counters["skipped"] += 1
+                return None
+            self._channels[channel] = (version + 1, snap)
+            self._counters["deltas"] += 1
+            self._counters["delta_bytes"] += len(json.dumps(ops, default=str))
+            return {"version": version + 1, "base": version, "patch": ops}
+
+    def ack(self, versions: Dict[str, Any]) -> None:
+        """Client-applied versions; channels the client is not in step with restart from a full snapshot."""
+        with self._lock:
+            self.enabled = True
+            for channel, version in (versions or {}).items():
+                cur = self._channels.get(channel)
+                try:
+                    ok = cur is not None and int(version) == cur[0]
+                except Exception:
+                    ok = False
+                if not ok and cur is not None:
+                    del self._channels[channel]
+                    self._counters["resyncs"] += 1
+
+    def reset(self) -> None:
+        """Forget every channel: the next update on each is a full snapshot."""
+        with self._lock:
+            self.enabled = True
+            if self._channels:
+                self._counters["resyncs"] += 1
+            self._channels.clear()
+
+    def versions(self) -> Dict[str, int]:
+        with self._lock:
+            return {k: v[0] for k, v in self._channels.items()}
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._counters)
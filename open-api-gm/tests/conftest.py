@@ -0,0 +1,6 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Keep the suite's log lines out of the tracked narration.log (read when play / ui.events are imported).
+os.environ.setdefault("VB_NARRATION_LOG", str(Path(tempfile.mkdtemp(prefix="vb-tests-")) / "narration.log"))
@@ -0,0 +1,57 @@
+import json
+import sys
+from copy import deepcopy
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.action_index import action_index, lookup_action  # noqa: E402
+
+
+class TestActionIndex(unittest.TestCase):
+    def test_lookup_by_name_and_id_prefers_abilities(self):
+        strike = {"id": "core.basic_strike", "name": "Basic Strike"}
+        move = {"id": "move.strike", "name": "Basic Strike"}
+        bite = {"id": "move.bite", "name": "Bite"}
+        entity = {"abilities": [strike], "moves": [move, bite]}
+        self.assertIs(lookup_action(entity, "Basic Strike"), strike)
+        self.assertIs(lookup_action(entity, "core.basic_strike"), strike)
+        self.assertIs(lookup_action(entity, "move.strike"), move)
+        self.assertIs(lookup_action(entity, "Bite"), bite)
+        self.assertIsNone(lookup_action(entity, "missing"))
+
+    def test_index_is_reused_until_list_changes(self):
+        entity = {"abilities": [{"id": "a", "name": "A"}]}
+        first = action_index(entity)
+        self.assertIs(action_index(entity), first)
+
+        entity["abilities"].append({"id": "b", "name": "B"})
+        self.assertIsNot(action_index(entity), first)
+        self.assertEqual(lookup_action(entity, "B")["id"], "b")
+
+        entity["abilities"][0] = {"id": "z", "name": "Z"}
+        self.assertIsNone(lookup_action(entity, "a"))
+        self.assertEqual(lookup_action(entity, "Z")["id"], "z")
+
+        entity["abilities"] = [{"id": "c", "name": "C"}]
+        self.assertIsNone(lookup_action(entity, "a"))
+        self.assertEqual(lookup_action(entity, "C")["id"], "c")
+
+    def test_deepcopy_rebuilds_against_copied_actions(self):
+        entity = {"moves": [{"id": "m1", "name": "Claw"}]}
+        action_index(entity)
+        clone = deepcopy(entity)
+        self.assertEqual(clone, {"moves": [{"id": "m1", "name": "Claw"}]})
+        self.assertIs(lookup_action(clone, "m1"), clone["moves"][0])
+
+    def test_indexed_entity_stays_plain_json(self):
+        entity = {"abilities": [{"id": "a", "name": "A"}]}
+        lookup_action(entity, "A")
+        self.assertEqual(json.loads(json.dumps(entity)), {"abilities": [{"id": "a", "name": "A"}]})
+
+
+if __name__ == "__main__":
+    unittest.main()
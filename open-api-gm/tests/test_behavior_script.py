@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.action_resolution import apply_action_effects  # noqa: E402
+from engine.behavior_script import compile_behavior, precompile_behaviors  # noqa: E402
+from engine.combat_journal import journal, player_moved  # noqa: E402
+from play import select_enemy_move  # noqa: E402
+
+
+def _enemy(loop, moves=("move.a", "move.b", "move.c")):
+    return {
+        "id": "enemy.test",
+        "moves": [{"id": m, "name": m} for m in moves],
+        "resolved_archetype": {"ai": {"behavior_script": {"default_loop": loop}}},
+    }
+
+
+def _state(hit=True, moved=False, blood=0):
+    return {
+        "log": [{"action_effects": {"hit": hit, "movement": moved}}],
+        "party": {"members": [{"marks": {"blood": blood}}]},
+    }
+
+
+class TestBehaviorScript(unittest.TestCase):
+    def test_conditions_read_the_journal(self):
+        enemy = _enemy([
+            {"type": "conditional", "if": {"player_missed_last_action": True}, "then": [{"type": "move", "ref": "move.b"}]},
+            {"type": "conditional", "if": {"player_moved": True, "blood_mark_gte": 2}, "then": [{"type": "move", "ref": "move.c"}]},
+            {"type": "move", "ref": "move.a"},
+        ])
+        self.assertEqual(select_enemy_move(enemy, _state())["id"], "move.a")
+        self.assertEqual(select_enemy_move(enemy, _state(hit=False))["id"], "move.b")
+        self.assertEqual(select_enemy_move(enemy, _state(moved=True))["id"], "move.a")
+        self.assertEqual(select_enemy_move(enemy, _state(moved=True, blood=2))["id"], "move.c")
+        self.assertIs(compile_behavior(enemy), compile_behavior(enemy))
+
+    def test_invalid_steps_are_reported_and_skipped(self):
+        enemy = _enemy([
+            {"type": "conditional", "if": {"repeat_count_gte": 2}, "then": [{"type": "move", "ref": "move.b"}]},
+            {"type": "move", "ref": "move.missing"},
+            {"type": "conditional", "if": {"blood_mark_gte": "lots"}, "then": [{"type": "move", "ref": "move.c"}]},
+        ], moves=("move.a", "move.b", "move.c"))
+        self.assertEqual(select_enemy_move(enemy, _state(blood=9))["id"], "move.a")
+        self.assertEqual(len(compile_behavior(enemy).errors), 3)
+        self.assertEqual(list(precompile_behaviors({"enemy.test": enemy, "enemy.ok": _enemy([])})), ["enemy.test"])
+        self.assertIsNone(select_enemy_move(_enemy([], moves=()), _state()))
+
+    def test_scriptless_enemy_compiles_once(self):
+        enemy = {"id": "enemy.plain", "moves": [{"id": "move.a", "name": "move.a"}]}
+        self.assertIs(compile_behavior(enemy), compile_behavior(enemy))
+        bare = {"id": "enemy.bare"}
+        self.assertIs(compile_behavior(bare), compile_behavior(bare))
+
+    def test_trace_records_each_rule(self):
+        enemy = _enemy([
+            {"type": "conditional", "if": {"player_missed_last_action": True}, "then": [{"type": "move", "ref": "move.b"}]},
+            {"type": "move", "ref": "move.c"},
+            {"type": "move", "ref": "move.a"},
+        ])
+        trace = []
+        self.assertEqual(select_enemy_move(enemy, _state(), trace)["id"], "move.c")
+        self.assertEqual(trace, [
+            {"step": 0, "move": "move.b", "if": {"player_missed_last_action": False}, "matched": False},
+            {"step": 1, "move": "move.c", "if": {}, "matched": True},
+        ])
+        self.assertEqual(len(compile_behavior(enemy).rules), 2)
+
+
+class TestMovementTracking(unittest.TestCase):
+    def _act(self, state, character, ability):
+        state["pending_action"] = {"ability": ability["name"], "ability_obj": ability, "to_hit": 30, "damage_roll": 1, "tags": [], "log": {}}
+        apply_action_effects(state, character, [{"hp": 50}], defense_d20=1)
+
+    def test_player_movement_is_journaled_and_enemy_actions_do_not_reset_it(self):
+        state = {"log": []}
+        player = {"resources": {}}
+        enemy = {"moves": [{"id": "move.a"}], "hp": 50}
+        self._act(state, player, {"name": "Step", "type": "movement", "resolution": "movement"})
+        self.assertTrue(player_moved(state))
+        self._act(state, enemy, {"name": "Swipe"})
+        self.assertTrue(player_moved(state))
+        self._act(state, player, {"name": "Strike", "type": "attack"})
+        self.assertFalse(player_moved(state))
+        self.assertEqual(journal(state).counters["actions"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
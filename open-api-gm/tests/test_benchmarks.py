@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import BENCHMARKS, compare, run_benchmarks, select  # noqa: E402
+
+
+def _report(**p50s):
+    return {"results": {n: {"ops_per_sec": 1e6 / us, "p50_us": us, "alloc_peak_bytes": 1000} for n, us in p50s.items()}}
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_suite_covers_the_requested_paths(self):
+        self.assertEqual(select(["resolve_chain"]), [f"resolve_chain.len{n}" for n in range(1, 9)])
+        for name in ("load_game_data.json", "hydrate_character_abilities", "enemy_window_policy.decide", "enter_scene_into_state", "session.encounter"):
+            self.assertIn(name, BENCHMARKS)
+
+    def test_run_reports_throughput_and_allocations(self):
+        report = run_benchmarks(["resolve_chain.len2", "enemy_window_policy"], min_time=0.0, min_ops=3, alloc_ops=1)
+        self.assertEqual(set(report["results"]), {"resolve_chain.len2", "enemy_window_policy.decide"})
+        row = report["results"]["resolve_chain.len2"]
+        self.assertGreaterEqual(row["ops"], 3)
+        self.assertGreater(row["ops_per_sec"], 0)
+        self.assertGreater(row["alloc_peak_bytes"], 0)
+        self.assertEqual(report["meta"]["seed"], 0)
+
+    def test_compare_flags_slowdowns_and_allocation_growth(self):
+        baseline = _report(a=100.0, b=100.0, c=100.0)
+        current = _report(a=105.0, b=130.0, d=1.0)
+        current["results"]["a"]["alloc_peak_bytes"] = 2000
+        rows = {r["name"]: r for r in compare(current, baseline)}
+        self.assertEqual(set(rows), {"a", "b"})
+        self.assertTrue(rows["a"]["regression"])
+        self.assertEqual(rows["a"]["reason"], "more allocations")
+        self.assertEqual(rows["b"]["reason"], "slower")
+        self.assertFalse(compare(current, baseline, threshold=0.5, alloc_threshold=2.0)[1]["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.chain_optimizer import clear_cache, suggest_chains  # noqa: E402
+
+
+def _ability(name, dice, pool="free", cooldown=0, **extra):
+    return {"name": name, "dice": dice, "cost": 1, "resource": "resolve", "pool": pool, "cooldown": cooldown, "type": "attack", **extra}
+
+
+def _state(resolve=3, enemy=None):
+    player = {
+        "name": "P",
+        "resources": {"resolve": resolve},
+        "pools": {"martial": 1},
+        "abilities": [
+            _ability("Jab", "1d4"),
+            _ability("Smash", "2d6", pool="martial"),
+            _ability("Crush", "2d8", pool="martial"),
+            _ability("Rest", "3d10", cooldown=1),
+            _ability("Step", "1d4", type="movement"),
+            _ability("Jab Copy", "1d4"),
+        ],
+    }
+    return {
+        "party": {"members": [player]},
+        "enemies": [enemy or {"id": "enemy.test", "hp": 40, "dv_base": 10}],
+        "phase": {"chain_max": 6, "round": 1},
+    }
+
+
+class TestChainOptimizer(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+
+    def test_only_legal_chains_ranked_by_expected_damage(self):
+        result = suggest_chains(_state(), top_k=50)
+        self.assertTrue(result["ok"])
+        self.assertTrue(result["complete"])
+        chains = [s["abilities"] for s in result["suggestions"]]
+        self.assertIn("Crush", chains[0])
+        for chain in chains:
+            self.assertLessEqual(len(chain), 3)
+            self.assertFalse({"Smash", "Crush"} <= set(chain))  # one martial point
+            self.assertFalse({"Rest", "Step"} & set(chain))
+            if "Jab Copy" in chain:
+                # Interchangeable abilities are only tried in list order.
+                self.assertIn("Jab", chain[: chain.index("Jab Copy")])
+        damage = [s["expected_damage"] for s in result["suggestions"]]
+        self.assertEqual(damage, sorted(damage, reverse=True))
+        self.assertEqual(result["suggestions"][0]["pools"], {"martial": 1})
+
+    def test_repeated_queries_hit_the_cache(self):
+        first = suggest_chains(_state(), top_k=3)
+        again = suggest_chains(_state(), top_k=3)
+        self.assertFalse(first["cached"])
+        self.assertTrue(again["cached"])
+        self.assertEqual(first["suggestions"], again["suggestions"])
+        poorer = suggest_chains(_state(resolve=1), top_k=3)
+        self.assertFalse(poorer["cached"])
+        self.assertEqual(poorer["max_len"], 1)
+
+    def test_enemy_windows_and_budget_drive_break_odds(self):
+        quiet = suggest_chains(_state(resolve=2))
+        self.assertTrue(all(s["break_prob"] == 0.0 for s in quiet["suggestions"]))
+        watcher = {
+            "id": "enemy.watcher", "hp": 40, "dv_base": 10, "temp_bonuses": {"interrupt": 10},
+            "resolved_archetype": {"rhythm_profile": {"interrupt": {
+                "budget_per_round": 1,
+                "windows": [{"after_action_index": [1], "weight": 1.0}],
+            }}},
+        }
+        watched = suggest_chains(_state(resolve=2, enemy=watcher))
+        self.assertTrue(all(s["break_prob"] > 0.0 for s in watched["suggestions"]))
+        spent = _state(resolve=2, enemy=watcher)
+        spent["_interrupt_budget"] = {"round": 1, "by_id": {"enemy.watcher": 1}}
+        self.assertTrue(all(s["break_prob"] == 0.0 for s in suggest_chains(spent)["suggestions"]))
+        self.assertFalse(suggest_chains({"party": {"members": [{}]}, "enemies": []})["ok"])
+
+
+class TestChainSuggestEndpoint(unittest.TestCase):
+    def test_unknown_session(self):
+        from fastapi.testclient import TestClient
+        import server
+
+        resp = TestClient(server.app).post("/chain/suggest", json={"session_id": "no-such-session"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(resp.json()["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import copy
+import json
+import pickle
+import sys
+import tempfile
+from types import SimpleNamespace
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.combat_journal import CombatJournal, journal, last_action_missed  # noqa: E402
+from engine.interrupt_policy import _default_window_open  # noqa: E402
+
+
+def action(hit, damage=0):
+    return {"type": "action_resolution", "action_effects": {"hit": hit, "damage_applied": damage}}
+
+
+class TestCombatJournal(unittest.TestCase):
+    def test_last_outcome_and_counters(self):
+        j = CombatJournal()
+        self.assertIsNone(j.last_hit)
+        j.append(action(True, 4))
+        j.append({"phase": "chain_resolution", "action": "noop"})
+        j.append({"action_effects": {"cancelled": True}})
+        self.assertIs(j.last_hit, True)
+        j.append(action(False))
+        j.append({"defense_reaction": {"damage_after_block": 0}})
+        self.assertTrue(j.last_missed())
+        self.assertEqual(j.counters["hits"], 1)
+        self.assertEqual(j.counters["misses"], 1)
+        self.assertEqual(j.counters["damage"], 4)
+        self.assertEqual(j.counters["defense_reactions"], 1)
+        self.assertEqual(j.recent_hit_rate(), 0.5)
+
+    def test_round_summaries(self):
+        j = CombatJournal()
+        j.begin_round(1)
+        j.extend([action(True, 3), action(True, 2)])
+        j.begin_round(2)
+        j.append(action(False))
+        self.assertEqual(j.round_summary(1)["damage"], 5)
+        self.assertEqual(j.round_summary(1)["hits"], 2)
+        self.assertEqual(j.round_summary()["misses"], 1)
+        self.assertEqual(j.round_summary(9)["entries"], 0)
+
+    def test_retention_spills_oldest_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            j = CombatJournal(max_entries=10, spill_dir=Path(tmp))
+            mark = None
+            for i in range(200):
+                if i == 195:
+                    mark = j.mark()
+                j.append({"i": i, **action(i % 2 == 0)})
+            self.assertLessEqual(len(j), 10 + 64)
+            self.assertEqual(j.total, 200)
+            self.assertEqual(j.spilled + len(j), 200)
+            self.assertEqual([e["i"] for e in j.since(mark)], [195, 196, 197, 198, 199])
+            self.assertEqual(j[-1]["i"], 199)
+            self.assertIs(j.last_hit, False)
+            lines = j.spill_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), j.spilled)
+            self.assertEqual(json.loads(lines[0])["i"], 0)
+
+    def test_without_spill_dir_old_entries_are_dropped(self):
+        j = CombatJournal(max_entries=5)
+        j.extend(action(True) for _ in range(100))
+        self.assertIsNone(j.spill_path)
+        self.assertEqual(j.counters["hits"], 100)
+        self.assertLess(len(j), 100)
+
+    def test_plain_lists_are_upgraded_in_place(self):
+        state = {"log": [action(True), {"action_effects": {"hit": False}}, {"phase": "x"}]}
+        self.assertTrue(last_action_missed(state))
+        self.assertIsInstance(state["log"], CombatJournal)
+        state["log"].append(action(True))
+        self.assertFalse(last_action_missed(state))
+        self.assertIs(journal(state), state["log"])
+        self.assertFalse(last_action_missed({}))
+
+    def test_copy_and_pickle_keep_index(self):
+        j = CombatJournal([action(False, 1)])
+        j.begin_round(3)
+        for clone in (copy.deepcopy(j), pickle.loads(pickle.dumps(j))):
+            self.assertEqual(list(clone), list(j))
+            self.assertTrue(clone.last_missed())
+            self.assertEqual(clone.round, 3)
+            clone.append(action(True))
+            self.assertEqual(clone.total, 2)
+        self.assertEqual(j.total, 1)
+
+    def test_interrupt_policy_reads_journal(self):
+        state = {"log": CombatJournal([action(False)])}
+        ctx = SimpleNamespace(chain_index=0)
+        self.assertTrue(_default_window_open("after_link", ctx, state))
+        state["log"].append(action(True))
+        self.assertFalse(_default_window_open("after_link", ctx, state))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.combat_state import (  # noqa: E402
+    Participant,
+    combat_add,
+    combat_get,
+    combat_set,
+    consume_shield,
+    participant,
+    register_participant,
+    shield_value,
+    status_add,
+    status_get,
+)
+from session_store import _decode, _encode  # noqa: E402
+
+
+class TestParticipant(unittest.TestCase):
+    def setUp(self):
+        self.state = {}
+        self.player = {"id": "p", "resources": {"resolve": 3, "resolve_cap": 5}}
+        register_participant(self.state, key="player", entity=self.player, side="player")
+
+    def test_meters(self):
+        self.assertIsInstance(participant(self.state, self.player), Participant)
+        self.assertEqual(combat_get(self.state, self.player, "rp"), 3)
+        self.assertEqual(combat_get(self.state, self.player, "rp_cap"), 5)
+        self.assertEqual(combat_add(self.state, self.player, "momentum", 2), 2)
+        combat_set(self.state, self.player, "heat", "4")
+        self.assertEqual(combat_get(self.state, self.player, "heat"), 4)
+        with self.assertRaises(KeyError):
+            combat_get(self.state, self.player, "mana")
+        self.assertEqual(combat_get(self.state, {"id": "stranger"}, "heat", 7), 7)
+
+    def test_statuses_and_shield(self):
+        status_add(self.state, self.player, status="Feedback Shield", stacks=2, shield=3)
+        status_add(self.state, self.player, status="Feedback Shield", stacks=1)
+        st = status_get(self.state, self.player, "status.feedback_shield")
+        self.assertEqual((st["stacks"], st["shield"]), (3, 3))
+        self.assertIsNone(status_get(self.state, self.player, "status.never_seen"))
+        self.assertEqual(shield_value(self.state, self.player), 3)
+        self.assertEqual(consume_shield(self.state, self.player, 1), 1)
+        self.assertEqual(status_get(self.state, self.player, "status.feedback_shield")["stacks"], 2)
+
+    def test_dict_round_trip_through_snapshot_encoding(self):
+        combat_set(self.state, self.player, "balance", 2)
+        status_add(self.state, self.player, status="Stagger")
+        encoded = _encode(self.state)
+        self.assertEqual(encoded["encounter"]["participants"]["player"]["combat"]["balance"], 2)
+        self.assertIn("status.stagger", encoded["encounter"]["participants"]["player"]["statuses"])
+
+        restored = _decode(encoded)
+        self.assertIsInstance(restored["encounter"]["participants"]["player"], dict)
+        self.assertEqual(combat_get(restored, self.player, "balance"), 2)
+        self.assertIsInstance(restored["encounter"]["participants"]["player"], Participant)
+        self.assertEqual(status_get(restored, self.player, "status.stagger")["stacks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.content import ContentRepository  # noqa: E402
+import play  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _write(path: Path, data, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestContentRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        _write(self.root / "traps" / "trap.a.json", {"id": "trap.a", "dc": 10})
+        _write(self.root / "scenes" / "scene.x.json", {"id": "scene.x", "encounter": {"traps": [{"id": "trap.a"}]}})
+        _write(self.root / "narrations.json", {"items": [{"id": "n.one", "template": "One."}, {"id": "n.two", "template": "Two."}]})
+        self.clock = FakeClock()
+        self.repo = ContentRepository(self.root, clock=self.clock, rescan_interval=5)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_each_file_parsed_once(self):
+        for _ in range(5):
+            self.assertEqual(self.repo.get("traps", "trap.a")["dc"], 10)
+            self.assertEqual(self.repo.get_frozen("narrations", "n.two")["template"], "Two.")
+        m = self.repo.metrics()
+        self.assertEqual(m["parses"], 2)
+        self.assertEqual(m["records"]["narrations"], 2)
+
+    def test_returns_independent_mutable_copies(self):
+        scene = self.repo.get("scenes", "scene.x")
+        scene["encounter"]["traps"].append({"id": "trap.b"})
+        self.assertEqual(len(self.repo.get("scenes", "scene.x")["encounter"]["traps"]), 1)
+        with self.assertRaises(TypeError):
+            self.repo.get_frozen("scenes", "scene.x")["id"] = "mutated"
+
+    def test_changed_file_is_reparsed_alone(self):
+        self.repo.get("traps", "trap.a")
+        self.repo.get("scenes", "scene.x")
+        _write(self.root / "traps" / "trap.a.json", {"id": "trap.a", "dc": 15}, mtime_ns=10**18)
+        self.assertEqual(self.repo.get("traps", "trap.a")["dc"], 15)
+        self.repo.get("scenes", "scene.x")
+        m = self.repo.metrics()
+        self.assertEqual(m["refreshes"], 1)
+        self.assertEqual(m["parses"], 3)
+
+    def test_new_and_deleted_files_after_rescan_interval(self):
+        self.assertIsNone(self.repo.get("traps", "trap.new"))
+        _write(self.root / "traps" / "trap.new.json", {"id": "trap.new"})
+        # Misses only rescan once per interval.
+        self.assertIsNone(self.repo.get("traps", "trap.new"))
+        self.clock.now = 10
+        self.assertEqual(self.repo.get("traps", "trap.new"), {"id": "trap.new"})
+
+        (self.root / "traps" / "trap.a.json").unlink()
+        self.assertIsNone(self.repo.get("traps", "trap.a"))
+        self.assertEqual(self.repo.ids("traps"), ["trap.new"])
+
+    def test_file_stem_and_record_id_both_resolve(self):
+        _write(self.root / "hazards" / "slick.json", {"id": "hazard.slick"})
+        self.assertEqual(self.repo.get("hazards", "slick"), self.repo.get("hazards", "hazard.slick"))
+        with self.assertRaises(KeyError):
+            self.repo.get("nope", "x")
+
+
+class TestPlayContentLookups(unittest.TestCase):
+    def test_play_helpers_match_files(self):
+        data_dir = ROOT / "game-data"
+        scene = json.loads((data_dir / "scenes" / "scene.01.01.json").read_text(encoding="utf-8"))
+        self.assertEqual(play.load_scene("scene.01.01"), scene)
+        self.assertEqual(play.load_scene("scene.missing"), {})
+        self.assertEqual(play.resolve_trap("trap.missing"), {"id": "trap.missing"})
+        self.assertEqual(play.resolve_loot_item("loot.vein_fragment.t1")["name"], "Faint Vein Sigil")
+        self.assertEqual(play.resolve_narration_template("narration.clean_victory"), "The vein stills. You remain un--blooded.")
+        self.assertIsNone(play.resolve_narration_template("narration.missing"))
+        self.assertTrue(play.load_script().get("acts"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine import content_pack  # noqa: E402
+from engine.content_pack import PACK_MAGIC, encode_pack, read_pack, source_digest, write_pack  # noqa: E402
+from engine.game_data import FrozenDict, GameData  # noqa: E402
+
+
+RAW = {
+    "abilities": {"abilities": [{"id": "core.basic_strike", "tags": ["attack"]}]},
+    "loot": [{"id": "loot.a", "tier": 1}],
+    "statuses": [{"id": "status.bleed"}],
+    "bestiary": [{"id": "enemy.a", "resolved_archetype": {"hp": 10}}, {"id": "enemy.b", "tags": ["attack"]}],
+}
+
+
+class TestContentPack(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root / "bestiary.json"
+        self.src.write_text(json.dumps(RAW["bestiary"]), encoding="utf-8")
+        self.pack = self.root / "content.pack"
+        self.gd = GameData.build(RAW)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_keeps_lookups_and_frozen_types(self):
+        write_pack(self.pack, self.gd, [self.src], self.root)
+        self.assertEqual(self.pack.read_bytes()[:4], PACK_MAGIC)
+        gd = read_pack(self.pack, sources=[self.src], root=self.root)
+        self.assertIsNotNone(gd)
+        self.assertEqual(json.dumps(gd.data, sort_keys=True), json.dumps(self.gd.data, sort_keys=True))
+        self.assertEqual(gd.abilities_by_id["core.basic_strike"]["tags"], ["attack"])
+        self.assertEqual(gd.enemies_by_id["enemy.a"]["resolved_archetype"]["hp"], 10)
+        self.assertIsInstance(gd.loot_by_id, FrozenDict)
+        with self.assertRaises(TypeError):
+            gd.data["loot"].append({})
+
+    def test_repeated_strings_are_shared(self):
+        gd = read_pack_from_bytes(self.root, encode_pack(self.gd, b"\0" * 32))
+        tags_a = gd.abilities_by_id["core.basic_strike"]["tags"][0]
+        tags_b = gd.enemies_by_id["enemy.b"]["tags"][0]
+        self.assertIs(tags_a, tags_b)
+
+    def test_stale_sources_fall_back(self):
+        write_pack(self.pack, self.gd, [self.src], self.root)
+        digest = source_digest([self.src], self.root)
+        self.src.write_text(json.dumps(RAW["bestiary"] + [{"id": "enemy.c"}]), encoding="utf-8")
+        os.utime(self.src, ns=(10**18, 10**18))
+        self.assertNotEqual(source_digest([self.src], self.root), digest)
+        self.assertIsNone(read_pack(self.pack, sources=[self.src], root=self.root))
+        # Trusted mode ignores the sources.
+        self.assertIsNotNone(read_pack(self.pack, sources=[self.src], root=self.root, check=False))
+
+    def test_malformed_or_missing_pack_is_ignored(self):
+        self.assertIsNone(read_pack(self.pack))
+        self.pack.write_bytes(b"VBPK garbage")
+        self.assertIsNone(read_pack(self.pack))
+        blob = encode_pack(self.gd, b"\0" * 32)
+        self.pack.write_bytes(blob[:-3])
+        self.assertIsNone(read_pack(self.pack, check=False))
+
+    def test_payload_is_plain_json(self):
+        blob = encode_pack(self.gd, b"\0" * 32)
+        payload = json.loads(blob[content_pack._HEADER.size:])
+        self.assertEqual(payload["loot"], RAW["loot"])
+
+    def test_pack_from_other_builder_is_rejected(self):
+        write_pack(self.pack, self.gd, [self.src], self.root)
+        old = content_pack.BUILDER_DIGEST
+        content_pack.BUILDER_DIGEST = b"\1" * 32
+        try:
+            self.assertIsNone(read_pack(self.pack, check=False))
+        finally:
+            content_pack.BUILDER_DIGEST = old
+        self.assertIsNotNone(read_pack(self.pack, check=False))
+
+
+def read_pack_from_bytes(root: Path, blob: bytes) -> GameData:
+    path = root / "inline.pack"
+    path.write_bytes(blob)
+    return read_pack(path, check=False)
+
+
+class TestPlayUsesPack(unittest.TestCase):
+    def test_shared_game_data_prefers_fresh_pack(self):
+        import play
+
+        with tempfile.TemporaryDirectory() as tmp:
+            pack = Path(tmp) / "content.pack"
+            sources = play._game_data_sources()
+            built = GameData.build(play._read_game_data())
+            write_pack(pack, built, sources, ROOT)
+            old_path = play.CONTENT_PACK_PATH
+            play.CONTENT_PACK_PATH = pack
+            play._GAME_DATA_CACHE.invalidate()
+            read_json = play._read_game_data
+            try:
+                # A fresh pack is used without touching the JSON.
+                play._read_game_data = lambda: self.fail("JSON read despite a fresh pack")
+                gd = play.shared_game_data()
+                play._read_game_data = read_json
+                self.assertEqual(sorted(gd.enemies_by_id), sorted(built.enemies_by_id))
+                self.assertTrue(gd.signature)
+                # Rebuilding the pack with a bad header falls back to JSON.
+                pack.write_bytes(b"broken")
+                play._GAME_DATA_CACHE.invalidate()
+                self.assertEqual(sorted(play.shared_game_data().enemies_by_id), sorted(built.enemies_by_id))
+            finally:
+                play._read_game_data = read_json
+                play.CONTENT_PACK_PATH = old_path
+                play._GAME_DATA_CACHE.invalidate()
+
+
+if __name__ == "__main__":
+    unittest.main()
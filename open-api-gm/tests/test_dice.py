@@ -0,0 +1,62 @@
+import random
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine import dice  # noqa: E402
+from engine.action_resolution import roll  # noqa: E402
+
+
+class TestParse(unittest.TestCase):
+    def test_forms(self):
+        self.assertEqual(str(dice.parse("2d6")), "2d6")
+        self.assertEqual(str(dice.parse(" 1D8 - 1 ")), "1d8-1")
+        self.assertEqual(str(dice.parse("d4")), "1d4")
+        self.assertEqual(dice.parse("3").max, 3)
+        self.assertIs(dice.parse("2d6"), dice.parse("2d6"))  # cached
+        for bad in ("banana", "", None, "2d", True):
+            with self.assertRaises(ValueError):
+                dice.parse(bad)
+        self.assertEqual(roll("banana"), 0)
+
+    def test_profile_folds_flat(self):
+        expr = dice.from_profile({"dice": "1d6", "flat": 2})
+        self.assertEqual((expr.min, expr.max), (3, 8))
+        self.assertEqual(str(dice.from_profile({"flat": 2}, default=None)), "2")
+        self.assertEqual(str(dice.from_profile({})), "1d6")
+
+
+class TestRolling(unittest.TestCase):
+    def test_scalar_roll_in_range(self):
+        r = random.Random(1)
+        expr = dice.parse("3d4+1")
+        rolls = [expr.roll(r) for _ in range(500)]
+        self.assertEqual((min(rolls), max(rolls)), (4, 13))
+
+    def test_roll_many_matches_distribution(self):
+        if dice.np is None:
+            self.skipTest("numpy not installed")
+        expr = dice.parse("2d6")
+        rolls = expr.roll_many(100_000, 3)
+        self.assertEqual(rolls.shape, (100_000,))
+        self.assertEqual((int(rolls.min()), int(rolls.max())), (2, 12))
+        self.assertAlmostEqual(float(rolls.mean()), expr.mean, delta=0.05)
+        self.assertTrue((expr.roll_many(10, 3) == expr.roll_many(10, 3)).all())
+
+
+class TestDistribution(unittest.TestCase):
+    def test_exact_pmf(self):
+        p = dice.pmf("2d6")
+        self.assertAlmostEqual(p[7], 6 / 36)
+        self.assertAlmostEqual(sum(p.values()), 1.0)
+        self.assertEqual(dice.expected("1d6+2"), 5.5)
+        self.assertAlmostEqual(dice.parse("1d20").prob_at_least(15), 0.3)
+        self.assertEqual(dice.pmf("4"), {4: 1.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
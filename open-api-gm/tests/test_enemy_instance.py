@@ -0,0 +1,109 @@
+import copy
+import json
+import pickle
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.action_index import lookup_action  # noqa: E402
+from engine.enemy_instance import EnemyInstance, spawn_enemy  # noqa: E402
+from engine.game_data import FrozenDict, freeze  # noqa: E402
+from session_store import snapshot_session  # noqa: E402
+import play  # noqa: E402
+
+
+TEMPLATE = freeze({
+    "id": "enemy.test",
+    "name": "Test Brute",
+    "stat_block": {"hp": {"max": 12}, "defense": {"dv_base": 9, "idf": 1}},
+    "moves": [{"id": "m.slam", "name": "Slam", "cost": 1}],
+    "hp": {"current": 12, "max": 12},
+})
+
+
+class TestEnemyInstance(unittest.TestCase):
+    def test_shares_template_and_keeps_mapping_interface(self):
+        inst = EnemyInstance(TEMPLATE)
+        self.assertIsInstance(inst, dict)
+        self.assertIs(inst["moves"], TEMPLATE["moves"])
+        self.assertTrue(inst.shared("stat_block"))
+        self.assertEqual(json.loads(json.dumps(inst)), json.loads(json.dumps(TEMPLATE)))
+        self.assertEqual(inst.overlay(), {"hp": {"current": 12, "max": 12}})
+
+    def test_runtime_fields_are_per_spawn(self):
+        a, b = EnemyInstance(TEMPLATE), EnemyInstance(TEMPLATE)
+        a["hp"]["current"] = 3
+        a["_combat_key"] = "enemy0"
+        self.assertEqual(b["hp"]["current"], 12)
+        self.assertNotIn("_combat_key", b)
+        self.assertEqual(TEMPLATE["hp"]["current"], 12)
+
+    def test_nested_template_data_is_copy_on_write(self):
+        inst = EnemyInstance(TEMPLATE)
+        with self.assertRaises(TypeError):
+            inst["moves"].append({"id": "m.new"})
+        inst.setdefault("moves", []).append({"id": "m.new"})
+        self.assertEqual(len(inst["moves"]), 2)
+        self.assertFalse(inst.shared("moves"))
+        self.assertEqual(len(TEMPLATE["moves"]), 1)
+
+    def test_plain_templates_are_not_edited(self):
+        raw = {"id": "enemy.raw", "moves": [{"id": "m.a"}]}
+        inst = EnemyInstance(raw)
+        inst.mutable("moves")[0]["id"] = "m.b"
+        self.assertEqual(raw["moves"][0]["id"], "m.a")
+        self.assertEqual(spawn_enemy(None, "enemy.missing"), {"id": "enemy.missing", "name": "enemy.missing"})
+
+    def test_copies_and_pickling_stay_independent(self):
+        inst = play._prime_enemy_for_combat(EnemyInstance(TEMPLATE))
+        clone = copy.deepcopy(inst)
+        clone["hp"]["current"] = 1
+        self.assertEqual(inst["hp"]["current"], 12)
+        self.assertIs(clone["stat_block"], inst["stat_block"])
+
+        restored = pickle.loads(pickle.dumps(inst))
+        self.assertIsInstance(restored, EnemyInstance)
+        self.assertEqual(restored, inst)
+        self.assertIsInstance(restored["moves"], type(TEMPLATE["moves"]))
+        restored["hp"]["current"] = 5
+
+    def test_primed_instance_matches_deepcopy_spawn(self):
+        legacy = play._prime_enemy_for_combat(copy.deepcopy(TEMPLATE))
+        inst = play._prime_enemy_for_combat(EnemyInstance(TEMPLATE))
+        for key in ("hp", "_hp_base_max", "dv_base", "idf", "execution_threshold_pct"):
+            self.assertEqual(inst[key], legacy[key])
+        self.assertEqual(lookup_action(inst, "Slam")["id"], "m.slam")
+
+    def test_session_snapshot_encodes_instances(self):
+        session = SimpleNamespace(game=SimpleNamespace(context={"state": {"enemies": [EnemyInstance(TEMPLATE)]}}), events=[])
+        snap = snapshot_session(session)
+        self.assertEqual(json.loads(json.dumps(snap))["state"]["enemies"][0]["moves"][0]["id"], "m.slam")
+
+
+class QuietUI:
+    is_blocking = True
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class TestSceneSpawns(unittest.TestCase):
+    def test_scene_enemies_share_bestiary_templates(self):
+        enemies = play.shared_game_data().enemies_by_id
+        self.assertIsInstance(next(iter(enemies.values())), FrozenDict)
+        ctx = {"state": play.initial_state(), "ui": QuietUI(), "game_data": play.load_game_data()}
+        self.assertTrue(play.enter_scene_into_state(ctx, "scene.01.03"))
+        spawned = ctx["state"]["enemies"]
+        self.assertTrue(spawned)
+        for inst in spawned:
+            self.assertIsInstance(inst, EnemyInstance)
+            self.assertIs(inst["moves"], enemies[inst["id"]]["moves"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.chain_odds import Matchup, chain_odds, link_model  # noqa: E402
+from engine.enemy_planner import clear_cache, greedy_chain, plan_chain  # noqa: E402
+from play import build_enemy_chain  # noqa: E402
+
+
+def _move(mid, dice, rp=1, effects=()):
+    return {"id": mid, "name": mid, "type": "attack", "dice": dice, "cost": {"rp": rp}, "on_hit": {"effects": list(effects)}}
+
+
+class TestChainOdds(unittest.TestCase):
+    def test_single_d20_model(self):
+        link = link_model({}, _move("m", "1d1"))
+        odds = chain_odds([link, link], Matchup(dv=10, interrupt_chance=0.0))
+        # Link 2 needs one more after a hit raises the defender's momentum; a first-link miss misses both.
+        self.assertAlmostEqual(odds.hit_probs[0], 0.55)
+        self.assertAlmostEqual(odds.hit_probs[1], 0.50)
+        # The second hit carries the heat bonus from the first.
+        self.assertAlmostEqual(odds.expected_damage, 0.55 * 1 + 0.50 * 2)
+        self.assertEqual(odds.break_prob, 0.0)
+
+        capped = chain_odds([link, link], Matchup(dv=10, hp=1, interrupt_chance=0.0))
+        self.assertAlmostEqual(capped.kill_prob, 0.55)
+        self.assertAlmostEqual(capped.expected_damage, 0.55)
+        shielded = chain_odds([link], Matchup(dv=10, shield=1, interrupt_chance=0.0))
+        self.assertAlmostEqual(shielded.expected_damage, 0.0)
+
+    def test_perfect_interrupts_break_the_chain(self):
+        link = link_model({}, _move("m", "1d6"))
+        safe = chain_odds([link] * 3, Matchup(dv=8, interrupt_chance=0.0))
+        risky = chain_odds([link] * 3, Matchup(dv=8, interrupt_chance=1.0, interrupt_bonus=5))
+        self.assertGreater(risky.break_prob, 0.0)
+        self.assertLess(risky.expected_damage, safe.expected_damage)
+        self.assertEqual(chain_odds([link_model({}, {"type": "movement"})], Matchup()).expected_damage, 0.0)
+
+
+class TestEnemyPlanner(unittest.TestCase):
+    def setUp(self):
+        clear_cache()
+        self.moves = [_move("weak", "1d2"), _move("heavy", "2d6"), _move("brand", "1d4", rp=2, effects=["vulnerable"])]
+        self.enemy = {"id": "enemy.test", "rp": 2, "moves": self.moves}
+
+    def test_plan_beats_greedy_and_respects_rp(self):
+        m = Matchup(dv=10, interrupt_chance=0.0)
+        greedy = greedy_chain(self.moves, 2)
+        self.assertEqual([mv["id"] for mv in greedy], ["weak", "heavy"])
+        plan = plan_chain(self.enemy, self.moves, 2, m, max_evals=1000)
+        self.assertEqual(plan.source, "search")
+        self.assertIn(self.moves[1], plan.moves)
+        self.assertLessEqual(sum(mv["cost"]["rp"] for mv in plan.moves), 2)
+        greedy_score = plan_chain(self.enemy, greedy, 2, m, max_links=2, beam=1, max_evals=1000)
+        self.assertGreaterEqual(plan.score, greedy_score.score)
+
+        again = plan_chain(self.enemy, self.moves, 2, m, max_evals=1000)
+        self.assertEqual(again.source, "cache")
+        self.assertEqual(again.moves, plan.moves)
+        one = plan_chain(self.enemy, self.moves, 2, m, max_links=1, max_evals=1000)
+        self.assertEqual([mv["id"] for mv in one.moves], ["heavy"])
+
+    def test_out_of_budget_degrades_to_greedy(self):
+        plan = plan_chain(self.enemy, self.moves, 2, Matchup(), max_evals=0)
+        self.assertTrue(plan.truncated)
+        self.assertEqual(plan.source, "greedy")
+        self.assertEqual(plan.moves, greedy_chain(self.moves, 2))
+
+    def test_cutoff_counts_evaluations(self):
+        m = Matchup(dv=10, interrupt_chance=0.0)
+        first = plan_chain(self.enemy, self.moves, 2, m, max_evals=3)
+        clear_cache()
+        again = plan_chain(self.enemy, self.moves, 2, m, max_evals=3)
+        self.assertTrue(first.truncated)
+        self.assertEqual(first.evaluated, 3)
+        self.assertEqual(again.moves, first.moves)
+
+    def test_lead_is_pinned(self):
+        m = Matchup(dv=10, interrupt_chance=0.0)
+        plan = plan_chain(self.enemy, self.moves, 2, m, max_links=2, lead=self.moves[0], max_evals=1000)
+        self.assertIs(plan.moves[0], self.moves[0])
+        self.assertEqual([mv["id"] for mv in plan.moves], ["weak", "heavy"])
+        # A pinned lead that uses all the RP is the whole chain.
+        plan = plan_chain(self.enemy, self.moves, 2, m, lead=self.moves[2], max_evals=1000)
+        self.assertEqual([mv["id"] for mv in plan.moves], ["brand"])
+
+    def test_build_enemy_chain_plans_against_the_party(self):
+        state = {"party": {"members": [{"hp": 20, "attributes": {"agi": 10}}]}}
+        self.assertEqual([mv["id"] for mv in build_enemy_chain(self.enemy, state, max_links=1)], ["heavy"])
+        self.assertEqual([mv["id"] for mv in build_enemy_chain(self.enemy)], ["weak", "heavy"])
+
+    def test_behavior_script_picks_the_opening_move(self):
+        enemy = dict(self.enemy, resolved_archetype={"ai": {"behavior_script": {"default_loop": [
+            {"type": "conditional", "if": {"blood_mark_gte": 1}, "then": [{"type": "move", "ref": "brand"}]},
+        ]}}})
+        state = {"party": {"members": [{"hp": 20, "attributes": {"agi": 10}}]}}
+        self.assertEqual([mv["id"] for mv in build_enemy_chain(enemy, state, max_links=1)], ["heavy"])
+        state["party"]["members"][0]["marks"] = {"blood": 2}
+        self.assertEqual([mv["id"] for mv in build_enemy_chain(enemy, state, max_links=1)], ["brand"])
+
+
+if __name__ == "__main__":
+    unittest.main()
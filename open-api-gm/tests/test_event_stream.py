@@ -0,0 +1,95 @@
+import asyncio
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from event_stream import EventRing  # noqa: E402
+
+
+class TestEventRing(unittest.TestCase):
+    def test_since_cursor_and_gap_after_wraparound(self):
+        ring = EventRing(capacity=3)
+        for i in range(5):
+            ring.append({"n": i})
+        events, gap = ring.since(3)
+        self.assertEqual([s for s, _ in events], [4, 5])
+        self.assertFalse(gap)
+        events, gap = ring.since(0)
+        self.assertEqual([e["n"] for _, e in events], [2, 3, 4])
+        self.assertTrue(gap)
+
+    def test_cursor_from_older_session_is_a_gap(self):
+        ring = EventRing()
+        ring.append({"n": 0})
+        events, gap = ring.since(40)
+        self.assertTrue(gap)
+        self.assertEqual(len(events), 1)
+
+    def test_wait_wakes_on_append_from_another_thread(self):
+        ring = EventRing()
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.01, lambda: loop.run_in_executor(None, ring.append, {"n": 1}))
+            woke = await ring.wait(0, timeout=2)
+            timed_out = await ring.wait(ring.last_seq, timeout=0.01)
+            return woke, timed_out
+
+        self.assertEqual(asyncio.run(scenario()), (True, False))
+
+
+class TestStreamingEndpoints(unittest.TestCase):
+    def setUp(self):
+        try:
+            from fastapi.testclient import TestClient
+        except Exception as e:  # pragma: no cover - optional test dependency
+            self.skipTest(f"fastapi test client unavailable: {e}")
+        import server
+
+        self.server = server
+        self.client = TestClient(server.app)
+        self.sid = "stream-test"
+        self.addCleanup(server.sessions.discard, self.sid)
+
+    def test_websocket_replays_backlog_and_resumes_from_cursor(self):
+        session = self.server._session_or_new(self.sid)
+        base = session.stream.last_seq
+        for i in range(3):
+            session.emit({"type": "system", "text": f"e{i}"})
+
+        with self.client.websocket_connect(f"/events/ws?session_id={self.sid}&cursor={base}") as ws:
+            texts = [ws.receive_json()["event"]["text"] for _ in range(3)]
+            self.assertEqual(texts, ["e0", "e1", "e2"])
+            session.emit({"type": "system", "text": "live"})
+            msg = ws.receive_json()
+            self.assertEqual((msg["seq"], msg["event"]["text"]), (base + 4, "live"))
+
+        with self.client.websocket_connect(f"/events/ws?session_id={self.sid}&cursor={base + 3}") as ws:
+            self.assertEqual(ws.receive_json()["event"]["text"], "live")
+
+    def test_sse_frames_carry_sequence_ids(self):
+        session = self.server._session_or_new(self.sid)
+        base = session.stream.last_seq
+        session.emit({"type": "system", "text": "hello"})
+
+        class FakeRequest:
+            headers = {"last-event-id": str(base)}
+
+            async def is_disconnected(self):
+                return False
+
+        async def first_frame():
+            response = await self.server.events_stream(self.sid, FakeRequest())
+            return await response.body_iterator.__anext__()
+
+        frame = asyncio.run(first_frame())
+        self.assertTrue(frame.startswith(f"id: {base + 1}\ndata: "))
+        self.assertIn('"hello"', frame)
+
+
+if __name__ == "__main__":
+    unittest.main()
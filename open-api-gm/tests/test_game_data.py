@@ -0,0 +1,112 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+from copy import deepcopy
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.game_data import FrozenDict, FrozenList, GameData, SharedCache, freeze  # noqa: E402
+import play  # noqa: E402
+
+
+class TestFrozenContainers(unittest.TestCase):
+    def test_freeze_blocks_mutation_but_keeps_isinstance(self):
+        data = freeze({"a": [1, {"b": 2}]})
+        self.assertIsInstance(data, dict)
+        self.assertIsInstance(data["a"], list)
+        with self.assertRaises(TypeError):
+            data["x"] = 1
+        with self.assertRaises(TypeError):
+            data["a"].append(3)
+        with self.assertRaises(TypeError):
+            data["a"][1]["b"] = 5
+        self.assertEqual(json.loads(json.dumps(data)), {"a": [1, {"b": 2}]})
+
+    def test_deepcopy_thaws(self):
+        data = freeze({"moves": [{"id": "m1"}]})
+        copy = deepcopy(data)
+        self.assertIs(type(copy), dict)
+        self.assertIs(type(copy["moves"]), list)
+        copy["moves"][0]["id"] = "m2"
+        self.assertEqual(data["moves"][0]["id"], "m1")
+
+    def test_pickle_round_trip(self):
+        data = freeze({"a": [1, 2]})
+        back = pickle.loads(pickle.dumps(data))
+        self.assertIsInstance(back, FrozenDict)
+        self.assertIsInstance(back["a"], FrozenList)
+        self.assertEqual(back, {"a": [1, 2]})
+
+
+class TestGameDataIndexes(unittest.TestCase):
+    def test_build_indexes(self):
+        gd = GameData.build({
+            "abilities": {"abilities": [{"id": "core.basic_strike", "name": "Strike"}]},
+            "resolve_abilities": {"abilities": [{"id": "rp.focus", "name": "Focus"}]},
+            "loot": [{"id": "loot.a"}],
+            "statuses": [{"id": "status.bleed"}],
+            "bestiary": [{"id": "enemy.a"}],
+        })
+        self.assertIn("core.basic_strike", gd.abilities_by_id)
+        self.assertIn("rp.focus", gd.abilities_by_id)
+        self.assertIn("loot.a", gd.loot_by_id)
+        self.assertIn("status.bleed", gd.statuses_by_id)
+        self.assertIn("enemy.a", gd.enemies_by_id)
+
+    def test_view_is_mutable_at_top_level_only(self):
+        gd = GameData.build({"loot": [{"id": "loot.a"}]})
+        view = gd.view()
+        view["__scene"] = {"id": "scene.x"}
+        self.assertNotIn("__scene", gd.data)
+        self.assertIs(view["loot"], gd.data["loot"])
+
+
+class TestSharedCache(unittest.TestCase):
+    def test_rebuilds_on_mtime_change(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "a.json"
+            src.write_text(json.dumps({"v": 1}), encoding="utf-8")
+            cache = SharedCache(lambda: [src], lambda _sig: freeze(json.loads(src.read_text(encoding="utf-8"))))
+            first = cache.get()
+            self.assertIs(cache.get(), first)
+            self.assertEqual(cache.builds, 1)
+
+            src.write_text(json.dumps({"v": 22}), encoding="utf-8")
+            st = src.stat()
+            os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            second = cache.get()
+            self.assertEqual(second["v"], 22)
+            self.assertEqual(cache.builds, 2)
+
+    def test_load_game_data_shares_parsed_data(self):
+        a = play.load_game_data()
+        b = play.load_game_data()
+        self.assertIsNot(a, b)
+        self.assertIs(a["bestiary"], b["bestiary"])
+        self.assertIs(play.shared_game_data(), play.shared_game_data())
+
+
+class TestHydration(unittest.TestCase):
+    def test_hydrated_abilities_are_mutable(self):
+        gd = freeze({"abilities": {"abilities": [
+            {"id": "ab.x", "name": "X", "tags": ["attack"], "cost": {"rp": 1}, "effects": {"on_hit": [{"type": "damage", "dice": "1d4"}]}},
+        ]}})
+        character = {"abilities": ["ab.x", {"name": "X"}]}
+        play.hydrate_character_abilities(character, gd)
+        for ab in character["abilities"]:
+            ab["effects"]["on_hit"].append({"type": "status", "id": "bleed"})
+            ab["effects"]["on_hit"][0]["dice"] = "1d6"
+            ab["tags"].append("heat")
+            ab["cost"]["rp"] = 2
+        self.assertEqual(gd["abilities"]["abilities"][0]["effects"]["on_hit"], [{"type": "damage", "dice": "1d4"}])
+        self.assertIsNot(character["abilities"][0]["effects"], character["abilities"][1]["effects"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.interrupt_policy import (  # noqa: E402
+    _legacy_window_allows_interrupt,
+    compile_legacy_window,
+    precompile_enemy_windows,
+)
+from engine.interrupt_windows import (  # noqa: E402
+    PredicateError,
+    cached_compile,
+    compile_predicate,
+    eval_predicate,
+    window_allows_interrupt,
+)
+
+
+PREDICATES = [
+    {"type": "always"},
+    {"type": "chain_index_at_least", "value": 1},
+    {"type": "chain_index_is", "value": "2"},
+    {"type": "chain_length_at_least", "value": 3},
+    {"type": "link_type_is", "value": "ATTACK"},
+    {"type": "defender_resource_at_least", "resource": "rp", "value": 2},
+    {"type": "attacker_momentum_at_least", "value": 1},
+    {"type": "compare", "left": "defender.resources.rp", "op": ">=", "right": 1},
+    {"type": "compare", "left": "state.phase.round", "op": "<", "right": "3"},
+    {"type": "compare", "left": "nowhere.x", "op": "==", "right": 0},
+    {"type": "not", "pred": {"type": "chain_index_is", "value": 0}},
+    {"type": "and", "preds": [{"type": "chain_index_at_least", "value": 1}, {"type": "link_type_is", "value": "attack"}]},
+    {"type": "or", "preds": [{"type": "chain_index_is", "value": 9}, {"type": "attacker_momentum_at_least", "value": 3}]},
+]
+
+
+def _ctx(chain_index, rp=2, momentum=1, link_type="attack", round_no=2):
+    return SimpleNamespace(
+        aggressor={"resources": {"momentum": momentum}},
+        defender={"resources": {"rp": rp}},
+        chain_index=chain_index,
+        chain_length=4,
+        link={"type": link_type},
+        state={"phase": {"round": round_no}},
+    )
+
+
+class TestCompiledPredicates(unittest.TestCase):
+    def test_compiled_matches_interpreter(self):
+        contexts = [_ctx(i, rp, m, lt, r) for i in range(4) for rp in (0, 2) for m in (0, 3) for lt in ("attack", "move") for r in (1, 5)]
+        for pred in PREDICATES:
+            test = compile_predicate(pred)
+            for ctx in contexts:
+                self.assertEqual(test(ctx), eval_predicate(pred, ctx), pred)
+
+    def test_invalid_predicates_are_rejected_at_compile_time(self):
+        for bad in (
+            {"type": "teleported"},
+            {"type": "chain_index_is", "value": "two"},
+            {"type": "compare", "left": "defender.resources.rp", "op": "~", "right": 1},
+            {"type": "and", "preds": [{"type": "always"}, {"type": "nope"}]},
+        ):
+            with self.assertRaises(PredicateError):
+                compile_predicate(bad)
+
+    def test_windows_priority_and_rejection(self):
+        windows = [
+            {"id": "low", "when": "after_link", "if": {"type": "always"}},
+            {"id": "bad", "when": "after_link", "if": {"type": "nope"}, "priority": 99},
+            {"id": "high", "when": "after_link", "if": {"type": "chain_index_at_least", "value": 2}, "priority": 5},
+            {"id": "before", "when": "before_link", "priority": 50},
+        ]
+        self.assertEqual(window_allows_interrupt(windows, "after_link", _ctx(0))["id"], "low")
+        self.assertEqual(window_allows_interrupt(windows, "after_link", _ctx(2))["id"], "high")
+        self.assertEqual(window_allows_interrupt(windows, "before_link", _ctx(0))["id"], "before")
+        compiled = cached_compile(windows)
+        self.assertIs(cached_compile(windows), compiled)
+        self.assertEqual(len(compiled.errors), 1)
+
+        windows[2] = {"id": "replaced", "when": "after_link", "priority": 7}
+        self.assertEqual(window_allows_interrupt(windows, "after_link", _ctx(0))["id"], "replaced")
+
+
+class TestCompiledLegacyWindows(unittest.TestCase):
+    def test_legacy_triggers(self):
+        w = {"after_action_index": [2, 3], "trigger_if": {"chain_length_gte": 3, "blood_mark_gte": 1}}
+        test = compile_legacy_window(w)
+        ctx = _ctx(1)
+        ctx.aggressor["marks"] = {"blood": 1}
+        self.assertTrue(test("after_link", ctx, {}))
+        self.assertFalse(test("before_link", ctx, {}))
+        self.assertFalse(test("after_link", _ctx(0), {}))
+
+    def test_player_moved_reads_the_journal(self):
+        test = compile_legacy_window({"after_action_index": [1], "trigger_if": {"player_moved": True}})
+        moved = {"log": [{"action_effects": {"hit": True, "movement": True}}]}
+        stayed = {"log": [{"action_effects": {"hit": True, "movement": False}}]}
+        self.assertTrue(test("after_link", _ctx(0), moved))
+        self.assertFalse(test("after_link", _ctx(0), stayed))
+
+    def test_unknown_trigger_is_reported_and_never_fires(self):
+        w = {"after_action_index": [1], "trigger_if": {"player_teleported": True}}
+        with self.assertRaises(PredicateError):
+            compile_legacy_window(w)
+        self.assertFalse(_legacy_window_allows_interrupt(w, "after_link", _ctx(0), {}))
+        enemies = {
+            "enemy.ok": {"id": "enemy.ok", "interrupt_windows": [{"after_action_index": [1], "trigger_if": {"chain_length_gte": 2}}]},
+            "enemy.bad": {"id": "enemy.bad", "resolved_archetype": {"rhythm_profile": {"interrupt": {"windows": [w]}}}},
+        }
+        self.assertEqual(list(precompile_enemy_windows(enemies)), ["enemy.bad"])
+        junk = {"enemy.junk": {"id": "enemy.junk", "interrupt_windows": ["after 1", {"after_action_index": [1]}]}}
+        self.assertEqual(precompile_enemy_windows(junk), {"enemy.junk": ["window 0: not an object"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
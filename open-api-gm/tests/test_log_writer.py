@@ -0,0 +1,113 @@
+import sys
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.log_writer import LogWriter, log_tag, log_writer  # noqa: E402
+
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "narration.log"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _lines(self, path=None):
+        return (path or self.path).read_text(encoding="utf-8").splitlines()
+
+    def test_lines_are_batched_in_order(self):
+        w = LogWriter(self.path, interval=5.0)
+        for i in range(100):
+            w.write(f"line {i}")
+        w.flush()
+        self.assertEqual(self._lines(), [f"line {i}" for i in range(100)])
+        m = w.metrics()
+        self.assertEqual(m["lines"], 100)
+        self.assertLess(m["batches"], 100)
+        w.close()
+
+    def test_background_thread_writes_without_flush(self):
+        w = LogWriter(self.path, interval=0.01)
+        w.write("hello")
+        for _ in range(200):
+            if self.path.exists():
+                break
+            threading.Event().wait(0.01)
+        w.close()
+        self.assertEqual(self._lines(), ["hello"])
+
+    def test_line_after_idle_is_written(self):
+        w = LogWriter(self.path, interval=0.01)
+        self.addCleanup(w.close)
+        w.write("a")
+        self._wait_for_lines(1)
+        threading.Event().wait(0.05)  # worker is now parked on an empty queue
+        w.write("b")
+        self._wait_for_lines(2)
+        self.assertEqual(self._lines(), ["a", "b"])
+
+    def _wait_for_lines(self, n):
+        for _ in range(200):
+            if self.path.exists() and len(self._lines()) >= n:
+                return
+            threading.Event().wait(0.01)
+
+    def test_concurrent_writers_lose_nothing(self):
+        w = LogWriter(self.path, batch_size=16, interval=0.001)
+
+        def worker(n):
+            for i in range(200):
+                w.write(f"{n}:{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        w.close()
+        lines = self._lines()
+        self.assertEqual(len(lines), 800)
+        for n in range(4):
+            mine = [int(l.split(":")[1]) for l in lines if l.startswith(f"{n}:")]
+            self.assertEqual(mine, list(range(200)))
+
+    def test_size_based_rotation(self):
+        w = LogWriter(self.path, max_bytes=200, backups=2, background=False)
+        for i in range(60):
+            w.write(f"entry number {i:03d}")
+        self.assertLessEqual(self.path.stat().st_size, 200)
+        self.assertTrue(self.path.with_name("narration.log.1").exists())
+        self.assertTrue(self.path.with_name("narration.log.2").exists())
+        self.assertFalse(self.path.with_name("narration.log.3").exists())
+        self.assertEqual(self._lines()[-1], "entry number 059")
+        self.assertGreaterEqual(w.metrics()["rotations"], 2)
+
+    def test_tags_and_close(self):
+        w = LogWriter(self.path)
+        with log_tag("sess-a"):
+            w.write("inside")
+        w.write("outside")
+        w.close()
+        w.write("after close")  # synchronous once closed
+        self.assertEqual(self._lines(), ["[sess-a] inside", "outside", "after close"])
+
+    def test_full_queue_drops_and_counts(self):
+        w = LogWriter(self.path, queue_size=0)
+        w.write("dropped")
+        self.assertEqual(w.metrics()["dropped"], 1)
+        w.close()
+
+    def test_shared_writer_per_file(self):
+        self.assertIs(log_writer(self.path), log_writer(str(self.path)))
+        log_writer(self.path).close()
+
+
+if __name__ == "__main__":
+    unittest.main()
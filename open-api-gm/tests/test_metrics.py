@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.metrics import HTTP_METRIC, METRICS, PHASE_METRIC, Histogram, MetricsRegistry  # noqa: E402
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        h = Histogram((0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v)
+        self.assertEqual(h.cumulative(), [2, 3, 4])
+        self.assertEqual(h.count, 4)
+        self.assertAlmostEqual(h.sum, 3.65)
+
+
+class TestRegistry(unittest.TestCase):
+    def test_timer_timed_and_laps(self):
+        reg = MetricsRegistry(buckets=(1.0,))
+        with reg.timer("scene_entry"):
+            pass
+
+        @reg.timed("enemy_turn")
+        def turn(x):
+            return x * 2
+
+        self.assertEqual(turn(4), 8)
+        self.assertEqual(turn.__name__, "turn")
+        links = reg.laps("chain_link")
+        for _ in range(3):
+            links.lap()
+        links.close()
+        self.assertEqual(reg.get(PHASE_METRIC, phase="scene_entry").count, 1)
+        self.assertEqual(reg.get(PHASE_METRIC, phase="enemy_turn").count, 1)
+        self.assertEqual(reg.get(PHASE_METRIC, phase="chain_link").count, 3)
+
+    def test_disabled_registry_records_nothing(self):
+        reg = MetricsRegistry(enabled=False)
+        with reg.timer("step"):
+            pass
+        reg.laps("chain_link").lap()
+        reg.timed("step")(lambda: None)()
+        reg.observe(HTTP_METRIC, 0.1, route="/step")
+        self.assertEqual(reg.snapshot(), {})
+        self.assertEqual(reg.render(), "\n")
+
+    def test_render_prometheus_text(self):
+        reg = MetricsRegistry(buckets=(0.5,))
+        reg.observe(HTTP_METRIC, 0.25, method="GET", route="/x", status=200)
+        text = reg.render()
+        self.assertIn("# TYPE vb_http_request_seconds histogram", text)
+        self.assertIn('vb_http_request_seconds_bucket{method="GET",route="/x",status="200",le="0.5"} 1', text)
+        self.assertIn('vb_http_request_seconds_bucket{method="GET",route="/x",status="200",le="+Inf"} 1', text)
+        self.assertIn('vb_http_request_seconds_count{method="GET",route="/x",status="200"} 1', text)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    def test_requests_are_recorded_by_route(self):
+        from fastapi.testclient import TestClient
+        import server
+
+        METRICS.reset()
+        client = TestClient(server.app)
+        client.get("/logs/metrics")
+        resp = client.get("/metrics")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.headers["content-type"].startswith("text/plain"))
+        self.assertIn('route="/logs/metrics"', resp.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import random
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ai.narration_cache import CachedNarrator, NarrationCache, cache_key, narrator_signature, normalize_payload  # noqa: E402
+from ai.narrator import PROMPT_VERSION, VeinbreakerNarrator  # noqa: E402
+from ai.stub_client import StubOpenAIClient  # noqa: E402
+
+
+def resolution(hp_before=12, hp_after=8, to_hit=17):
+    return {
+        "action": "Bleed Strike",
+        "hit": True,
+        "to_hit": to_hit,
+        "damage": 4,
+        "enemy_hp_before": hp_before,
+        "enemy_hp_after": hp_after,
+        "statuses_applied": [],
+    }
+
+
+class TestNormalization(unittest.TestCase):
+    def test_hp_and_rolls_are_banded(self):
+        self.assertEqual(cache_key("narrate", resolution(12, 8, 17)), cache_key("narrate", resolution(13, 9, 19)))
+        self.assertNotEqual(cache_key("narrate", resolution(12, 8)), cache_key("narrate", resolution(12, 0)))
+        self.assertEqual(normalize_payload({"enemy_hp_after": 0, "damage": 4}), {"damage": 4, "enemy_hp_after": "0"})
+
+    def test_key_ignores_dict_order_but_not_kind(self):
+        a = {"x": 1, "y": 2}
+        b = {"y": 2, "x": 1}
+        self.assertEqual(cache_key("loot", a), cache_key("loot", b))
+        self.assertNotEqual(cache_key("loot", a), cache_key("scene", a))
+
+    def test_key_depends_on_the_narrator(self):
+        class OtherClient(StubOpenAIClient):
+            pass
+
+        stub = narrator_signature(VeinbreakerNarrator(StubOpenAIClient(), model="gpt-4o-mini"))
+        other_model = narrator_signature(VeinbreakerNarrator(StubOpenAIClient(), model="gpt-5-nano"))
+        other_client = narrator_signature(VeinbreakerNarrator(OtherClient(), model="gpt-4o-mini"))
+        self.assertIn(PROMPT_VERSION, stub)
+        keys = {cache_key("narrate", resolution(), "combat", sig) for sig in (stub, other_model, other_client)}
+        self.assertEqual(len(keys), 3)
+
+
+class TestNarrationCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "narration.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cache(self, **kw):
+        cache = NarrationCache(self.path, rng=random.Random(0), **kw)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_single_variant_cache_hits_after_first_call(self):
+        client = StubOpenAIClient()
+        narrator = CachedNarrator(VeinbreakerNarrator(client, model="stub"), self._cache(max_variants=1))
+        first = narrator.narrate(resolution(12, 8), scene_tag="combat")
+        again = narrator.narrate(resolution(13, 9), scene_tag="combat")
+        self.assertEqual(first, again)
+        self.assertEqual(len(client.calls), 1)
+
+    def test_other_model_does_not_reuse_text(self):
+        cache = self._cache(max_variants=1)
+        client = StubOpenAIClient()
+        CachedNarrator(VeinbreakerNarrator(client, model="stub"), cache).narrate(resolution())
+        CachedNarrator(VeinbreakerNarrator(client, model="gpt-4o-mini"), cache).narrate(resolution())
+        self.assertEqual(len(client.calls), 2)
+
+    def test_variants_fill_up_then_stop_calling_model(self):
+        client = StubOpenAIClient()
+        narrator = CachedNarrator(VeinbreakerNarrator(client, model="stub"), self._cache(max_variants=3))
+        seen = {narrator.narrate(resolution()) for _ in range(40)}
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len(client.calls), 3)
+
+    def test_persists_across_instances(self):
+        key = cache_key("scene", {"location": "vault"})
+        self._cache(max_variants=1).put(key, "Dust settles.")
+        self.assertEqual(self._cache(max_variants=1).get(key), "Dust settles.")
+
+    def test_size_eviction_drops_least_recently_used(self):
+        clock = iter(range(100))
+        cache = self._cache(max_variants=1, max_bytes=25, clock=lambda: next(clock))
+        cache.put("a", "x" * 10)
+        cache.put("b", "y" * 10)
+        cache.get("a")
+        cache.put("c", "z" * 10)
+        self.assertLessEqual(cache.size_bytes(), 25)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "x" * 10)
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    def test_batch_only_sends_misses(self):
+        client = StubOpenAIClient()
+        narrator = CachedNarrator(VeinbreakerNarrator(client, model="stub"), self._cache(max_variants=1))
+        narrator.narrate_batch([resolution()], scene_tag="combat")
+        other = dict(resolution(), action="Stonepulse")
+        third = dict(resolution(), action="Ward")
+        texts = narrator.narrate_batch([resolution(), other, third], scene_tag="combat")
+        self.assertEqual(len(texts), 3)
+        self.assertEqual(len(client.calls), 2)
+        self.assertIn("Link count: 2", client.calls[1]["prompt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
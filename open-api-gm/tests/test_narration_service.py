@@ -0,0 +1,141 @@
+import sys
+import threading
+import time
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ai.narrator import VeinbreakerNarrator  # noqa: E402
+from ai.stub_client import StubOpenAIClient  # noqa: E402
+from engine.narration_manager import NarrationManager  # noqa: E402
+from engine.narration_service import NarrationService  # noqa: E402
+from game_session import GameSession  # noqa: E402
+
+
+class Collector:
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self.events.append(event)
+
+
+class TestNarrationService(unittest.TestCase):
+    def _service(self, client, **kw):
+        service = NarrationService(VeinbreakerNarrator(client, model="stub"), **kw)
+        self.addCleanup(service.close)
+        return service
+
+    def test_chain_links_coalesce_into_one_prompt(self):
+        client = StubOpenAIClient()
+        service = self._service(client, coalesce_window=0.05)
+        sink = Collector()
+        ids = [
+            service.submit("combat", {"action": f"Strike {i}"}, deliver=sink, group="chain-1")
+            for i in range(3)
+        ]
+        self.assertTrue(service.flush(timeout=5))
+        self.assertEqual(len(client.calls), 1)
+        self.assertIn("Link count: 3", client.calls[0]["prompt"])
+        self.assertEqual([e["id"] for e in sink.events], ids)
+        self.assertEqual(sink.events[1]["text"], "Link 2 lands. Stone answers.")
+        self.assertEqual(service.metrics()["max_batch"], 3)
+
+    def test_timeout_delivers_failure(self):
+        client = StubOpenAIClient(delay=0.5)
+        service = self._service(client, timeout=0.05)
+        sink = Collector()
+        rid = service.submit("scene", {"location": "vault"}, deliver=sink)
+        self.assertTrue(service.flush(timeout=5))
+        self.assertEqual(sink.events, [{"type": "narration_failed", "id": rid, "reason": "timeout"}])
+        self.assertEqual(service.metrics()["timeouts"], 1)
+
+    def test_concurrency_limit(self):
+        state = {"now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def slow(prompt):
+            with lock:
+                state["now"] += 1
+                state["peak"] = max(state["peak"], state["now"])
+            time.sleep(0.05)
+            with lock:
+                state["now"] -= 1
+            return "Dust settles."
+
+        service = self._service(StubOpenAIClient(text_fn=slow), max_concurrency=2)
+        sink = Collector()
+        for _ in range(6):
+            service.submit("scene", {}, deliver=sink)
+        self.assertTrue(service.flush(timeout=5))
+        self.assertEqual(len(sink.events), 6)
+        self.assertLessEqual(state["peak"], 2)
+
+    def test_timed_out_call_keeps_its_slot_until_it_returns(self):
+        gate = threading.Event()
+        state = {"calls": 0, "now": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def stuck_first(prompt):
+            with lock:
+                state["calls"] += 1
+                first = state["calls"] == 1
+                state["now"] += 1
+                state["peak"] = max(state["peak"], state["now"])
+            if first:
+                gate.wait(5)
+            with lock:
+                state["now"] -= 1
+            return "Dust settles."
+
+        service = self._service(StubOpenAIClient(text_fn=stuck_first), max_concurrency=1, timeout=0.2)
+        sink = Collector()
+        first = service.submit("scene", {}, deliver=sink)
+        deadline = time.time() + 5
+        while not sink.events and time.time() < deadline:
+            time.sleep(0.01)
+        second = service.submit("scene", {}, deliver=sink)
+        time.sleep(0.4)  # longer than the timeout: the second call must not have started yet
+        self.assertEqual(state["calls"], 1)
+        gate.set()
+        self.assertTrue(service.flush(timeout=5))
+        self.assertEqual([(e["type"], e["id"]) for e in sink.events], [("narration_failed", first), ("narration", second)])
+        self.assertEqual(state["peak"], 1)
+
+
+class TestAsyncNarrationWiring(unittest.TestCase):
+    def test_manager_submit_returns_placeholder_and_session_receives_text(self):
+        narrator = VeinbreakerNarrator(StubOpenAIClient(), model="stub")
+        service = NarrationService(narrator)
+        self.addCleanup(service.close)
+        manager = NarrationManager(narrator, service=service)
+        session = GameSession(None)
+
+        rid = manager.submit_combat_step(
+            action_effects={"ability_name": "Stonepulse", "hit": True},
+            chain_index=1,
+            deliver=session.deliver,
+            chain_key="c",
+        )
+        self.assertTrue(rid.startswith("narr-"))
+        self.assertTrue(service.flush(timeout=5))
+        delivered = session.drain_delivered()
+        self.assertEqual([(e["type"], e["id"]) for e in delivered], [("narration", rid)])
+        self.assertEqual(session.drain_delivered(), [])
+
+    def test_without_service_submit_is_noop(self):
+        manager = NarrationManager(VeinbreakerNarrator(StubOpenAIClient(), model="stub"))
+        self.assertFalse(manager.is_async)
+        self.assertIsNone(manager.submit_scene_intro(
+            deliver=lambda e: None,
+            location="x", environment_tags=[], enemy_presence={}, player_state={}, threat_level="low",
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.player_store import (  # noqa: E402
+    DEFAULT_PLAYER_ID,
+    JsonPlayerStore,
+    SqlitePlayerStore,
+    open_player_store,
+)
+
+
+STATE = {
+    "character_id": "character.ash",
+    "resources": {"hp": 20, "hp_max": 28, "resolve": 2, "resolve_cap": 5, "idf": 0},
+    "pools": {"martial": 4, "faith": 5},
+    "marks": {"blood": 0},
+    "veinscore": 12,
+    "veins_spent_total": 1,
+    "cooldowns": {"core.basic_strike": {"cooldown": 0, "base_cooldown": 0}},
+}
+
+
+class SqlitePlayerStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = SqlitePlayerStore(self.root / "players.sqlite")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _value_rows(self):
+        return self.store._conn.execute("SELECT COUNT(*) FROM player_values").fetchone()[0]
+
+    def test_wal_mode(self):
+        mode = self.store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_state_round_trip_per_player(self):
+        self.store.save_state("alice", STATE)
+        other = dict(STATE, character_id="character.bo", veinscore=3)
+        self.store.save_state("bob", other)
+        self.assertEqual(self.store.load_state("alice"), STATE)
+        self.assertEqual(self.store.load_state("bob")["veinscore"], 3)
+        self.assertIsNone(self.store.load_state("carol"))
+
+    def test_update_state_touches_only_changed_rows(self):
+        self.store.save_state("alice", STATE)
+        rows = self._value_rows()
+        before = self.store._conn.total_changes
+        self.store.update_state("alice", "resources", {"hp": 11})
+        # player row touch + one value row
+        self.assertEqual(self.store._conn.total_changes - before, 2)
+        self.assertEqual(self._value_rows(), rows)
+        state = self.store.load_state("alice")
+        self.assertEqual(state["resources"]["hp"], 11)
+        self.assertEqual(state["resources"]["hp_max"], 28)
+
+        self.store.update_state("alice", "marks", {"blood": None, "duns": 1})
+        self.assertEqual(self.store.load_state("alice")["marks"], {"duns": 1})
+
+    def test_save_state_skips_unchanged_rows(self):
+        self.store.save_state("alice", STATE)
+        before = self.store._conn.total_changes
+        self.store.save_state("alice", STATE)
+        self.assertEqual(self.store._conn.total_changes - before, 1)  # players.updated_at only
+
+    def test_save_state_keeps_character_without_id(self):
+        self.store.save_state("alice", STATE)
+        self.store.save_state("alice", {k: v for k, v in STATE.items() if k != "character_id"})
+        self.assertEqual(self.store.load_state("alice")["character_id"], "character.ash")
+
+    def test_transaction_rolls_back(self):
+        self.store.save_state("alice", STATE)
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.store.update_state("alice", "pools", {"martial": 0})
+                self.store.set_character("alice", "character.other")
+                raise RuntimeError("boom")
+        state = self.store.load_state("alice")
+        self.assertEqual(state["pools"]["martial"], 4)
+        self.assertEqual(state["character_id"], "character.ash")
+
+    def test_concurrent_players_do_not_clobber(self):
+        def worker(pid):
+            for i in range(25):
+                self.store.update_state(pid, "resources", {"hp": i})
+
+        threads = [threading.Thread(target=worker, args=(f"p{n}",)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for n in range(4):
+            self.assertEqual(self.store.load_state(f"p{n}")["resources"], {"hp": 24})
+
+    def test_profiles_fall_back_to_directory(self):
+        chars = self.root / "characters"
+        chars.mkdir()
+        (chars / "character.ash.json").write_text(json.dumps({"id": "character.ash", "name": "Ash"}), encoding="utf-8")
+        store = SqlitePlayerStore(self.root / "other.sqlite", profiles_dir=chars)
+        try:
+            self.assertEqual(store.load_profile("character.ash")["name"], "Ash")
+            store.save_profile({"id": "character.ash", "name": "Ash II"})
+            store.save_profile({"id": "character.new", "name": "New"})
+            self.assertEqual(store.load_profile("character.ash")["name"], "Ash II")
+            self.assertEqual([p["id"] for p in store.list_profiles()], ["character.ash", "character.new"])
+            self.assertFalse(store.has_profile("character.missing"))
+        finally:
+            store.close()
+
+
+class MigrationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.state_path = self.root / "player_state.json"
+        self.chars = self.root / "characters"
+        self.chars.mkdir()
+        self.state_path.write_text(json.dumps(STATE), encoding="utf-8")
+        (self.chars / "character.ash.json").write_text(json.dumps({"id": "character.ash", "name": "Ash"}), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_open_imports_legacy_files_once(self):
+        db = self.root / "players.sqlite"
+        store = open_player_store("sqlite", state_path=self.state_path, profiles_dir=self.chars, db_path=db)
+        try:
+            self.assertEqual(store.load_state(DEFAULT_PLAYER_ID), STATE)
+            self.assertEqual(store.load_profile("character.ash")["name"], "Ash")
+            store.update_state(DEFAULT_PLAYER_ID, "resources", {"hp": 1})
+        finally:
+            store.close()
+
+        # Re-opening does not re-import over newer data.
+        store = open_player_store("sqlite", state_path=self.state_path, profiles_dir=self.chars, db_path=db)
+        try:
+            self.assertEqual(store.load_state(DEFAULT_PLAYER_ID)["resources"]["hp"], 1)
+        finally:
+            store.close()
+
+    def test_json_store_per_player_files_migrate(self):
+        legacy = JsonPlayerStore(state_path=self.state_path, profiles_dir=self.chars)
+        legacy.save_state("alice", dict(STATE, veinscore=7))
+        self.assertEqual(json.loads(self.state_path.read_text(encoding="utf-8")), STATE)
+
+        store = SqlitePlayerStore(":memory:")
+        counts = store.import_json_files(
+            state_path=self.state_path, profiles_dir=self.chars, players_dir=legacy.players_dir
+        )
+        self.assertEqual(counts, {"players": 2, "profiles": 1})
+        self.assertEqual(store.load_state("alice")["veinscore"], 7)
+        self.assertEqual(store.load_state(DEFAULT_PLAYER_ID)["veinscore"], 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import sys
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine import rng as rng_mod  # noqa: E402
+from engine.action_resolution import roll  # noqa: E402
+from engine.rng import EncounterRNG, bind, encounter_rng, start_encounter_rng  # noqa: E402
+from session_store import _decode, _encode  # noqa: E402
+
+
+class TestEncounterRNG(unittest.TestCase):
+    def test_substreams_are_independent_and_reproducible(self):
+        a, b = EncounterRNG(42), EncounterRNG(42)
+        a.stream("interrupt").random()  # extra draw on another stream
+        self.assertEqual([a.roll("2d6") for _ in range(5)], [b.roll("2d6") for _ in range(5)])
+        self.assertNotEqual(EncounterRNG(1).stream("attack").random(), EncounterRNG(1).stream("damage").random())
+
+    def test_malformed_dice_roll_zero(self):
+        self.assertEqual(EncounterRNG(1).roll("banana"), 0)
+        self.assertEqual(EncounterRNG(1).roll("0d6"), 0)
+
+    def test_block_mode_is_deterministic_and_in_range(self):
+        if rng_mod.np is None:
+            self.skipTest("numpy not installed")
+        a, b = EncounterRNG(7, block_size=64), EncounterRNG(7, block_size=64)
+        rolls = [a.roll("3d6") for _ in range(100)]
+        self.assertEqual(rolls, [b.roll("3d6") for _ in range(100)])
+        self.assertTrue(all(3 <= r <= 18 for r in rolls))
+        block = a.dice_block(20, 10_000, "attack")
+        self.assertEqual((int(block.min()), int(block.max())), (1, 20))
+
+    def test_snapshot_round_trip_resumes_streams(self):
+        state = {"seed": 99}
+        start_encounter_rng(state)
+        encounter_rng(state).roll("1d20", "attack")
+        restored = _decode(_encode(state))
+        expected = [encounter_rng(state).roll("1d20", "attack") for _ in range(5)]
+        self.assertEqual([encounter_rng(restored).roll("1d20", "attack") for _ in range(5)], expected)
+
+    def test_new_encounters_get_new_streams(self):
+        state = {"seed": 5}
+        first = start_encounter_rng(state).stream("damage").random()
+        second = start_encounter_rng(state).stream("damage").random()
+        self.assertNotEqual(first, second)
+        self.assertEqual(state["encounter_count"], 2)
+
+
+class TestBinding(unittest.TestCase):
+    def test_roll_uses_bound_state_and_falls_back_to_global(self):
+        state = {"seed": 3}
+        with bind(state):
+            bound = [roll("1d20", stream="attack") for _ in range(3)]
+        again = {"seed": 3}
+        with bind(again):
+            self.assertEqual([roll("1d20", stream="attack") for _ in range(3)], bound)
+        with patch.object(random, "randint", return_value=4):
+            self.assertEqual(roll("2d6"), 8)
+
+    def test_select_loot_draws_from_loot_stream(self):
+        import play
+
+        game_data = {"loot": [{"name": f"item{i}", "tier": 1} for i in range(10)]}
+        picks = []
+        for _ in range(2):
+            state = {"seed": 11}
+            with bind(state):
+                picks.append([play.select_loot(game_data, {"tier": 1})["name"] for _ in range(5)])
+        self.assertEqual(picks[0], picks[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import sys
+from collections import Counter
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from session_routing import HashRing, create_router, session_id_of  # noqa: E402
+
+
+class TestHashRing(unittest.TestCase):
+    def test_spread_and_minimal_movement(self):
+        ring = HashRing(["w0", "w1", "w2", "w3"])
+        keys = [f"session-{i}" for i in range(4000)]
+        before = {k: ring.node_for(k) for k in keys}
+        counts = Counter(before.values())
+        self.assertEqual(set(counts), {"w0", "w1", "w2", "w3"})
+        self.assertGreater(min(counts.values()), 600)
+
+        ring.remove("w2")
+        after = {k: ring.node_for(k) for k in keys}
+        moved = [k for k in keys if before[k] != after[k]]
+        self.assertTrue(all(before[k] == "w2" for k in moved))
+        self.assertEqual(len(moved), counts["w2"])
+
+    def test_exclude_falls_through_to_next_node(self):
+        ring = HashRing(["a", "b"])
+        owner = ring.node_for("s1")
+        self.assertNotEqual(ring.node_for("s1", exclude=[owner]), owner)
+        self.assertIsNone(ring.node_for("s1", exclude=["a", "b"]))
+
+    def test_session_id_of(self):
+        self.assertEqual(session_id_of({"session_id": "q"}, b""), "q")
+        self.assertEqual(session_id_of({}, b'{"session_id": "b", "action": "tick"}'), "b")
+        self.assertIsNone(session_id_of({}, b"not json"))
+
+
+def _worker(name):
+    app = FastAPI()
+
+    @app.post("/step")
+    async def step(request: Request):
+        body = await request.json()
+        return {"worker": name, "session_id": body["session_id"]}
+
+    return app
+
+
+class _Dispatch(httpx.AsyncBaseTransport):
+    """Routes by host to in-process worker apps; hosts not listed refuse connections."""
+
+    def __init__(self, apps):
+        self.transports = {host: httpx.ASGITransport(app=app) for host, app in apps.items()}
+
+    async def handle_async_request(self, request):
+        transport = self.transports.get(request.url.host)
+        if transport is None:
+            raise httpx.ConnectError("refused", request=request)
+        return await transport.handle_async_request(request)
+
+
+class TestRouter(unittest.TestCase):
+    def test_sticky_routing_and_failover(self):
+        upstreams = ["http://w0", "http://w1", "http://w2"]
+        live = {"w0": _worker("w0"), "w1": _worker("w1"), "w2": _worker("w2")}
+        transport = _Dispatch(live)
+        client = TestClient(create_router(upstreams, transport=transport))
+
+        seen = {}
+        for i in range(30):
+            sid = f"s{i}"
+            first = client.post("/step", json={"session_id": sid}).json()["worker"]
+            again = client.post("/step", json={"session_id": sid}).json()["worker"]
+            self.assertEqual(first, again)
+            seen[sid] = first
+        self.assertGreater(len(set(seen.values())), 1)
+
+        del transport.transports["w1"]
+        for sid, owner in seen.items():
+            resp = client.post("/step", json={"session_id": sid})
+            self.assertEqual(resp.status_code, 200)
+            if owner != "w1":
+                self.assertEqual(resp.json()["worker"], owner)
+            else:
+                self.assertNotEqual(resp.json()["worker"], "w1")
+        metrics = client.get("/router/metrics").json()
+        self.assertEqual(metrics["down"], ["http://w1"])
+        self.assertGreaterEqual(metrics["failovers"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from session_store import LRUSessionStore, SqliteSessionStore, restore_session, snapshot_session  # noqa: E402
+
+
+class FakeGame:
+    def __init__(self):
+        self.started = False
+        self.context = {"state": {"phase": {"round": 0}}, "game_data": {"shared": True}, "combat": None}
+
+
+class FakeSession:
+    def __init__(self):
+        self.game = FakeGame()
+        self.events = []
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_round_trip_drops_runtime_objects_and_keeps_rng(self):
+        session = FakeSession()
+        rng = random.Random("seed")
+        state = session.game.context["state"]
+        state["game_data"] = session.game.context["game_data"]
+        state["enemies"] = [{"id": "e1", "_spawn_rng": rng, "_action_index": object(), "hp": {"current": 3, "max": 5}}]
+        state["phase"]["resolve_regen"] = (1, 2, 3)
+        session.events = [{"type": "system", "text": "hi"}]
+
+        snap = snapshot_session(session)
+        self.assertNotIn("game_data", snap["state"])
+        self.assertNotIn("_action_index", snap["state"]["enemies"][0])
+
+        fresh = restore_session(FakeSession(), snap)
+        fstate = fresh.game.context["state"]
+        self.assertIs(fstate["game_data"], fresh.game.context["game_data"])
+        self.assertEqual(fstate["enemies"][0]["hp"], {"current": 3, "max": 5})
+        self.assertEqual(fstate["enemies"][0]["_spawn_rng"].random(), rng.random())
+        self.assertEqual(fresh.events, [{"type": "system", "text": "hi"}])
+
+
+class TestLRUSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.store = LRUSessionStore(FakeSession, max_sessions=2, idle_ttl=60, snapshot_dir=Path(self.tmp.name), clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _session(self, rnd):
+        s = FakeSession()
+        s.game.context["state"]["phase"]["round"] = rnd
+        return s
+
+    def test_lru_eviction_snapshots_and_rehydrates(self):
+        self.store.put("a", self._session(1))
+        self.store.put("b", self._session(2))
+        self.store.get("a")  # b is now least recently used
+        self.store.put("c", self._session(3))
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.metrics()["evictions_lru"], 1)
+
+        b = self.store.get("b")
+        self.assertEqual(b.game.context["state"]["phase"]["round"], 2)
+        m = self.store.metrics()
+        self.assertEqual(m["rehydrations"], 1)
+        self.assertEqual(m["live_sessions"], 2)
+        self.assertGreater(m["bytes_per_session_avg"], 0)
+
+    def test_idle_ttl_expires_sessions(self):
+        self.store.put("a", self._session(1))
+        self.clock.now = 61
+        self.store.put("b", self._session(2))
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.metrics()["evictions_ttl"], 1)
+        self.assertEqual(self.store.get("a").game.context["state"]["phase"]["round"], 1)
+
+    def test_discard_forgets_snapshot(self):
+        self.store.put("a", self._session(1))
+        self.store.put("b", self._session(2))
+        self.store.put("c", self._session(3))
+        self.store.discard("a")
+        self.assertIsNone(self.store.get("a"))
+
+    def test_abandoned_snapshots_are_pruned(self):
+        self.store.put("a", self._session(1))
+        self.store.put("b", self._session(2))
+        self.store.put("c", self._session(3))  # evicts "a" to disk
+        (path,) = Path(self.tmp.name).glob("*.json")
+        old = path.stat().st_mtime - 60 * 49
+        os.utime(path, (old, old))
+        restarted = LRUSessionStore(FakeSession, idle_ttl=60, snapshot_dir=Path(self.tmp.name), clock=self.clock)
+        self.assertEqual(restarted.metrics()["snapshots_pruned"], 1)
+        self.assertEqual(list(Path(self.tmp.name).glob("*.json")), [])
+        self.assertIsNone(restarted.get("a"))
+
+    def test_on_evict_runs_before_snapshot(self):
+        evicted = []
+        store = LRUSessionStore(
+            FakeSession, max_sessions=1, snapshot_dir=Path(self.tmp.name), clock=self.clock,
+            on_evict=lambda sid, session: evicted.append((sid, session.game.context["state"]["phase"]["round"])),
+        )
+        store.put("a", self._session(1))
+        store.put("b", self._session(2))
+        self.assertEqual(evicted, [("a", 1)])
+
+
+class TestSqliteSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        db = Path(self.tmp.name) / "sessions.sqlite"
+        self.a = SqliteSessionStore(FakeSession, db, worker="a")
+        self.b = SqliteSessionStore(FakeSession, db, worker="b")
+
+    def tearDown(self):
+        self.a.close()
+        self.b.close()
+        self.tmp.cleanup()
+
+    def _round(self, store, sid="s1"):
+        return store.get(sid).game.context["state"]["phase"]["round"]
+
+    def test_session_moves_between_workers(self):
+        s = FakeSession()
+        s.game.context["state"]["phase"]["round"] = 1
+        self.a.put("s1", s)
+        self.assertIs(self.a.get("s1"), s)  # cached while nobody else touched it
+
+        moved = self.b.get("s1")
+        self.assertEqual(moved.game.context["state"]["phase"]["round"], 1)
+        moved.game.context["state"]["phase"]["round"] = 2
+        self.b.save("s1", moved)
+
+        self.assertIsNot(self.a.get("s1"), s)  # stale copy replaced by b's snapshot
+        self.assertEqual(self._round(self.a), 2)
+        self.assertEqual(self.a.version("s1"), 2)
+        self.assertEqual(self.a.metrics()["moved_in"], 1)
+        self.assertEqual(self.a.metrics()["conflicts"], 0)
+
+    def test_concurrent_saves_last_writer_wins(self):
+        self.a.put("s1", FakeSession())
+        sa, sb = self.a.get("s1"), self.b.get("s1")
+        sa.game.context["state"]["phase"]["round"] = 5
+        sb.game.context["state"]["phase"]["round"] = 7
+        self.a.save("s1", sa)
+        self.b.save("s1", sb)
+        self.assertEqual(self.b.metrics()["conflicts"], 1)
+        self.assertEqual(self._round(self.a), 7)
+
+    def test_stale_rows_are_pruned(self):
+        self.a.put("old", FakeSession())
+        self.a.put("new", FakeSession())
+        self.a._conn.execute("UPDATE sessions SET updated_at = updated_at - ? WHERE session_id = 'old'", (self.a.retention + 1,))
+        self.assertEqual(self.b.prune(), 1)
+        self.assertEqual(self.b.metrics()["stored_sessions"], 1)
+        self.assertIsNone(self.b.get("old"))
+        self.assertIsNotNone(self.b.get("new"))
+
+    def test_discard_and_unknown_sessions(self):
+        self.assertIsNone(self.a.get("nope"))
+        self.a.put("s1", FakeSession())
+        self.b.discard("s1")
+        self.assertIsNone(self.a.get("s1"))
+        self.assertEqual(self.a.metrics()["stored_sessions"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import random
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import simulator  # noqa: E402
+
+
+class TestSimulator(unittest.TestCase):
+    def setUp(self):
+        builds = simulator.load_builds()
+        self.build_id = sorted(builds)[0]
+        self.builds = {self.build_id: builds[self.build_id]}
+        self.enemy = "enemy.brumklin.skitter"
+
+    def test_encounter_is_reproducible_from_seed(self):
+        build = self.builds[self.build_id]
+        a = simulator.simulate_encounter(build, self.enemy, 1234)
+        b = simulator.simulate_encounter(build, self.enemy, 1234)
+        self.assertEqual(a, b)
+        self.assertIn(a["outcome"], {"win", "loss", "timeout"})
+        self.assertGreaterEqual(a["rounds"], 1)
+
+    def test_global_random_is_not_reseeded(self):
+        build = self.builds[self.build_id]
+        after = []
+        results = []
+        for outer in (1, 2):
+            random.seed(outer)
+            results.append(simulator.simulate_encounter(build, self.enemy, 99))
+            after.append(random.random())
+        self.assertEqual(results[0], results[1])
+        self.assertNotEqual(after[0], after[1])
+
+    def test_batch_summary(self):
+        report = simulator.run_batch(builds=self.builds, enemy_ids=[self.enemy], n=6, seed=3, workers=1, chunk_size=4)
+        again = simulator.run_batch(builds=self.builds, enemy_ids=[self.enemy], n=6, seed=3, workers=1, chunk_size=2)
+        self.assertEqual(report["summary"], again["summary"])
+        row = report["summary"][f"{self.build_id}|{self.enemy}"]
+        self.assertEqual(row["encounters"], 6)
+        self.assertTrue(0.0 <= row["win_rate"] <= 1.0)
+        for key in ("rounds_to_kill", "damage_dealt", "damage_taken"):
+            self.assertIn("p50", row[key])
+        self.assertIn("enemy_interrupts_per_round", row)
+
+    def test_derive_seed_is_stable(self):
+        self.assertEqual(simulator.derive_seed(1, "a", "b", 0), simulator.derive_seed(1, "a", "b", 0))
+        self.assertNotEqual(simulator.derive_seed(1, "a", "b", 0), simulator.derive_seed(1, "a", "b", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from game_session import GameSession  # noqa: E402
+from state_diff import StateDiffer, apply_patch, diff  # noqa: E402
+from ui.events import emit_character_update  # noqa: E402
+from ui.web_provider import WebProvider  # noqa: E402
+
+
+SHEET = {
+    "name": "Kest",
+    "hp": {"current": 20, "max": 28},
+    "abilities": [{"id": "a", "cooldown": 0}, {"id": "b", "cooldown": 2}],
+    "meters": {"heat": 0, "a/b": 1},
+}
+
+
+class TestDiff(unittest.TestCase):
+    def test_round_trip(self):
+        new = {
+            "name": "Kest",
+            "hp": {"current": 14, "max": 28},
+            "abilities": [{"id": "a", "cooldown": 1}, {"id": "b", "cooldown": 2}],
+            "meters": {"heat": 2, "balance": 1},
+        }
+        ops = diff(SHEET, new)
+        self.assertEqual(apply_patch(SHEET, ops), new)
+        self.assertIn({"op": "replace", "path": "/hp/current", "value": 14}, ops)
+        self.assertIn({"op": "remove", "path": "/meters/a~1b"}, ops)
+        self.assertEqual(diff(SHEET, SHEET), [])
+
+    def test_lists_of_new_length_and_type_changes_are_replaced(self):
+        new = dict(SHEET, abilities=[{"id": "a", "cooldown": 0}], hp=None)
+        ops = diff(SHEET, new)
+        self.assertIn({"op": "replace", "path": "/abilities", "value": [{"id": "a", "cooldown": 0}]}, ops)
+        self.assertEqual(apply_patch(SHEET, ops), new)
+        self.assertEqual(diff(1, 1.0), [{"op": "replace", "path": "", "value": 1.0}])
+
+
+class TestStateDiffer(unittest.TestCase):
+    def test_full_then_delta_then_skip(self):
+        d = StateDiffer()
+        first = d.encode("character", SHEET)
+        self.assertEqual(first, {"version": 1, "full": SHEET})
+        changed = dict(SHEET, hp={"current": 5, "max": 28})
+        second = d.encode("character", changed)
+        self.assertEqual(second["base"], 1)
+        self.assertEqual(second["version"], 2)
+        self.assertEqual(apply_patch(first["full"], second["patch"]), changed)
+        self.assertIsNone(d.encode("character", changed))
+        self.assertEqual(d.versions(), {"character": 2})
+
+    def test_stale_ack_and_reset_force_full_snapshots(self):
+        d = StateDiffer()
+        d.encode("character", SHEET)
+        d.encode("enemy", {"name": "Skitter"})
+        d.ack({"character": 1, "enemy": 0})
+        self.assertTrue(d.enabled)
+        self.assertIn("patch", d.encode("character", dict(SHEET, name="K")))
+        self.assertIn("full", d.encode("enemy", {"name": "Skitter"}))
+        d.reset()
+        self.assertIn("full", d.encode("character", SHEET))
+
+
+class TestEmitStateUpdate(unittest.TestCase):
+    def setUp(self):
+        self.session = GameSession(None)
+        self.ui = WebProvider(self.session)
+
+    def test_legacy_sessions_get_full_events(self):
+        emit_character_update(self.ui, SHEET)
+        emit_character_update(self.ui, SHEET)
+        self.assertEqual(len(self.session.events), 2)
+        self.assertNotIn("version", self.session.events[0])
+        self.assertEqual(self.session.events[1]["character"]["name"], "Kest")
+
+    def test_acked_sessions_get_deltas(self):
+        self.session.deltas.ack({})
+        emit_character_update(self.ui, SHEET)
+        emit_character_update(self.ui, SHEET)
+        emit_character_update(self.ui, dict(SHEET, hp={"current": 1, "max": 28}))
+        full, delta = self.session.events
+        self.assertEqual(full["type"], "character_update")
+        self.assertEqual(full["version"], 1)
+        self.assertEqual(delta["type"], "character_update")
+        self.assertEqual(delta["base"], 1)
+        self.assertNotIn("character", delta)
+        self.assertEqual(apply_patch(full["character"], delta["patch"])["hp"]["current"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
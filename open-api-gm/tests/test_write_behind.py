@@ -0,0 +1,205 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import unittest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.player_store import JsonPlayerStore, PlayerStore, SqlitePlayerStore  # noqa: E402
+from engine.write_behind import WriteBehindStore  # noqa: E402
+
+
+STATE = {
+    "character_id": "character.ash",
+    "resources": {"hp": 20, "hp_max": 28},
+    "pools": {"martial": 4},
+    "marks": {},
+    "veinscore": 12,
+    "veins_spent_total": 0,
+    "cooldowns": {},
+}
+PROFILE = {"id": "character.ash", "name": "Ash", "abilities": ["core.basic_strike"]}
+
+
+class CountingStore(SqlitePlayerStore):
+    def __init__(self):
+        super().__init__(":memory:")
+        self.writes = []
+
+    def save_state(self, player_id, state):
+        self.writes.append(("state", player_id))
+        super().save_state(player_id, state)
+
+    def save_profile(self, profile):
+        self.writes.append(("profile", profile.get("id")))
+        super().save_profile(profile)
+
+
+class FailingStore(PlayerStore):
+    def __init__(self):
+        self.fail = True
+        self.saved = {}
+
+    def load_state(self, player_id="default"):
+        return self.saved.get(player_id)
+
+    def save_state(self, player_id, state):
+        if self.fail:
+            raise OSError("disk full")
+        self.saved[player_id] = state
+
+    def save_profile(self, profile):
+        pass
+
+    def load_profile(self, character_id):
+        return None
+
+    def list_profiles(self):
+        return []
+
+
+class WriteBehindTests(unittest.TestCase):
+    def setUp(self):
+        self.backend = CountingStore()
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_saves_within_a_step_coalesce_into_one_flush(self):
+        store = WriteBehindStore(self.backend, window=0)
+        with store.hold("alice"):
+            for hp in (10, 9, 8):
+                store.save_profile(PROFILE)
+                store.save_state("alice", dict(STATE, resources={"hp": hp, "hp_max": 28}))
+            store.set_character("alice", "character.ash")
+            self.assertEqual(self.backend.writes, [])
+            # Reads see the buffered state.
+            self.assertEqual(store.load_state("alice")["resources"]["hp"], 8)
+        self.assertEqual(sorted(self.backend.writes), [("profile", "character.ash"), ("state", "alice")])
+        self.assertEqual(self.backend.load_state("alice")["resources"]["hp"], 8)
+
+        m = store.metrics()
+        self.assertEqual(m["logical_writes"], 7)
+        self.assertEqual(m["physical_writes"], 2)
+        self.assertEqual(m["flushes"], 1)
+        self.assertLess(m["write_amplification"], 1.0)
+        self.assertGreater(m["bytes_written"], 0)
+
+    def test_unheld_synchronous_mode_writes_immediately(self):
+        store = WriteBehindStore(self.backend, window=0)
+        store.save_state("alice", STATE)
+        self.assertEqual(self.backend.writes, [("state", "alice")])
+        self.assertEqual(store.pending(), 0)
+
+    def test_time_window_flushes_in_background(self):
+        store = WriteBehindStore(self.backend, window=0.05)
+        try:
+            store.save_state("alice", STATE)
+            store.save_state("alice", dict(STATE, veinscore=3))
+            self.assertEqual(store.pending(), 1)
+            deadline = time.monotonic() + 2.0
+            while store.pending() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(self.backend.writes, [("state", "alice")])
+            self.assertEqual(self.backend.load_state("alice")["veinscore"], 3)
+        finally:
+            store.close()
+
+    def test_held_player_is_not_flushed_by_window(self):
+        store = WriteBehindStore(self.backend, window=0.01)
+        try:
+            with store.hold("alice"):
+                store.save_state("alice", STATE)
+                time.sleep(0.1)
+                self.assertEqual(self.backend.writes, [])
+        finally:
+            store.close()
+        self.assertEqual(self.backend.writes, [("state", "alice")])
+
+    def test_flush_one_player_and_close(self):
+        store = WriteBehindStore(self.backend, window=60)
+        store.save_state("alice", STATE)
+        store.save_state("bob", STATE)
+        self.assertEqual(store.flush("alice"), 1)
+        self.assertEqual(self.backend.writes, [("state", "alice")])
+        store.close()
+        self.assertEqual(self.backend.writes, [("state", "alice"), ("state", "bob")])
+        # After close, writes go straight through.
+        store.save_state("carol", STATE)
+        self.assertEqual(self.backend.writes[-1], ("state", "carol"))
+
+    def test_failed_flush_keeps_data(self):
+        backend = FailingStore()
+        store = WriteBehindStore(backend, window=60)
+        store.save_state("alice", STATE)
+        self.assertEqual(store.flush(), 0)
+        self.assertEqual(store.metrics()["flush_errors"], 1)
+        self.assertEqual(store.pending(), 1)
+        backend.fail = False
+        self.assertEqual(store.flush(), 1)
+        self.assertEqual(backend.saved["alice"]["veinscore"], 12)
+
+    def test_failing_backend_is_retried_with_backoff(self):
+        backend = FailingStore()
+        store = WriteBehindStore(backend, window=0.05)
+        self.addCleanup(store.close)
+        self.addCleanup(setattr, backend, "fail", False)
+        store.save_state("alice", STATE)
+        time.sleep(0.5)
+        # Due at 0.05s, then backoff of 0.05, 0.1, 0.2: a handful of attempts, not a spin.
+        errors = store.metrics()["flush_errors"]
+        self.assertGreaterEqual(errors, 2)
+        self.assertLessEqual(errors, 5)
+        self.assertEqual(store.pending(), 1)
+        backend.fail = False
+        self.assertEqual(store.flush("alice"), 1)
+        self.assertEqual(backend.saved["alice"]["veinscore"], 12)
+
+    def test_concurrent_steps_for_different_players(self):
+        store = WriteBehindStore(self.backend, window=0)
+
+        def step(pid):
+            with store.hold(pid):
+                for i in range(10):
+                    store.save_state(pid, dict(STATE, veinscore=i))
+
+        threads = [threading.Thread(target=step, args=(f"p{n}",)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.backend.writes), 4)
+        for n in range(4):
+            self.assertEqual(self.backend.load_state(f"p{n}")["veinscore"], 9)
+
+
+class AtomicJsonWriteTests(unittest.TestCase):
+    def test_json_store_replaces_files_atomically(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            store = JsonPlayerStore(state_path=root / "player_state.json", profiles_dir=root / "characters")
+            store.save_state("default", STATE)
+            store.save_profile(PROFILE)
+            self.assertEqual(json.loads((root / "player_state.json").read_text(encoding="utf-8")), STATE)
+            leftovers = [p.name for p in root.rglob("*.tmp")]
+            self.assertEqual(leftovers, [])
+
+
+class PlayStoreTests(unittest.TestCase):
+    def test_importing_play_does_not_open_the_store(self):
+        code = "import play; assert play._PLAYER_STORE is None; play.player_store(); assert play._PLAYER_STORE is not None"
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, VB_PLAYER_DB=str(Path(tmp) / "players.sqlite"))
+            proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Benchmark suite: engine, loaders and the web step path.
+
+Usage:
+  python tools/bench.py                                   # all benchmarks, table only
+  python tools/bench.py resolve_chain --min-time 0.5      # prefix filter
+  python tools/bench.py --json bench_baseline.json        # save a report
+  python tools/bench.py --compare bench_baseline.json     # exit 1 on regression
+
+Benchmarks and report format: see benchmarks.py. Runs against a throwaway
+player database, journal directory and narration log, so the working copy's
+saves and logs are left alone. Compare reports from the same machine and
+Python build; use --threshold to widen the tolerance on noisy hosts.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_SCRATCH = tempfile.mkdtemp(prefix="vb-bench-")
+os.environ.setdefault("VB_PLAYER_DB", str(Path(_SCRATCH) / "players.db"))
+os.environ.setdefault("VB_JOURNAL_DIR", "")
+os.environ.setdefault("VB_METRICS", "0")
+
+import play  # noqa: E402
+import ui.events  # noqa: E402
+from benchmarks import compare, run_benchmarks, select  # noqa: E402
+
+play.LOG_FILE = ui.events._DEBUG_LOG_PATH = Path(_SCRATCH) / "narration.log"
+
+
+def _print_row(r) -> None:
+    print(f"{r.name:<30} {r.ops_per_sec:>11.1f} {r.p50_us:>10.1f} {r.p95_us:>10.1f} {r.alloc_peak_bytes:>11} {r.alloc_retained_bytes:>11}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VeinBreaker benchmark suite")
+    parser.add_argument("names", nargs="*", help="Benchmark name prefixes (default: all).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=1.0, help="Timed seconds per benchmark.")
+    parser.add_argument("--min-ops", type=int, default=5)
+    parser.add_argument("--json", dest="json_out", default=None, help="Write the report to this path.")
+    parser.add_argument("--compare", default=None, help="Baseline report to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed ops/sec drop vs the baseline (fraction).")
+    parser.add_argument("--alloc-threshold", type=float, default=0.25, help="Allowed peak allocation growth (fraction).")
+    parser.add_argument("--list", action="store_true", help="List benchmark names and exit.")
+    args = parser.parse_args(argv)
+
+    names = select(args.names)
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        parser.error(f"no benchmark matches {args.names}")
+
+    header = f"{'benchmark':<30} {'ops/sec':>11} {'p50 us':>10} {'p95 us':>10} {'peak B':>11} {'retained B':>11}"
+    print(header)
+    print("-" * len(header))
+    report = run_benchmarks(names, seed=args.seed, min_time=args.min_time, min_ops=args.min_ops, progress=_print_row)
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nreport -> {args.json_out}")
+
+    if not args.compare:
+        return 0
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    rows = compare(report, baseline, threshold=args.threshold, alloc_threshold=args.alloc_threshold)
+    print(f"\nvs {args.compare}")
+    print(f"{'benchmark':<30} {'speed':>8} {'alloc':>8}")
+    for row in rows:
+        flag = f"  REGRESSION ({row['reason']})" if row["regression"] else ""
+        print(f"{row['name']:<30} {row['speed_ratio']:>7.2f}x {row['alloc_ratio']:>7.2f}x{flag}")
+    missing = [n for n in report["results"] if n not in (baseline.get("results") or {})]
+    if missing:
+        print(f"not in baseline: {', '.join(missing)}")
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Microbenchmark: engine.combat_state meter/status access.
+
+Usage:
+  python tools/bench_combat_state.py
+  python tools/bench_combat_state.py -n 500000
+
+Runs the per-link access pattern of the chain resolution engine (meter reads,
+adds and sets plus a status lookup) against the slotted Participant layout and
+against the previous nested-dict layout (reproduced below), and compares the
+memory held by one registered participant.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine import combat_state as cs  # noqa: E402
+
+
+# ── previous dict-based layout ────────────────────────────────────────────────
+
+_LEGACY_METERS = {"heat", "balance", "momentum", "rp", "rp_cap"}
+
+
+def legacy_register(state, *, key, entity, side):
+    participants = state.setdefault("encounter", {}).setdefault("participants", {})
+    participants[key] = {
+        "key": key,
+        "side": side,
+        "id": entity.get("id") or key,
+        "combat": {"heat": 0, "balance": 0, "momentum": 0, "rp": 3, "rp_cap": 3},
+        "statuses": {},
+    }
+    entity["_combat_key"] = key
+
+
+def legacy_participant(state, entity):
+    key = entity.get("_combat_key") if isinstance(entity, dict) else None
+    if not key:
+        return None
+    enc = state.get("encounter") if isinstance(state, dict) else None
+    participants = enc.get("participants") if isinstance(enc, dict) else None
+    if not isinstance(participants, dict):
+        return None
+    p = participants.get(key)
+    return p if isinstance(p, dict) else None
+
+
+def legacy_get(state, entity, meter, default=0):
+    if meter not in _LEGACY_METERS:
+        raise KeyError(meter)
+    p = legacy_participant(state, entity)
+    if not p:
+        return int(default)
+    combat = p.get("combat")
+    if not isinstance(combat, dict):
+        return int(default)
+    return int(combat.get(meter, default) or 0)
+
+
+def legacy_set(state, entity, meter, value):
+    if meter not in _LEGACY_METERS:
+        raise KeyError(meter)
+    p = legacy_participant(state, entity)
+    if not p:
+        return
+    p.setdefault("combat", {})[meter] = int(value)
+
+
+def legacy_add(state, entity, meter, delta):
+    nxt = int(legacy_get(state, entity, meter, 0) + int(delta))
+    legacy_set(state, entity, meter, nxt)
+    return nxt
+
+
+def legacy_status_get(state, entity, status_id):
+    p = legacy_participant(state, entity)
+    if not p:
+        return None
+    statuses = p.get("statuses")
+    if not isinstance(statuses, dict):
+        return None
+    st = statuses.get(status_id)
+    return st if isinstance(st, dict) else None
+
+
+# ── workloads ────────────────────────────────────────────────────────────────
+
+def _link(get, add, set_, status_get, state, a, d):
+    get(state, a, "heat", 0)
+    get(state, a, "momentum", 0)
+    add(state, a, "momentum", 1)
+    add(state, a, "balance", 1)
+    set_(state, d, "balance", 0)
+    get(state, d, "rp", 0)
+    status_get(state, d, "status.stagger")
+
+
+def _fresh(register):
+    state, a, d = {}, {"id": "player"}, {"id": "enemy"}
+    register(state, key="player", entity=a, side="player")
+    register(state, key="enemy0", entity=d, side="enemy")
+    return state, a, d
+
+
+def _bytes_per_participant(register, n=2000):
+    state = {}
+    entities = [{"id": f"e{i}", "_combat_key": None} for i in range(n)]
+    keys = [f"k{i}" for i in range(n)]
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    for i, e in enumerate(entities):
+        register(state, key=keys[i], entity=e, side="enemy")
+    used = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(base, "filename"))
+    tracemalloc.stop()
+    return used / n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="combat_state microbenchmark")
+    parser.add_argument("-n", type=int, default=200_000, help="Simulated chain links per run.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for label, register, fns in (
+        ("dict (previous)", legacy_register, (legacy_get, legacy_add, legacy_set, legacy_status_get)),
+        ("Participant", lambda s, **kw: cs.register_participant(s, **kw), (cs.combat_get, cs.combat_add, cs.combat_set, cs.status_get)),
+    ):
+        state, a, d = _fresh(register)
+        t = min(timeit.repeat(lambda: _link(*fns, state, a, d), number=args.n, repeat=args.repeat))
+        rows.append((label, t / args.n * 1e9, _bytes_per_participant(register)))
+
+    print(f"{'layout':<18} {'ns/link':>10} {'bytes/participant':>18}")
+    for label, ns, size in rows:
+        print(f"{label:<18} {ns:>10.0f} {size:>18.0f}")
+    (_, old_ns, old_b), (_, new_ns, new_b) = rows
+    print(f"\nspeedup x{old_ns / new_ns:.2f}, memory x{old_b / new_b:.2f} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Microbenchmark: enemy spawning (deepcopy vs copy-on-write EnemyInstance).
+
+Usage:
+  python tools/bench_enemy_spawn.py
+  python tools/bench_enemy_spawn.py --spawns 5000 --enemy enemy.stonebound.mauler
+
+Spawns N primed enemies (the same work as a scene with N monsters: template
+copy, per-spawn RNG, play._prime_enemy_for_combat) the previous way, with
+deepcopy(template), and as EnemyInstance overlays on the shared template, and
+compares the memory held per live spawn and the time per spawn.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+import tracemalloc
+from copy import deepcopy
+from pathlib import Path
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import play  # noqa: E402
+from engine.enemy_instance import EnemyInstance  # noqa: E402
+
+
+def _spawn(make, template, i):
+    inst = make(template)
+    r = random.Random()
+    r.seed(f"bench|{template.get('id')}|{i}")
+    inst["_spawn_rng"] = r
+    return play._prime_enemy_for_combat(inst)
+
+
+def _bytes_per_spawn(make, template, n):
+    tracemalloc.start()
+    base = tracemalloc.take_snapshot()
+    live = [_spawn(make, template, i) for i in range(n)]
+    used = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(base, "filename"))
+    tracemalloc.stop()
+    del live
+    return used / n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="enemy spawn microbenchmark")
+    parser.add_argument("--spawns", type=int, default=2000, help="Live spawns measured for memory.")
+    parser.add_argument("-n", type=int, default=5000, help="Spawns per timing run.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--enemy", default=None, help="Bestiary id (default: the largest entry).")
+    args = parser.parse_args(argv)
+
+    enemies = play.shared_game_data().enemies_by_id
+    if args.enemy:
+        template = enemies[args.enemy]
+    else:
+        template = max(enemies.values(), key=lambda e: len(repr(e)))
+
+    rows = []
+    for label, make in (("deepcopy (previous)", deepcopy), ("EnemyInstance", EnemyInstance)):
+        t = min(timeit.repeat(lambda: [_spawn(make, template, i) for i in range(args.n)], number=1, repeat=args.repeat))
+        rows.append((label, t / args.n * 1e6, _bytes_per_spawn(make, template, args.spawns)))
+
+    print(f"template {template.get('id')}, {args.spawns} live spawns\n")
+    print(f"{'spawn':<20} {'us/spawn':>10} {'bytes/spawn':>12}")
+    for label, us, size in rows:
+        print(f"{label:<20} {us:>10.1f} {size:>12.0f}")
+    (_, old_us, old_b), (_, new_us, new_b) = rows
+    print(f"\nspeedup x{old_us / new_us:.2f}, memory x{old_b / new_b:.2f} smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compile game-data/ into a content pack.
+
+Usage:
+  python tools/build_content_pack.py
+  python tools/build_content_pack.py --out /srv/veinbreaker/content.pack
+  python tools/build_content_pack.py --check
+
+Reads the same JSON sources as play.load_game_data(), resolves enemy
+archetypes, builds the GameData lookup tables and writes them to
+game-data/content.pack (see engine/content_pack.py). The runtime loads the
+pack at startup. If any JSON source is newer than the pack, it falls back
+to the JSON. --check only reports whether the current pack is up to date
+(exit 1 when stale). Interrupt windows that can never fire (unknown predicate
+types or triggers) are listed; --strict refuses to write the pack then.
+
+The monster-maker and Path-maker builders run this after they emit their JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import os  # noqa: E402
+
+# Build from the JSON, never from an existing pack.
+os.environ["VB_CONTENT_PACK"] = "off"
+
+import play  # noqa: E402
+from engine.content_pack import read_pack, write_pack  # noqa: E402
+from engine.game_data import GameData  # noqa: E402
+from engine.interrupt_policy import precompile_enemy_windows  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the content pack")
+    parser.add_argument("--out", type=Path, default=play.CONTENT_PACK_PATH)
+    parser.add_argument("--check", action="store_true", help="Only check that the pack matches the sources.")
+    parser.add_argument("--strict", action="store_true", help="Fail (exit 1) on interrupt windows that can never fire.")
+    args = parser.parse_args(argv)
+
+    sources = play._game_data_sources()
+    if args.check:
+        ok = read_pack(args.out, sources=sources, root=ROOT) is not None
+        print(f"{args.out}: {'up to date' if ok else 'stale or missing'}")
+        return 0 if ok else 1
+
+    started = time.perf_counter()
+    game_data = GameData.build(play._read_game_data())
+    invalid = precompile_enemy_windows(game_data.enemies_by_id)
+    for eid, errors in sorted(invalid.items()):
+        for err in errors:
+            print(f"{eid}: interrupt {err}")
+    if invalid and args.strict:
+        return 1
+    size = write_pack(args.out, game_data, sources, ROOT)
+    elapsed = time.perf_counter() - started
+    print(
+        f"wrote {args.out} ({size} bytes, {len(game_data.enemies_by_id)} enemies, "
+        f"{len(game_data.abilities_by_id)} abilities, {len(game_data.loot_by_id)} loot) in {elapsed * 1000:.0f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
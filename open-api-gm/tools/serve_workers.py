@@ -0,0 +1,67 @@
+"""
+Run N server workers behind the consistent-hash session router.
+
+Usage:
+  python tools/serve_workers.py --workers 4              # router on :8000, workers on :8001-8004
+  python tools/serve_workers.py --workers 8 --port 9000 --db /var/lib/vb/sessions.sqlite
+
+Each worker is a separate `uvicorn server:app` process (its own core for
+chain resolution) with VB_SESSION_STORE=sqlite on the shared database, so a
+session can be served by any of them. The router (session_routing.py) sends
+every session_id to the same worker while it is up and fails over to the
+next one on the ring when it is not. Ctrl-C stops everything.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Router + N session-sharing server workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000, help="Router port; workers use the next N ports.")
+    parser.add_argument("--db", default=str(ROOT / ".data" / "sessions.sqlite"), help="Shared session database.")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    from session_routing import create_router
+
+    procs = []
+    upstreams = []
+    for i in range(max(1, args.workers)):
+        port = args.port + 1 + i
+        env = dict(os.environ, VB_SESSION_STORE="sqlite", VB_SESSION_DB=args.db, VB_WORKER_ID=f"worker-{i}")
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=str(ROOT),
+            env=env,
+        ))
+        upstreams.append(f"http://127.0.0.1:{port}")
+    time.sleep(1.0)
+    print(f"router http://{args.host}:{args.port} -> {', '.join(upstreams)}", flush=True)
+    try:
+        uvicorn.run(create_router(upstreams), host=args.host, port=args.port)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+if __name__ == "__main__":
+    main()
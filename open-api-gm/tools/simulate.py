@@ -0,0 +1,77 @@
+"""
+Headless Monte Carlo balance runs.
+
+Usage:
+  python tools/simulate.py -n 2000 --seed 7
+  python tools/simulate.py -n 500 --enemy enemy.brumklin.skitter --build characters/character.magus.json
+  python tools/simulate.py -n 5000 --workers 8 --json sim_report.json
+
+Runs N seeded encounters for every (character build, bestiary entry) pair and
+prints win rate, rounds-to-kill, damage and interrupt frequency. Same seed and
+options -> same numbers, regardless of --workers.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from simulator import SimConfig, load_builds, run_batch  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless combat simulator")
+    parser.add_argument("-n", type=int, default=1000, help="Encounters per (build, enemy) pair.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--enemy", action="append", default=None, help="Bestiary id (repeatable; default: all).")
+    parser.add_argument("--build", action="append", default=None, help="Character profile JSON (repeatable; default: characters/*.json).")
+    parser.add_argument("--max-rounds", type=int, default=SimConfig.max_rounds)
+    parser.add_argument("--chain-len", type=int, default=SimConfig.chain_len)
+    parser.add_argument("--player-interrupt-rate", type=float, default=SimConfig.player_interrupt_rate)
+    parser.add_argument("--no-execute", action="store_true", help="Never declare EXECUTE.")
+    parser.add_argument("--dice-block", type=int, default=SimConfig.dice_block, help="Pre-rolled dice per vectorized block (0 = roll one at a time).")
+    parser.add_argument("--json", dest="json_out", default=None, help="Write the full report to this path.")
+    args = parser.parse_args(argv)
+
+    config = SimConfig(
+        max_rounds=args.max_rounds,
+        chain_len=args.chain_len,
+        player_interrupt_rate=args.player_interrupt_rate,
+        use_execute=not args.no_execute,
+        dice_block=args.dice_block,
+    )
+    builds = load_builds([Path(p) for p in args.build]) if args.build else None
+
+    t0 = time.perf_counter()
+    report = run_batch(builds=builds, enemy_ids=args.enemy, n=args.n, seed=args.seed, workers=args.workers, config=config)
+    elapsed = time.perf_counter() - t0
+
+    header = f"{'build':<28} {'enemy':<32} {'win%':>6} {'rtk p50':>8} {'dmg out':>8} {'dmg in':>7} {'int/rnd':>8} {'brk/rnd':>8}"
+    print(header)
+    print("-" * len(header))
+    total = 0
+    for row in report["summary"].values():
+        total += row["encounters"]
+        print(
+            f"{row['build'][:28]:<28} {row['enemy'][:32]:<32} "
+            f"{row['win_rate'] * 100:>5.1f}% {row['rounds_to_kill']['p50']:>8.1f} "
+            f"{row['damage_dealt']['mean']:>8.1f} {row['damage_taken']['mean']:>7.1f} "
+            f"{row['enemy_interrupts_per_round']:>8.3f} {row['enemy_interrupt_break_rate']:>8.3f}"
+        )
+    print(f"\n{total} encounters in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f}/s)")
+
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,30 @@ Works for both CLI and Web providers by probing for a session.emit hook.
 
 from __future__ import annotations
 
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
+from engine.log_writer import log_writer
 
-_DEBUG_LOG_PATH = Path(__file__).resolve().parents[1] / "narration.log"
+
+_DEBUG_LOG_PATH = Path(os.getenv("VB_NARRATION_LOG") or Path(__file__).resolve().parents[1] / "narration.log")
+_DEBUG_LOG_ENABLED = True
+
+
+def set_debug_log_enabled(enabled: bool) -> None:
+    """Toggle the narration.log wiring trace (headless tools such as the simulator turn it off)."""
+    global _DEBUG_LOG_ENABLED
+    _DEBUG_LOG_ENABLED = bool(enabled)
 
 
 def _debug_log(line: str) -> None:
+    if not _DEBUG_LOG_ENABLED:
+        return
     try:
         ts = datetime.now().strftime("%H:%M:%S")
-        _DEBUG_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with _DEBUG_LOG_PATH.open("a", encoding="utf-8") as f:
-            f.write(f"{ts} {line}\n")
+        log_writer(_DEBUG_LOG_PATH).write(f"{ts} {line}")
     except Exception:
         # never break game loop for debug logging
         pass
@@ -49,6 +59,50 @@ def emit_event(ui, payload: Dict[str, Any]) -> None:
         pass
 
 
+def emit_state_update(ui, event: Dict[str, Any], key: str, channel: str | None = None) -> None:
+    """
+    Emit a HUD snapshot event (`event[key]` is the snapshot). Sessions whose client
+    acknowledges versions get it delta-encoded against the last one sent (state_diff.py).
+    """
+    try:
+        provider = getattr(ui, "provider", None) or ui
+        session = getattr(provider, "session", None)
+        differ = getattr(session, "deltas", None)
+        if differ is None or not differ.enabled:
+            emit_event(ui, event)
+            return
+        encoded = differ.encode(channel or key, event.get(key))
+        if encoded is None:
+            return
+        out = {k: v for k, v in event.items() if k != key}
+        if "full" in encoded:
+            out[key] = encoded["full"]
+            out["version"] = encoded["version"]
+        else:
+            out.update(encoded)
+        emit_event(ui, out)
+    except Exception:
+        emit_event(ui, event)
+
+
+def deliver_event(ui, payload: Dict[str, Any]) -> None:
+    """
+    Thread-safe variant of emit_event for events produced off the game loop
+    (async narration). Queued on the session until the next /events or /step.
+    """
+    try:
+        provider = getattr(ui, "provider", None) or ui
+        session = getattr(provider, "session", None)
+        if session is None:
+            return
+        if hasattr(session, "deliver"):
+            session.deliver(payload)
+        elif hasattr(session, "emit"):
+            session.emit(payload)
+    except Exception:
+        pass
+
+
 def build_combat_state(active: bool) -> Dict[str, Any]:
     return {"type": "combat_state", "active": active}
 
@@ -132,7 +186,7 @@ def emit_character_update(ui, character: Dict[str, Any]) -> None:
                 )
     except Exception:
         pass
-    emit_event(ui, build_character_update(character))
+    emit_state_update(ui, build_character_update(character), "character")
 
 
 def emit_resource_update(ui, *, momentum: int | None = None, balance: int | None = None, heat: int | None = None) -> None: